@@ -42,6 +42,7 @@ from app.models.clinical_case import ClinicalCase
 from app.models.expert_strategy import ExpertStrategy
 from app.models.expert_user import ExpertUser
 from app.models.prerequisite import Competence, PrerequisCompetence
+from app.models.exam_catalog import ExamCatalogEntry
 
 # Module Apprenant
 from app.models.learner_models import (
@@ -61,6 +62,12 @@ from app.models.tutor_models import (
     TutorScaffoldingState, TutorSocraticState, TutorMotivationalState, 
     TutorFeedbackLog
 )
+
+# Module Cache IA
+from app.models.cache_models import ExamResultCache
+
+# Module File des Évaluations Finales
+from app.models.job_models import EvaluationJob
 # --------------------------------------------------
 
 target_metadata = Base.metadata
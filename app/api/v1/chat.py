@@ -1,5 +1,7 @@
 #=== Fichier: ./app/api/v1/chat.py ===
 
+import asyncio
+import json
 import logging
 import time
 import uuid
@@ -7,11 +9,13 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ... import schemas, models
+from ... import schemas
 from ...services import chat_service
-from ...dependencies import get_db
+from ...services.session_events import session_event_bus
+from ...dependencies import get_async_db, llm_work_slot
 
 # ==============================================================================
 # CONFIGURATION DU LOGGER API
@@ -25,6 +29,9 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
+# Intervalle des commentaires keep-alive sur le canal d'événements
+SSE_KEEPALIVE_SECONDS = 15
+
 router = APIRouter(
     prefix="/chat",
     tags=["Chat"]
@@ -33,19 +40,22 @@ router = APIRouter(
 @router.post(
     "/sessions/{session_id}/messages", 
     response_model=schemas.chat_message.ChatMessage, 
-    status_code=status.HTTP_201_CREATED
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(llm_work_slot)]
 )
-def post_chat_message(
+async def post_chat_message(
     session_id: UUID,
     message_data: schemas.chat_message.ChatMessageCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Poste un nouveau message dans le chat d'une session de simulation.
     
-    ATTENTION : Cet endpoint est synchrone et bloquant. 
-    Si c'est un message de l'étudiant, il va déclencher le Patient Actor (IA).
-    La réponse peut prendre quelques secondes.
+    Si c'est un message de l'étudiant, il va déclencher le Patient Actor (IA) :
+    la réponse peut prendre quelques secondes (attente non bloquante, sans
+    thread ni connexion BDD mobilisés pendant l'appel IA).
+    Le feedback du Tuteur est calculé en arrière-plan : il est notifié sur
+    GET /sessions/{session_id}/events (et visible ensuite dans l'historique).
     """
     # ID de requête pour corréler avec les logs des services
     req_id = str(uuid.uuid4())[:8]
@@ -56,7 +66,7 @@ def post_chat_message(
 
     try:
         # Appel au service (qui va orchestrer l'IA si nécessaire)
-        new_message = chat_service.create_chat_message(
+        new_message = await chat_service.create_chat_message_async(
             db=db, 
             session_id=session_id, 
             message=message_data
@@ -82,13 +92,108 @@ def post_chat_message(
             detail=f"Erreur interne lors du traitement du message: {str(e)}"
         )
 
+def _format_sse(event: str, data: dict) -> str:
+    """Sérialise un événement au format Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/sessions/{session_id}/messages/stream", dependencies=[Depends(llm_work_slot)])
+async def post_chat_message_stream(
+    session_id: UUID,
+    message_data: schemas.chat_message.ChatMessageCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Variante streamée de POST /messages (Server-Sent Events).
+
+    Le message de l'étudiant est sauvegardé immédiatement, puis la réponse du
+    patient est envoyée token par token dès sa génération. Événements émis :
+    `learner_message`, `token`*, `patient_message`, `done` (ou `error`).
+    Le feedback du Tuteur arrive ensuite sur GET /sessions/{session_id}/events.
+    """
+    req_id = str(uuid.uuid4())[:8]
+    logger.info(f"📥 [REQ-{req_id}] POST /messages/stream | Session: {session_id}")
+
+    try:
+        learner_msg = await chat_service.create_learner_message_async(
+            db=db,
+            session_id=session_id,
+            message=message_data
+        )
+    except ValueError as e:
+        logger.warning(f"   ⚠️ [REQ-{req_id}] Erreur 404 (Resource Not Found): {str(e)}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"   ❌ [REQ-{req_id}] Erreur 500 (Internal Server Error): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur interne lors du traitement du message: {str(e)}"
+        )
+
+    learner_payload = schemas.chat_message.ChatMessage.model_validate(learner_msg).model_dump(mode="json")
+    learner_msg_id = learner_msg.id
+    trigger_ai = chat_service.is_ai_trigger(message_data.sender)
+
+    async def event_stream():
+        yield _format_sse("learner_message", learner_payload)
+        if not trigger_ai:
+            yield _format_sse("done", {"message_id": learner_msg_id})
+            return
+        async for event, data in chat_service.stream_patient_reply_async(session_id, learner_msg_id, message_data.content):
+            yield _format_sse(event, data)
+        logger.info(f"   ✅ [REQ-{req_id}] Stream clôturé | Msg ID: {learner_msg_id}")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/sessions/{session_id}/events")
+async def stream_session_events(session_id: UUID, request: Request):
+    """
+    Canal de notifications de la session (Server-Sent Events).
+
+    Le client y reçoit les résultats des traitements d'arrière-plan, notamment
+    l'événement `tutor_feedback` ({"message_id", "tutor_feedback"}) dès que
+    l'analyse du Tuteur d'un message patient est disponible (`tutor_feedback`
+    à null si l'analyse a été abandonnée), et `evaluation_done` à la fin d'une
+    évaluation. Ces événements sont relayés par Postgres NOTIFY : le client les
+    reçoit quel que soit le worker web qui les a produits.
+    """
+    req_id = str(uuid.uuid4())[:8]
+    logger.info(f"📡 [REQ-{req_id}] GET /events | Session: {session_id}")
+
+    async def event_stream():
+        queue = session_event_bus.subscribe(session_id)
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Commentaire SSE : garde la connexion ouverte derrière les proxys
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(event, data)
+        finally:
+            session_event_bus.unsubscribe(session_id, queue)
+            logger.info(f"   🔌 [REQ-{req_id}] Client déconnecté du canal d'événements.")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get(
     "/sessions/{session_id}/messages", 
     response_model=List[schemas.chat_message.ChatMessage]
 )
-def get_chat_history(
+async def get_chat_history(
     session_id: UUID, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Récupère l'historique complet des messages pour une session.
@@ -100,15 +205,12 @@ def get_chat_history(
     logger.debug(f"🔍 [REQ-{req_id}] GET /messages | Session: {session_id}")
 
     try:
-        # Vérification pré-service pour un log API plus propre
-        # (Bien que le service le fasse aussi, le faire ici permet de logger l'erreur HTTP correspondante)
-        session = db.query(models.SimulationSession).filter(models.SimulationSession.id == session_id).first()
-        if not session:
+        # Le service renvoie None si la session n'existe pas (log de l'erreur HTTP correspondante ici)
+        messages = await chat_service.get_messages_by_session_async(db=db, session_id=session_id)
+        if messages is None:
             logger.warning(f"   ⚠️ [REQ-{req_id}] Session introuvable.")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"La session {session_id} n'existe pas.")
         
-        messages = chat_service.get_messages_by_session(db=db, session_id=session_id)
-        
         duration = time.time() - start_time
         logger.info(f"   ✅ [REQ-{req_id}] Succès HTTP 200 | {len(messages)} messages récupérés | {duration:.3f}s")
         
@@ -0,0 +1,87 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from ...database import async_pool_metrics, pool_metrics
+from ...services import ai_generation_service
+from ...services.session_context_cache import session_context_cache
+from ...services.patient_intent_service import patient_intent_router
+from ...services.tutor_gating_service import tutor_gate
+from ...services.llm_work_executor import get_llm_work_stats
+from ...services.lab_report_service import lab_report_renderer
+from ...services.local_grader_service import local_grader
+from ...services.llm import completion_single_flight, llm_governor, circuit_breakers, model_latency_tracker
+
+router = APIRouter(
+    prefix="/monitoring",
+    tags=["Monitoring"]
+)
+
+
+@router.get("/sessions", response_model=Dict[str, Any])
+def get_session_context_metrics():
+    """
+    Patient virtuel (ce processus) :
+
+    - `session_context`   : cache des contextes de session (taille, succès/échecs,
+                            évictions LRU, expirations TTL, invalidations).
+    - `patient_fast_path` : questions factuelles servies sans LLM, par intention.
+    - `tutor_gating`      : décisions du déclencheur de l'analyse du Tuteur
+                            (analysées, groupées, différées, ignorées).
+    """
+    return {
+        "session_context": session_context_cache.stats(),
+        "patient_fast_path": patient_intent_router.stats(),
+        "tutor_gating": tutor_gate.stats(),
+    }
+
+
+@router.get("/db", response_model=Dict[str, Any])
+def get_db_pool_metrics():
+    """
+    Occupation des pools de connexions BDD (ce processus) : `pool` (moteur
+    synchrone : jobs d'arrière-plan, scripts) et `async_pool` (routes async).
+
+    - `checked_out` / `peak_checked_out` : connexions empruntées (actuel / pic).
+    - `hold_seconds`                     : durée d'emprunt (p50/p95/max, derniers emprunts).
+    - `external_calls_holding_connection`: appels LLM lancés avec une connexion
+                                           empruntée (doit rester à 0).
+    """
+    return {"pool": pool_metrics.stats(), "async_pool": async_pool_metrics.stats()}
+
+
+@router.get("/workers", response_model=Dict[str, Any])
+def get_llm_work_metrics():
+    """
+    Capacité dédiée au travail IA (ce processus), pour dimensionner les workers par pod.
+
+    - `llm_requests`   : requêtes HTTP attendant un LLM (actives / en attente,
+                         refus en 503, attentes expirées, pics).
+    - `tutor_analysis` : pool d'arrière-plan de l'analyse du Tuteur.
+    """
+    return get_llm_work_stats()
+
+
+@router.get("/llm", response_model=Dict[str, Any])
+def get_llm_metrics():
+    """
+    Métriques du noyau IA pour ce processus (remises à zéro au redémarrage).
+
+    - `governor`         : places actives, files d'attente par tâche, temps d'attente, 429.
+    - `circuit_breakers` : état des disjoncteurs par modèle (closed / open / half_open).
+    - `models`           : latences (p50/p95), erreurs et relances par modèle et par tâche.
+    - `single_flight`    : appels LLM coalescés (requêtes identiques simultanées).
+    - `token_usage`      : tokens consommés par type de tâche.
+    - `local_grader`     : soumissions notées localement (méthode de résolution
+                           du diagnostic, corrections rapides sans jury).
+    - `lab_reports`      : comptes-rendus de biologie rendus localement (sans LLM).
+    """
+    return {
+        "governor": llm_governor.stats(),
+        "circuit_breakers": circuit_breakers.stats(),
+        "models": model_latency_tracker.stats(),
+        "single_flight": completion_single_flight.stats(),
+        "token_usage": ai_generation_service.get_token_usage(),
+        "local_grader": local_grader.stats(),
+        "lab_reports": lab_report_renderer.stats(),
+    }
@@ -8,10 +8,11 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ... import schemas, models
-from ...services import tutor_service
-from ...dependencies import get_db
+from ...services import tutor_service, evaluation_job_service
+from ...dependencies import get_async_db, llm_work_slot
 
 # ==============================================================================
 # CONFIGURATION DU LOGGER API SIMULATION
@@ -35,14 +36,61 @@ router = APIRouter(
 # 1. DÉMARRAGE DE SESSION
 # ==============================================================================
 
+def _start_session_response(
+    db: Session,
+    learner_id: int,
+    category: str
+) -> schemas.simulation.SessionStartResponse:
+    """
+    Démarre la session et sérialise la réponse dans le contexte synchrone
+    (`run_sync`) : la pathologie y est chargée à la demande.
+    """
+    session, clinical_case, session_type = tutor_service.start_new_session(
+        db=db,
+        learner_id=learner_id,
+        category=category
+    )
+    
+    # --- SÉRIALISATION MANUELLE (Protection Pydantic) ---
+    # On convertit l'objet SQLAlchemy Pathologie en dictionnaire simple
+    # pour éviter l'erreur "Unable to serialize unknown type"
+    patho_dict = None
+    if clinical_case.pathologie_principale:
+        p = clinical_case.pathologie_principale
+        patho_dict = {
+            "id": p.id,
+            "nom_fr": p.nom_fr,
+            "code_icd10": p.code_icd10,
+            "categorie": p.categorie,
+            "description": p.description
+        }
+
+    # Construction du dictionnaire pour le schéma de réponse
+    case_dict = {
+        "id": clinical_case.id,
+        "code_fultang": clinical_case.code_fultang,
+        "niveau_difficulte": clinical_case.niveau_difficulte,
+        "pathologie_principale": patho_dict, # Dict pur, pas d'objet ORM
+        "presentation_clinique": clinical_case.presentation_clinique,
+        "donnees_paracliniques": clinical_case.donnees_paracliniques
+    }
+
+    return schemas.simulation.SessionStartResponse(
+        session_id=session.id,
+        session_type=session_type,
+        clinical_case=case_dict,
+        start_time=session.start_time
+    )
+
+
 @router.post(
     "/sessions/start",
     response_model=schemas.simulation.SessionStartResponse,
     status_code=status.HTTP_201_CREATED
 )
-def start_simulation_session(
+async def start_simulation_session(
     request_data: schemas.simulation.SessionStartRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Démarre une nouvelle session de simulation pour un apprenant.
@@ -54,46 +102,13 @@ def start_simulation_session(
     logger.info(f"📥 [REQ-{req_id}] POST /sessions/start | Learner: {request_data.learner_id} | Cat: {request_data.category}")
 
     try:
-        # Appel au service orchestrateur
-        session, clinical_case, session_type = tutor_service.start_new_session(
-            db=db,
-            learner_id=request_data.learner_id,
-            category=request_data.category
-        )
-        
-        # --- SÉRIALISATION MANUELLE (Protection Pydantic) ---
-        # On convertit l'objet SQLAlchemy Pathologie en dictionnaire simple
-        # pour éviter l'erreur "Unable to serialize unknown type"
-        patho_dict = None
-        if clinical_case.pathologie_principale:
-            p = clinical_case.pathologie_principale
-            patho_dict = {
-                "id": p.id,
-                "nom_fr": p.nom_fr,
-                "code_icd10": p.code_icd10,
-                "categorie": p.categorie,
-                "description": p.description
-            }
-
-        # Construction du dictionnaire pour le schéma de réponse
-        case_dict = {
-            "id": clinical_case.id,
-            "code_fultang": clinical_case.code_fultang,
-            "niveau_difficulte": clinical_case.niveau_difficulte,
-            "pathologie_principale": patho_dict, # Dict pur, pas d'objet ORM
-            "presentation_clinique": clinical_case.presentation_clinique,
-            "donnees_paracliniques": clinical_case.donnees_paracliniques
-        }
-
-        response = schemas.simulation.SessionStartResponse(
-            session_id=session.id,
-            session_type=session_type,
-            clinical_case=case_dict,
-            start_time=session.start_time
+        # Appel au service orchestrateur (accès BDD synchrones, sans appel IA)
+        response = await db.run_sync(
+            lambda sync_db: _start_session_response(sync_db, request_data.learner_id, request_data.category)
         )
         
         duration = time.time() - start_time
-        logger.info(f"   ✅ [REQ-{req_id}] Session démarrée : {session.id} ({duration:.2f}s)")
+        logger.info(f"   ✅ [REQ-{req_id}] Session démarrée : {response.session_id} ({duration:.2f}s)")
         
         return response
 
@@ -116,12 +131,13 @@ def start_simulation_session(
 
 @router.post(
     "/sessions/{session_id}/actions",
-    response_model=schemas.simulation.LearnerActionResponse
+    response_model=schemas.simulation.LearnerActionResponse,
+    dependencies=[Depends(llm_work_slot)]
 )
-def perform_learner_action(
+async def perform_learner_action(
     session_id: UUID,
     action_data: schemas.simulation.LearnerActionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Traite une action effectuée par l'apprenant (Examen, Prescription).
@@ -135,21 +151,12 @@ def perform_learner_action(
 
     try:
         # Appel au service Tutor
-        result_data, feedback = tutor_service.process_learner_action(
+        # Coût et durée viennent du service : l'examen n'est résolu qu'une fois
+        result_data, feedback, meta = await tutor_service.process_learner_action_async(
             db=db,
             session_id=session_id,
             action_data=action_data
         )
-        
-        # Reconstruction des métadonnées pour l'affichage frontend
-        from ...services.tutor_service import VirtualTimeManager, VirtualBudgetManager
-        cost = VirtualBudgetManager.estimate_cost(action_data.action_name)
-        duration_min = VirtualTimeManager.calculate_duration(action_data.action_type, action_data.action_name)
-        
-        meta = schemas.simulation.ActionMetadata(
-            virtual_cost=cost,
-            virtual_duration=duration_min
-        )
 
         response = schemas.simulation.LearnerActionResponse(
             action_type=action_data.action_type,
@@ -183,11 +190,12 @@ def perform_learner_action(
 
 @router.post(
     "/sessions/{session_id}/request-hint",
-    response_model=schemas.simulation.HintResponse
+    response_model=schemas.simulation.HintResponse,
+    dependencies=[Depends(llm_work_slot)]
 )
-def request_hint(
+async def request_hint(
     session_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Permet à un apprenant de demander un indice pour la session en cours.
@@ -196,7 +204,7 @@ def request_hint(
     logger.info(f"📥 [REQ-{req_id}] POST /request-hint | Session: {session_id}")
 
     try:
-        hint_type, hint_content = tutor_service.provide_hint(
+        hint_type, hint_content = await tutor_service.provide_hint_async(
             db=db,
             session_id=session_id
         )
@@ -204,7 +212,7 @@ def request_hint(
         response = schemas.simulation.HintResponse(
             hint_type=hint_type,
             content=hint_content,
-            cost_penalty=5 
+            cost_penalty=tutor_service.HINT_TIME_PENALTY
         )
         
         logger.info(f"   ✅ [REQ-{req_id}] Indice fourni ({hint_type})")
@@ -220,24 +228,28 @@ def request_hint(
         )
 
 # ==============================================================================
-# 4. SOUMISSION FINALE (Mode Sémantique)
+# 4. SOUMISSION FINALE (Mode Sémantique, évaluation en arrière-plan)
 # ==============================================================================
 
 @router.post(
     "/sessions/{session_id}/submit",
-    response_model=schemas.simulation.SubmissionResponse
+    response_model=schemas.simulation.EvaluationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
 )
-def submit_final_diagnosis(
+async def submit_final_diagnosis(
     session_id: UUID,
     submission_data: schemas.simulation.SubmissionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Soumet le diagnostic et le traitement final de l'apprenant pour évaluation.
-    Accepte maintenant du texte libre qui sera analysé sémantiquement par l'IA.
+    Accepte du texte libre qui sera analysé sémantiquement par l'IA.
+
+    L'évaluation est mise en file (202 + job) et traitée par les workers
+    d'évaluation. Le rapport s'obtient sur GET /evaluations/{job_id}, et est
+    aussi poussé (`evaluation_done`) sur le canal d'événements de la session.
     """
     req_id = str(uuid.uuid4())[:8]
-    start_time = time.time()
     
     logger.info(f"📥 [REQ-{req_id}] POST /submit | Session: {session_id}")
     
@@ -251,37 +263,47 @@ def submit_final_diagnosis(
     logger.info(f"   💊 Traitement soumis : '{treat_preview}'")
 
     try:
-        # Appel au service d'évaluation (IA Juge)
-        eval_result, feedback, recommendation = tutor_service.evaluate_submission(
-            db=db,
-            session_id=session_id,
-            submission_data=submission_data
-        )
-
-        response = schemas.simulation.SubmissionResponse(
-            evaluation=eval_result,
-            feedback_global=feedback,
-            recommendation_next_step=recommendation,
-            # On pourrait ajouter ici les métriques finales calculées
-            session_duration_seconds=int(time.time() - start_time) 
+        response = await db.run_sync(
+            lambda sync_db: evaluation_job_service.to_response(
+                evaluation_job_service.enqueue_evaluation(sync_db, session_id, submission_data)
+            )
         )
-        
-        duration = time.time() - start_time
-        logger.info(f"   🏆 [REQ-{req_id}] Évaluation terminée. Note: {eval_result.score_total}/20 ({duration:.2f}s)")
-        
+        logger.info(f"   📨 [REQ-{req_id}] Évaluation en file : job {response.job_id} ({response.status})")
         return response
 
     except ValueError as e:
         logger.warning(f"   ⚠️ [REQ-{req_id}] Données invalides (404): {str(e)}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
-        logger.critical(f"   ❌ [REQ-{req_id}] Erreur critique évaluation (500): {str(e)}")
+        logger.critical(f"   ❌ [REQ-{req_id}] Erreur mise en file de l'évaluation (500): {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de l'évaluation: {str(e)}"
+            detail=f"Erreur lors de la soumission: {str(e)}"
         )
+
+
+@router.get(
+    "/evaluations/{job_id}",
+    response_model=schemas.simulation.EvaluationJobResponse
+)
+async def get_evaluation_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    État d'une évaluation soumise : `queued`, `running`, `done` (rapport dans
+    `result`) ou `failed` (cause dans `error`).
+    """
+    def _read(sync_db: Session):
+        job = evaluation_job_service.get_job(sync_db, job_id)
+        return evaluation_job_service.to_response(job) if job else None
+
+    response = await db.run_sync(_read)
+    if response is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Évaluation {job_id} introuvable.")
+    return response
     
 
 @router.get(
@@ -289,9 +311,9 @@ def submit_final_diagnosis(
     response_model=schemas.simulation.LearnerDetailedHistoryResponse,
     summary="Obtenir l'historique détaillé par catégorie"
 )
-def get_learner_detailed_history(
+async def get_learner_detailed_history(
     learner_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Renvoie l'historique complet des sessions de l'apprenant, regroupé par spécialité médicale (catégorie).
@@ -308,7 +330,9 @@ def get_learner_detailed_history(
     ]
     """
     try:
-        return tutor_service.get_learner_history_by_category(db=db, learner_id=learner_id)
+        return await db.run_sync(
+            lambda sync_db: tutor_service.get_learner_history_by_category(db=sync_db, learner_id=learner_id)
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -3,7 +3,7 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # ... (existant)
     DATABASE_URL: str
-    
+
     # --- AJOUT ---
     CLOUDINARY_CLOUD_NAME: str
     CLOUDINARY_API_KEY: str
@@ -12,6 +12,74 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: str
     # -------------
 
+    # --- NOYAU IA (Client HTTP mutualisé) ---
+    LLM_HTTP2_ENABLED: bool = True          # HTTP/2 si le paquet 'h2' est installé
+    LLM_POOL_MAX_CONNECTIONS: int = 100     # Connexions simultanées max vers le fournisseur
+    LLM_POOL_MAX_KEEPALIVE: int = 20        # Connexions gardées ouvertes entre deux appels
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 30.0 # Durée de vie (s) d'une connexion inactive
+
+    # --- NOYAU IA (Gouverneur de débit et de priorités) ---
+    LLM_MAX_CONCURRENCY: int = 16           # Appels LLM simultanés max (toutes tâches confondues)
+    LLM_RATE_LIMIT_PER_SECOND: float = 5.0  # Débit moyen autorisé vers le fournisseur (0 = illimité)
+    LLM_RATE_LIMIT_BURST: int = 10          # Rafale tolérée au-dessus du débit moyen
+
+    # --- NOYAU IA (Disjoncteur) ---
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 3      # Échecs consécutifs (retries épuisés) avant ouverture
+    LLM_BREAKER_RECOVERY_SECONDS: float = 30.0  # Durée d'ouverture avant appel sonde
+    LLM_BREAKER_HALF_OPEN_CALLS: int = 1        # Appels sondes simultanés en semi-ouverture
+
+    # --- NOYAU IA (Routage multi-modèles / relances différées) ---
+    LLM_HEDGING_ENABLED: bool = True
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 10.0  # Délai de relance tant que le p95 n'est pas connu
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 2.0       # Plancher (évite de doubler tous les appels)
+
+    # --- CACHE DES RÉSULTATS D'EXAMENS ---
+    EXAM_CACHE_ENABLED: bool = True
+    EXAM_CACHE_TTL_HOURS: int = 720         # 30 jours (les données du cas changent rarement)
+    EXAM_CACHE_MAX_ENTRIES: int = 50000     # Au-delà : éviction des entrées les moins récemment utilisées
+    LOCAL_LAB_REPORTS_ENABLED: bool = True  # Panels de biologie rendus localement (sans LLM) depuis le dossier
+
+    # --- CONTEXTE DE SESSION EN MÉMOIRE (Patient virtuel) ---
+    SESSION_CONTEXT_CACHE_MAX_ENTRIES: int = 1000     # Sessions actives gardées en mémoire (LRU)
+    SESSION_CONTEXT_CACHE_TTL_SECONDS: float = 3600.0  # Durée de vie d'un contexte
+    SESSION_CONTEXT_VERSION_CHECK_SECONDS: float = 60.0  # Revérification du `updated_at` du cas
+
+    # --- VOIE RAPIDE DU PATIENT (questions factuelles servies sans LLM) ---
+    PATIENT_FAST_PATH_ENABLED: bool = True
+    PATIENT_FAST_PATH_MIN_SIMILARITY: float = 0.82  # Similarité cosinus minimale avec la banque d'intentions
+    PATIENT_FAST_PATH_MIN_MARGIN: float = 0.05      # Écart minimal avec l'intention (ou le dialogue ouvert) suivante
+    PATIENT_FAST_PATH_RETRY_SECONDS: float = 60.0   # Suspension de la voie rapide après une erreur du classifieur
+
+    # --- DÉCLENCHEMENT DE L'ANALYSE DU TUTEUR ---
+    TUTOR_GATING_ENABLED: bool = True   # False : chaque échange est analysé par le LLM
+    TUTOR_ANALYSIS_BATCH_EVERY: int = 3  # Échanges sans élément nouveau analysés par lots de N
+
+    # --- POOL DE CONNEXIONS BDD ---
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Attente maximale d'une connexion libre
+
+    # --- CAPACITÉ DÉDIÉE AU TRAVAIL IA (admission, 503 + Retry-After au-delà) ---
+    LLM_WORK_MAX_ACTIVE: int = 32               # Requêtes HTTP attendant un LLM traitées simultanément
+    LLM_WORK_MAX_QUEUED: int = 64               # Requêtes en attente d'une place
+    LLM_WORK_QUEUE_TIMEOUT_SECONDS: float = 10.0  # Attente maximale d'une place avant refus
+    LLM_WORK_RETRY_AFTER_SECONDS: int = 5       # Valeur de l'en-tête Retry-After des refus
+    TUTOR_ANALYSIS_WORKERS: int = 4             # Threads de l'analyse du Tuteur (arrière-plan)
+    TUTOR_ANALYSIS_MAX_QUEUED: int = 100        # Analyses en attente avant abandon
+
+    # --- FILE DES ÉVALUATIONS FINALES (POST /submit -> 202) ---
+    EVALUATION_JOB_MAX_ATTEMPTS: int = 3                 # Tentatives avant statut 'failed'
+    EVALUATION_JOB_RETRY_BACKOFF_SECONDS: float = 30.0   # Délai avant 2e tentative (doublé ensuite)
+    EVALUATION_JOB_LEASE_SECONDS: float = 300.0          # Job 'running' repris au-delà (worker mort)
+    EVALUATION_WORKER_POLL_SECONDS: float = 2.0          # Attente d'un worker quand la file est vide
+    EVALUATION_INPROCESS_WORKERS: int = 0                # Workers lancés dans le processus web (0 = script dédié)
+
+    # --- CORRECTEUR LOCAL DES SOUMISSIONS (notes sans jury LLM) ---
+    LOCAL_GRADER_ENABLED: bool = True              # Notes diagnostic/traitement calculées localement
+    FAST_GRADING_ENABLED: bool = False             # True : aucun appel LLM (feedback rédigé localement)
+    GRADER_DISEASE_MIN_SIMILARITY: float = 0.80    # Similarité minimale du plus proche voisin (embedding)
+    GRADER_QUESTION_MIN_SIMILARITY: float = 0.60   # Question d'anamnèse considérée comme posée (embedding)
+
     class Config:
         env_file = ".env"
         extra = "ignore"
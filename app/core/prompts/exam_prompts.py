@@ -5,6 +5,8 @@ import json
 import datetime
 from typing import Dict, Any, Optional, List
 
+from ...services.exam_catalog_service import exam_catalog
+
 # ==============================================================================
 # CONFIGURATION DU LOGGER SPÉCIFIQUE
 # ==============================================================================
@@ -31,6 +33,9 @@ class ExamPromptBuilder:
     que le LLM devra suivre pour produire le résultat.
     """
 
+    # À incrémenter à chaque modification des templates : invalide le cache des résultats d'examens
+    TEMPLATE_VERSION = "v1"
+
     def __init__(self):
         logger.info("🔧 Initialisation du ExamPromptBuilder")
         
@@ -151,28 +156,36 @@ FORMAT DE SORTIE : JSON STRICT.
         Construit le prompt final en choisissant le bon template et en injectant les données.
         
         :param case_data: Dictionnaire contenant 'pathologie', 'donnees_paracliniques', etc.
-        :param exam_request: Dictionnaire {'name': '...', 'type': '...', 'justification': '...'}
+        :param exam_request: Dictionnaire {'name': '...', 'type': '...', 'justification': '...'},
+            et éventuellement 'code' : le code catalogue déjà résolu par l'appelant.
         :param patient_persona: Dictionnaire {'age': '...', 'genre': '...'}
         """
         request_id = f"PRMPT-{id(exam_request) % 10000}"
         logger.info(f"🔨 [{request_id}] Construction du prompt pour : {exam_request.get('name')}")
 
-        # 1. Analyse du type d'examen pour choisir le template
-        exam_name = exam_request.get('name', '').lower()
+        # 1. Choix du template à partir de l'examen canonique (catalogue)
+        exam_name = exam_request.get('name', '')
         exam_type = exam_request.get('type', '').lower() # ex: 'biologie', 'imagerie'
         
-        template_to_use = self.GENERIC_TEMPLATE
-        template_name = "GENERIC"
-
-        # Détection heuristique si le type n'est pas explicite
-        if 'bio' in exam_type or 'sang' in exam_name or 'nfs' in exam_name or 'crp' in exam_name or 'urine' in exam_name:
-            template_to_use = self.BIOLOGY_TEMPLATE
+        # Sans code fourni : correspondance lexicale seule. Le repli par embedding
+        # est bloquant et revient à l'appelant (hors de la boucle asyncio).
+        exam_code = exam_request.get('code')
+        catalog_entry = exam_catalog.get(exam_code) if exam_code else exam_catalog.match(exam_name, use_embeddings=False)
+        if catalog_entry:
+            template_name = catalog_entry.get("template", "GENERIC")
+        elif 'bio' in exam_type:
             template_name = "BIOLOGY"
-        elif 'image' in exam_type or 'radio' in exam_name or 'scanner' in exam_name or 'irm' in exam_name or 'echo' in exam_name:
-            template_to_use = self.IMAGING_TEMPLATE
+        elif 'image' in exam_type:
             template_name = "IMAGING"
+        else:
+            template_name = "GENERIC"
+
+        template_to_use = {
+            "BIOLOGY": self.BIOLOGY_TEMPLATE,
+            "IMAGING": self.IMAGING_TEMPLATE,
+        }.get(template_name, self.GENERIC_TEMPLATE)
         
-        logger.debug(f"   [{request_id}] Template sélectionné : {template_name}")
+        logger.debug(f"   [{request_id}] Template sélectionné : {template_name} (examen : {catalog_entry['code'] if catalog_entry else 'hors catalogue'})")
 
         # 2. Préparation des données d'injection (Data Cleaning)
         # On s'assure que les données ne sont jamais 'None' pour éviter les crashs de formatage
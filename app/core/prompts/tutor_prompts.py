@@ -51,6 +51,7 @@ Tu dois fournir un feedback pédagogique immédiat, bienveillant mais rigoureux.
 Pathologie réelle : {pathologie_nom}
 Résumé du cas : {resume_cas}
 Phase théorique actuelle de la consultation : {phase_courante} (ex: Anamnèse, Examen Physique...)
+Déroulé de la consultation jusqu'ici : {resume_conversation}
 
 --- 2. L'INTERACTION À ANALYSER ---
 DERNIÈRE QUESTION DE L'ÉTUDIANT :
@@ -90,7 +91,8 @@ Tu dois répondre UNIQUEMENT avec un objet JSON valide. Pas de texte avant ou ap
         case_data: Dict[str, Any], 
         student_msg: str,
         patient_msg: str,
-        chat_history_count: int
+        chat_history_count: int,
+        conversation_summary: Optional[str] = None
     ) -> str:
         """
         Construit le prompt complet pour l'analyse pédagogique.
@@ -99,6 +101,7 @@ Tu dois répondre UNIQUEMENT avec un objet JSON valide. Pas de texte avant ou ap
         :param student_msg: Le texte envoyé par l'étudiant.
         :param patient_msg: Le texte répondu par le patient (IA).
         :param chat_history_count: Nombre de messages précédents (pour estimer la phase).
+        :param conversation_summary: Résumé glissant de la consultation (optionnel).
         :return: Le prompt formaté prêt à être envoyé au LLM.
         """
         # ID de trace pour suivre la construction de ce prompt spécifique dans les logs
@@ -113,8 +116,12 @@ Tu dois répondre UNIQUEMENT avec un objet JSON valide. Pas de texte avant ou ap
             # -----------------------------------------------------------------
             pathologie_nom = self._safe_get(case_data, 'pathologie_principale.nom_fr', 'Pathologie non spécifiée')
             
-            # Construction d'un résumé contextuel à partir des données brutes
-            histoire = self._safe_get(case_data, 'presentation_clinique.histoire_maladie', '')
+            # Résumé contextuel : pré-rendu ('resume_cas', cf. case_narrative_service)
+            # ou, à défaut, construit à partir des données brutes
+            resume_cas = case_data.get('resume_cas')
+            if resume_cas is None:
+                histoire = self._safe_get(case_data, 'presentation_clinique.histoire_maladie', '')
+                resume_cas = histoire[:500] + "..." if len(histoire) > 500 else histoire
             
             # On logue les données sensibles (Vérité Terrain) pour le debug
             logger.debug(f"   [{trace_id}] Contexte Vérité : Patho='{pathologie_nom}'")
@@ -139,8 +146,9 @@ Tu dois répondre UNIQUEMENT avec un objet JSON valide. Pas de texte avant ou ap
             # -----------------------------------------------------------------
             final_prompt = self.PEDAGOGICAL_ANALYSIS_TEMPLATE.format(
                 pathologie_nom=pathologie_nom,
-                resume_cas=histoire[:500] + "..." if len(histoire) > 500 else histoire,
+                resume_cas=resume_cas,
                 phase_courante=phase,
+                resume_conversation=conversation_summary or "Non disponible (début de consultation).",
                 question_etudiant=student_msg,
                 reponse_patient=patient_msg
             )
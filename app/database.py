@@ -1,14 +1,193 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from .config import settings
 
+# ==============================================================================
+# CONFIGURATION DU LOGGER "DB-POOL"
+# ==============================================================================
+logger = logging.getLogger("db_pool")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [DB-POOL] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
 # L'objet 'engine' est le point d'entrée principal pour communiquer avec la BDD.
 engine = create_engine(
     settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
     # pool_pre_ping=True # Option utile en production
 )
 
 # La 'SessionLocal' est une "usine" à sessions de base de données.
 # Chaque fois que nous aurons besoin de parler à la BDD, nous demanderons une session à cette usine.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _async_database_url(url: str) -> str:
+    """Même base, pilote asyncpg (`postgresql://` -> `postgresql+asyncpg://`)."""
+    scheme, _, rest = url.partition("://")
+    if scheme in ("postgres", "postgresql") or scheme.startswith("postgresql+"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+# Moteur asynchrone (asyncpg) des routes `async def` : une attente LLM y coûte
+# une coroutine, pas un thread. Son pool est distinct de celui du moteur synchrone.
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+)
+
+# `expire_on_commit=False` : après un commit, les objets chargés restent lisibles
+# sans nouvelle requête (un chargement implicite est impossible en asynchrone).
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# ==============================================================================
+# OCCUPATION DU POOL DE CONNEXIONS
+# ==============================================================================
+
+def _current_borrower() -> Any:
+    """
+    Emprunteur courant d'une connexion : la tâche asyncio en cours si l'appel
+    vient d'une boucle d'événements (moteur asyncpg, `run_sync` compris), sinon
+    le thread. Sur le moteur asynchrone, toutes les requêtes partagent le thread
+    de la boucle : seule la tâche les distingue.
+    """
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task if task is not None else threading.get_ident()
+
+
+class PoolMetrics:
+    """
+    Occupation du pool de connexions (par processus), alimentée par les
+    événements `checkout` / `checkin` du pool.
+
+    Chaque connexion empruntée est rattachée à son emprunteur (tâche asyncio ou
+    thread, cf. `_current_borrower`) dans les infos de la connexion : on peut
+    ainsi vérifier qu'aucun emprunteur ne garde une connexion pendant une
+    attente d'E/S externe (appel LLM), cf. `record_external_call`.
+    """
+
+    HOLD_SAMPLES = 500
+
+    def __init__(self, bound_engine: Engine):
+        self._engine = bound_engine
+        self._lock = threading.Lock()
+        self._held_by: Dict[Any, int] = {}
+        self._hold_times = deque(maxlen=self.HOLD_SAMPLES)
+        self._stats = {
+            "checked_out": 0, "peak_checked_out": 0, "checkouts": 0,
+            "external_calls": 0, "external_calls_holding_connection": 0,
+        }
+        event.listen(bound_engine, "checkout", self.on_checkout)
+        event.listen(bound_engine, "checkin", self.on_checkin)
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        borrower = _current_borrower()
+        connection_record.info["checkout_at"] = time.monotonic()
+        connection_record.info["checkout_borrower"] = borrower
+        with self._lock:
+            self._held_by[borrower] = self._held_by.get(borrower, 0) + 1
+            self._stats["checkouts"] += 1
+            self._stats["checked_out"] += 1
+            self._stats["peak_checked_out"] = max(self._stats["peak_checked_out"], self._stats["checked_out"])
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        checkout_at = connection_record.info.pop("checkout_at", None)
+        # Le checkin peut venir d'un autre thread ou d'une autre tâche (ex: fermeture
+        # différée) : l'emprunteur est celui enregistré sur la connexion.
+        borrower = connection_record.info.pop("checkout_borrower", None)
+        if checkout_at is None:
+            return
+        with self._lock:
+            self._hold_times.append(time.monotonic() - checkout_at)
+            self._stats["checked_out"] = max(0, self._stats["checked_out"] - 1)
+            remaining = self._held_by.get(borrower, 0) - 1
+            if remaining > 0:
+                self._held_by[borrower] = remaining
+            else:
+                self._held_by.pop(borrower, None)
+
+    def current_borrower_holds_connection(self) -> bool:
+        borrower = _current_borrower()
+        with self._lock:
+            return self._held_by.get(borrower, 0) > 0
+
+    def record_external_call(self, label: str) -> None:
+        """
+        À appeler au début d'une attente d'E/S externe, depuis le thread ou la
+        tâche qui attend. Compte (et signale) les attentes faites en gardant une
+        connexion du pool.
+        """
+        holding = self.current_borrower_holds_connection()
+        with self._lock:
+            self._stats["external_calls"] += 1
+            if holding:
+                self._stats["external_calls_holding_connection"] += 1
+        if holding:
+            logger.warning(f"   ⚠️ Appel externe '{label}' avec une connexion BDD empruntée (pool bloqué pendant l'attente).")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            hold_times = sorted(self._hold_times)
+        if hold_times:
+            stats["hold_seconds"] = {
+                "p50": round(hold_times[len(hold_times) // 2], 3),
+                "p95": round(hold_times[min(len(hold_times) - 1, int(len(hold_times) * 0.95))], 3),
+                "max": round(hold_times[-1], 3),
+            }
+        stats["pool_size"] = settings.DB_POOL_SIZE
+        stats["max_overflow"] = settings.DB_MAX_OVERFLOW
+        stats["pool_status"] = self._engine.pool.status()
+        return stats
+
+
+pool_metrics = PoolMetrics(engine)
+async_pool_metrics = PoolMetrics(async_engine.sync_engine)
+
+
+def release_connection(db: Session) -> None:
+    """
+    Termine la transaction en cours pour rendre sa connexion au pool, avant
+    une attente d'E/S externe (appel LLM).
+
+    Les objets déjà chargés restent utilisables (ils ne sont pas expirés) ;
+    la prochaine requête emprunte une nouvelle connexion (transaction courte).
+    Les écritures en attente éventuelles sont validées.
+    """
+    if not db.in_transaction():
+        return
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+async def release_connection_async(db: AsyncSession) -> None:
+    """Équivalent de `release_connection` pour une `AsyncSession` (objets jamais expirés au commit)."""
+    if db.in_transaction():
+        await db.commit()
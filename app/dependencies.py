@@ -1,9 +1,37 @@
 # app/dependencies.py
-from .database import SessionLocal
+from fastapi import HTTPException, Request, status
+
+from .database import AsyncSessionLocal, SessionLocal
+from .services.llm_work_executor import LlmWorkSaturatedError, llm_request_gate
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Session asynchrone (asyncpg), pour les routes `async def`."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def llm_work_slot(request: Request):
+    """
+    Place dans la capacité dédiée aux requêtes qui attendent un LLM, gardée
+    jusqu'à la fin de la réponse (flux SSE compris). Capacité saturée :
+    503 immédiat avec en-tête Retry-After.
+    """
+    label = getattr(request.scope.get("endpoint"), "__name__", request.url.path)
+    try:
+        await llm_request_gate.acquire(label)
+    except LlmWorkSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Le service IA est momentanément saturé, veuillez réessayer.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    try:
+        yield
+    finally:
+        llm_request_gate.release()
@@ -1,19 +1,46 @@
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from .api.v1 import (
     symptoms, diseases, medications, media, clinical_cases, 
-    expert_strategies, diagnostic, chat, simulation
+    expert_strategies, diagnostic, chat, simulation, monitoring
 )
 # --- AJOUT ---
 from .utils.logging import setup_logging
+from .services.llm import llm_client
+from .services import chat_service, evaluation_job_service
+from .services.evaluation_job_service import start_worker_threads
+from .services.session_events import start_event_relay
+from .config import settings
 
 # Configurer le logging dès le démarrage
 setup_logging()
 # --- FIN AJOUT ---
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Workers d'évaluation dans le processus web (optionnel ; sinon
+    # scripts/run_evaluation_worker.py)
+    stop_workers = threading.Event()
+    start_worker_threads(settings.EVALUATION_INPROCESS_WORKERS, stop_workers)
+    # Événements produits par les autres processus -> clients SSE de ce processus
+    start_event_relay({
+        evaluation_job_service.NOTIFY_CHANNEL: evaluation_job_service.relay_evaluation_done,
+        chat_service.TUTOR_NOTIFY_CHANNEL: chat_service.relay_tutor_feedback,
+    }, stop_workers)
+    yield
+    stop_workers.set()
+    # Fermeture propre du pool HTTP partagé vers le fournisseur LLM
+    llm_client.shutdown()
+
+
 app = FastAPI(
     title="STI Medical Expert Module",
     description="Base de connaissances et moteur de raisonnement pour le STI médical.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # ... (le reste de vos `app.include_router` reste identique)
@@ -26,6 +53,7 @@ app.include_router(expert_strategies.router, prefix="/api/v1")
 app.include_router(diagnostic.router, prefix="/api/v1")
 app.include_router(chat.router, prefix="/api/v1")
 app.include_router(simulation.router, prefix="/api/v1")
+app.include_router(monitoring.router, prefix="/api/v1")
 
 @app.get("/")
 def read_root():
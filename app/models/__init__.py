@@ -52,6 +52,15 @@ from .tutor_models import (
     TutorFeedbackLog
 )
 
+# --- Catalogue des Examens ---
+from .exam_catalog import ExamCatalogEntry
+
+# --- Modèles de Cache IA ---
+from .cache_models import ExamResultCache
+
+# --- File des Évaluations Finales ---
+from .job_models import EvaluationJob
+
 # ==============================================================================
 # FIN DU FICHIER
 # ==============================================================================
\ No newline at end of file
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, TIMESTAMP, text, UniqueConstraint, Index
+from .base import Base
+
+
+class ExamResultCache(Base):
+    """
+    Cache partagé des résultats d'examens générés par l'IA Laboratoire.
+
+    Clé logique : (cas clinique, nom d'examen canonique, version du template de prompt).
+    `case_fingerprint` capture l'état des données qui influencent le résultat
+    (donnees_paracliniques + pathologie principale) : une entrée dont l'empreinte
+    ne correspond plus au cas est considérée comme périmée.
+    """
+    __tablename__ = "exam_result_cache"
+    __table_args__ = (
+        UniqueConstraint("case_id", "exam_key", "template_version", name="uq_exam_cache_key"),
+        Index("ix_exam_cache_last_hit", "last_hit_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    case_id = Column(Integer, ForeignKey("cas_cliniques_enrichis.id", ondelete="CASCADE"), nullable=False, index=True)
+    exam_key = Column(String(255), nullable=False, comment="Nom d'examen canonique (ex: 'nfs')")
+    template_version = Column(String(20), nullable=False, comment="Version des templates ExamPromptBuilder")
+    case_fingerprint = Column(String(64), nullable=False, comment="SHA-256 des données paracliniques + pathologie")
+
+    result = Column(JSON, nullable=False, comment="Résultat JSON (même forme que generate_exam_result)")
+    source = Column(String(20), default="llm", comment="Origine : 'llm' (à la demande), 'library' (pré-génération)")
+
+    hit_count = Column(Integer, default=0)
+    created_at = Column(TIMESTAMP, server_default=text("now()"))
+    last_hit_at = Column(TIMESTAMP, server_default=text("now()"))
+    expires_at = Column(TIMESTAMP, nullable=True, comment="NULL = pas d'expiration")
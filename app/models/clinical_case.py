@@ -40,6 +40,7 @@ class ClinicalCase(Base):
     presentation_clinique = Column(JSON, nullable=False, comment="Histoire du patient, symptômes présentés, etc.")
     donnees_paracliniques = Column(JSON, comment="Résultats des examens pour ce cas spécifique")
     evolution_patient = Column(Text, comment="Description de l'évolution du patient pendant le cas")
+    fragments_narratifs = Column(JSON, nullable=True, comment="Textes pré-rendus pour les prompts (histoire, symptômes, antécédents, vérité terrain) - cf. case_narrative_service")
     
     # --- Liaisons Multimédia ---
     images_associees_ids = Column(ARRAY(Integer), comment="Liste des IDs des images de la table 'images_medicales'")
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, JSON, TIMESTAMP, Boolean, text
+from .base import Base
+
+
+class ExamCatalogEntry(Base):
+    """
+    Catalogue canonique des examens complémentaires (biologie, imagerie, constantes...).
+
+    Chaque entrée regroupe les différentes façons dont un apprenant peut nommer
+    un examen (synonymes, abréviations) sous un code unique. Le code sert de clé
+    pour le temps virtuel, le coût, le choix du template de prompt et le cache
+    des résultats.
+    """
+    __tablename__ = "catalogue_examens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(50), unique=True, nullable=False, index=True, comment="Identifiant canonique (ex: 'NFS')")
+    nom = Column(String(255), nullable=False, comment="Libellé officiel (ex: 'Numération Formule Sanguine')")
+    categorie = Column(String(50), nullable=False, comment="biologie, imagerie, constantes, cardiologie...")
+    template = Column(String(20), nullable=False, default="GENERIC", comment="Template ExamPromptBuilder : BIOLOGY, IMAGING, GENERIC")
+    synonymes = Column(JSON, comment="Liste des appellations reconnues (abréviations incluses)")
+
+    duree_minutes = Column(Integer, comment="Temps virtuel avant disponibilité du résultat")
+    cout_virtuel = Column(Integer, comment="Coût fictif (FCFA) pour l'évaluation économique")
+
+    actif = Column(Boolean, default=True)
+    created_at = Column(TIMESTAMP, server_default=text("now()"))
+    updated_at = Column(TIMESTAMP, server_default=text("now()"), onupdate=text("now()"))
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, TIMESTAMP, text, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from .base import Base
+
+
+class EvaluationJob(Base):
+    """
+    File d'attente des évaluations finales (soumissions), servie par les
+    workers d'évaluation (cf. evaluation_job_service).
+
+    Un worker réserve le prochain job prêt avec `SELECT ... FOR UPDATE SKIP
+    LOCKED` : plusieurs workers se partagent la file sans se bloquer ni
+    traiter deux fois le même job.
+    """
+    __tablename__ = "evaluation_jobs"
+    __table_args__ = (
+        Index("ix_evaluation_jobs_ready", "status", "run_after"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("simulation_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    status = Column(String(20), nullable=False, default="queued", comment="queued, running, done, failed")
+    submission = Column(JSON, nullable=False, comment="SubmissionRequest de l'apprenant")
+    result = Column(JSON, nullable=True, comment="SubmissionResponse une fois l'évaluation terminée")
+
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    run_after = Column(TIMESTAMP, server_default=text("now()"), comment="Pas de reprise avant cette date (relances)")
+    locked_by = Column(String(100), nullable=True, comment="Worker en charge du job")
+    locked_at = Column(TIMESTAMP, nullable=True)
+
+    created_at = Column(TIMESTAMP, server_default=text("now()"))
+    finished_at = Column(TIMESTAMP, nullable=True)
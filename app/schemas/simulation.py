@@ -238,6 +238,17 @@ class EvaluationResult(BaseModel):
     score_demarche: float = Field(..., ge=0, le=5, description="Qualité de la démarche /5")
     score_total: float = Field(..., ge=0, le=20, description="Note finale /20")
 
+class EvaluationVerdict(BaseModel):
+    """
+    Structure brute du verdict renvoyé par l'IA Juge (JSON du LLM).
+    Sert à valider une réponse réparée avant de l'accepter.
+    """
+    score_diagnostic: float = Field(..., description="Note diagnostic /10")
+    score_therapeutique: float = Field(..., description="Note thérapeutique /5")
+    score_demarche: float = Field(..., description="Note démarche /5")
+    feedback_global: Optional[str] = None
+    recommendation_next_step: Optional[str] = None
+
 class SubmissionResponse(BaseModel):
     """
     Le rapport final renvoyé au frontend.
@@ -251,6 +262,21 @@ class SubmissionResponse(BaseModel):
     virtual_cost_total: Optional[int] = None
 
 
+class EvaluationJobResponse(BaseModel):
+    """
+    État d'une évaluation finale traitée en arrière-plan (POST /submit renvoie
+    202 avec cet objet ; le client interroge ensuite GET /evaluations/{job_id}).
+    """
+    job_id: UUID
+    session_id: UUID
+    status: Literal["queued", "running", "done", "failed"]
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[SubmissionResponse] = Field(None, description="Rapport final, une fois le statut 'done'")
+
+
 
 
 
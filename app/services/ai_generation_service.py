@@ -1,22 +1,35 @@
 #=== Fichier: ./app/services/ai_generation_service.py ===
 
+import asyncio
 import logging
-import requests
 import json
 import time
 import uuid
 import re
 import traceback
-from typing import Dict, Any, List, Tuple, Optional, Union
+import threading
+import httpx
+from collections import deque
+from typing import Dict, Any, AsyncIterator, List, Tuple, Optional, Type, Union
 from enum import Enum
 
 from sqlalchemy.orm import Session, joinedload
 from .. import models, schemas
 from ..config import settings
+from ..database import async_pool_metrics, pool_metrics, release_connection
 from ..core.prompts.exam_prompts import exam_prompt_builder
 
 from ..core.prompts.tutor_prompts import tutor_prompt_builder
 from ..schemas import TutorFeedback  # Pour la validation stricte Pydantic
+from pydantic import BaseModel, ValidationError
+from .llm import (
+    llm_client, LLMUnavailableError, completion_single_flight, payload_fingerprint,
+    llm_governor, circuit_breakers, hedged_call, model_latency_tracker, repair_json,
+    count_message_tokens, assemble_prompt, fit_messages, PromptSection
+)
+from . import degraded_mode_service, case_narrative_service
+from .local_grader_service import LocalGrade, local_grader
+from .exam_catalog_service import exam_catalog
 
 # ==============================================================================
 # CONFIGURATION DU LOGGER "AI-KERNEL" (Niveau Expert / Debugging)
@@ -39,17 +52,22 @@ if not logger.handlers:
 # CONSTANTES ET CONFIGURATION
 # ==============================================================================
 
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
-
 # Modèle choisi : Mistral 7B Instruct (Bon rapport qualité/prix/performance pour le roleplay)
 # Alternatives testées : 'openai/gpt-4o-mini', 'anthropic/claude-3-haiku'
 MODEL_NAME = "mistralai/devstral-2512:free" 
 
+# Modèles de secours (même palier gratuit), utilisés en relance différée ('hedge')
+# ou en repli quand le modèle principal est indisponible.
+SECONDARY_MODEL_NAME = "mistralai/mistral-small-3.2-24b-instruct:free"
+TERTIARY_MODEL_NAME = "meta-llama/llama-3.3-70b-instruct:free"
+
 # Configuration de résilience
 MAX_RETRIES_NETWORK = 3    # Tentatives en cas d'échec de connexion
-MAX_RETRIES_LOGIC = 2      # Tentatives en cas de JSON malformé
+MAX_RETRIES_LOGIC = 2      # Tentatives en cas de JSON malformé et irréparable
 TIMEOUT_SECONDS = 60       # Timeout strict pour ne pas bloquer le worker
 
+LLM_UNAVAILABLE_TEXT = "(Erreur technique : Le service d'IA est injoignable pour le moment.)"
+
 class AiTaskType(Enum):
     """Énumération des types de tâches pour le tagging des logs."""
     CHAT_PATIENT = "CHAT_PATIENT"
@@ -57,6 +75,62 @@ class AiTaskType(Enum):
     EVALUATION = "EVALUATION"
     HINT_GENERATION = "HINT_GENERATION"
     TUTOR_ANALYSIS = "TUTOR_ANALYSIS"
+    CONVERSATION_SUMMARY = "CONVERSATION_SUMMARY"
+
+# Priorité d'accès au fournisseur (0 = servi en premier quand la file d'attente
+# du gouverneur se remplit) : le patient en direct passe avant le tuteur, qui
+# passe avant les évaluations finales (traitement de masse, tolérant à l'attente).
+TASK_PRIORITIES = {
+    AiTaskType.CHAT_PATIENT: 0,
+    AiTaskType.HINT_GENERATION: 1,
+    AiTaskType.EXAM_GENERATION: 1,
+    AiTaskType.TUTOR_ANALYSIS: 2,
+    AiTaskType.CONVERSATION_SUMMARY: 2,
+    AiTaskType.EVALUATION: 3,
+}
+
+# Routage multi-modèles : liste ordonnée des modèles à essayer par tâche.
+TASK_MODEL_ROUTES = {
+    AiTaskType.CHAT_PATIENT: [MODEL_NAME, SECONDARY_MODEL_NAME, TERTIARY_MODEL_NAME],
+    AiTaskType.HINT_GENERATION: [MODEL_NAME, SECONDARY_MODEL_NAME],
+    AiTaskType.EXAM_GENERATION: [MODEL_NAME, SECONDARY_MODEL_NAME],
+    AiTaskType.TUTOR_ANALYSIS: [MODEL_NAME, SECONDARY_MODEL_NAME],
+    AiTaskType.CONVERSATION_SUMMARY: [MODEL_NAME, SECONDARY_MODEL_NAME],
+    AiTaskType.EVALUATION: [MODEL_NAME, TERTIARY_MODEL_NAME],
+}
+
+# Tâches sans relance parallèle (repli séquentiel uniquement) : l'évaluation
+# finale et le résumé de conversation sont des traitements de fond, tolérants
+# à la latence.
+NO_HEDGE_TASKS = {AiTaskType.EVALUATION, AiTaskType.CONVERSATION_SUMMARY}
+
+# Budget de tokens d'entrée par tâche (compté avant l'envoi) : les prompts sont
+# assemblés section par section dans ce budget, et un historique de chat trop
+# long est réduit à ses échanges les plus récents.
+TASK_INPUT_BUDGETS = {
+    AiTaskType.CHAT_PATIENT: 3000,
+    AiTaskType.HINT_GENERATION: 1500,
+    AiTaskType.EXAM_GENERATION: 2500,
+    AiTaskType.TUTOR_ANALYSIS: 2000,
+    AiTaskType.CONVERSATION_SUMMARY: 3000,
+    AiTaskType.EVALUATION: 6000,
+}
+
+# Plafond de tokens de sortie par tâche. Une fois assez de réponses observées,
+# `max_tokens` est ajusté au p95 réel de la tâche (avec marge), sans dépasser
+# ce plafond : on ne réserve (et ne paie) pas 1500 tokens pour une réplique.
+TASK_MAX_TOKENS = {
+    AiTaskType.CHAT_PATIENT: 300,
+    AiTaskType.HINT_GENERATION: 400,
+    AiTaskType.EXAM_GENERATION: 1000,
+    AiTaskType.TUTOR_ANALYSIS: 600,
+    AiTaskType.CONVERSATION_SUMMARY: 500,
+    AiTaskType.EVALUATION: 1500,
+}
+COMPLETION_STATS_WINDOW = 200   # Dernières réponses conservées par tâche
+MIN_COMPLETION_SAMPLES = 20     # En dessous : plafond de la tâche
+COMPLETION_TOKENS_MARGIN = 1.5  # Marge appliquée au p95 observé
+MIN_COMPLETION_TOKENS = 100
 
 # ==============================================================================
 # UTILITAIRES DE NETTOYAGE ET VALIDATION
@@ -122,40 +196,130 @@ def _validate_exam_json_structure(data: Dict[str, Any], trace_id: str) -> bool:
     return True
 
 # ==============================================================================
-# NOYAU D'APPEL API (CORE)
+# COMPTABILITÉ DES TOKENS
 # ==============================================================================
+# Cumul (par processus) des tokens consommés, par type de tâche.
+# Permet aux jobs batch et au monitoring de mesurer la dépense réelle.
+
+_usage_lock = threading.Lock()
+_token_usage: Dict[str, Dict[str, int]] = {}
+_completion_samples: Dict[str, Any] = {}
+
+
+def _record_usage(task_type: "AiTaskType", response_data: Dict[str, Any]) -> None:
+    """Ajoute l'usage (tokens) d'une réponse API au cumul de son type de tâche."""
+    usage = response_data.get('usage') or {}
+    with _usage_lock:
+        stats = _token_usage.setdefault(task_type.value, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        stats["calls"] += 1
+        stats["prompt_tokens"] += usage.get('prompt_tokens', 0) or 0
+        stats["completion_tokens"] += usage.get('completion_tokens', 0) or 0
+        if usage.get('completion_tokens'):
+            _completion_samples.setdefault(task_type.value, deque(maxlen=COMPLETION_STATS_WINDOW)).append(
+                usage['completion_tokens']
+            )
 
-def _call_openrouter_api(
-    input_data: Union[str, List[Dict[str, str]]], 
-    json_mode: bool = False,
-    temperature: float = 0.7,
-    task_type: AiTaskType = AiTaskType.CHAT_PATIENT,
-    max_tokens: int = 1500
-) -> Any:
+
+def _max_tokens_for(task_type: "AiTaskType") -> int:
     """
-    Fonction noyau (Core) pour appeler l'API LLM.
-    Elle est conçue pour être une boîte noire totalement transparente via les logs.
-    
-    :param input_data: Le prompt (str) ou la liste de messages (list).
-    :param json_mode: Force le modèle à produire du JSON et active le validateur.
-    :param temperature: Créativité (0.0 = Rigide, 1.0 = Folie).
-    :param task_type: Type de tâche pour le logging.
+    `max_tokens` d'une tâche : p95 des réponses observées x marge, arrondi à 50,
+    borné par le plafond de la tâche (plafond seul tant que l'échantillon est court).
     """
-    trace_id = f"AI-{str(uuid.uuid4())[:6].upper()}"
-    
-    logger.info(f"⚡ [{trace_id}] DÉBUT TRANSACTION API | Tâche: {task_type.value} | Mode JSON: {json_mode}")
-    logger.debug(f"   [{trace_id}] Config: Temp={temperature}, MaxTokens={max_tokens}, Model={MODEL_NAME}")
+    ceiling = TASK_MAX_TOKENS[task_type]
+    with _usage_lock:
+        samples = sorted(_completion_samples.get(task_type.value, ()))
+    if len(samples) < MIN_COMPLETION_SAMPLES:
+        return ceiling
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    adaptive = int(-(-p95 * COMPLETION_TOKENS_MARGIN // 50) * 50)
+    return max(MIN_COMPLETION_TOKENS, min(ceiling, adaptive))
+
 
-    # 1. Normalisation du Payload
-    messages = []
+def get_token_usage() -> Dict[str, Dict[str, int]]:
+    """
+    Instantané des tokens consommés depuis le démarrage du processus.
+
+    :return: {"EXAM_GENERATION": {"calls": .., "prompt_tokens": .., "completion_tokens": ..}, ...}
+    """
+    with _usage_lock:
+        usage = {task: dict(stats) for task, stats in _token_usage.items()}
+    for task_type in AiTaskType:
+        if task_type.value in usage:
+            usage[task_type.value]["max_tokens"] = _max_tokens_for(task_type)
+    return usage
+
+
+# ==============================================================================
+# NOYAU D'APPEL API (CORE)
+# ==============================================================================
+
+def _normalize_messages(input_data: Union[str, List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """Transforme un prompt texte en liste de messages (format chat)."""
     if isinstance(input_data, str):
-        messages = [{"role": "user", "content": input_data}]
-    else:
-        messages = input_data
+        return [{"role": "user", "content": input_data}]
+    return input_data
 
-    # ==========================================================================
-    # 🔍 PROMPT DUMP - LOGGING EXTENSIF
-    # ==========================================================================
+
+def _preflight_messages(
+    messages: List[Dict[str, Any]],
+    task_type: "AiTaskType",
+    trace_id: str
+) -> List[Dict[str, Any]]:
+    """
+    Compte les tokens d'entrée avant l'envoi. Une conversation au-delà du budget
+    de la tâche perd ses échanges les plus anciens (prompt système et question
+    courante conservés) ; un prompt unique déjà assemblé est seulement signalé.
+    """
+    budget = TASK_INPUT_BUDGETS[task_type]
+    input_tokens = count_message_tokens(messages)
+    logger.debug(f"   🧮 [{trace_id}] Entrée : {input_tokens}/{budget} tokens.")
+    if input_tokens <= budget:
+        return messages
+    if len(messages) > 2:
+        return fit_messages(messages, budget, trace_id=trace_id)
+    logger.warning(f"   ⚠️ [{trace_id}] Prompt au-delà du budget de la tâche ({input_tokens}/{budget} tokens).")
+    return messages
+
+
+# ==============================================================================
+# CACHE DE PROMPT DU FOURNISSEUR
+# ==============================================================================
+# Les fournisseurs mettent en cache le plus long préfixe identique d'un prompt à
+# l'autre (coût et latence du premier token réduits). Les services placent donc
+# les parties statiques (persona, vérité clinique, règles) en tête et les marquent
+# avec `cacheable_message` ; le noyau traduit ce marqueur en indication
+# `cache_control` pour les modèles qui l'exigent, et le retire pour les autres
+# (cache automatique sur le préfixe).
+
+CACHE_BREAKPOINT_KEY = "cache_breakpoint"
+EXPLICIT_CACHE_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+
+def cacheable_message(role: str, content: str) -> Dict[str, Any]:
+    """Message statique à mettre en cache côté fournisseur (fin du préfixe stable)."""
+    return {"role": role, "content": content, CACHE_BREAKPOINT_KEY: True}
+
+
+def _apply_cache_hints(messages: List[Dict[str, Any]], model: str) -> List[Dict[str, Any]]:
+    """Adapte les marqueurs de cache au modèle effectivement appelé."""
+    if not any(CACHE_BREAKPOINT_KEY in m for m in messages):
+        return messages
+    explicit = model.startswith(EXPLICIT_CACHE_MODEL_PREFIXES)
+    prepared = []
+    for message in messages:
+        message = dict(message)
+        if message.pop(CACHE_BREAKPOINT_KEY, False) and explicit:
+            message["content"] = [{
+                "type": "text",
+                "text": message["content"],
+                "cache_control": {"type": "ephemeral"},
+            }]
+        prepared.append(message)
+    return prepared
+
+
+def _log_prompt(trace_id: str, messages: List[Dict[str, str]]) -> None:
+    """🔍 PROMPT DUMP - Logging extensif du payload envoyé."""
     logger.debug(f"\n{'='*40} [{trace_id}] PROMPT ENVOYÉ {'='*40}")
     for i, msg in enumerate(messages):
         role = msg.get('role', 'unknown').upper()
@@ -164,186 +328,472 @@ def _call_openrouter_api(
         display_content = content if len(content) < 2000 else f"{content[:2000]}... [TRONQUÉ {len(content)-2000} chars]"
         logger.debug(f"[{i}] {role}:\n{display_content}\n{'-'*20}")
     logger.debug(f"{'='*100}\n")
-    # ==========================================================================
 
-    headers = {
-        "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://expert-cmck.onrender.com",
-        "X-Title": "STI Medical Expert System"
-    }
-    
+
+def _build_payload(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool,
+    model: str = MODEL_NAME
+) -> Dict[str, Any]:
+    """Construit le corps de la requête 'chat/completions'."""
     payload = {
-        "model": MODEL_NAME,
+        "model": model,
         "messages": messages,
         "temperature": temperature,
         "max_tokens": max_tokens,
     }
-
     if json_mode:
         # Hint pour les modèles compatibles OpenAI
         payload["response_format"] = {"type": "json_object"}
+    return payload
 
-    # 2. Boucle de Tentatives (Retry Loop)
-    attempt = 0
-    
-    while attempt < MAX_RETRIES_NETWORK:
-        attempt += 1
-        start_time = time.time()
-        
-        try:
-            if attempt > 1:
-                logger.warning(f"   🔄 [{trace_id}] Tentative réseau {attempt}/{MAX_RETRIES_NETWORK}...")
-                # Backoff exponentiel (2s, 4s, 8s...)
-                sleep_time = 2 ** attempt
-                time.sleep(sleep_time)
 
-            logger.debug(f"   🚀 [{trace_id}] Envoi requête POST vers {OPENROUTER_API_URL}...")
-            
-            response = requests.post(
-                OPENROUTER_API_URL, 
-                headers=headers, 
-                data=json.dumps(payload), 
-                timeout=TIMEOUT_SECONDS
+def _repair_matches_schema(data: Any, schema: Optional[Type[BaseModel]], trace_id: str) -> bool:
+    """
+    Un JSON réparé n'est accepté que si tous les champs obligatoires du schéma
+    cible ont survécu à la réparation (une troncature peut emporter les derniers).
+    """
+    if not isinstance(data, dict) or not data:
+        return False
+    if schema is None:
+        return True
+    missing = [
+        name for name, field in schema.model_fields.items()
+        if field.is_required() and data.get(name) in (None, "")
+    ]
+    if missing:
+        logger.warning(f"   ⚠️ [{trace_id}] JSON réparé incomplet pour {schema.__name__} : champs manquants {missing}")
+        return False
+    return True
+
+
+def _parse_completion(
+    response_data: Dict[str, Any],
+    json_mode: bool,
+    trace_id: str,
+    response_schema: Optional[Type[BaseModel]] = None
+) -> Any:
+    """
+    Extrait le contenu d'une réponse API (et le parse si le mode JSON est actif).
+
+    Un JSON malformé ou tronqué est d'abord réparé localement (`repair_json`) ;
+    la réparation n'est retenue que si elle satisfait `response_schema`.
+
+    :raises ValueError: si la structure de réponse est invalide ou si le JSON est
+        cassé et irréparable (l'appelant peut alors régénérer).
+    """
+    # Metrics d'utilisation
+    usage = response_data.get('usage') or {}
+    p_tok = usage.get('prompt_tokens', 0)
+    c_tok = usage.get('completion_tokens', 0)
+    logger.info(f"   ✅ [{trace_id}] Succès HTTP 200 | Tokens: {p_tok} in / {c_tok} out")
+
+    try:
+        if not response_data.get('choices'):
+            raise ValueError("Liste 'choices' vide dans la réponse API")
+
+        choice = response_data['choices'][0]
+        raw_content = choice['message']['content']
+        finish_reason = choice.get('finish_reason', 'unknown')
+
+        if finish_reason == 'length':
+            logger.warning(f"   ⚠️ [{trace_id}] Attention: La réponse a été tronquée (max_tokens atteint). Le JSON risque d'être cassé.")
+
+        # ==========================================================
+        # 🔍 RESPONSE DUMP
+        # ==========================================================
+        logger.debug(f"\n{'='*40} [{trace_id}] RÉPONSE BRUTE IA {'='*40}")
+        logger.debug(f"{raw_content}")
+        logger.debug(f"{'='*100}\n")
+        # ==========================================================
+
+        # Traitement JSON si requis
+        if json_mode:
+            cleaned_content = _clean_json_string(raw_content, trace_id)
+            try:
+                parsed_json = json.loads(cleaned_content)
+                logger.info(f"   ✅ [{trace_id}] JSON parsé et validé techniquement.")
+                return parsed_json
+            except json.JSONDecodeError as je:
+                repaired = repair_json(raw_content)
+                if _repair_matches_schema(repaired, response_schema, trace_id):
+                    logger.warning(f"   🩹 [{trace_id}] JSON invalide réparé localement (finish_reason={finish_reason}) : pas de nouvel appel.")
+                    return repaired
+                logger.error(f"   ❌ [{trace_id}] Échec du parsing JSON (réparation impossible).")
+                logger.error(f"      Source nettoyée : {cleaned_content}")
+                logger.error(f"      Erreur Python : {str(je)}")
+                raise ValueError(f"L'IA n'a pas produit un JSON valide : {str(je)}")
+
+        # Mode texte simple
+        return raw_content
+
+    except (KeyError, IndexError, ValueError) as e:
+        logger.error(f"   ❌ [{trace_id}] Erreur structurelle réponse API : {str(e)}")
+        # On ne retry pas une erreur de structure interne, c'est probablement fatal
+        raise e
+
+
+# ==============================================================================
+# DISJONCTEUR ET MODE DÉGRADÉ
+# ==============================================================================
+# Un disjoncteur par modèle : une fois ouvert, les appels échouent immédiatement
+# (sans retries) et les services basculent sur les générateurs locaux de
+# `degraded_mode_service` jusqu'au rétablissement du fournisseur.
+
+def _breaker_for(model: str):
+    return circuit_breakers.get(f"openrouter:{model}")
+
+
+def is_llm_available(task_type: AiTaskType = AiTaskType.CHAT_PATIENT) -> bool:
+    """False si les disjoncteurs de tous les modèles de la tâche sont ouverts."""
+    return any(_breaker_for(model).is_available() for model in TASK_MODEL_ROUTES[task_type])
+
+
+def _unavailable_reply(task_type: AiTaskType, messages: List[Dict[str, str]]) -> str:
+    """Texte renvoyé en mode texte quand le fournisseur est injoignable."""
+    if task_type == AiTaskType.CHAT_PATIENT:
+        student_message = degraded_mode_service.last_student_message(messages)
+        return degraded_mode_service.degraded_patient_reply(student_message)
+    return LLM_UNAVAILABLE_TEXT
+
+
+async def _fetch_completion(payload: Dict[str, Any], trace_id: str, task_type: AiTaskType) -> Dict[str, Any]:
+    """
+    Appel amont effectif (une seule fois par groupe de requêtes identiques
+    simultanées, cf. `completion_single_flight`), soumis au disjoncteur du
+    modèle puis au gouverneur de débit et de priorités (`llm_governor`).
+
+    :raises CircuitOpenError: (sous-classe de `LLMUnavailableError`) si le
+        disjoncteur est ouvert : aucun appel réseau, aucune attente.
+    """
+    breaker = _breaker_for(payload["model"])
+    breaker.before_call()
+    try:
+        async with llm_governor.slot(task_type.value, TASK_PRIORITIES[task_type]):
+            response_data = await llm_client.post_chat_completion(
+                dict(payload, messages=_apply_cache_hints(payload["messages"], payload["model"])),
+                trace_id=trace_id,
+                max_retries=MAX_RETRIES_NETWORK,
+                timeout=TIMEOUT_SECONDS,
+                on_rate_limited=llm_governor.penalize
             )
-            
-            latency = time.time() - start_time
-            
-            # --- Analyse de la Réponse HTTP ---
-            if response.status_code == 200:
-                response_data = response.json()
-                
-                # Metrics d'utilisation
-                usage = response_data.get('usage', {})
-                p_tok = usage.get('prompt_tokens', 0)
-                c_tok = usage.get('completion_tokens', 0)
-                logger.info(f"   ✅ [{trace_id}] Succès HTTP 200 | Latence: {latency:.2f}s | Tokens: {p_tok} in / {c_tok} out")
-
-                # Extraction du contenu
-                try:
-                    if not response_data.get('choices'):
-                        raise ValueError("Liste 'choices' vide dans la réponse API")
-
-                    choice = response_data['choices'][0]
-                    raw_content = choice['message']['content']
-                    finish_reason = choice.get('finish_reason', 'unknown')
-                    
-                    if finish_reason == 'length':
-                        logger.warning(f"   ⚠️ [{trace_id}] Attention: La réponse a été tronquée (max_tokens atteint). Le JSON risque d'être cassé.")
-
-                    # ==========================================================
-                    # 🔍 RESPONSE DUMP
-                    # ==========================================================
-                    logger.debug(f"\n{'='*40} [{trace_id}] RÉPONSE BRUTE IA {'='*40}")
-                    logger.debug(f"{raw_content}")
-                    logger.debug(f"{'='*100}\n")
-                    # ==========================================================
-
-                    # Traitement JSON si requis
-                    if json_mode:
-                        cleaned_content = _clean_json_string(raw_content, trace_id)
-                        try:
-                            parsed_json = json.loads(cleaned_content)
-                            logger.info(f"   ✅ [{trace_id}] JSON parsé et validé techniquement.")
-                            return parsed_json
-                        except json.JSONDecodeError as je:
-                            logger.error(f"   ❌ [{trace_id}] Échec du parsing JSON.")
-                            logger.error(f"      Source nettoyée : {cleaned_content}")
-                            logger.error(f"      Erreur Python : {str(je)}")
-                            
-                            # Logique de Retry "Logique" (si on n'a pas épuisé les essais)
-                            # On pourrait relancer l'appel en disant à l'IA qu'elle s'est trompée,
-                            # mais pour ce prototype, on lève l'erreur pour le catch global.
-                            raise ValueError(f"L'IA n'a pas produit un JSON valide : {str(je)}")
-                    
-                    # Mode texte simple
-                    return raw_content
-
-                except (KeyError, IndexError, ValueError) as e:
-                    logger.error(f"   ❌ [{trace_id}] Erreur structurelle réponse API : {str(e)}")
-                    # On ne retry pas une erreur de structure interne, c'est probablement fatal
-                    raise e
-
-            elif response.status_code == 429:
-                logger.warning(f"   ⚠️ [{trace_id}] Rate Limit atteint (429). Pause forcée.")
-                time.sleep(5) # Pause fixe
-                continue 
-            
-            elif response.status_code >= 500:
-                logger.error(f"   🔥 [{trace_id}] Erreur Serveur IA ({response.status_code}).")
-                logger.debug(f"      Body: {response.text}")
-                continue
-            
-            else:
-                # Erreur client (400, 401, 403) -> Pas de retry
-                logger.critical(f"   ⛔ [{trace_id}] Erreur Client {response.status_code}.")
-                logger.critical(f"      Réponse: {response.text}")
-                response.raise_for_status()
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"   🌐 [{trace_id}] Exception Réseau : {str(e)}")
-            continue
-
-    # Si on sort de la boucle, c'est l'échec total
-    logger.critical(f"   💀 [{trace_id}] ÉCHEC TOTAL après {MAX_RETRIES_NETWORK} tentatives réseaux.")
+    except LLMUnavailableError:
+        breaker.record_failure()
+        raise
+    except httpx.HTTPStatusError:
+        # Erreur client (400/401/403) : le fournisseur répond, il n'est pas en panne
+        breaker.record_success()
+        raise
+    except asyncio.CancelledError:
+        # Relance perdante (un autre modèle a répondu) : ni succès ni échec
+        breaker.record_cancelled()
+        raise
+    breaker.record_success()
+    _record_usage(task_type, response_data)
+    return response_data
+
+
+# ==============================================================================
+# ROUTAGE MULTI-MODÈLES ET RELANCES DIFFÉRÉES ('HEDGING')
+# ==============================================================================
+# Chaque tâche dispose d'une liste ordonnée de modèles. Si le modèle principal
+# n'a pas répondu dans son p95 de latence observé pour cette tâche, un second
+# modèle est interrogé en parallèle ; la première réponse exploitable l'emporte.
+
+def _route_for(task_type: AiTaskType) -> List[str]:
+    """Modèles de la tâche, en excluant ceux dont le disjoncteur est ouvert."""
+    route = TASK_MODEL_ROUTES[task_type]
+    available = [model for model in route if _breaker_for(model).is_available()]
+    # Tous ouverts : on garde la liste complète (les disjoncteurs échoueront vite)
+    return available or route
+
+
+def _hedge_delay(model: str, task_type: AiTaskType) -> float:
+    """Délai de relance : p95 observé du modèle pour cette tâche (borné)."""
+    if not settings.LLM_HEDGING_ENABLED or task_type in NO_HEDGE_TASKS:
+        return float(TIMEOUT_SECONDS * MAX_RETRIES_NETWORK)
+    p95 = model_latency_tracker.percentile(model, task_type.value)
+    if p95 is None:
+        return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+    return max(settings.LLM_HEDGE_MIN_DELAY_SECONDS, p95)
+
+
+def _has_content(response_data: Any) -> bool:
+    """Réponse exploitable : au moins un choix avec un contenu non vide."""
+    try:
+        return bool(response_data["choices"][0]["message"]["content"].strip())
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return False
+
+
+async def _fetch_routed_completion(payload: Dict[str, Any], trace_id: str, task_type: AiTaskType) -> Dict[str, Any]:
+    """
+    Appel amont routé : modèles de la tâche essayés en relance différée
+    (cf. `hedged_call`). Le payload d'origine fixe tout sauf le modèle.
+    """
+    def call(model: str):
+        return _fetch_completion(dict(payload, model=model), f"{trace_id}/{model.split('/')[-1]}", task_type)
+
+    model, response_data = await hedged_call(
+        candidates=_route_for(task_type),
+        call=call,
+        hedge_delay=lambda model: _hedge_delay(model, task_type),
+        is_valid=_has_content,
+        task=task_type.value,
+        tracker=model_latency_tracker,
+        # Pas de relance si des appels attendent déjà leur tour : elle aggraverait la file
+        allow_hedge=lambda: llm_governor.queue_depth == 0,
+    )
+    if model != payload["model"]:
+        logger.info(f"   🔀 [{trace_id}] Réponse fournie par le modèle de secours '{model}'.")
+    return response_data
+
+
+async def _execute_completion(
+    input_data: Union[str, List[Dict[str, str]]],
+    json_mode: bool,
+    temperature: float,
+    task_type: AiTaskType,
+    max_tokens: Optional[int],
+    response_schema: Optional[Type[BaseModel]] = None
+) -> Any:
+    """
+    Transaction LLM complète, exécutée sur la boucle du noyau IA (`llm_client`).
+    Partagée par `_call_openrouter_api` (sync) et `_call_openrouter_api_async`.
+    """
+    trace_id = f"AI-{str(uuid.uuid4())[:6].upper()}"
+    max_tokens = max_tokens or _max_tokens_for(task_type)
+
+    logger.info(f"⚡ [{trace_id}] DÉBUT TRANSACTION API | Tâche: {task_type.value} | Mode JSON: {json_mode}")
+    logger.debug(f"   [{trace_id}] Config: Temp={temperature}, MaxTokens={max_tokens}, Modèles={TASK_MODEL_ROUTES[task_type]}")
+
+    # 1. Normalisation du Payload (et contrôle du budget d'entrée)
+    messages = _preflight_messages(_normalize_messages(input_data), task_type, trace_id)
+    _log_prompt(trace_id, messages)
+    payload = _build_payload(messages, temperature, max_tokens, json_mode, model=TASK_MODEL_ROUTES[task_type][0])
+
+    # 2. Appel réseau (retries et backoff non bloquants gérés par le client)
+    # Les requêtes identiques simultanées partagent un seul appel amont.
+    start_time = time.time()
+    try:
+        response_data = await completion_single_flight.do(
+            payload_fingerprint(payload),
+            lambda: _fetch_routed_completion(payload, trace_id, task_type)
+        )
+    except LLMUnavailableError as e:
+        # Si on arrive ici, c'est l'échec total (ou le disjoncteur est ouvert)
+        logger.error(f"   🚫 [{trace_id}] Fournisseur indisponible : {e}")
+        if json_mode:
+            return {}
+        return _unavailable_reply(task_type, messages)
+
+    logger.debug(f"   ⏱️ [{trace_id}] Latence totale : {time.time() - start_time:.2f}s")
+
+    # 3. Extraction / Parsing
+    return _parse_completion(response_data, json_mode, trace_id, response_schema)
+
+
+def _call_openrouter_api(
+    input_data: Union[str, List[Dict[str, str]]], 
+    json_mode: bool = False,
+    temperature: float = 0.7,
+    task_type: AiTaskType = AiTaskType.CHAT_PATIENT,
+    max_tokens: Optional[int] = None,
+    response_schema: Optional[Type[BaseModel]] = None
+) -> Any:
+    """
+    Fonction noyau (Core) pour appeler l'API LLM depuis du code synchrone.
+    Elle est conçue pour être une boîte noire totalement transparente via les logs.
+
+    L'appel est délégué à la boucle asynchrone du noyau IA : la connexion HTTP est
+    réutilisée (pool keep-alive partagé) et le backoff ne bloque aucun thread.
     
-    if json_mode:
-        return {} 
-    return "(Erreur technique : Le service d'IA est injoignable pour le moment.)"
+    :param input_data: Le prompt (str) ou la liste de messages (list).
+    :param json_mode: Force le modèle à produire du JSON et active le validateur.
+    :param temperature: Créativité (0.0 = Rigide, 1.0 = Folie).
+    :param task_type: Type de tâche pour le logging.
+    :param max_tokens: Plafond de sortie ; par défaut, ajusté aux réponses
+        observées pour la tâche (cf. `_max_tokens_for`).
+    :param response_schema: Schéma Pydantic attendu (mode JSON) : sert à valider
+        une réponse réparée localement avant de l'accepter.
+    """
+    pool_metrics.record_external_call(task_type.value)
+    return llm_client.run(
+        _execute_completion(input_data, json_mode, temperature, task_type, max_tokens, response_schema)
+    )
+
+
+async def _call_openrouter_api_async(
+    input_data: Union[str, List[Dict[str, str]]],
+    json_mode: bool = False,
+    temperature: float = 0.7,
+    task_type: AiTaskType = AiTaskType.CHAT_PATIENT,
+    max_tokens: Optional[int] = None,
+    response_schema: Optional[Type[BaseModel]] = None
+) -> Any:
+    """
+    Variante asynchrone de `_call_openrouter_api` (mêmes paramètres, même résultat).
+    À utiliser depuis une route ou un service `async def`.
+    """
+    async_pool_metrics.record_external_call(task_type.value)
+    return await llm_client.run_async(
+        _execute_completion(input_data, json_mode, temperature, task_type, max_tokens, response_schema)
+    )
+
+
+async def _execute_stream(
+    input_data: Union[str, List[Dict[str, str]]],
+    temperature: float,
+    task_type: AiTaskType,
+    max_tokens: Optional[int]
+) -> AsyncIterator[str]:
+    """
+    Variante 'stream' de `_execute_completion` (mode texte uniquement) : produit
+    les fragments de la réponse au fil de leur génération.
+    En cas d'indisponibilité du fournisseur, produit le message d'erreur technique.
+    """
+    trace_id = f"AI-{str(uuid.uuid4())[:6].upper()}"
+    max_tokens = max_tokens or _max_tokens_for(task_type)
+
+    # Pas de relance parallèle sur un flux : on prend le premier modèle disponible
+    model = _route_for(task_type)[0]
+
+    logger.info(f"⚡ [{trace_id}] DÉBUT STREAM API | Tâche: {task_type.value}")
+    logger.debug(f"   [{trace_id}] Config: Temp={temperature}, MaxTokens={max_tokens}, Model={model}")
+
+    messages = _preflight_messages(_normalize_messages(input_data), task_type, trace_id)
+    _log_prompt(trace_id, messages)
+    payload = _build_payload(messages, temperature, max_tokens, json_mode=False, model=model)
+
+    chunks: List[str] = []
+    breaker = _breaker_for(payload["model"])
+    try:
+        breaker.before_call()
+        try:
+            async with llm_governor.slot(task_type.value, TASK_PRIORITIES[task_type]):
+                async for delta in llm_client.stream_chat_completion(
+                    dict(payload, messages=_apply_cache_hints(payload["messages"], model)),
+                    trace_id=trace_id,
+                    max_retries=MAX_RETRIES_NETWORK,
+                    timeout=TIMEOUT_SECONDS,
+                    on_rate_limited=llm_governor.penalize
+                ):
+                    if not chunks:
+                        # Premier token : le fournisseur répond
+                        breaker.record_success()
+                    chunks.append(delta)
+                    yield delta
+        except LLMUnavailableError:
+            breaker.record_failure()
+            raise
+        except httpx.HTTPStatusError:
+            breaker.record_success()
+            raise
+        if not chunks:
+            breaker.record_success()
+    except LLMUnavailableError as e:
+        logger.error(f"   🚫 [{trace_id}] Fournisseur indisponible : {e}")
+        yield _unavailable_reply(task_type, messages)
+        return
+
+    logger.debug(f"\n{'='*40} [{trace_id}] RÉPONSE STREAMÉE IA {'='*40}")
+    logger.debug("".join(chunks))
+    logger.debug(f"{'='*100}\n")
+
+
+def _stream_openrouter_api_async(
+    input_data: Union[str, List[Dict[str, str]]],
+    temperature: float = 0.7,
+    task_type: AiTaskType = AiTaskType.CHAT_PATIENT,
+    max_tokens: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Équivalent 'stream' de `_call_openrouter_api_async` : générateur asynchrone
+    des fragments de texte produits par le LLM.
+    """
+    async_pool_metrics.record_external_call(task_type.value)
+    return llm_client.iterate_async(_execute_stream(input_data, temperature, task_type, max_tokens))
 
 
 # ==============================================================================
 # SERVICES MÉTIERS (Business Logic)
 # ==============================================================================
-
-def generate_patient_reply_chat(messages: List[Dict[str, str]]) -> str:
+# Chaque service existe en deux variantes :
+# - synchrone (`generate_xxx`)        : pour les routes `def` et les scripts.
+# - asynchrone (`generate_xxx_async`) : pour les routes/services `async def`.
+# Les deux partagent les mêmes helpers de préparation (prompt) et d'interprétation
+# (validation, fallback) : seule la façon d'attendre le LLM change.
+# Exception : la réplique du patient n'est produite que depuis le chat, donc
+# uniquement en asynchrone.
+
+def _interpret_patient_reply(response: Any) -> str:
+    """Normalise la sortie brute du LLM en réplique patient."""
+    if isinstance(response, str):
+        return response
+    return "..."
+
+
+async def generate_patient_reply_chat_async(messages: List[Dict[str, str]]) -> str:
     """
     Génère la réplique du patient (Mode Chat).
-    
+
     Cette fonction est appelée par le PatientActorService.
     Elle privilégie une température élevée pour la variété et le naturel.
     """
     try:
-        response = _call_openrouter_api(
+        response = await _call_openrouter_api_async(
             input_data=messages,
             json_mode=False,
-            temperature=0.85, # Créatif
+            temperature=0.85,
             task_type=AiTaskType.CHAT_PATIENT,
-            max_tokens=300 # Réponses courtes (patient)
         )
-        
-        if isinstance(response, str):
-            return response
-        return "..."
+        return _interpret_patient_reply(response)
     except Exception as e:
-        logger.error(f"Erreur dans generate_patient_reply_chat: {e}")
+        logger.error(f"Erreur dans generate_patient_reply_chat_async: {e}")
         return "(Silence...)"
 
 
-def generate_exam_result(
-    case: models.ClinicalCase, 
-    session_history: List[str], 
+async def stream_patient_reply_chat_async(messages: Union[str, List[Dict[str, str]]]) -> AsyncIterator[str]:
+    """
+    Génère la réplique du patient token par token (Mode Chat streamé).
+    Mêmes réglages que `generate_patient_reply_chat_async` ; la concaténation des
+    fragments donne la réplique complète.
+    """
+    try:
+        async for delta in _stream_openrouter_api_async(
+            input_data=messages,
+            temperature=0.85,
+            task_type=AiTaskType.CHAT_PATIENT,
+        ):
+            yield delta
+    except Exception as e:
+        logger.error(f"Erreur dans stream_patient_reply_chat_async: {e}")
+        yield "(Silence...)"
+
+
+def _build_exam_prompt(
+    case: models.ClinicalCase,
     exam_name: str,
-    exam_justification: str = "Non spécifiée"
-) -> Dict[str, Any]:
+    exam_justification: str,
+    exam_code: Optional[str]
+) -> str:
     """
-    Génère un résultat d'examen médical structuré.
-    
-    C'est le CŒUR de la fonctionnalité d'examen.
-    Elle utilise le `ExamPromptBuilder` pour créer un prompt contextuel hyper-précis.
+    Prépare les données du cas et construit le prompt d'examen via le Builder.
+    `exam_code` : code catalogue déjà résolu (None : hors catalogue).
     """
-    logger.info(f"🔬 [AI-LAB] Demande génération examen : '{exam_name}'")
-    
     # 1. Préparation des données pour le Builder
-    # Conversion du modèle SQLAlchemy en dict simpliste pour le builder
+    # Vérité terrain lue dans les fragments matérialisés du cas (pas de chargement de la pathologie)
+    ground_truth = case_narrative_service.get_case_fragments(case)["verite_terrain"]
     case_data = {
         "pathologie_principale": {
-            "nom_fr": case.pathologie_principale.nom_fr if case.pathologie_principale else "Inconnue"
+            "nom_fr": ground_truth["pathologie_nom"] or "Inconnue"
         },
         "niveau_gravite": case.niveau_difficulte,
         "donnees_paracliniques": case.donnees_paracliniques,
-        "description": case.pathologie_principale.description if case.pathologie_principale else "",
-        "physiopathologie": case.pathologie_principale.physiopathologie if case.pathologie_principale else ""
+        "description": ground_truth["description"],
+        "physiopathologie": ground_truth["physiopathologie"]
     }
     
     # Extraction sommaire du persona depuis l'historique ou données par défaut
@@ -356,21 +806,66 @@ def generate_exam_result(
     exam_req = {
         "name": exam_name,
         "type": "tous", # Le builder déduira le type (bio/imag)
-        "justification": exam_justification
+        "justification": exam_justification,
+        "code": exam_code
     }
 
     # 2. Construction du Prompt via le Builder dédié
-    prompt = exam_prompt_builder.build_prompt(
+    return exam_prompt_builder.build_prompt(
         case_data=case_data,
         exam_request=exam_req,
         patient_persona=patient_persona
     )
 
+
+def _exam_fallback_result(case: models.ClinicalCase, exam_name: str) -> Dict[str, Any]:
+    """
+    Résultat de secours lorsque la génération d'un examen échoue définitivement :
+    compte-rendu par gabarit à partir des données paracliniques du cas.
+    """
+    logger.critical(f"   💀 [AI-LAB] Échec définitif de génération de l'examen '{exam_name}'. Utilisation du fallback.")
+    try:
+        return degraded_mode_service.build_degraded_exam_result(case, exam_name)
+    except Exception as e:
+        logger.error(f"   ❌ [AI-LAB] Gabarit de secours impossible : {e}")
+        return {
+            "type_resultat": "erreur",
+            "rapport_complet": f"Erreur technique : Impossible de générer le rapport pour {exam_name}. Veuillez contacter le support.",
+            "conclusion": "Examen non réalisé."
+        }
+
+
+def _accept_exam_result(result: Any, logic_attempts: int) -> bool:
+    """Validation Métier d'une tentative de génération d'examen."""
+    if isinstance(result, dict) and _validate_exam_json_structure(result, f"EXAM-{logic_attempts}"):
+        return True
+    logger.warning(f"   ⚠️ [AI-LAB] Tentative {logic_attempts}: JSON reçu mais invalide structurellement.")
+    return False
+
+
+def generate_exam_result(
+    case: models.ClinicalCase, 
+    session_history: List[str], 
+    exam_name: str,
+    exam_justification: str = "Non spécifiée"
+) -> Dict[str, Any]:
+    """
+    Génère un résultat d'examen médical structuré.
+    
+    C'est le CŒUR de la fonctionnalité d'examen.
+    Elle utilise le `ExamPromptBuilder` pour créer un prompt contextuel hyper-précis.
+    """
+    logger.info(f"🔬 [AI-LAB] Demande génération examen : '{exam_name}'")
+    prompt = _build_exam_prompt(case, exam_name, exam_justification, exam_catalog.match_code(exam_name))
+
     # 3. Appel IA avec logique de retry sur le format JSON
     logic_attempts = 0
     final_result = None
     
     while logic_attempts < MAX_RETRIES_LOGIC:
+        if not is_llm_available(AiTaskType.EXAM_GENERATION):
+            logger.warning("   🔴 [AI-LAB] Fournisseur IA indisponible (disjoncteur ouvert) : passage en mode dégradé.")
+            break
         logic_attempts += 1
         
         try:
@@ -379,16 +874,14 @@ def generate_exam_result(
                 json_mode=True,
                 temperature=0.2, # Très strict pour des données médicales
                 task_type=AiTaskType.EXAM_GENERATION,
-                max_tokens=1000
+                response_schema=schemas.simulation.ExamResultContent
             )
             
             # 4. Validation Métier
-            if isinstance(result, dict) and _validate_exam_json_structure(result, f"EXAM-{logic_attempts}"):
+            if _accept_exam_result(result, logic_attempts):
                 final_result = result
                 break # Succès !
-            else:
-                logger.warning(f"   ⚠️ [AI-LAB] Tentative {logic_attempts}: JSON reçu mais invalide structurellement.")
-                # On retente (l'aléatoire de la température peut aider à corriger)
+            # Sinon on retente (l'aléatoire de la température peut aider à corriger)
         
         except Exception as e:
             logger.error(f"   ❌ [AI-LAB] Tentative {logic_attempts} échouée : {str(e)}")
@@ -396,33 +889,71 @@ def generate_exam_result(
             
     # 5. Gestion du Fallback (Si échec après retries)
     if not final_result:
-        logger.critical(f"   💀 [AI-LAB] Échec définitif de génération de l'examen '{exam_name}'. Utilisation du fallback.")
-        return {
-            "type_resultat": "erreur",
-            "rapport_complet": f"Erreur technique : Impossible de générer le rapport pour {exam_name}. Veuillez contacter le support.",
-            "conclusion": "Examen non réalisé."
-        }
-    
-    # 6. Post-traitement (optionnel)
-    # On pourrait ajouter ici des vérifications de sécurité (mots interdits, etc.)
+        return _exam_fallback_result(case, exam_name)
     
     logger.info(f"   🎉 [AI-LAB] Résultat généré avec succès. Conclusion : {final_result.get('conclusion', '')[:50]}...")
     return final_result
 
 
-def evaluate_final_submission(
+async def generate_exam_result_async(
+    case: models.ClinicalCase,
+    session_history: List[str],
+    exam_name: str,
+    exam_justification: str = "Non spécifiée",
+    exam_code: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Variante asynchrone de `generate_exam_result`. `exam_code` est résolu par
+    l'appelant hors de la boucle (cf. exam_cache_service) : sans lui, seule la
+    correspondance lexicale du catalogue est tentée.
+    """
+    logger.info(f"🔬 [AI-LAB] Demande génération examen (async) : '{exam_name}'")
+    prompt = _build_exam_prompt(case, exam_name, exam_justification, exam_code)
+
+    logic_attempts = 0
+    final_result = None
+
+    while logic_attempts < MAX_RETRIES_LOGIC:
+        if not is_llm_available(AiTaskType.EXAM_GENERATION):
+            logger.warning("   🔴 [AI-LAB] Fournisseur IA indisponible (disjoncteur ouvert) : passage en mode dégradé.")
+            break
+        logic_attempts += 1
+        try:
+            result = await _call_openrouter_api_async(
+                input_data=prompt,
+                json_mode=True,
+                temperature=0.2,
+                task_type=AiTaskType.EXAM_GENERATION,
+                response_schema=schemas.simulation.ExamResultContent
+            )
+            if _accept_exam_result(result, logic_attempts):
+                final_result = result
+                break
+        except Exception as e:
+            logger.error(f"   ❌ [AI-LAB] Tentative {logic_attempts} échouée : {str(e)}")
+
+    if not final_result:
+        return _exam_fallback_result(case, exam_name)
+
+    logger.info(f"   🎉 [AI-LAB] Résultat généré avec succès. Conclusion : {final_result.get('conclusion', '')[:50]}...")
+    return final_result
+
+
+def _build_evaluation_prompt(
     db: Session,
     case: models.ClinicalCase,
     submission: schemas.simulation.SubmissionRequest,
-    session_history: list
-) -> Tuple[schemas.simulation.EvaluationResult, str, str]:
-    """
-    Le Juge Sémantique. Évalue la performance de l'étudiant en comparant
-    ses réponses textuelles avec la vérité structurée de la base de données.
+    session_history: list,
+    eval_id: str,
+    local_grade: Optional[LocalGrade] = None
+) -> str:
     """
-    eval_id = f"JUDGE-{str(uuid.uuid4())[:6]}"
-    logger.info(f"⚖️ [{eval_id}] Démarrage évaluation SÉMANTIQUE")
+    Construit le prompt du jury : vérité terrain (BDD) + soumission + historique.
+    Seule étape de l'évaluation qui lit la base de données.
 
+    :param local_grade: Notes déjà fixées par le correcteur local : le jury ne
+        rédige alors que le feedback (et la note de démarche).
+    """
     # 1. Récupération de la VÉRITÉ TERRAIN (Ce qu'il fallait trouver)
     # -------------------------------------------------------------------------
     logger.debug(f"   [{eval_id}] Chargement de la vérité terrain depuis la BDD...")
@@ -465,14 +996,13 @@ def evaluate_final_submission(
 
     # 3. Formatage de l'historique (Preuves de la démarche)
     # -------------------------------------------------------------------------
-    # On tronque pour ne pas dépasser la fenêtre de contexte du LLM
     history_str = json.dumps(session_history, indent=2, ensure_ascii=False)
-    if len(history_str) > 5000:
-        history_str = history_str[:5000] + "\n... [HISTORIQUE TRONQUÉ] ..."
 
     # 4. Construction du PROMPT DU JURY (Comparaison Sémantique)
     # -------------------------------------------------------------------------
-    prompt = f"""
+    # Consignes et vérité terrain sont intégrales ; l'historique occupe le reste
+    # du budget de la tâche (début du parcours conservé en priorité).
+    instructions = f"""
 TU ES UN PROFESSEUR DE MÉDECINE EXPERT (JURY D'EXAMEN).
 Ta mission est d'évaluer la pertinence clinique de la réponse d'un étudiant.
 Tu dois faire une COMPARAISON SÉMANTIQUE entre la vérité terrain et la réponse de l'étudiant.
@@ -502,103 +1032,311 @@ Instruction de notation Thérapeutique :
 
 --- 3. LA DÉMARCHE CLINIQUE (HISTORIQUE) ---
 Parcours de l'étudiant :
-{history_str}
+"""
+    if local_grade and any(
+        score is not None
+        for score in (local_grade.score_diagnostic, local_grade.score_therapeutique, local_grade.score_demarche)
+    ):
+        fixed = []
+        if local_grade.score_diagnostic is not None:
+            fixed.append(f"- score_diagnostic : {local_grade.score_diagnostic}/10")
+        if local_grade.score_therapeutique is not None:
+            fixed.append(f"- score_therapeutique : {local_grade.score_therapeutique}/5")
+        if local_grade.score_demarche is not None:
+            fixed.append(f"- score_demarche : {local_grade.score_demarche}/5")
+        missed = local_grade.missed_items()
+        if missed["questions"]:
+            fixed.append(f"Questions d'anamnèse non abordées : {' ; '.join(missed['questions'])}")
+        if missed["examens"]:
+            fixed.append(f"Examens utiles non demandés : {', '.join(missed['examens'])}")
+        instructions = instructions.replace("--- 3. LA DÉMARCHE CLINIQUE", (
+            "--- NOTES DÉJÀ ATTRIBUÉES (barème automatique) ---\n"
+            + "\n".join(fixed)
+            + "\nReprends ces notes telles quelles et rédige un feedback cohérent avec elles (en citant les éléments manqués).\n\n"
+            "--- 3. LA DÉMARCHE CLINIQUE"
+        ))
+    closing_instructions = """
 
 Instruction de notation Démarche :
 - 5/5 : Questions pertinentes, examens justifiés, logique claire.
 - 0-2/5 : Questions au hasard, examens inutiles ("pêche aux infos").
 
 --- FORMAT DE SORTIE ATTENDU (JSON) ---
-{{
+{
   "score_diagnostic": float,  // Note sur 10
   "score_therapeutique": float, // Note sur 5
   "score_demarche": float,      // Note sur 5
   "feedback_global": "Analyse pédagogique détaillée. Explique pourquoi le diagnostic est bon/mauvais par rapport à la vérité. Commente le choix des médicaments.",
   "recommendation_next_step": "Conseil court (ex: 'Revoir la pharmacologie des antipaludéens')."
-}}
+}
 """
+    return assemble_prompt(
+        [
+            PromptSection("consignes", instructions, required=True),
+            PromptSection("historique", history_str, truncate="head"),
+            PromptSection("format", closing_instructions, required=True),
+        ],
+        budget=TASK_INPUT_BUDGETS[AiTaskType.EVALUATION],
+        trace_id=eval_id
+    )
 
-    # 5. Appel IA
-    # -------------------------------------------------------------------------
-    logger.info(f"   🚀 [{eval_id}] Envoi du dossier au jury (LLM)...")
-    
-    # On utilise _call_openrouter_api (assurez-vous qu'elle est bien définie dans le fichier complet)
-    eval_json = _call_openrouter_api(
-        input_data=prompt,
-        json_mode=True,
-        temperature=0.2, # Faible température pour une notation objective
-        task_type=AiTaskType.EVALUATION
+
+def _interpret_evaluation(
+    eval_json: Any,
+    eval_id: str,
+    local_grade: Optional[LocalGrade] = None
+) -> Tuple[schemas.simulation.EvaluationResult, str, str]:
+    """
+    Parsing et validation du verdict du jury.
+    Les notes fixées par le correcteur local priment sur celles du jury.
+
+    Un verdict vide (fournisseur indisponible : `{}` en mode JSON) ou invalide
+    n'est jamais converti en notes : la correction locale, si complète, fait
+    foi ; sinon `LLMUnavailableError` est levée pour que l'évaluation soit
+    retentée (cf. evaluation_job_service).
+    """
+    try:
+        verdict = schemas.simulation.EvaluationVerdict.model_validate(eval_json)
+    except ValidationError as e:
+        logger.error(f"   ❌ [{eval_id}] Verdict du jury inexploitable : {e.error_count()} erreur(s) de validation")
+        logger.debug(f"      JSON reçu : {eval_json}")
+
+        # Jury indisponible : la correction locale, si complète, fait foi
+        if local_grade and local_grade.is_complete:
+            logger.info(f"   🧮 [{eval_id}] Verdict du correcteur local retenu.")
+            return (local_grade.to_result(), *local_grader.feedback(local_grade))
+        raise LLMUnavailableError(f"Verdict du jury inexploitable ({eval_id})") from e
+
+    s_diag, s_ther, s_dem = verdict.score_diagnostic, verdict.score_therapeutique, verdict.score_demarche
+    if local_grade and local_grade.score_diagnostic is not None:
+        s_diag = local_grade.score_diagnostic
+    if local_grade and local_grade.score_therapeutique is not None:
+        s_ther = local_grade.score_therapeutique
+    if local_grade and local_grade.score_demarche is not None:
+        s_dem = local_grade.score_demarche
+
+    # Clamp des notes (au cas où l'IA note sur 20 au lieu de 10)
+    s_diag = min(10, max(0, s_diag))
+    s_ther = min(5, max(0, s_ther))
+    s_dem = min(5, max(0, s_dem))
+
+    total = s_diag + s_ther + s_dem
+
+    logger.info(f"   🏆 [{eval_id}] Verdict rendu : {total}/20")
+    logger.debug(f"      Détails : Diag={s_diag}/10, Ther={s_ther}/5, Dem={s_dem}/5")
+    logger.debug(f"      Feedback : {(verdict.feedback_global or '')[:100]}...")
+
+    result_obj = schemas.simulation.EvaluationResult(
+        score_diagnostic=s_diag,
+        score_therapeutique=s_ther,
+        score_demarche=s_dem,
+        score_total=total
+    )
+    return (
+        result_obj,
+        verdict.feedback_global or "Évaluation complétée.",
+        verdict.recommendation_next_step or "Continuer."
     )
 
-    # 6. Parsing et Validation du Résultat
+
+def _prepare_evaluation(
+    db: Session,
+    case: models.ClinicalCase,
+    submission: schemas.simulation.SubmissionRequest,
+    session_history: list,
+    session_id: uuid.UUID,
+    eval_id: str
+) -> Tuple[Optional[LocalGrade], Optional[str]]:
+    """
+    Correction locale puis, si le jury LLM reste nécessaire, son prompt.
+
+    :return: (notes locales, prompt du jury) ; prompt à None quand la
+        correction rapide (FAST_GRADING_ENABLED) suffit.
+    """
+    local_grade = local_grader.grade(db, case, submission, session_id)
+    if settings.FAST_GRADING_ENABLED and local_grade and local_grade.is_complete:
+        return local_grade, None
+    return local_grade, _build_evaluation_prompt(db, case, submission, session_history, eval_id, local_grade)
+
+
+def _fast_graded(local_grade: LocalGrade, eval_id: str) -> Tuple[schemas.simulation.EvaluationResult, str, str]:
+    """Verdict du correcteur local seul (aucun appel LLM)."""
+    local_grader.record_fast_grading()
+    result = local_grade.to_result()
+    logger.info(f"   ⚡ [{eval_id}] Correction rapide (sans jury LLM) : {result.score_total}/20")
+    return (result, *local_grader.feedback(local_grade))
+
+
+def evaluate_final_submission(
+    db: Session,
+    case: models.ClinicalCase,
+    submission: schemas.simulation.SubmissionRequest,
+    session_history: list,
+    session_id: uuid.UUID
+) -> Tuple[schemas.simulation.EvaluationResult, str, str]:
+    """
+    Le Juge Sémantique. Évalue la performance de l'étudiant en comparant
+    ses réponses textuelles avec la vérité structurée de la base de données.
+    """
+    eval_id = f"JUDGE-{str(uuid.uuid4())[:6]}"
+    logger.info(f"⚖️ [{eval_id}] Démarrage évaluation SÉMANTIQUE")
+
+    local_grade, prompt = _prepare_evaluation(db, case, submission, session_history, session_id, eval_id)
+    if prompt is None:
+        return _fast_graded(local_grade, eval_id)
+    # Vérité terrain lue : la connexion BDD est rendue au pool avant l'attente du jury
+    release_connection(db)
+
+    # 5. Appel IA
     # -------------------------------------------------------------------------
+    logger.info(f"   🚀 [{eval_id}] Envoi du dossier au jury (LLM)...")
     try:
-        # Sécurisation des types
-        s_diag = float(eval_json.get("score_diagnostic", 0))
-        s_ther = float(eval_json.get("score_therapeutique", 0))
-        s_dem = float(eval_json.get("score_demarche", 0))
-        
-        # Clamp des notes (au cas où l'IA note sur 20 au lieu de 10)
-        s_diag = min(10, max(0, s_diag))
-        s_ther = min(5, max(0, s_ther))
-        s_dem = min(5, max(0, s_dem))
-        
-        total = s_diag + s_ther + s_dem
-        
-        logger.info(f"   🏆 [{eval_id}] Verdict rendu : {total}/20")
-        logger.debug(f"      Détails : Diag={s_diag}/10, Ther={s_ther}/5, Dem={s_dem}/5")
-        logger.debug(f"      Feedback : {eval_json.get('feedback_global', '')[:100]}...")
-
-        result_obj = schemas.simulation.EvaluationResult(
-            score_diagnostic=s_diag,
-            score_therapeutique=s_ther,
-            score_demarche=s_dem,
-            score_total=total
+        eval_json = _call_openrouter_api(
+            input_data=prompt,
+            json_mode=True,
+            temperature=0.2, # Faible température pour une notation objective
+            task_type=AiTaskType.EVALUATION,
+            response_schema=schemas.simulation.EvaluationVerdict
         )
-        
-        return result_obj, eval_json.get("feedback_global", "Évaluation complétée."), eval_json.get("recommendation_next_step", "Continuer.")
+    except ValueError as e:
+        # JSON irréparable : traité comme un verdict absent (cf. _interpret_evaluation)
+        logger.error(f"   ❌ [{eval_id}] Réponse du jury illisible : {e}")
+        eval_json = None
 
-    except Exception as e:
-        logger.error(f"   ❌ [{eval_id}] Erreur lecture verdict : {e}")
-        logger.debug(f"      JSON reçu : {eval_json}")
-        
-        # Fallback pour ne pas bloquer l'UI
-        return schemas.simulation.EvaluationResult(
-            score_diagnostic=0, score_therapeutique=0, score_demarche=0, score_total=0
-        ), "Erreur technique lors de l'évaluation automatique. Vos réponses ont été enregistrées.", "Veuillez contacter l'administrateur."
+    # 6. Parsing et Validation du Résultat
+    return _interpret_evaluation(eval_json, eval_id, local_grade)
 
-def generate_hint(case: models.ClinicalCase, session_history: List[str], hint_level: int) -> Tuple[str, str]:
-    """
-    Génère un indice.
-    """
-    logger.info(f"💡 [AI-TUTOR] Indice niveau {hint_level}")
-    
-    prompt = f"""
+
+def _build_hint_prompt(case: models.ClinicalCase, session_history: List[str], hint_level: int) -> str:
+    # L'indice porte sur le point où en est l'étudiant : on garde la fin de l'historique
+    return assemble_prompt(
+        [
+            PromptSection("consignes", f"""
 ROLE: Tuteur médical.
 CONTEXTE: Cas de {case.pathologie_principale.nom_fr}.
 NIVEAU AIDE: {hint_level}/3.
-HISTORIQUE: {str(session_history)[-1000:]}
+HISTORIQUE: """, required=True),
+            PromptSection("historique", str(session_history), truncate="tail"),
+            PromptSection("format", """
+
+Donne un indice pédagogique JSON : { "hint_type": "...", "content": "..." }
+""", required=True),
+        ],
+        budget=TASK_INPUT_BUDGETS[AiTaskType.HINT_GENERATION]
+    )
 
-Donne un indice pédagogique JSON : {{ "hint_type": "...", "content": "..." }}
-"""
-    res = _call_openrouter_api(prompt, json_mode=True, task_type=AiTaskType.HINT_GENERATION)
+
+def _interpret_hint(res: Any) -> Tuple[str, str]:
     if isinstance(res, dict):
         return res.get("hint_type", "info"), res.get("content", "Analysez les symptômes.")
     return "info", "Continuez."
 
 
+async def generate_hint_async(case: models.ClinicalCase, session_history: List[str], hint_level: int) -> Tuple[str, str]:
+    """
+    Génère un indice.
+    """
+    logger.info(f"💡 [AI-TUTOR] Indice niveau {hint_level}")
+    prompt = _build_hint_prompt(case, session_history, hint_level)
+    res = await _call_openrouter_api_async(prompt, json_mode=True, task_type=AiTaskType.HINT_GENERATION)
+    return _interpret_hint(res)
+
+
+def _prepare_feedback_prompt(
+    case: models.ClinicalCase,
+    student_msg: str,
+    patient_msg: str,
+    chat_history_count: int,
+    analysis_id: str,
+    conversation_summary: Optional[str] = None
+) -> Optional[str]:
+    """
+    PHASES 1 à 3 de l'analyse pédagogique : contrôle des entrées, extraction de la
+    vérité terrain et construction du prompt. Renvoie None si l'analyse est annulée.
+    """
+    logger.info(f"🎓 [{analysis_id}] DÉMARRAGE ANALYSE PÉDAGOGIQUE")
+    logger.debug(f"   [{analysis_id}] Contexte : {chat_history_count} messages précédents.")
+    
+    # --- PHASE 1 : SANITY CHECK (Vérification des entrées) ---
+    if not student_msg or not patient_msg:
+        logger.warning(f"   ⚠️ [{analysis_id}] Annulation : Message étudiant ou patient vide.")
+        return None
 
+    # Nettoyage préventif des inputs pour les logs
+    s_preview = student_msg[:50].replace('\n', ' ') + "..." if len(student_msg) > 50 else student_msg
+    p_preview = patient_msg[:50].replace('\n', ' ') + "..." if len(patient_msg) > 50 else patient_msg
+    
+    logger.debug(f"   [{analysis_id}] Input Student : '{s_preview}'")
+    logger.debug(f"   [{analysis_id}] Input Patient : '{p_preview}'")
 
+    # --- PHASE 2 : PRÉPARATION DES DONNÉES (Extraction Sécurisée) ---
+    # On extrait les données brutes du modèle SQLAlchemy pour éviter les erreurs de sérialisation
+    logger.debug(f"   [{analysis_id}] Extraction de la vérité terrain du cas ID {case.id}...")
+    
+    fragments = case_narrative_service.get_case_fragments(case)
+    case_data_safe = {
+        "pathologie_principale": {
+            "nom_fr": fragments["verite_terrain"]["pathologie_nom"] or "Pathologie Inconnue"
+        },
+        "resume_cas": fragments["resume_cas"]
+    }
+    
+    # --- PHASE 3 : CONSTRUCTION DU PROMPT (Ingénierie) ---
+    logger.debug(f"   [{analysis_id}] Appel au TutorPromptBuilder...")
+    
+    prompt = tutor_prompt_builder.build_feedback_prompt(
+        case_data=case_data_safe,
+        student_msg=student_msg,
+        patient_msg=patient_msg,
+        chat_history_count=chat_history_count,
+        conversation_summary=conversation_summary
+    )
+    
+    # Log de la taille du prompt pour surveiller les coûts tokens
+    logger.debug(f"   [{analysis_id}] Prompt généré. Taille : {len(prompt)} caractères.")
+    return prompt
 
 
+def _validate_feedback(raw_result: Any, analysis_id: str, start_time: float) -> Dict[str, Any]:
+    """PHASE 5 : Validation et parsing (la "Douane") du feedback tuteur."""
+    # Si raw_result est déjà un dict (grâce au parsing interne de _call_openrouter_api)
+    if isinstance(raw_result, dict):
+        logger.debug(f"   [{analysis_id}] JSON reçu. Validation du schéma Pydantic...")
+        
+        try:
+            # Validation stricte via le schéma défini en Phase 2
+            validated_feedback = TutorFeedback(**raw_result)
+            
+            # Conversion en dict standard pour le stockage JSONB
+            final_output = validated_feedback.model_dump()
+            
+            # Logs de succès avec aperçu du contenu pédagogique
+            logger.info(f"   ✅ [{analysis_id}] Feedback validé et structuré.")
+            logger.debug(f"      - Chrono : {final_output['chronology_check']}")
+            logger.debug(f"      - Guide  : {final_output['interpretation_guide'][:50]}...")
+            
+            duration = time.time() - start_time
+            logger.info(f"   🏁 [{analysis_id}] TERMINÉ en {duration:.3f}s")
+            
+            return final_output
 
+        except Exception as validation_err:
+            logger.error(f"   ❌ [{analysis_id}] ÉCHEC VALIDATION PYDANTIC : {validation_err}")
+            logger.error(f"      Données reçues : {json.dumps(raw_result)}")
+            # On ne retourne pas de feedback corrompu
+            return {}
+    
+    # Si ce n'est pas un dict (cas d'erreur rare ou fallback texte)
+    logger.warning(f"   ⚠️ [{analysis_id}] Format de réponse inattendu (pas un dict). Type: {type(raw_result)}")
+    return {}
 
 
 def generate_pedagogical_feedback(
     case: models.ClinicalCase,
     student_msg: str,
     patient_msg: str,
-    chat_history_count: int
+    chat_history_count: int,
+    conversation_summary: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Génère une analyse pédagogique (Feedback Tuteur) en temps réel.
@@ -617,51 +1355,20 @@ def generate_pedagogical_feedback(
     :param student_msg: La dernière question posée par l'étudiant.
     :param patient_msg: La réponse générée par le Patient Actor.
     :param chat_history_count: Nombre de messages précédents (pour estimer la phase).
+    :param conversation_summary: Résumé glissant de la consultation (cf.
+        `conversation_summary_service`), pour juger l'échange dans son contexte.
     :return: Un dictionnaire validé contenant {chronology_check, interpretation_guide, better_question}.
     """
     # ID de traçabilité unique pour suivre cette analyse précise dans les logs serveurs
     analysis_id = f"TUTOR-{str(uuid.uuid4())[:8].upper()}"
     start_time = time.time()
-    
-    logger.info(f"🎓 [{analysis_id}] DÉMARRAGE ANALYSE PÉDAGOGIQUE")
-    logger.debug(f"   [{analysis_id}] Contexte : {chat_history_count} messages précédents.")
-    
-    # --- PHASE 1 : SANITY CHECK (Vérification des entrées) ---
-    if not student_msg or not patient_msg:
-        logger.warning(f"   ⚠️ [{analysis_id}] Annulation : Message étudiant ou patient vide.")
-        return {}
-
-    # Nettoyage préventif des inputs pour les logs
-    s_preview = student_msg[:50].replace('\n', ' ') + "..." if len(student_msg) > 50 else student_msg
-    p_preview = patient_msg[:50].replace('\n', ' ') + "..." if len(patient_msg) > 50 else patient_msg
-    
-    logger.debug(f"   [{analysis_id}] Input Student : '{s_preview}'")
-    logger.debug(f"   [{analysis_id}] Input Patient : '{p_preview}'")
 
     try:
-        # --- PHASE 2 : PRÉPARATION DES DONNÉES (Extraction Sécurisée) ---
-        # On extrait les données brutes du modèle SQLAlchemy pour éviter les erreurs de sérialisation
-        logger.debug(f"   [{analysis_id}] Extraction de la vérité terrain du cas ID {case.id}...")
-        
-        case_data_safe = {
-            "pathologie_principale": {
-                "nom_fr": case.pathologie_principale.nom_fr if case.pathologie_principale else "Pathologie Inconnue"
-            },
-            "presentation_clinique": case.presentation_clinique or {}
-        }
-        
-        # --- PHASE 3 : CONSTRUCTION DU PROMPT (Ingénierie) ---
-        logger.debug(f"   [{analysis_id}] Appel au TutorPromptBuilder...")
-        
-        prompt = tutor_prompt_builder.build_feedback_prompt(
-            case_data=case_data_safe,
-            student_msg=student_msg,
-            patient_msg=patient_msg,
-            chat_history_count=chat_history_count
+        prompt = _prepare_feedback_prompt(
+            case, student_msg, patient_msg, chat_history_count, analysis_id, conversation_summary
         )
-        
-        # Log de la taille du prompt pour surveiller les coûts tokens
-        logger.debug(f"   [{analysis_id}] Prompt généré. Taille : {len(prompt)} caractères.")
+        if prompt is None:
+            return {}
 
         # --- PHASE 4 : APPEL LLM (Inférence) ---
         logger.info(f"   🚀 [{analysis_id}] Envoi requête IA (Mode: Tuteur)...")
@@ -672,49 +1379,79 @@ def generate_pedagogical_feedback(
             json_mode=True,  # CRUCIAL : Force le modèle à sortir du JSON
             temperature=0.2,
             task_type=AiTaskType.TUTOR_ANALYSIS,
-            max_tokens=600   # Pas besoin de plus pour 3 paragraphes
+            response_schema=TutorFeedback
         )
 
-        # --- PHASE 5 : VALIDATION ET PARSING (La "Douane") ---
-        # Si raw_result est déjà un dict (grâce au parsing interne de _call_openrouter_api)
-        if isinstance(raw_result, dict):
-            logger.debug(f"   [{analysis_id}] JSON reçu. Validation du schéma Pydantic...")
-            
-            try:
-                # Validation stricte via le schéma défini en Phase 2
-                validated_feedback = TutorFeedback(**raw_result)
-                
-                # Conversion en dict standard pour le stockage JSONB
-                final_output = validated_feedback.model_dump()
-                
-                # Logs de succès avec aperçu du contenu pédagogique
-                logger.info(f"   ✅ [{analysis_id}] Feedback validé et structuré.")
-                logger.debug(f"      - Chrono : {final_output['chronology_check']}")
-                logger.debug(f"      - Guide  : {final_output['interpretation_guide'][:50]}...")
-                
-                duration = time.time() - start_time
-                logger.info(f"   🏁 [{analysis_id}] TERMINÉ en {duration:.3f}s")
-                
-                return final_output
-
-            except Exception as validation_err:
-                logger.error(f"   ❌ [{analysis_id}] ÉCHEC VALIDATION PYDANTIC : {validation_err}")
-                logger.error(f"      Données reçues : {json.dumps(raw_result)}")
-                # On ne retourne pas de feedback corrompu
-                return {}
-        
-        else:
-            # Si ce n'est pas un dict (cas d'erreur rare ou fallback texte)
-            logger.warning(f"   ⚠️ [{analysis_id}] Format de réponse inattendu (pas un dict). Type: {type(raw_result)}")
-            return {}
+        return _validate_feedback(raw_result, analysis_id, start_time)
 
     except Exception as e:
         # --- PHASE 6 : FILET DE SÉCURITÉ (Catch-All) ---
         # On capture absolument tout pour ne pas faire planter la boucle de chat
         logger.critical(f"   🔥 [{analysis_id}] CRASH CRITIQUE DANS TUTOR ANALYSIS : {str(e)}")
-        import traceback
         logger.error(traceback.format_exc())
         
         # On retourne un dictionnaire vide.
         # Le frontend saura que s'il n'y a pas de métadonnées tuteur, il n'affiche pas la bulle.
-        return {}
\ No newline at end of file
+        return {}
+
+
+# ==============================================================================
+# RÉSUMÉ GLISSANT DE LA CONVERSATION
+# ==============================================================================
+
+def _build_summary_prompt(previous_summary: Optional[str], transcript: List[Dict[str, str]]) -> str:
+    """
+    Prompt de mise à jour incrémentale : l'ancien résumé est complété par les
+    nouveaux échanges (jamais de relecture de toute la conversation).
+    """
+    lines = "\n".join(f"[{m['sender']}]: {m['content']}" for m in transcript)
+    return assemble_prompt(
+        [
+            PromptSection("consignes", f"""
+TU ES LE SECRÉTAIRE MÉDICAL D'UNE CONSULTATION SIMULÉE.
+Mets à jour le résumé de la consultation avec les nouveaux échanges ci-dessous.
+
+Règles :
+- Conserve toutes les informations déjà acquises (symptômes rapportés, antécédents, traitements, examens demandés).
+- Ajoute uniquement ce que les nouveaux échanges apprennent (questions posées par l'étudiant, réponses du patient).
+- Style télégraphique, en français, 150 mots maximum.
+- N'invente rien et ne propose aucun diagnostic.
+
+RÉSUMÉ ACTUEL :
+{previous_summary or "(Aucun : début de consultation)"}
+
+NOUVEAUX ÉCHANGES :
+""", required=True),
+            PromptSection("echanges", lines, truncate="tail"),
+            PromptSection("format", """
+
+Réponds en JSON : { "resume": "..." }
+""", required=True),
+        ],
+        budget=TASK_INPUT_BUDGETS[AiTaskType.CONVERSATION_SUMMARY]
+    )
+
+
+def generate_conversation_summary(
+    previous_summary: Optional[str],
+    transcript: List[Dict[str, str]]
+) -> Optional[str]:
+    """
+    Met à jour le résumé glissant d'une session.
+
+    :param transcript: Nouveaux messages, [{"sender": ..., "content": ...}] (ordre chronologique).
+    :return: Le nouveau résumé, ou None si le LLM n'a rien produit d'exploitable
+        (l'ancien résumé reste alors en place).
+    """
+    logger.info(f"🗒️ [AI-SUMMARY] Mise à jour du résumé ({len(transcript)} nouveaux messages)")
+    res = _call_openrouter_api(
+        _build_summary_prompt(previous_summary, transcript),
+        json_mode=True,
+        temperature=0.2,
+        task_type=AiTaskType.CONVERSATION_SUMMARY
+    )
+    summary = res.get("resume") if isinstance(res, dict) else None
+    if not isinstance(summary, str) or not summary.strip():
+        logger.warning("   ⚠️ [AI-SUMMARY] Résumé vide ou invalide : ancien résumé conservé.")
+        return None
+    return summary.strip()
@@ -0,0 +1,224 @@
+#=== Fichier: ./app/services/case_narrative_service.py ===
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import cast, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .. import models
+from ..database import SessionLocal
+from .session_context_cache import session_context_cache
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "CASE-NARRATIVE"
+# ==============================================================================
+logger = logging.getLogger("case_narrative")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [CASE-NARRATIVE] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Version du format des fragments : à incrémenter quand le rendu change, les
+# fragments des versions précédentes sont alors régénérés à la première lecture.
+FRAGMENTS_VERSION = 1
+CASE_SUMMARY_MAX_CHARS = 500  # Résumé du cas transmis au Tuteur
+
+# ==============================================================================
+# RENDU DES FRAGMENTS
+# ==============================================================================
+# Les fragments sont le texte dérivé de `presentation_clinique`, des symptômes
+# référencés et de la pathologie principale. Ils sont identiques pour toutes les
+# sessions d'un cas : on les calcule une fois et on les stocke sur le cas
+# (`ClinicalCase.fragments_narratifs`).
+
+
+def _render_symptoms(db: Session, raw_symptoms: Any) -> str:
+    symptomes_txt: List[str] = []
+
+    if isinstance(raw_symptoms, list):
+        # Chargement groupé des symptômes référencés (une seule requête)
+        symptom_ids = {item.get("symptome_id") for item in raw_symptoms if isinstance(item, dict)}
+        symptom_ids.discard(None)
+        symptoms_by_id = {
+            s.id: s for s in db.query(models.Symptom).filter(models.Symptom.id.in_(symptom_ids)).all()
+        } if symptom_ids else {}
+
+        for item in raw_symptoms:
+            if not isinstance(item, dict):
+                continue
+            s_id = item.get("symptome_id")
+            details = item.get("details", "")
+
+            symptom_name = "Symptôme inconnu"
+            symptom_obj = symptoms_by_id.get(s_id) if s_id else None
+            if symptom_obj:
+                symptom_name = symptom_obj.nom
+                # Ajout du nom local si disponible pour plus de réalisme
+                if symptom_obj.nom_local:
+                    symptom_name += f" (ou '{symptom_obj.nom_local}')"
+
+            line = f"- {symptom_name}"
+            if details:
+                line += f" : {details}"
+            symptomes_txt.append(line)
+
+    if not symptomes_txt:
+        symptomes_txt = ["Aucun symptôme spécifique listé (improviser selon l'histoire)."]
+    return "\n".join(symptomes_txt)
+
+
+def _render_antecedents(antecedents_raw: Any) -> str:
+    if isinstance(antecedents_raw, str):
+        return antecedents_raw
+    if isinstance(antecedents_raw, dict):
+        parts = []
+        for k, v in antecedents_raw.items():
+            if isinstance(v, list):
+                parts.append(f"{k}: {', '.join(str(x) for x in v)}")
+            else:
+                parts.append(f"{k}: {v}")
+        if parts:
+            return "\n".join(parts)
+    return "Aucun antécédent notable."
+
+
+def render_case_fragments(db: Session, case: models.ClinicalCase) -> Dict[str, Any]:
+    """
+    Calcule les fragments narratifs d'un cas.
+
+    :return: {"histoire", "symptomes", "antecedents", "resume_cas",
+              "verite_terrain": {"pathologie_nom", "description", "physiopathologie"},
+              "version", "generated_at"}
+    """
+    presentation = case.presentation_clinique or {}
+    histoire = presentation.get("histoire_maladie", "Pas d'histoire disponible.")
+    resume_source = presentation.get("histoire_maladie") or ""
+    pathology = case.pathologie_principale
+
+    return {
+        "version": FRAGMENTS_VERSION,
+        "histoire": histoire,
+        "symptomes": _render_symptoms(db, presentation.get("symptomes_patient", [])),
+        "antecedents": _render_antecedents(presentation.get("antecedents", {})),
+        "resume_cas": (
+            resume_source[:CASE_SUMMARY_MAX_CHARS] + "..."
+            if len(resume_source) > CASE_SUMMARY_MAX_CHARS else resume_source
+        ),
+        "verite_terrain": {
+            "pathologie_nom": pathology.nom_fr if pathology else None,
+            "description": (pathology.description if pathology else "") or "",
+            "physiopathologie": (pathology.physiopathologie if pathology else "") or "",
+        },
+        "generated_at": datetime.now().isoformat(),
+    }
+
+
+# ==============================================================================
+# LECTURE ET MATÉRIALISATION
+# ==============================================================================
+
+def _store_fragments(db: Session, case_id: int, fragments: Dict[str, Any]) -> None:
+    """
+    Écrit les fragments sans toucher à `updated_at` : ce sont des données
+    dérivées, leur écriture ne doit pas passer pour une modification du cas.
+    """
+    db.execute(
+        update(models.ClinicalCase)
+        .where(models.ClinicalCase.id == case_id)
+        .values(fragments_narratifs=fragments, updated_at=models.ClinicalCase.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_case_fragments(case: models.ClinicalCase, db: Optional[Session] = None) -> Dict[str, Any]:
+    """
+    Fragments narratifs d'un cas : simple lecture s'ils sont matérialisés.
+
+    À défaut (cas antérieur à la matérialisation, format obsolète), ils sont
+    calculés puis enregistrés dans une transaction séparée, pour ne pas
+    valider (commit) le travail en cours de l'appelant.
+
+    :param db: Session utilisée pour le calcul éventuel (par défaut, celle du cas).
+    """
+    fragments = case.fragments_narratifs
+    if isinstance(fragments, dict) and fragments.get("version") == FRAGMENTS_VERSION:
+        return fragments
+
+    write_db = SessionLocal()
+    try:
+        fragments = render_case_fragments(db or object_session(case) or write_db, case)
+    except Exception:
+        write_db.close()
+        raise
+    try:
+        _store_fragments(write_db, case.id, fragments)
+        write_db.commit()
+        logger.info(f"   🧱 Fragments narratifs matérialisés pour le cas {case.id}.")
+    except Exception as e:
+        write_db.rollback()
+        logger.warning(f"   ⚠️ Fragments du cas {case.id} non enregistrés (Non-bloquant) : {str(e)}")
+    finally:
+        write_db.close()
+    # Mémorisés sur l'instance (sans la marquer modifiée) : les lectures suivantes
+    # ne refont ni calcul ni requête, même après libération de la connexion.
+    set_committed_value(case, "fragments_narratifs", fragments)
+    return fragments
+
+
+def refresh_case_fragments(db: Session, case: models.ClinicalCase) -> Dict[str, Any]:
+    """
+    Recalcule et enregistre (commit) les fragments d'un cas, puis invalide le
+    contexte en mémoire des sessions en cours sur ce cas.
+    """
+    fragments = render_case_fragments(db, case)
+    _store_fragments(db, case.id, fragments)
+    db.commit()
+    db.refresh(case)
+    session_context_cache.invalidate_case(case.id)
+    logger.info(f"   🧱 Fragments narratifs régénérés pour le cas {case.id}.")
+    return fragments
+
+
+def _refresh_cases(db: Session, cases: Iterable[models.ClinicalCase], reason: str) -> int:
+    count = 0
+    for case in cases:
+        try:
+            refresh_case_fragments(db, case)
+            count += 1
+        except Exception as e:
+            db.rollback()
+            logger.error(f"   ❌ Régénération des fragments du cas {case.id} en échec ({reason}) : {str(e)}")
+    if count:
+        logger.info(f"   🧱 {count} cas régénéré(s) ({reason}).")
+    return count
+
+
+# ==============================================================================
+# HOOKS (appelés par les services CRUD après modification)
+# ==============================================================================
+
+def on_symptom_changed(db: Session, symptom_id: int) -> int:
+    """Un symptôme a été renommé/supprimé : régénère les cas qui le référencent."""
+    # Filtre côté base : containment JSONB (`@>`) sur la liste des symptômes du cas
+    # (la colonne est en JSON, d'où le cast)
+    cases = db.query(models.ClinicalCase).filter(
+        cast(models.ClinicalCase.presentation_clinique, JSONB).contains(
+            {"symptomes_patient": [{"symptome_id": symptom_id}]}
+        )
+    ).all()
+    return _refresh_cases(db, cases, f"symptôme {symptom_id}")
+
+
+def on_disease_changed(db: Session, disease_id: int) -> int:
+    """La pathologie principale de certains cas a changé : régénère ces cas."""
+    cases = db.query(models.ClinicalCase).filter(
+        models.ClinicalCase.pathologie_principale_id == disease_id
+    ).all()
+    return _refresh_cases(db, cases, f"pathologie {disease_id}")
@@ -1,20 +1,30 @@
 #=== Fichier: ./app/services/chat_service.py ===
 
+import json
 import logging
 import time
 import uuid
-import json
-from typing import List, Optional, Dict, Any
+from concurrent.futures import Future
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models, schemas
+from ..database import AsyncSessionLocal, SessionLocal, release_connection
 # Services dépendants
 from .patient_actor_service import patient_actor_service
 from . import ai_generation_service  # <-- Le service Intelligence qu'on vient de modifier
+from .session_events import session_event_bus
+from .llm_work_executor import LlmWorkSaturatedError, tutor_analysis_executor
+from .conversation_summary_service import conversation_summary_service, get_summary
+from .session_context_cache import session_context_cache
+from .tutor_gating_service import tutor_gate, merge_exchanges, record_tutor_decision
+from . import case_narrative_service
 
 # ==============================================================================
 # CONFIGURATION DU LOGGER "CHAT-ORCHESTRATOR"
@@ -45,34 +55,26 @@ if not logger.handlers:
 # ==============================================================================
 AUTHORIZED_SENDERS_TRIGGER = ["student", "apprenant", "learner", "user"]
 
-def create_chat_message(
-    db: Session, 
-    session_id: UUID, 
-    message: schemas.ChatMessageCreate
-) -> models.ChatMessage:
-    """
-    Orchestre le flux de conversation complet :
-    1. Sauvegarde du message de l'Étudiant.
-    2. Génération de la réponse du Patient (Patient Actor).
-    3. Génération du feedback pédagogique (Tuteur AI).
-    4. Sauvegarde de la réponse enrichie.
-    
-    Cette fonction est transactionnelle et résiliente : un échec du Tuteur
-    ne doit pas empêcher la réponse du Patient.
-    """
-    # ID de traçabilité unique pour toute cette transaction
-    trace_id = f"MSG-{str(uuid.uuid4())[:8].upper()}"
-    start_total = time.time()
-    
-    # Injection du trace_id pour les logs
-    log_extra = {'trace_id': trace_id}
+# Événement poussé sur le canal de la session (GET /chat/sessions/{id}/events).
+# Le job du Tuteur peut tourner dans un autre worker web que le client SSE :
+# sa fin est annoncée par NOTIFY et relayée par chaque processus (cf. session_events).
+EVENT_TUTOR_FEEDBACK = "tutor_feedback"
+TUTOR_NOTIFY_CHANNEL = "tutor_feedback_ready"
 
-    logger.info(f"📨 Nouvelle requête de message pour Session {session_id}", extra=log_extra)
-    logger.debug(f"   Payload reçu : {json.dumps(message.model_dump(), ensure_ascii=False)}", extra=log_extra)
+# Analyse du Tuteur en arrière-plan : elle ne retarde plus la réponse du patient.
+# Elle tourne sur `tutor_analysis_executor` (cf. llm_work_executor), dimensionné
+# par TUTOR_ANALYSIS_WORKERS / TUTOR_ANALYSIS_MAX_QUEUED.
 
-    # ==========================================================================
-    # ÉTAPE 1 : VALIDATION ET CHARGEMENT DU CONTEXTE
-    # ==========================================================================
+def _load_session_and_case(
+    db: Session,
+    session_id: UUID,
+    log_extra: Dict[str, str]
+) -> Tuple[models.SimulationSession, models.ClinicalCase]:
+    """
+    Charge la session et son cas clinique.
+
+    :raises ValueError: si la session ou le cas clinique est introuvable.
+    """
     try:
         logger.debug("   🔍 Étape 1: Vérification session & chargement cas clinique...", extra=log_extra)
         
@@ -95,14 +97,32 @@ def create_chat_message(
         if db_session.statut in ["completed", "abandoned"]:
             logger.warning(f"   ⚠️ Écriture dans une session terminée ({db_session.statut})", extra=log_extra)
 
+        return db_session, clinical_case
+
     except SQLAlchemyError as e:
         logger.critical(f"   🔥 Erreur DB critique lors de l'init : {str(e)}", extra=log_extra)
         raise e
 
-    # ==========================================================================
-    # ÉTAPE 2 : PERSISTANCE DU MESSAGE APPRENANT
-    # ==========================================================================
-    learner_msg_obj = None
+
+def _ensure_session(db: Session, session_id: UUID, log_extra: Dict[str, str]) -> None:
+    """
+    Contrôle d'existence de la session avant un tour de chat. Sans requête si
+    le contexte de la session est déjà en cache (session vérifiée à sa construction).
+
+    :raises ValueError: si la session ou son cas clinique est introuvable.
+    """
+    if session_context_cache.get(session_id) is not None:
+        return
+    _load_session_and_case(db, session_id, log_extra)
+
+
+def _persist_learner_message(
+    db: Session,
+    session_id: UUID,
+    message: schemas.ChatMessageCreate,
+    log_extra: Dict[str, str]
+) -> models.ChatMessage:
+    """Sauvegarde le message de l'apprenant (commit immédiat)."""
     try:
         logger.info("   💾 Étape 2: Sauvegarde message APPRENANT...", extra=log_extra)
         
@@ -119,129 +139,266 @@ def create_chat_message(
         db.refresh(learner_msg_obj)
         
         logger.info(f"   ✅ Message Apprenant sauvegardé (ID: {learner_msg_obj.id})", extra=log_extra)
+        return learner_msg_obj
 
     except Exception as e:
         db.rollback()
         logger.error(f"   ❌ Échec sauvegarde message apprenant : {str(e)}", extra=log_extra)
         raise e
 
-    # ==========================================================================
-    # ÉTAPE 3 : DÉCLENCHEMENT DE L'INTELLIGENCE ARTIFICIELLE
-    # ==========================================================================
-    sender_normalized = message.sender.lower().strip()
+
+def _compute_tutor_feedback(
+    db_session: models.SimulationSession,
+    clinical_case: models.ClinicalCase,
+    student_msg: str,
+    patient_msg: str,
+    history_count: int,
+    log_extra: Dict[str, str]
+) -> Tuple[Dict[str, Any], float]:
+    """
+    Analyse pédagogique de la paire (Question Étudiant / Réponse Patient).
+    Non-bloquant : renvoie un feedback vide en cas d'erreur.
+
+    :return: (feedback, durée en secondes)
+    """
+    tutor_feedback_data = {}
+    tutor_duration = 0.0
     
-    # On ne répond que si c'est un humain qui parle
-    if sender_normalized in AUTHORIZED_SENDERS_TRIGGER:
-        logger.info(f"   🤖 Déclenchement Pipeline IA (Sender='{message.sender}')...", extra=log_extra)
+    try:
+        tutor_start = time.time()
+        logger.debug("   [IA-2] Appel au AiGenerationService (Module Tuteur)...", extra=log_extra)
         
-        # --- 3.A : GÉNÉRATION RÉPONSE PATIENT (ACTOR) ---
-        patient_response_text = "..."
-        actor_duration = 0.0
+        tutor_feedback_data = ai_generation_service.generate_pedagogical_feedback(
+            case=clinical_case,
+            student_msg=student_msg,
+            patient_msg=patient_msg,
+            chat_history_count=history_count,
+            conversation_summary=get_summary(db_session)[0]
+        )
         
-        try:
-            actor_start = time.time()
-            logger.debug("   [IA-1] Appel au PatientActorService...", extra=log_extra)
-            
-            patient_response_text = patient_actor_service.generate_response(
-                db=db,
-                session_id=session_id,
-                student_message=message.content
-            )
-            
-            actor_duration = time.time() - actor_start
-            logger.info(f"   ✅ [IA-1] Patient a répondu en {actor_duration:.2f}s", extra=log_extra)
-            logger.debug(f"      Contenu : '{patient_response_text[:50]}...'", extra=log_extra)
-
-        except Exception as e:
-            logger.critical(f"   🔥 [IA-1] CRASH PATIENT ACTOR : {str(e)}", extra=log_extra)
-            import traceback
-            logger.error(traceback.format_exc())
-            patient_response_text = "(Le patient semble confus et ne répond pas...)"
+        tutor_duration = time.time() - tutor_start
+        
+        if tutor_feedback_data:
+            logger.info(f"   ✅ [IA-2] Tuteur a analysé en {tutor_duration:.2f}s", extra=log_extra)
+        else:
+            logger.warning(f"   ⚠️ [IA-2] Tuteur silencieux (pas de feedback généré)", extra=log_extra)
 
-        # --- 3.B : ANALYSE PÉDAGOGIQUE (TUTEUR) ---
-        # C'est ici que la magie opère. On analyse la paire (Question Étudiant / Réponse Patient)
+    except Exception as e:
+        # IMPORTANT : Le crash du tuteur ne doit PAS bloquer la réponse du patient
+        logger.error(f"   ❌ [IA-2] Erreur Tuteur (Non-bloquant) : {str(e)}", extra=log_extra)
         tutor_feedback_data = {}
+
+    return tutor_feedback_data or {}, tutor_duration
+
+
+def _build_patient_metadata(learner_msg_id: int, actor_duration: float) -> Dict[str, Any]:
+    """
+    Construction des métadonnées de la réponse du patient, au moment de sa sauvegarde.
+    Le feedback du Tuteur est ajouté plus tard par `_run_tutor_analysis_job`.
+    """
+    return {
+        "generated_by": "PatientActorService",
+        "reply_to": learner_msg_id,
+        "latencies": {
+            "patient_actor": f"{actor_duration:.2f}s"
+        },
+        # C'est ici qu'on injecte le résultat du Tuteur !
+        # Le frontend cherchera cette clé pour afficher la bulle.
+        "tutor_feedback": {},
+        "tutor_status": "pending"
+    }
+
+
+def _persist_patient_message(
+    db: Session,
+    session_id: UUID,
+    content: str,
+    metadata: Dict[str, Any],
+    log_extra: Dict[str, str]
+) -> models.ChatMessage:
+    """Sauvegarde la réponse du patient (commit immédiat)."""
+    patient_msg_obj = models.ChatMessage(
+        session_id=session_id,
+        sender="Patient",
+        content=content,
+        message_metadata=metadata,
+        timestamp=datetime.now()
+    )
+    
+    db.add(patient_msg_obj)
+    db.commit()
+    db.refresh(patient_msg_obj)
+    
+    logger.info(f"   ✅ Réponse Patient sauvegardée (ID: {patient_msg_obj.id})", extra=log_extra)
+    return patient_msg_obj
+
+
+def _run_tutor_analysis_job(
+    session_id: UUID,
+    patient_msg_id: int,
+    student_msg: str,
+    patient_msg: str,
+    trace_id: str
+) -> Dict[str, Any]:
+    """
+    Job d'arrière-plan : décision du déclencheur (analyser, différer ou ignorer
+    l'échange), analyse pédagogique le cas échéant, rattachement du feedback
+    aux métadonnées du message patient, puis notification du client
+    (événement `tutor_feedback`, relayé via NOTIFY à tous les processus).
+
+    Chaque décision est tracée dans `tutor_decisions` (audit du déclencheur).
+    Le job ouvre sa propre session BDD (il survit à la requête HTTP).
+    """
+    log_extra = {'trace_id': trace_id}
+    db = SessionLocal()
+    tutor_feedback_data: Dict[str, Any] = {}
+    try:
+        db_session, clinical_case = _load_session_and_case(db, session_id, log_extra)
+
+        # On a besoin de l'historique pour savoir à quelle étape on est (Début ? Fin ?)
+        # Optimisation : On compte juste, pas besoin de charger tout le texte
+        history_count = db.query(models.ChatMessage).filter(
+            models.ChatMessage.session_id == session_id
+        ).count()
+
+        # Déclencheur local : l'appel LLM n'a lieu que si l'échange le mérite
+        decision = tutor_gate.evaluate(
+            session_id, student_msg, patient_msg, history_count,
+            case_narrative_service.get_case_fragments(clinical_case, db)
+        )
         tutor_duration = 0.0
-        
-        try:
-            tutor_start = time.time()
-            logger.debug("   [IA-2] Appel au AiGenerationService (Module Tuteur)...", extra=log_extra)
-            
-            # On a besoin de l'historique pour savoir à quelle étape on est (Début ? Fin ?)
-            # Optimisation : On compte juste, pas besoin de charger tout le texte
-            history_count = db.query(models.ChatMessage).filter(
-                models.ChatMessage.session_id == session_id
-            ).count()
-            
-            # Appel à la fonction qu'on a créée en Phase 3
-            tutor_feedback_data = ai_generation_service.generate_pedagogical_feedback(
-                case=clinical_case,
-                student_msg=message.content,
-                patient_msg=patient_response_text,
-                chat_history_count=history_count
+        if decision.should_analyze:
+            analysed_student_msg, analysed_patient_msg = merge_exchanges(decision.exchanges)
+            # Aucune connexion BDD gardée pendant l'analyse LLM
+            release_connection(db)
+            tutor_feedback_data, tutor_duration = _compute_tutor_feedback(
+                db_session, clinical_case, analysed_student_msg, analysed_patient_msg, history_count, log_extra
             )
-            
-            tutor_duration = time.time() - tutor_start
-            
-            if tutor_feedback_data:
-                logger.info(f"   ✅ [IA-2] Tuteur a analysé en {tutor_duration:.2f}s", extra=log_extra)
-            else:
-                logger.warning(f"   ⚠️ [IA-2] Tuteur silencieux (pas de feedback généré)", extra=log_extra)
+        else:
+            logger.info(f"   🚦 [IA-2] Analyse Tuteur {decision.action} ({decision.reason})", extra=log_extra)
 
-        except Exception as e:
-            # IMPORTANT : Le crash du tuteur ne doit PAS bloquer la réponse du patient
-            logger.error(f"   ❌ [IA-2] Erreur Tuteur (Non-bloquant) : {str(e)}", extra=log_extra)
-            tutor_feedback_data = {}
+        record_tutor_decision(db, session_id, decision, patient_msg_id, tutor_feedback_data)
 
-        # ======================================================================
-        # ÉTAPE 4 : ASSEMBLAGE ET PERSISTANCE FINALE
-        # ======================================================================
-        try:
-            logger.info("   💾 Étape 4: Sauvegarde réponse PATIENT enrichie...", extra=log_extra)
-            
-            # Construction des métadonnées enrichies
-            final_metadata = {
-                "generated_by": "PatientActorService",
-                "reply_to": learner_msg_obj.id,
-                "latencies": {
-                    "patient_actor": f"{actor_duration:.2f}s",
-                    "tutor_analysis": f"{tutor_duration:.2f}s"
-                },
-                # C'est ici qu'on injecte le résultat du Tuteur !
-                # Le frontend cherchera cette clé pour afficher la bulle.
-                "tutor_feedback": tutor_feedback_data 
-            }
-            
-            patient_msg_obj = models.ChatMessage(
-                session_id=session_id,
-                sender="Patient",
-                content=patient_response_text,
-                message_metadata=final_metadata,
-                timestamp=datetime.now()
-            )
-            
-            db.add(patient_msg_obj)
+        patient_msg_obj = db.query(models.ChatMessage).filter(
+            models.ChatMessage.id == patient_msg_id
+        ).first()
+        if not patient_msg_obj:
             db.commit()
-            db.refresh(patient_msg_obj)
-            
-            logger.info(f"   ✅ Réponse Patient sauvegardée (ID: {patient_msg_obj.id})", extra=log_extra)
-            
-            # Log final de performance
-            total_duration = time.time() - start_total
-            logger.info(f"🏁 [REQ-FIN] Transaction terminée en {total_duration:.2f}s", extra=log_extra)
-            logger.info(f"   (Patient: {actor_duration:.2f}s + Tuteur: {tutor_duration:.2f}s + Overhead: {total_duration - actor_duration - tutor_duration:.2f}s)", extra=log_extra)
+            logger.error(f"   ❌ Message patient {patient_msg_id} introuvable : feedback non rattaché.", extra=log_extra)
+            return tutor_feedback_data
 
-        except Exception as e:
-            db.rollback()
-            logger.critical(f"   🔥 Erreur sauvegarde finale : {str(e)}", extra=log_extra)
-            # Ici on ne relève pas l'erreur si le message étudiant est passé, 
-            # mais idéalement il faudrait gérer une file de retry.
-    
-    else:
-        logger.info(f"   zzz Pas de réponse IA requise (Sender '{message.sender}' ignoré)", extra=log_extra)
+        # Réassignation d'un nouveau dict : SQLAlchemy ne détecte pas les mutations en place du JSON
+        metadata = dict(patient_msg_obj.message_metadata or {})
+        metadata["latencies"] = dict(metadata.get("latencies") or {}, tutor_analysis=f"{tutor_duration:.2f}s")
+        metadata["tutor_feedback"] = tutor_feedback_data
+        if decision.should_analyze:
+            metadata["tutor_status"] = "done" if tutor_feedback_data else "empty"
+        else:
+            metadata["tutor_status"] = "skipped"
+        metadata["tutor_decision"] = decision.action
+        patient_msg_obj.message_metadata = metadata
+        db.commit()
+
+        logger.info(f"   💾 [IA-2] Feedback Tuteur rattaché au message {patient_msg_id}", extra=log_extra)
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"   ❌ [IA-2] Job Tuteur en échec (Non-bloquant) : {str(e)}", extra=log_extra)
+    finally:
+        # Après le commit du feedback : le relais le relit dans les métadonnées
+        _notify_tutor_feedback(db, session_id, patient_msg_id, log_extra)
+        db.close()
+    return tutor_feedback_data
 
-    # On retourne le message initial (REST standard), le client fera un GET pour voir la réponse
-    return learner_msg_obj
+
+def schedule_tutor_analysis(
+    session_id: UUID,
+    patient_msg_id: int,
+    student_msg: str,
+    patient_msg: str,
+    trace_id: str
+) -> Future:
+    """
+    Soumet l'analyse du Tuteur au pool d'arrière-plan (retour immédiat).
+    Pool saturé : l'analyse de ce message est abandonnée (Future déjà résolu à None).
+    """
+    logger.debug(f"   [IA-2] Analyse Tuteur planifiée pour le message {patient_msg_id}", extra={'trace_id': trace_id})
+    try:
+        return tutor_analysis_executor.submit(
+            "tutor_analysis", _run_tutor_analysis_job, session_id, patient_msg_id, student_msg, patient_msg, trace_id
+        )
+    except LlmWorkSaturatedError:
+        logger.warning(f"   ⚠️ [IA-2] Pool du Tuteur saturé : analyse du message {patient_msg_id} abandonnée.", extra={'trace_id': trace_id})
+        db = SessionLocal()
+        try:
+            _notify_tutor_feedback(db, session_id, patient_msg_id, {'trace_id': trace_id}, abandoned=True)
+        finally:
+            db.close()
+        skipped: Future = Future()
+        skipped.set_result(None)
+        return skipped
+
+
+def _notify_tutor_feedback(
+    db: Session,
+    session_id: UUID,
+    patient_msg_id: int,
+    log_extra: Dict[str, str],
+    abandoned: bool = False
+) -> None:
+    """
+    Annonce la fin (ou l'abandon) de l'analyse d'un message patient, dans une
+    transaction courte : la notification n'est délivrée qu'au commit. Le
+    feedback n'y figure pas (charge utile NOTIFY limitée à 8 Ko).
+    """
+    payload = json.dumps({"session_id": str(session_id), "message_id": patient_msg_id, "abandoned": abandoned})
+    try:
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": TUTOR_NOTIFY_CHANNEL, "payload": payload})
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"   ❌ [IA-2] Notification du feedback impossible : {e}", extra=log_extra)
+
+
+def relay_tutor_feedback(payload: str) -> bool:
+    """
+    Relais de `TUTOR_NOTIFY_CHANNEL` (cf. session_events.SessionEventRelay) :
+    publie `tutor_feedback` ({"message_id", "tutor_feedback"}) aux abonnés
+    locaux de la session. `tutor_feedback` vaut None si l'analyse a été abandonnée.
+
+    :return: True si l'événement a été publié.
+    """
+    try:
+        data = json.loads(payload)
+        session_id, message_id = UUID(data["session_id"]), int(data["message_id"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"   ⚠️ Notification de feedback illisible ignorée : {payload!r}")
+        return False
+    if not session_event_bus.has_subscribers(session_id):
+        return False
+
+    tutor_feedback_data = None
+    if not data.get("abandoned"):
+        db = SessionLocal()
+        try:
+            row = db.query(models.ChatMessage.message_metadata).filter(
+                models.ChatMessage.id == message_id,
+                models.ChatMessage.session_id == session_id
+            ).first()
+        finally:
+            db.close()
+        tutor_feedback_data = ((row.message_metadata if row else None) or {}).get("tutor_feedback") or {}
+
+    session_event_bus.publish(session_id, EVENT_TUTOR_FEEDBACK, {
+        "message_id": message_id,
+        "tutor_feedback": tutor_feedback_data
+    })
+    return True
+
+
+def is_ai_trigger(sender: str) -> bool:
+    """Indique si un message de cet émetteur doit déclencher le patient virtuel."""
+    return sender.lower().strip() in AUTHORIZED_SENDERS_TRIGGER
 
 
 def get_messages_by_session(db: Session, session_id: UUID) -> List[models.ChatMessage]:
@@ -271,4 +428,180 @@ def get_messages_by_session(db: Session, session_id: UUID) -> List[models.ChatMe
         
     except SQLAlchemyError as e:
         logger.error(f"   ❌ Erreur DB lecture historique : {str(e)}", extra=log_extra)
-        raise e
\ No newline at end of file
+        raise e
+
+
+# ==============================================================================
+# ORCHESTRATION DES TOURS DE CHAT (routes `async def`, moteur asyncpg)
+# ==============================================================================
+# Les étapes BDD (courtes) s'exécutent via `AsyncSession.run_sync` sur les
+# helpers synchrones ci-dessus ; l'attente du patient virtuel est un `await`
+# (aucune connexion empruntée pendant). Le Tuteur et le résumé restent des jobs
+# d'arrière-plan (pools de threads, sessions synchrones).
+
+def _ensure_and_persist_learner_message(
+    db: Session,
+    session_id: UUID,
+    message: schemas.ChatMessageCreate,
+    log_extra: Dict[str, str]
+) -> models.ChatMessage:
+    """Étapes 1 et 2 (validation de la session, message apprenant) en une transaction courte."""
+    _ensure_session(db, session_id, log_extra)
+    return _persist_learner_message(db, session_id, message, log_extra)
+
+
+async def create_chat_message_async(
+    db: AsyncSession,
+    session_id: UUID,
+    message: schemas.ChatMessageCreate
+) -> models.ChatMessage:
+    """
+    Orchestre le flux de conversation complet :
+    1. Sauvegarde du message de l'Étudiant.
+    2. Génération de la réponse du Patient (Patient Actor).
+    3. Sauvegarde immédiate de la réponse du Patient.
+    4. Planification du feedback pédagogique (Tuteur AI) en arrière-plan :
+       il est rattaché plus tard aux métadonnées du message patient, et le
+       client est notifié via le bus d'événements de la session.
+
+    Un échec du Patient ou du Tuteur n'empêche pas le retour du message de
+    l'apprenant (le client fera un GET pour voir la réponse).
+    """
+    trace_id = f"MSG-{str(uuid.uuid4())[:8].upper()}"
+    start_total = time.time()
+    log_extra = {'trace_id': trace_id}
+
+    logger.info(f"📨 Nouvelle requête de message (async) pour Session {session_id}", extra=log_extra)
+
+    # ÉTAPES 1 & 2 : validation et persistance du message apprenant
+    learner_msg_obj = await db.run_sync(
+        lambda sync_db: _ensure_and_persist_learner_message(sync_db, session_id, message, log_extra)
+    )
+
+    if not is_ai_trigger(message.sender):
+        logger.info(f"   zzz Pas de réponse IA requise (Sender '{message.sender}' ignoré)", extra=log_extra)
+        return learner_msg_obj
+
+    # ÉTAPE 3 : réponse du patient (attente LLM sans connexion BDD empruntée)
+    actor_start = time.time()
+    try:
+        patient_response_text = await patient_actor_service.generate_response_async(db, session_id, message.content)
+    except Exception as e:
+        logger.critical(f"   🔥 [IA-1] CRASH PATIENT ACTOR : {str(e)}", extra=log_extra)
+        patient_response_text = "(Le patient semble confus et ne répond pas...)"
+    actor_duration = time.time() - actor_start
+    logger.info(f"   ✅ [IA-1] Patient a répondu en {actor_duration:.2f}s", extra=log_extra)
+
+    # ÉTAPE 4 : persistance de la réponse, Tuteur et résumé en arrière-plan
+    try:
+        metadata = _build_patient_metadata(learner_msg_obj.id, actor_duration)
+        patient_msg_obj = await db.run_sync(
+            lambda sync_db: _persist_patient_message(sync_db, session_id, patient_response_text, metadata, log_extra)
+        )
+        schedule_tutor_analysis(session_id, patient_msg_obj.id, message.content, patient_response_text, trace_id)
+        conversation_summary_service.schedule_refresh(session_id, trace_id)
+        logger.info(f"🏁 [REQ-FIN] Transaction terminée en {time.time() - start_total:.2f}s", extra=log_extra)
+    except Exception as e:
+        await db.rollback()
+        logger.critical(f"   🔥 Erreur sauvegarde finale : {str(e)}", extra=log_extra)
+
+    return learner_msg_obj
+
+
+async def create_learner_message_async(
+    db: AsyncSession,
+    session_id: UUID,
+    message: schemas.ChatMessageCreate
+) -> models.ChatMessage:
+    """
+    Étapes 1 et 2 du flux de conversation, sans déclencher l'IA.
+    Utilisé par l'endpoint streamé, qui enchaîne ensuite sur `stream_patient_reply_async`.
+
+    :raises ValueError: si la session ou son cas clinique est introuvable.
+    """
+    trace_id = f"MSG-{str(uuid.uuid4())[:8].upper()}"
+    log_extra = {'trace_id': trace_id}
+
+    logger.info(f"📨 Nouvelle requête de message (stream, async) pour Session {session_id}", extra=log_extra)
+    return await db.run_sync(
+        lambda sync_db: _ensure_and_persist_learner_message(sync_db, session_id, message, log_extra)
+    )
+
+
+async def stream_patient_reply_async(
+    session_id: UUID,
+    learner_msg_id: int,
+    student_msg: str
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Génère la réponse du patient en continu, sous forme d'événements
+    `(nom, données)` destinés à être sérialisés en SSE :
+
+    - `token`            : fragment de la réponse du patient ({"delta": ...}).
+    - `patient_message`  : réponse complète, nettoyée et déjà sauvegardée.
+    - `done`             : fin du flux, émis aussitôt la réponse sauvegardée.
+
+    L'analyse du Tuteur est planifiée en arrière-plan : son résultat est publié
+    (`tutor_feedback`) sur le canal d'événements de la session (GET /events).
+
+    Ouvre sa propre `AsyncSession` : le flux survit à la session de la requête.
+    """
+    trace_id = f"SSE-{str(uuid.uuid4())[:8].upper()}"
+    log_extra = {'trace_id': trace_id}
+    start_total = time.time()
+
+    async with AsyncSessionLocal() as db:
+        try:
+            await db.run_sync(lambda sync_db: _ensure_session(sync_db, session_id, log_extra))
+
+            # --- 1 : RÉPONSE PATIENT (STREAM) ---
+            actor_start = time.time()
+            chunks: List[str] = []
+            try:
+                async for delta in patient_actor_service.stream_response_async(db, session_id, student_msg):
+                    chunks.append(delta)
+                    yield "token", {"delta": delta}
+                patient_response_text = patient_actor_service.finalize_response("".join(chunks))
+            except Exception as e:
+                logger.critical(f"   🔥 [IA-1] CRASH PATIENT ACTOR (stream) : {str(e)}", extra=log_extra)
+                patient_response_text = "(Le patient semble confus et ne répond pas...)"
+            actor_duration = time.time() - actor_start
+            logger.info(f"   ✅ [IA-1] Patient a répondu (stream) en {actor_duration:.2f}s", extra=log_extra)
+
+            # --- 2 : PERSISTANCE IMMÉDIATE ---
+            metadata = _build_patient_metadata(learner_msg_id, actor_duration)
+            patient_msg_obj = await db.run_sync(
+                lambda sync_db: _persist_patient_message(sync_db, session_id, patient_response_text, metadata, log_extra)
+            )
+            patient_msg_id = patient_msg_obj.id
+            yield "patient_message", schemas.ChatMessage.model_validate(patient_msg_obj).model_dump(mode="json")
+        except Exception as e:
+            await db.rollback()
+            logger.critical(f"   🔥 Erreur pendant le stream : {str(e)}", extra=log_extra)
+            yield "error", {"detail": str(e)}
+            return
+
+    # --- 3 : ANALYSE PÉDAGOGIQUE (TUTEUR) --- (session BDD déjà rendue)
+    # Le flux ne l'attend pas : le feedback arrive sur le canal d'événements de la session.
+    schedule_tutor_analysis(session_id, patient_msg_id, student_msg, patient_response_text, trace_id)
+    conversation_summary_service.schedule_refresh(session_id, trace_id)
+
+    logger.info(f"🏁 [REQ-FIN] Stream terminé en {time.time() - start_total:.2f}s", extra=log_extra)
+    yield "done", {"message_id": patient_msg_id}
+
+
+async def get_messages_by_session_async(db: AsyncSession, session_id: UUID) -> Optional[List[models.ChatMessage]]:
+    """
+    Historique complet d'une session (variante asynchrone).
+
+    :return: None si la session n'existe pas.
+    """
+    def _read(sync_db: Session) -> Optional[List[models.ChatMessage]]:
+        exists = sync_db.query(models.SimulationSession.id).filter(
+            models.SimulationSession.id == session_id
+        ).first()
+        if not exists:
+            return None
+        return get_messages_by_session(sync_db, session_id)
+
+    return await db.run_sync(_read)
@@ -4,12 +4,16 @@ from typing import List, Optional
 import random
 
 from .. import models, schemas
-from . import disease_service, media_service
+from . import disease_service, media_service, exam_cache_service, case_narrative_service
+from .session_context_cache import session_context_cache
 
 # Logger spécifique
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Champs du cas dont dépendent les résultats d'examens (cf. exam_cache_service)
+EXAM_CACHE_DEPENDENCIES = ("donnees_paracliniques", "pathologie_principale_id")
+
 def get_case_by_id(db: Session, case_id: int) -> Optional[models.ClinicalCase]:
     return db.query(models.ClinicalCase).filter(models.ClinicalCase.id == case_id).first()
 
@@ -109,15 +113,28 @@ def create_case(db: Session, case: schemas.ClinicalCaseCreate) -> models.Clinica
     db.add(db_case)
     db.commit()
     db.refresh(db_case)
+    case_narrative_service.refresh_case_fragments(db, db_case)
     return db_case
 
 def update_case(db: Session, case_id: int, case_update: schemas.ClinicalCaseUpdate) -> Optional[models.ClinicalCase]:
     db_case = get_case_by_id(db, case_id)
     if not db_case: return None
-    for key, value in case_update.model_dump(exclude_unset=True).items():
+    update_data = case_update.model_dump(exclude_unset=True)
+
+    # Les résultats d'examens mis en cache dépendent de ces champs
+    if any(
+        key in update_data and update_data[key] != getattr(db_case, key)
+        for key in EXAM_CACHE_DEPENDENCIES
+    ):
+        exam_cache_service.invalidate_case(db, case_id)
+
+    for key, value in update_data.items():
         setattr(db_case, key, value)
     db.commit()
     db.refresh(db_case)
+    # Fragments narratifs régénérés ; persona et vérité clinique des sessions en
+    # cours reconstruits (invalidation du contexte en mémoire)
+    case_narrative_service.refresh_case_fragments(db, db_case)
     return db_case
 
 def delete_case(db: Session, case_id: int) -> Optional[models.ClinicalCase]:
@@ -125,4 +142,5 @@ def delete_case(db: Session, case_id: int) -> Optional[models.ClinicalCase]:
     if not db_case: return None
     db.delete(db_case)
     db.commit()
+    session_context_cache.invalidate_case(case_id)
     return db_case
\ No newline at end of file
@@ -0,0 +1,190 @@
+#=== Fichier: ./app/services/conversation_summary_service.py ===
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal, release_connection
+from . import ai_generation_service
+from .session_context_cache import session_context_cache
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "CONV-SUMMARY"
+# ==============================================================================
+logger = logging.getLogger("conversation_summary")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [CONV-SUMMARY] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# ==============================================================================
+# CONSTANTES
+# ==============================================================================
+# Clé du résumé dans `SimulationSession.context_state` :
+# {"text": str, "covered_message_id": int, "covered_messages": int, "updated_at": iso}
+CONTEXT_STATE_KEY = "conversation_summary"
+
+# Messages récents toujours envoyés tels quels (non résumés) aux prompts.
+RECENT_WINDOW_MESSAGES = 6
+# Le résumé est rafraîchi dès que N messages sont sortis de la fenêtre récente
+# (N = 3 tours étudiant/patient) : le prompt reste de taille quasi constante.
+SUMMARY_REFRESH_EVERY_MESSAGES = 6
+
+SUMMARY_WORKERS = 2
+_summary_executor = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS, thread_name_prefix="conv-summary")
+
+
+def get_summary(session_obj: models.SimulationSession) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Résumé courant d'une session.
+
+    :return: (texte du résumé, id du dernier message résumé), ou (None, None)
+        si la conversation n'a pas encore été résumée.
+    """
+    return _summary_from_state(session_obj.context_state)
+
+
+def read_summary(db: Session, session_id: UUID) -> Tuple[Optional[str], Optional[int]]:
+    """Comme `get_summary`, relu en base sans charger la session."""
+    context_state = db.query(models.SimulationSession.context_state).filter(
+        models.SimulationSession.id == session_id
+    ).scalar()
+    return _summary_from_state(context_state)
+
+
+def summary_covered_id_column():
+    """
+    `covered_message_id` du résumé en expression SQL : permet de vérifier la
+    fraîcheur d'un résumé mis en cache sans relire son texte.
+    """
+    return models.SimulationSession.context_state[CONTEXT_STATE_KEY]["covered_message_id"].as_integer()
+
+
+def _summary_from_state(context_state: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[int]]:
+    state = (context_state or {}).get(CONTEXT_STATE_KEY) or {}
+    return state.get("text"), state.get("covered_message_id")
+
+
+class ConversationSummaryService:
+    """
+    Résumé glissant des sessions de simulation.
+
+    Tous les `SUMMARY_REFRESH_EVERY_MESSAGES` messages, les échanges sortis de la
+    fenêtre récente sont intégrés au résumé (mise à jour incrémentale, en
+    arrière-plan). Le patient et le tuteur reçoivent ensuite « résumé + fenêtre
+    récente » au lieu de l'historique brut.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Pattern Singleton : un seul registre de rafraîchissements en cours."""
+        if cls._instance is None:
+            cls._instance = super(ConversationSummaryService, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def schedule_refresh(self, session_id: UUID, trace_id: str = "SYSTEM") -> Optional[Future]:
+        """
+        Planifie la mise à jour du résumé (retour immédiat). Sans effet si une
+        mise à jour est déjà en cours pour cette session.
+        """
+        key = str(session_id)
+        with self._lock:
+            if key in self._in_flight:
+                return None
+            future = _summary_executor.submit(self._refresh_job, session_id, trace_id)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._release(key))
+        return future
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def _refresh_job(self, session_id: UUID, trace_id: str) -> bool:
+        """
+        Job d'arrière-plan (sa propre session BDD). Le contrôle du seuil est fait
+        ici pour que l'orchestrateur du chat n'ajoute aucune requête au tour.
+
+        :return: True si le résumé a été mis à jour.
+        """
+        db = SessionLocal()
+        try:
+            return self._refresh(db, session_id, trace_id)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"   ❌ [{trace_id}] Rafraîchissement du résumé en échec (Non-bloquant) : {str(e)}")
+            return False
+        finally:
+            db.close()
+
+    def _refresh(self, db: Session, session_id: UUID, trace_id: str) -> bool:
+        session_obj = db.query(models.SimulationSession).filter(
+            models.SimulationSession.id == session_id
+        ).first()
+        if not session_obj:
+            return False
+
+        previous_summary, covered_id = get_summary(session_obj)
+        query = db.query(models.ChatMessage).filter(models.ChatMessage.session_id == session_id)
+        if covered_id is not None:
+            query = query.filter(models.ChatMessage.id > covered_id)
+        pending = query.order_by(models.ChatMessage.id.asc()).all()
+
+        to_fold = pending[:max(0, len(pending) - RECENT_WINDOW_MESSAGES)]
+        if len(to_fold) < SUMMARY_REFRESH_EVERY_MESSAGES:
+            return False
+
+        logger.info(f"   🗒️ [{trace_id}] Résumé de la session {session_id} : intégration de {len(to_fold)} message(s).")
+        transcript = [{"sender": m.sender, "content": (m.content or "").strip()} for m in to_fold]
+        covered_up_to = to_fold[-1].id
+        # Aucune connexion BDD gardée pendant l'appel LLM
+        release_connection(db)
+        summary = ai_generation_service.generate_conversation_summary(
+            previous_summary, transcript
+        )
+        if summary is None:
+            return False
+
+        # Relecture avant écriture : `context_state` est aussi modifié par d'autres
+        # traitements (ex: évaluation finale) pendant l'appel LLM.
+        db.refresh(session_obj)
+        previous_state: Dict[str, Any] = (session_obj.context_state or {}).get(CONTEXT_STATE_KEY) or {}
+        if previous_state.get("covered_message_id") != covered_id:
+            logger.warning(f"   ⚠️ [{trace_id}] Résumé modifié entre-temps : mise à jour abandonnée.")
+            return False
+
+        # Réassignation d'un nouveau dict : SQLAlchemy ne détecte pas les mutations en place du JSON
+        context = dict(session_obj.context_state or {})
+        context[CONTEXT_STATE_KEY] = {
+            "text": summary,
+            "covered_message_id": covered_up_to,
+            "covered_messages": int(previous_state.get("covered_messages", 0)) + len(to_fold),
+            "updated_at": datetime.now().isoformat(),
+        }
+        session_obj.context_state = context
+        db.commit()
+        session_context_cache.update_summary(session_id, summary, covered_up_to)
+        logger.info(f"   ✅ [{trace_id}] Résumé mis à jour (jusqu'au message {covered_up_to}).")
+        return True
+
+
+# Instance globale
+conversation_summary_service = ConversationSummaryService()
@@ -0,0 +1,162 @@
+#=== Fichier: ./app/services/degraded_mode_service.py ===
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import models
+from .exam_catalog_service import exam_catalog, normalize_exam_text
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "DEGRADED-MODE"
+# ==============================================================================
+# Générateurs locaux (sans LLM) utilisés quand le fournisseur IA est indisponible
+# (disjoncteur ouvert, retries épuisés) : la simulation reste jouable.
+logger = logging.getLogger("degraded_mode")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [DEGRADED-MODE] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+TEMPLATE_RESULT_TYPES = {"BIOLOGY": "biologie", "IMAGING": "imagerie"}
+MAX_KEY_VALUES = 4
+
+# ==============================================================================
+# RÉPLIQUES PATIENT PRÉ-ÉCRITES
+# ==============================================================================
+# Le patient reste dans son personnage sans rien révéler du cas : l'étudiant est
+# invité à reformuler, ce qui laisse au fournisseur le temps de revenir.
+
+CANNED_PATIENT_REPLIES = {
+    "douleur": [
+        "Ça me fait mal, docteur... J'ai du mal à vous répondre, laissez-moi reprendre mon souffle.",
+        "Aïe... Excusez-moi, la douleur me coupe. Vous pouvez me reposer la question ?",
+    ],
+    "examen": [
+        "D'accord docteur, faites ce qu'il faut. Je vous laisse m'examiner.",
+        "Oui, allez-y. Dites-moi si je dois bouger.",
+    ],
+    "default": [
+        "Pardon docteur, je suis très fatigué... Vous pouvez répéter ?",
+        "Excusez-moi, je n'ai pas bien compris. Vous pouvez reformuler ?",
+        "Hmm... Je ne sais pas trop comment vous répondre. Vous pouvez me demander autrement ?",
+        "Je suis un peu perdu, docteur. Qu'est-ce que vous voulez savoir exactement ?",
+    ],
+}
+
+_REPLY_KEYWORDS = {
+    "douleur": ("mal", "douleur", "douleurs", "souffre"),
+    "examen": ("examiner", "ausculter", "palper", "allonger", "allongez", "tension"),
+}
+
+
+def degraded_patient_reply(student_message: str) -> str:
+    """
+    Réplique patient pré-écrite, choisie selon les mots-clés du message de
+    l'étudiant. Déterministe pour un même message (pas de tirage aléatoire).
+    """
+    words = set(normalize_exam_text(student_message or "").split())
+    category = next(
+        (cat for cat, keywords in _REPLY_KEYWORDS.items() if words.intersection(keywords)),
+        "default"
+    )
+    replies = CANNED_PATIENT_REPLIES[category]
+    digest = hashlib.md5((student_message or "").encode("utf-8")).digest()
+    logger.warning(f"   🩹 Réplique patient pré-écrite (catégorie '{category}').")
+    return replies[digest[0] % len(replies)]
+
+
+def last_student_message(messages: List[Dict[str, str]]) -> str:
+    """Extrait le dernier message étudiant d'un prompt (liste de messages normalisée)."""
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return str(message.get("content", "")).strip()
+    return ""
+
+
+# ==============================================================================
+# COMPTES-RENDUS D'EXAMENS PAR GABARIT
+# ==============================================================================
+
+def _matches_exam(label: str, exam_name: str, exam_code: Optional[str]) -> bool:
+    """Une donnée du dossier ('CRP', 'radio_thorax'...) concerne-t-elle l'examen demandé ?"""
+    label_norm = normalize_exam_text(label.replace("_", " "))
+    exam_norm = normalize_exam_text(exam_name)
+    if not label_norm or not exam_norm:
+        return False
+    if exam_code and exam_catalog.match_code(label_norm, use_embeddings=False) == exam_code:
+        return True
+    return label_norm in exam_norm or exam_norm in label_norm
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _select_findings(
+    paracliniques: Dict[str, Any],
+    exam_name: str,
+    exam_code: Optional[str]
+) -> List[Tuple[str, str]]:
+    """Données du dossier relatives à l'examen, sous forme (libellé, valeur)."""
+    findings: List[Tuple[str, str]] = []
+
+    for lab in paracliniques.get("lab_results") or []:
+        if not isinstance(lab, dict) or not lab.get("nom"):
+            continue
+        if _matches_exam(str(lab["nom"]), exam_name, exam_code):
+            valeur = f"{lab.get('valeur', '')} {lab.get('unite') or ''}".strip()
+            findings.append((str(lab["nom"]), valeur))
+
+    for key, value in paracliniques.items():
+        if key == "lab_results" or value in (None, "", [], {}):
+            continue
+        if _matches_exam(str(key), exam_name, exam_code):
+            findings.append((str(key), _format_value(value)))
+
+    return findings
+
+
+def build_degraded_exam_result(case: models.ClinicalCase, exam_name: str) -> Dict[str, Any]:
+    """
+    Compte-rendu d'examen construit localement à partir de `donnees_paracliniques`.
+
+    Même forme que `generate_exam_result` (type_resultat, valeurs_cles,
+    rapport_complet, conclusion). Seules les valeurs enregistrées dans le dossier
+    sont restituées : rien n'est inventé. La clé `mode_degrade` empêche la mise
+    en cache de ce résultat (cf. `exam_cache_service.store_result`).
+    """
+    entry = exam_catalog.match(exam_name, use_embeddings=False)
+    exam_code = entry["code"] if entry else None
+    type_resultat = TEMPLATE_RESULT_TYPES.get(entry.get("template") if entry else None, "autre")
+    exam_label = entry["nom"] if entry else exam_name
+
+    findings = _select_findings(case.donnees_paracliniques or {}, exam_name, exam_code)
+    logger.warning(
+        f"   🩹 Compte-rendu par gabarit pour '{exam_name}' "
+        f"(cas {getattr(case, 'id', '?')}, {len(findings)} donnée(s) du dossier)."
+    )
+
+    lines = [f"COMPTE-RENDU : {exam_label}", ""]
+    if findings:
+        lines.append("Paramètre | Résultat")
+        lines.extend(f"{label} | {value}" for label, value in findings)
+        conclusion = "Résultats du dossier restitués (compte-rendu simplifié, sans interprétation)."
+    else:
+        lines.append("Aucune anomalie enregistrée au dossier pour cet examen.")
+        conclusion = "Examen sans particularité notable."
+    lines += ["", "Note : compte-rendu simplifié généré automatiquement (service d'interprétation indisponible)."]
+
+    return {
+        "type_resultat": type_resultat,
+        "valeurs_cles": {label: value for label, value in findings[:MAX_KEY_VALUES]},
+        "rapport_complet": "\n".join(lines),
+        "conclusion": conclusion,
+        "mode_degrade": True,
+    }
@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from .. import models, schemas
+from . import case_narrative_service
+from .local_grader_service import local_grader
 
 def get_disease_by_id(db: Session, disease_id: int) -> Optional[models.Disease]:
     """
@@ -31,6 +33,7 @@ def create_disease(db: Session, disease: schemas.DiseaseCreate) -> models.Diseas
     db.add(db_disease)
     db.commit()
     db.refresh(db_disease)
+    local_grader.diseases.invalidate()
     
     return db_disease
 
@@ -49,6 +52,12 @@ def update_disease(db: Session, disease_id: int, disease_update: schemas.Disease
         
     db.commit()
     db.refresh(db_disease)
+    # Noms et codes servent à reconnaître le diagnostic proposé par l'étudiant
+    local_grader.diseases.invalidate()
+
+    # Nom, description et physiopathologie font partie de la vérité terrain des cas
+    if {"nom_fr", "description", "physiopathologie"} & update_data.keys():
+        case_narrative_service.on_disease_changed(db, disease_id)
     
     return db_disease
 
@@ -62,6 +71,7 @@ def delete_disease(db: Session, disease_id: int) -> Optional[models.Disease]:
 
     db.delete(db_disease)
     db.commit()
+    local_grader.diseases.invalidate()
     
     return db_disease
 
@@ -49,5 +49,22 @@ class EmbeddingService:
             logger.error(f"Erreur lors de la vectorisation du texte : {e}")
             return None
 
+    def get_text_embeddings(self, texts: list) -> list:
+        """
+        Vectorise une liste de textes en un seul passage du modèle (par lots).
+
+        :param texts: Les textes à vectoriser.
+        :return: Une liste de vecteurs (même ordre que `texts`), ou None en cas d'erreur.
+        """
+        if not texts:
+            return []
+
+        try:
+            embeddings = self._model.encode([str(t or "") for t in texts])
+            return embeddings.tolist()
+        except Exception as e:
+            logger.error(f"Erreur lors de la vectorisation par lot : {e}")
+            return None
+
 # Instance globale prête à l'emploi
 embedding_service = EmbeddingService()
\ No newline at end of file
@@ -0,0 +1,400 @@
+#=== Fichier: ./app/services/evaluation_job_service.py ===
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..config import settings
+from ..database import SessionLocal
+from . import tutor_service
+from .session_events import session_event_bus
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "EVAL-JOBS"
+# ==============================================================================
+logger = logging.getLogger("evaluation_jobs")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [EVAL-JOBS] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# ==============================================================================
+# CONSTANTES
+# ==============================================================================
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+PENDING_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# Événement poussé sur le canal de la session (GET /chat/sessions/{id}/events)
+EVENT_EVALUATION_DONE = "evaluation_done"
+# Les workers tournent souvent dans un autre processus que le client SSE :
+# la fin d'un job est annoncée par NOTIFY, relayée par chaque processus web.
+NOTIFY_CHANNEL = "evaluation_jobs_done"
+MAX_ERROR_CHARS = 2000
+
+
+# ==============================================================================
+# FILE D'ATTENTE
+# ==============================================================================
+
+def to_response(job: models.EvaluationJob) -> schemas.simulation.EvaluationJobResponse:
+    return schemas.simulation.EvaluationJobResponse(
+        job_id=job.id,
+        session_id=job.session_id,
+        status=job.status,
+        attempts=job.attempts or 0,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        error=job.last_error if job.status == JOB_FAILED else None,
+        result=job.result if job.status == JOB_DONE else None
+    )
+
+
+def enqueue_evaluation(
+    db: Session,
+    session_id: UUID,
+    submission: schemas.simulation.SubmissionRequest
+) -> models.EvaluationJob:
+    """
+    Place la soumission dans la file des évaluations (retour immédiat).
+    Une double soumission renvoie le job déjà en attente ou en cours pour la session.
+
+    :raises ValueError: si la session est introuvable.
+    """
+    session_exists = db.query(models.SimulationSession.id).filter(
+        models.SimulationSession.id == session_id
+    ).first()
+    if not session_exists:
+        raise ValueError("Session introuvable")
+
+    pending = db.query(models.EvaluationJob).filter(
+        models.EvaluationJob.session_id == session_id,
+        models.EvaluationJob.status.in_(PENDING_STATUSES)
+    ).first()
+    if pending:
+        logger.info(f"   🔁 Soumission déjà en file pour la session {session_id} (job {pending.id}).")
+        return pending
+
+    job = models.EvaluationJob(
+        session_id=session_id,
+        status=JOB_QUEUED,
+        submission=submission.model_dump(mode="json"),
+        attempts=0,
+        run_after=datetime.now()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    logger.info(f"   📥 Évaluation en file : job {job.id} (session {session_id}).")
+    return job
+
+
+def get_job(db: Session, job_id: UUID) -> Optional[models.EvaluationJob]:
+    return db.query(models.EvaluationJob).filter(models.EvaluationJob.id == job_id).first()
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[models.EvaluationJob]:
+    """
+    Réserve le prochain job prêt (FIFO), ou un job `running` dont le bail a
+    expiré (worker mort en cours de traitement).
+
+    Le verrou `FOR UPDATE SKIP LOCKED` ne dure que le temps de la réservation :
+    le job passe `running` et la transaction est validée avant l'évaluation.
+    """
+    now = datetime.now()
+    lease_expired = now - timedelta(seconds=settings.EVALUATION_JOB_LEASE_SECONDS)
+    Job = models.EvaluationJob
+
+    job = db.query(Job).filter(
+        or_(
+            and_(Job.status == JOB_QUEUED, Job.run_after <= now),
+            and_(Job.status == JOB_RUNNING, Job.locked_at < lease_expired)
+        )
+    ).order_by(Job.created_at.asc()).with_for_update(skip_locked=True).first()
+
+    if not job:
+        db.rollback()
+        return None
+
+    if job.status == JOB_RUNNING:
+        logger.warning(f"   ♻️ [{worker_id}] Reprise du job {job.id} (bail de '{job.locked_by}' expiré).")
+    job.status = JOB_RUNNING
+    job.attempts = (job.attempts or 0) + 1
+    job.locked_by = worker_id
+    job.locked_at = now
+    db.commit()
+    return job
+
+
+def _retry_delay(attempts: int) -> float:
+    """Délai avant nouvelle tentative (exponentiel : base, 2x base, 4x base...)."""
+    return settings.EVALUATION_JOB_RETRY_BACKOFF_SECONDS * (2 ** max(0, attempts - 1))
+
+
+@contextmanager
+def _lease_heartbeat(job_id: UUID, worker_id: str) -> Iterator[None]:
+    """
+    Renouvelle le bail du job (`locked_at`) toutes les
+    EVALUATION_JOB_LEASE_SECONDS / 3 tant que le bloc s'exécute : une
+    évaluation longue (file du gouverneur, relances réseau) n'est pas reprise
+    par un autre worker. Connexion courte à chaque renouvellement.
+    """
+    stop = threading.Event()
+    interval = max(1.0, settings.EVALUATION_JOB_LEASE_SECONDS / 3)
+
+    def beat() -> None:
+        while not stop.wait(interval):
+            db = SessionLocal()
+            try:
+                db.query(models.EvaluationJob).filter(
+                    models.EvaluationJob.id == job_id,
+                    models.EvaluationJob.status == JOB_RUNNING,
+                    models.EvaluationJob.locked_by == worker_id
+                ).update({models.EvaluationJob.locked_at: datetime.now()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"   ⚠️ [{worker_id}] Renouvellement du bail du job {job_id} impossible : {e}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=beat, name=f"lease-{str(job_id)[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+
+
+def _session_completed(db: Session, session_id: UUID) -> bool:
+    statut = db.query(models.SimulationSession.statut).filter(
+        models.SimulationSession.id == session_id
+    ).scalar()
+    return statut == "completed"
+
+
+def _resolve_already_evaluated(db: Session, job_id: UUID, session_id: UUID, worker_id: str) -> None:
+    """
+    Session déjà clôturée (autre tentative du même job, ou autre job) : le job
+    reprend le rapport existant s'il y en a un, sinon il est marqué `failed`.
+    Aucune nouvelle évaluation, aucune progression ajoutée.
+    """
+    job = get_job(db, job_id)
+    if not job or job.status == JOB_DONE:
+        return
+    previous = db.query(models.EvaluationJob).filter(
+        models.EvaluationJob.session_id == session_id,
+        models.EvaluationJob.status == JOB_DONE,
+        models.EvaluationJob.id != job_id
+    ).order_by(models.EvaluationJob.finished_at.desc()).first()
+
+    if previous:
+        job.status = JOB_DONE
+        job.result = previous.result
+        job.last_error = None
+        logger.info(f"   ♻️ [{worker_id}] Session {session_id} déjà évaluée : rapport du job {previous.id} repris.")
+    else:
+        job.status = JOB_FAILED
+        job.last_error = "Session déjà clôturée par une évaluation précédente."
+        logger.warning(f"   ⚠️ [{worker_id}] Session {session_id} déjà clôturée : job {job_id} abandonné.")
+    job.finished_at = datetime.now()
+    job.locked_by = None
+    job.locked_at = None
+    _notify_finished(db, job)
+    db.commit()
+
+
+def run_job(db: Session, job: models.EvaluationJob, worker_id: str) -> bool:
+    """
+    Évalue la soumission d'un job réservé (cf. `claim_next_job`) et enregistre
+    le rapport. En cas d'échec, le job est replanifié jusqu'à
+    EVALUATION_JOB_MAX_ATTEMPTS tentatives, puis marqué `failed`.
+    Une session déjà clôturée n'est jamais réévaluée.
+
+    :return: True si l'évaluation a abouti.
+    """
+    job_id, session_id, attempts = job.id, job.session_id, job.attempts
+    logger.info(f"   ⚙️ [{worker_id}] Job {job_id} : évaluation de la session {session_id} (tentative {attempts}).")
+    start_eval = time.time()
+
+    try:
+        if _session_completed(db, session_id):
+            _resolve_already_evaluated(db, job_id, session_id, worker_id)
+            return False
+
+        submission = schemas.simulation.SubmissionRequest.model_validate(job.submission)
+        with _lease_heartbeat(job_id, worker_id):
+            eval_result, feedback, recommendation = tutor_service.evaluate_submission(
+                db=db,
+                session_id=session_id,
+                submission_data=submission
+            )
+        response = schemas.simulation.SubmissionResponse(
+            evaluation=eval_result,
+            feedback_global=feedback,
+            recommendation_next_step=recommendation,
+            session_duration_seconds=int(time.time() - start_eval)
+        )
+
+        job = get_job(db, job_id)
+        job.status = JOB_DONE
+        job.result = response.model_dump(mode="json")
+        job.last_error = None
+        job.finished_at = datetime.now()
+        _notify_finished(db, job)
+        db.commit()
+    except tutor_service.SessionAlreadyEvaluatedError:
+        db.rollback()
+        _resolve_already_evaluated(db, job_id, session_id, worker_id)
+        return False
+    except Exception as e:
+        db.rollback()
+        logger.error(f"   ❌ [{worker_id}] Job {job_id} en échec : {e}")
+        logger.debug(traceback.format_exc())
+        # Session introuvable : inutile de réessayer
+        _record_failure(db, job_id, attempts, f"{type(e).__name__}: {e}", retryable=not isinstance(e, ValueError))
+        return False
+
+    logger.info(f"   ✅ [{worker_id}] Job {job_id} terminé en {time.time() - start_eval:.2f}s (note {eval_result.score_total}/20).")
+    return True
+
+
+def _record_failure(db: Session, job_id: UUID, attempts: int, error: str, retryable: bool) -> None:
+    try:
+        job = get_job(db, job_id)
+        if not job:
+            return
+        job.last_error = error[:MAX_ERROR_CHARS]
+        job.locked_by = None
+        job.locked_at = None
+        if not retryable or attempts >= settings.EVALUATION_JOB_MAX_ATTEMPTS:
+            job.status = JOB_FAILED
+            job.finished_at = datetime.now()
+            _notify_finished(db, job)
+            logger.critical(f"   🔥 Job {job_id} abandonné après {attempts} tentative(s).")
+        else:
+            delay = _retry_delay(attempts)
+            job.status = JOB_QUEUED
+            job.run_after = datetime.now() + timedelta(seconds=delay)
+            logger.info(f"   🔁 Job {job_id} replanifié dans {delay:.0f}s.")
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.critical(f"   🔥 Impossible d'enregistrer l'échec du job {job_id} : {e}")
+
+
+# ==============================================================================
+# RELAIS DES FINS DE JOBS (LISTEN / NOTIFY)
+# ==============================================================================
+
+def _notify_finished(db: Session, job: models.EvaluationJob) -> None:
+    """
+    Annonce la fin d'un job (`done` ou `failed`). Postgres ne délivre la
+    notification qu'au commit de la transaction : jamais avant que le rapport
+    soit lisible. Le rapport lui-même n'y figure pas (charge utile limitée à 8 Ko).
+    """
+    payload = json.dumps({"job_id": str(job.id), "session_id": str(job.session_id)})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": payload})
+
+
+def relay_evaluation_done(payload: str) -> bool:
+    """
+    Relais de `NOTIFY_CHANNEL` (cf. session_events.SessionEventRelay) : publie
+    le job annoncé en `evaluation_done` aux abonnés locaux de sa session, qu'il
+    ait été traité par un thread local ou par `scripts/run_evaluation_worker.py`.
+
+    :return: True si l'événement a été publié.
+    """
+    try:
+        data = json.loads(payload)
+        job_id, session_id = UUID(data["job_id"]), UUID(data["session_id"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"   ⚠️ Notification de job illisible ignorée : {payload!r}")
+        return False
+    if not session_event_bus.has_subscribers(session_id):
+        return False
+
+    db = SessionLocal()
+    try:
+        job = get_job(db, job_id)
+        if not job or job.status not in (JOB_DONE, JOB_FAILED):
+            return False
+        session_event_bus.publish(session_id, EVENT_EVALUATION_DONE, to_response(job).model_dump(mode="json"))
+        return True
+    finally:
+        db.close()
+
+
+# ==============================================================================
+# WORKER
+# ==============================================================================
+
+class EvaluationWorker:
+    """
+    Boucle de traitement de la file : réserve un job, l'évalue, recommence ;
+    attend `poll_seconds` quand la file est vide. Le débit croît avec le nombre
+    de workers (processus `scripts/run_evaluation_worker.py`, et/ou threads
+    dans le processus web via EVALUATION_INPROCESS_WORKERS).
+    """
+
+    def __init__(self, worker_id: str, poll_seconds: float):
+        self.worker_id = worker_id
+        self.poll_seconds = poll_seconds
+
+    def run_once(self) -> bool:
+        """Traite au plus un job. :return: True si un job a été pris."""
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, self.worker_id)
+            if not job:
+                return False
+            run_job(db, job, self.worker_id)
+            return True
+        finally:
+            db.close()
+
+    def run_forever(self, stop_event: threading.Event) -> None:
+        logger.info(f"🚀 Worker d'évaluation '{self.worker_id}' démarré.")
+        while not stop_event.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                logger.error(f"   ❌ [{self.worker_id}] Erreur de la boucle : {e}")
+                worked = False
+            if not worked:
+                stop_event.wait(self.poll_seconds)
+        logger.info(f"🛑 Worker d'évaluation '{self.worker_id}' arrêté.")
+
+
+def default_worker_id(index: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def start_worker_threads(count: int, stop_event: threading.Event) -> List[threading.Thread]:
+    """Démarre `count` workers en threads démons (processus web ou script)."""
+    threads = []
+    for index in range(count):
+        worker = EvaluationWorker(default_worker_id(index), settings.EVALUATION_WORKER_POLL_SECONDS)
+        thread = threading.Thread(
+            target=worker.run_forever, args=(stop_event,), name=f"eval-worker-{index}", daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    return threads
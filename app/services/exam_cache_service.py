@@ -0,0 +1,321 @@
+#=== Fichier: ./app/services/exam_cache_service.py ===
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..config import settings
+from ..database import release_connection_async
+from ..core.prompts.exam_prompts import ExamPromptBuilder
+from . import ai_generation_service, case_narrative_service
+from .exam_catalog_service import exam_catalog, normalize_exam_text
+from .lab_report_service import lab_report_renderer
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "EXAM-CACHE"
+# ==============================================================================
+logger = logging.getLogger("exam_cache")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [EXAM-CACHE] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Résultats qui ne doivent jamais être mis en cache (fallback technique)
+NON_CACHEABLE_RESULT_TYPES = {"erreur"}
+
+# Bibliothèque d'examens courants, pré-générés hors ligne pour chaque cas
+# (cf. scripts/pregenerate_exam_library.py). Source : 'library', sans expiration.
+LIBRARY_SOURCE = "library"
+DEFAULT_EXAM_LIBRARY = [
+    "Paramètres vitaux complets",
+    "NFS",
+    "CRP",
+    "Ionogramme sanguin",
+    "Glycémie",
+    "Créatininémie",
+    "Bilan hépatique",
+    "Bandelette urinaire",
+    "Goutte épaisse",
+    "Radiographie du thorax",
+    "Échographie abdominale",
+    "ECG",
+]
+
+
+# ==============================================================================
+# CLÉS DE CACHE
+# ==============================================================================
+
+def canonicalize_exam_name(exam_name: str, exam_code: Optional[str] = None) -> str:
+    """
+    Clé d'examen : le code du catalogue canonique ("Hémogramme", "N.F.S" -> "NFS"),
+    ou à défaut le libellé normalisé ("Dosage TPHA" -> "dosage tpha").
+
+    :param exam_code: Code déjà résolu par l'appelant : aucune correspondance
+        (ni repli par embedding) n'est alors relancée.
+    """
+    return exam_code or exam_catalog.match_code(exam_name) or normalize_exam_text(exam_name)
+
+
+def compute_case_fingerprint(case: models.ClinicalCase) -> str:
+    """
+    Empreinte des données du cas qui conditionnent les résultats d'examens :
+    données paracliniques, pathologie, et sa vérité terrain telle qu'injectée
+    dans le prompt (nom, description, physiopathologie). Une modification de la
+    pathologie régénère les fragments du cas (`on_disease_changed`) et rend
+    donc ses entrées périmées.
+    """
+    payload = {
+        "donnees_paracliniques": case.donnees_paracliniques or {},
+        "pathologie_principale_id": case.pathologie_principale_id,
+        "verite_terrain": case_narrative_service.get_case_fragments(case)["verite_terrain"],
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ==============================================================================
+# LECTURE / ÉCRITURE
+# ==============================================================================
+
+def get_cached_result(
+    db: Session,
+    case: models.ClinicalCase,
+    exam_name: str,
+    exam_key: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Cherche un résultat valide pour (cas, examen, version de template).
+    Une entrée expirée ou dont l'empreinte ne correspond plus au cas est ignorée.
+
+    :param exam_key: Clé déjà calculée (cf. `canonicalize_exam_name`) ; obligatoire sous `run_sync`.
+    """
+    exam_key = exam_key or canonicalize_exam_name(exam_name)
+    entry = db.query(models.ExamResultCache).filter(
+        models.ExamResultCache.case_id == case.id,
+        models.ExamResultCache.exam_key == exam_key,
+        models.ExamResultCache.template_version == ExamPromptBuilder.TEMPLATE_VERSION
+    ).first()
+
+    if not entry:
+        logger.debug(f"   ∅ [MISS] Cas {case.id} / '{exam_key}'")
+        return None
+
+    if entry.expires_at and entry.expires_at < datetime.now():
+        logger.debug(f"   ⌛ [EXPIRED] Cas {case.id} / '{exam_key}'")
+        return None
+
+    if entry.case_fingerprint != compute_case_fingerprint(case):
+        logger.info(f"   ♻️ [STALE] Cas {case.id} / '{exam_key}' : données du cas modifiées depuis la mise en cache.")
+        return None
+
+    try:
+        db.query(models.ExamResultCache).filter(models.ExamResultCache.id == entry.id).update(
+            {
+                models.ExamResultCache.hit_count: models.ExamResultCache.hit_count + 1,
+                models.ExamResultCache.last_hit_at: func.now()
+            },
+            synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        # Les statistiques d'usage ne doivent jamais faire échouer une lecture
+        db.rollback()
+        logger.warning(f"   ⚠️ Mise à jour des stats de cache impossible : {e}")
+
+    logger.info(f"   ⚡ [HIT] Cas {case.id} / '{exam_key}' (source: {entry.source})")
+    return dict(entry.result)
+
+
+def has_fresh_entry(db: Session, case: models.ClinicalCase, exam_name: str, source: Optional[str] = None) -> bool:
+    """
+    Indique si une entrée valide (non expirée, empreinte à jour) existe déjà,
+    sans compter de 'hit'. Sert à la reprise des jobs de pré-génération.
+    """
+    query = db.query(models.ExamResultCache).filter(
+        models.ExamResultCache.case_id == case.id,
+        models.ExamResultCache.exam_key == canonicalize_exam_name(exam_name),
+        models.ExamResultCache.template_version == ExamPromptBuilder.TEMPLATE_VERSION,
+        models.ExamResultCache.case_fingerprint == compute_case_fingerprint(case)
+    )
+    if source:
+        query = query.filter(models.ExamResultCache.source == source)
+    entry = query.first()
+    return bool(entry) and (entry.expires_at is None or entry.expires_at >= datetime.now())
+
+
+def store_result(
+    db: Session,
+    case: models.ClinicalCase,
+    exam_name: str,
+    result: Dict[str, Any],
+    source: str = "llm",
+    ttl_hours: Optional[int] = None,
+    exam_key: Optional[str] = None
+) -> bool:
+    """
+    Enregistre (ou remplace) un résultat dans le cache partagé.
+
+    :param ttl_hours: Durée de vie ; `None` = valeur par défaut, `0` = pas d'expiration.
+    :param exam_key: Clé déjà calculée (cf. `canonicalize_exam_name`) ; obligatoire sous `run_sync`.
+    :return: True si le résultat a été mis en cache.
+    """
+    if not isinstance(result, dict) or result.get("type_resultat") in NON_CACHEABLE_RESULT_TYPES:
+        return False
+    if result.get("mode_degrade"):
+        # Compte-rendu de secours (fournisseur IA indisponible) : on régénérera
+        return False
+
+    ttl = settings.EXAM_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours
+    expires_at = datetime.now() + timedelta(hours=ttl) if ttl else None
+
+    values = {
+        "case_id": case.id,
+        "exam_key": exam_key or canonicalize_exam_name(exam_name),
+        "template_version": ExamPromptBuilder.TEMPLATE_VERSION,
+        "case_fingerprint": compute_case_fingerprint(case),
+        "result": result,
+        "source": source,
+        "hit_count": 0,
+        "expires_at": expires_at,
+    }
+    stmt = pg_insert(models.ExamResultCache).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_exam_cache_key",
+        set_={
+            "case_fingerprint": stmt.excluded.case_fingerprint,
+            "result": stmt.excluded.result,
+            "source": stmt.excluded.source,
+            "hit_count": 0,
+            "created_at": func.now(),
+            "last_hit_at": func.now(),
+            "expires_at": stmt.excluded.expires_at,
+        }
+    )
+
+    try:
+        db.execute(stmt)
+        db.commit()
+        logger.info(f"   💾 [STORE] Cas {case.id} / '{values['exam_key']}' (source: {source})")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"   ❌ Échec écriture cache : {e}")
+        return False
+
+    evict(db)
+    return True
+
+
+# ==============================================================================
+# ÉVICTION / INVALIDATION
+# ==============================================================================
+
+def evict(db: Session, max_entries: Optional[int] = None) -> int:
+    """
+    Supprime les entrées expirées, puis les moins récemment utilisées au-delà
+    de la taille maximale. Les entrées sans expiration (bibliothèque) sont conservées.
+
+    :return: Le nombre d'entrées supprimées.
+    """
+    max_entries = settings.EXAM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    Cache = models.ExamResultCache
+    removed = 0
+    try:
+        removed += db.query(Cache).filter(
+            Cache.expires_at.isnot(None), Cache.expires_at < func.now()
+        ).delete(synchronize_session=False)
+
+        overflow = db.query(func.count(Cache.id)).scalar() - max_entries
+        if overflow > 0:
+            lru_ids = db.query(Cache.id).filter(Cache.expires_at.isnot(None)).order_by(
+                Cache.last_hit_at.asc()
+            ).limit(overflow).subquery()
+            removed += db.query(Cache).filter(Cache.id.in_(lru_ids.select())).delete(synchronize_session=False)
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"   ❌ Échec de l'éviction du cache : {e}")
+        return 0
+
+    if removed:
+        logger.info(f"   🧹 [EVICT] {removed} entrée(s) supprimée(s)")
+    return removed
+
+
+def invalidate_case(db: Session, case_id: int) -> int:
+    """
+    Supprime toutes les entrées d'un cas (à appeler quand ses données
+    paracliniques ou sa pathologie changent). Ne commit pas : l'appelant
+    l'intègre à sa propre transaction.
+    """
+    removed = db.query(models.ExamResultCache).filter(
+        models.ExamResultCache.case_id == case_id
+    ).delete(synchronize_session=False)
+    logger.info(f"   🗑️ [INVALIDATE] Cas {case_id} : {removed} entrée(s) supprimée(s)")
+    return removed
+
+
+# ==============================================================================
+# POINT D'ENTRÉE
+# ==============================================================================
+
+async def get_or_generate_exam_result_async(
+    db: AsyncSession,
+    case: models.ClinicalCase,
+    exam_name: str,
+    exam_justification: str = "Non spécifiée",
+    exam_code: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Renvoie le résultat d'un examen depuis le cache partagé, ou le génère via
+    l'IA Laboratoire puis le met en cache. Lecture et écriture du cache via
+    `run_sync`, génération attendue sans connexion BDD.
+
+    L'examen est associé au catalogue une seule fois, hors de la boucle
+    (le repli par embedding est bloquant) ; `exam_code` évite même ce passage
+    quand l'appelant l'a déjà résolu.
+
+    NOTE : La justification n'entre pas dans la clé : elle n'influence que la
+    rédaction du rapport, pas les valeurs (dictées par le cas).
+    Les panels de biologie standard sont rendus localement, sans cache ni LLM
+    (cf. lab_report_service).
+    """
+    local_report = lab_report_renderer.render(case, exam_name)
+    if local_report is not None:
+        return local_report
+
+    if exam_code is None:
+        exam_code = await asyncio.to_thread(exam_catalog.match_code, exam_name)
+    # Même clé que `canonicalize_exam_name`, sans nouvelle correspondance sous `run_sync`
+    exam_key = exam_code or normalize_exam_text(exam_name)
+
+    if settings.EXAM_CACHE_ENABLED:
+        cached = await db.run_sync(lambda sync_db: get_cached_result(sync_db, case, exam_name, exam_key))
+        if cached is not None:
+            return cached
+
+    await release_connection_async(db)
+    result = await ai_generation_service.generate_exam_result_async(
+        case=case,
+        session_history=[],
+        exam_name=exam_name,
+        exam_justification=exam_justification,
+        exam_code=exam_code
+    )
+
+    if settings.EXAM_CACHE_ENABLED:
+        await db.run_sync(lambda sync_db: store_result(sync_db, case, exam_name, result, exam_key=exam_key))
+    return result
@@ -0,0 +1,412 @@
+#=== Fichier: ./app/services/exam_catalog_service.py ===
+
+import logging
+import re
+import threading
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import models
+from ..database import SessionLocal
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "EXAM-CATALOG"
+# ==============================================================================
+logger = logging.getLogger("exam_catalog")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [EXAM-CATALOG] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Similarité cosinus minimale pour accepter une correspondance par embedding
+EMBEDDING_MATCH_THRESHOLD = 0.70
+
+
+class EmbeddingUnavailableError(RuntimeError):
+    """Le repli sémantique n'a pas pu être calculé (modèle absent ou en échec)."""
+
+# ==============================================================================
+# CATALOGUE PAR DÉFAUT
+# ==============================================================================
+# Sert à peupler la table `catalogue_examens` (scripts/populate_exam_catalog.py)
+# et de repli si la table est vide ou inaccessible.
+# Les synonymes sont comparés après normalisation (minuscules, sans accents).
+
+DEFAULT_EXAM_CATALOG: List[Dict[str, Any]] = [
+    # --- Constantes ---
+    {"code": "CONSTANTES", "nom": "Paramètres vitaux complets", "categorie": "constantes", "template": "GENERIC",
+     "duree_minutes": 2, "cout_virtuel": 1000,
+     "synonymes": ["constantes", "parametres vitaux", "signes vitaux", "tension arterielle", "pression arterielle",
+                   "frequence cardiaque", "temperature", "saturation", "spo2"]},
+
+    # --- Biologie standard ---
+    {"code": "NFS", "nom": "Numération Formule Sanguine", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["nfs", "hemogramme", "numeration formule sanguine", "formule sanguine", "numeration sanguine",
+                   "taux d hemoglobine", "hemoglobine"]},
+    {"code": "CRP", "nom": "Protéine C Réactive", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["crp", "proteine c reactive", "c reactive protein"]},
+    {"code": "IONO", "nom": "Ionogramme sanguin", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["ionogramme", "iono", "ionogramme sanguin", "electrolytes", "natremie", "kaliemie"]},
+    {"code": "GLYCEMIE", "nom": "Glycémie", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["glycemie", "glycemie a jeun", "glucose sanguin", "dextro", "glycemie capillaire"]},
+    {"code": "FONCTION_RENALE", "nom": "Urée et créatininémie", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["creatinine", "creatininemie", "uree", "uremie", "fonction renale", "uree creatinine"]},
+    {"code": "BILAN_HEPATIQUE", "nom": "Bilan hépatique", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["bilan hepatique", "transaminases", "asat", "alat", "bilirubine", "ggt", "phosphatases alcalines"]},
+    {"code": "COAGULATION", "nom": "Bilan de coagulation (TP/TCA)", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["bilan de coagulation", "hemostase", "tp", "tca", "inr", "taux de prothrombine"]},
+    {"code": "GOUTTE_EPAISSE", "nom": "Goutte épaisse / Frottis sanguin", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 5000,
+     "synonymes": ["goutte epaisse", "frottis sanguin", "tdr paludisme", "test de diagnostic rapide",
+                   "recherche de plasmodium"]},
+    {"code": "BU", "nom": "Bandelette urinaire", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 5, "cout_virtuel": 1000,
+     "synonymes": ["bandelette urinaire", "bu", "labstix"]},
+
+    # --- Biologie complexe ---
+    {"code": "ECBU", "nom": "Examen cytobactériologique des urines", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 120, "cout_virtuel": 15000,
+     "synonymes": ["ecbu", "examen cytobacteriologique des urines", "uroculture"]},
+    {"code": "HEMOCULTURE", "nom": "Hémocultures", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 120, "cout_virtuel": 15000,
+     "synonymes": ["hemoculture", "hemocultures"]},
+    {"code": "GAZ_DU_SANG", "nom": "Gaz du sang artériel", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 60, "cout_virtuel": 15000,
+     "synonymes": ["gaz du sang", "gazometrie", "gds"]},
+    {"code": "LCR", "nom": "Ponction lombaire (analyse du LCR)", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 120, "cout_virtuel": 15000,
+     "synonymes": ["ponction lombaire", "lcr", "liquide cephalo rachidien"]},
+    {"code": "SEROLOGIE_VIH", "nom": "Sérologie VIH", "categorie": "biologie", "template": "BIOLOGY",
+     "duree_minutes": 120, "cout_virtuel": 15000,
+     "synonymes": ["serologie vih", "vih", "hiv", "test vih", "depistage vih"]},
+
+    # --- Imagerie ---
+    {"code": "RX_THORAX", "nom": "Radiographie du thorax", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 30, "cout_virtuel": 10000,
+     "synonymes": ["radiographie du thorax", "radio du thorax", "radio thorax", "rx thorax", "radiographie thoracique",
+                   "radiographie pulmonaire", "radio pulmonaire", "cliche thoracique"]},
+    {"code": "RX_ABDOMEN", "nom": "Abdomen sans préparation", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 30, "cout_virtuel": 10000,
+     "synonymes": ["abdomen sans preparation", "asp", "radio abdomen", "radio de l abdomen"]},
+    {"code": "RX", "nom": "Radiographie standard", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 30, "cout_virtuel": 10000,
+     "synonymes": ["radio", "radiographie", "rx"]},
+    {"code": "ECHO_ABDO", "nom": "Échographie abdominale", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 30, "cout_virtuel": 15000,
+     "synonymes": ["echographie abdominale", "echo abdominale", "echographie abdomino pelvienne", "echo abdo"]},
+    {"code": "ECHO_CARDIAQUE", "nom": "Échocardiographie", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 45, "cout_virtuel": 15000,
+     "synonymes": ["echocardiographie", "echo cardiaque", "echographie cardiaque", "ett"]},
+    {"code": "ECHO", "nom": "Échographie", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 30, "cout_virtuel": 15000,
+     "synonymes": ["echographie", "echo"]},
+    {"code": "TDM_CEREBRAL", "nom": "Scanner cérébral", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 45, "cout_virtuel": 45000,
+     "synonymes": ["scanner cerebral", "tdm cerebrale", "scanner cranien", "tdm cranio encephalique",
+                   "scanner crane"]},
+    {"code": "TDM", "nom": "Scanner (TDM)", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 45, "cout_virtuel": 45000,
+     "synonymes": ["scanner", "tdm", "tomodensitometrie"]},
+    {"code": "IRM", "nom": "IRM", "categorie": "imagerie", "template": "IMAGING",
+     "duree_minutes": 60, "cout_virtuel": 100000,
+     "synonymes": ["irm", "imagerie par resonance magnetique"]},
+
+    # --- Cardiologie ---
+    {"code": "ECG", "nom": "Électrocardiogramme", "categorie": "cardiologie", "template": "GENERIC",
+     "duree_minutes": 15, "cout_virtuel": 5000,
+     "synonymes": ["ecg", "electrocardiogramme", "electrocardiographie"]},
+]
+
+
+def normalize_exam_text(text: str) -> str:
+    """
+    Normalise un libellé d'examen : minuscules, sans accents ni ponctuation,
+    acronymes pointés recollés ("N.F.S" -> "nfs", "Échographie" -> "echographie").
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"(?<=\b\w)\.(?=\w\b|\w\.)", "", text)   # Acronymes pointés : n.f.s -> nfs
+    text = re.sub(r"[^a-z0-9+]+", " ", text)
+    return text.strip()
+
+
+# ==============================================================================
+# MATCHER AHO-CORASICK
+# ==============================================================================
+
+class _AhoCorasickMatcher:
+    """
+    Automate Aho-Corasick sur les synonymes normalisés du catalogue.
+
+    Une seule passe sur le texte (O(len(texte) + nb_correspondances)) trouve
+    toutes les occurrences de tous les synonymes. Les motifs sont encadrés
+    d'espaces pour ne reconnaître que des mots entiers ("tp" ne matche pas "tpha").
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        """:param patterns: {synonyme normalisé: code d'examen}"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]   # (longueur du motif, code)
+
+        for pattern, code in patterns.items():
+            self._add(f" {pattern} ", code)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, code: str) -> None:
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), code))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def best_match(self, text: str) -> Optional[str]:
+        """
+        Renvoie le code du synonyme le plus long trouvé dans le texte (le plus
+        spécifique : "scanner cerebral" l'emporte sur "scanner"), à égalité le premier.
+        """
+        padded = f" {text} "
+        state = 0
+        best: Optional[Tuple[int, int, str]] = None   # (longueur, -position, code)
+        for index, char in enumerate(padded):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, code in self._out[state]:
+                candidate = (length, -(index - length + 1), code)
+                if best is None or candidate[:2] > best[:2]:
+                    best = candidate
+        return best[2] if best else None
+
+
+# ==============================================================================
+# SERVICE CATALOGUE
+# ==============================================================================
+
+class ExamCatalog:
+    """
+    Catalogue des examens chargé une seule fois en mémoire (depuis la BDD).
+
+    `match(texte)` associe le libellé libre saisi par un apprenant à une entrée
+    canonique : d'abord par l'automate Aho-Corasick (synonymes exacts, mots entiers),
+    puis, à défaut, par similarité d'embedding avec les libellés du catalogue.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Pattern Singleton : un seul catalogue en mémoire par processus."""
+        if cls._instance is None:
+            cls._instance = super(ExamCatalog, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._matcher: Optional[_AhoCorasickMatcher] = None
+        self._embedding_index = None   # (labels_codes, matrice normalisée), calculé à la demande
+
+    # --------------------------------------------------------------------------
+    # CHARGEMENT
+    # --------------------------------------------------------------------------
+
+    def load(self, entries: List[Dict[str, Any]]) -> None:
+        """Installe un catalogue (liste de dicts au format DEFAULT_EXAM_CATALOG)."""
+        indexed = {e["code"]: dict(e) for e in entries}
+        patterns: Dict[str, str] = {}
+        for code, entry in indexed.items():
+            for label in [entry["nom"], code] + list(entry.get("synonymes") or []):
+                key = normalize_exam_text(label)
+                if key:
+                    patterns.setdefault(key, code)
+
+        # Verrou de l'index en plus : un index en cours de construction sur
+        # l'ancien catalogue est invalidé une fois terminé
+        with self._lock, self._index_lock:
+            self._entries = indexed
+            self._matcher = _AhoCorasickMatcher(patterns)
+            self._embedding_index = None
+            self._cached_match.cache_clear()
+        logger.info(f"📚 Catalogue d'examens chargé : {len(indexed)} examens, {len(patterns)} appellations.")
+
+    def reload(self) -> None:
+        """(Re)charge le catalogue depuis la table `catalogue_examens`."""
+        entries: List[Dict[str, Any]] = []
+        db = SessionLocal()
+        try:
+            rows = db.query(models.ExamCatalogEntry).filter(models.ExamCatalogEntry.actif.is_(True)).all()
+            entries = [
+                {
+                    "code": r.code,
+                    "nom": r.nom,
+                    "categorie": r.categorie,
+                    "template": r.template or "GENERIC",
+                    "synonymes": r.synonymes or [],
+                    "duree_minutes": r.duree_minutes,
+                    "cout_virtuel": r.cout_virtuel,
+                }
+                for r in rows
+            ]
+        except Exception as e:
+            logger.error(f"❌ Lecture du catalogue impossible ({e}) : utilisation du catalogue par défaut.")
+        finally:
+            db.close()
+
+        if not entries:
+            logger.warning("⚠️ Table 'catalogue_examens' vide : utilisation du catalogue par défaut.")
+            entries = DEFAULT_EXAM_CATALOG
+        self.load(entries)
+
+    def _ensure_loaded(self) -> None:
+        if self._entries is None:
+            with self._lock:
+                needs_load = self._entries is None
+            if needs_load:
+                self.reload()
+
+    # --------------------------------------------------------------------------
+    # CONSULTATION
+    # --------------------------------------------------------------------------
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        """Renvoie l'entrée d'un code canonique."""
+        self._ensure_loaded()
+        return self._entries.get(code)
+
+    def all(self) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return list(self._entries.values())
+
+    def match(self, exam_name: str, use_embeddings: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Associe un libellé libre ("NFS + plaquettes", "radio pulmonaire de face")
+        à une entrée du catalogue, ou None si aucun examen ne correspond.
+        """
+        self._ensure_loaded()
+        normalized = normalize_exam_text(exam_name)
+        if not normalized:
+            return None
+        try:
+            code = self._cached_match(normalized, use_embeddings)
+        except EmbeddingUnavailableError as e:
+            # Non mis en cache : le repli sémantique sera retenté au prochain appel
+            logger.warning(f"   ⚠️ Repli par embedding indisponible : {e}")
+            return None
+        return self._entries.get(code) if code else None
+
+    def match_code(self, exam_name: str, use_embeddings: bool = True) -> Optional[str]:
+        """Comme `match`, mais ne renvoie que le code canonique."""
+        entry = self.match(exam_name, use_embeddings)
+        return entry["code"] if entry else None
+
+    @lru_cache(maxsize=4096)
+    def _cached_match(self, normalized: str, use_embeddings: bool) -> Optional[str]:
+        code = self._matcher.best_match(normalized)
+        if code:
+            return code
+        if use_embeddings:
+            code = self._embedding_match(normalized)
+            if code:
+                logger.info(f"   🧭 Correspondance sémantique : '{normalized}' -> {code}")
+        return code
+
+    # --------------------------------------------------------------------------
+    # REPLI SÉMANTIQUE (EMBEDDINGS)
+    # --------------------------------------------------------------------------
+
+    def _build_embedding_index(self):
+        # Import tardif : le modèle d'embedding est lourd et rarement nécessaire
+        import numpy as np
+        from .embedding_service import embedding_service
+
+        codes: List[str] = []
+        labels: List[str] = []
+        for code, entry in self._entries.items():
+            for label in [entry["nom"]] + list(entry.get("synonymes") or []):
+                codes.append(code)
+                labels.append(label)
+
+        # Un seul passage du modèle pour tout le catalogue
+        vectors = embedding_service.get_text_embeddings(labels)
+        if vectors is None:
+            raise EmbeddingUnavailableError("vectorisation du catalogue impossible")
+
+        matrix = np.array(vectors, dtype="float32")
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        logger.info(f"   🧭 Catalogue d'examens indexé pour le repli sémantique ({len(codes)} libellés).")
+        return codes, matrix
+
+    def _ensure_embedding_index(self):
+        """Index construit une seule fois, même si plusieurs appelants arrivent en même temps."""
+        with self._index_lock:
+            if self._embedding_index is None:
+                self._embedding_index = self._build_embedding_index()
+            return self._embedding_index
+
+    def _embedding_match(self, normalized: str) -> Optional[str]:
+        """
+        :raises EmbeddingUnavailableError: si le modèle d'embedding est absent ou
+            en échec (l'échec ne doit pas être mis en cache par `_cached_match`).
+        """
+        try:
+            import numpy as np
+            from .embedding_service import embedding_service
+
+            codes, matrix = self._ensure_embedding_index()
+            query = embedding_service.get_text_embedding(normalized)
+        except EmbeddingUnavailableError:
+            raise
+        except Exception as e:
+            raise EmbeddingUnavailableError(str(e)) from e
+
+        if not query:
+            raise EmbeddingUnavailableError(f"vectorisation de '{normalized}' impossible")
+        if not codes:
+            return None
+        query = np.array(query, dtype="float32")
+        scores = matrix @ (query / (np.linalg.norm(query) + 1e-12))
+        best = int(scores.argmax())
+        if scores[best] >= EMBEDDING_MATCH_THRESHOLD:
+            return codes[best]
+        logger.debug(f"   ∅ Aucun examen proche de '{normalized}' (meilleur score {scores[best]:.2f})")
+        return None
+
+
+# Instance globale prête à l'emploi
+exam_catalog = ExamCatalog()
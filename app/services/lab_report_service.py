@@ -0,0 +1,287 @@
+#=== Fichier: ./app/services/lab_report_service.py ===
+
+import hashlib
+import logging
+import random
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import models
+from ..config import settings
+from .exam_catalog_service import exam_catalog, normalize_exam_text
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LAB-REPORT"
+# ==============================================================================
+# Comptes-rendus de biologie rendus localement (sans LLM) : les valeurs
+# anormales viennent du dossier (`donnees_paracliniques.lab_results`), les
+# autres paramètres du panel sont tirés dans les valeurs de référence.
+logger = logging.getLogger("lab_report")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LAB-REPORT] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+MAX_KEY_VALUES = 4
+
+# ==============================================================================
+# PANELS CANONIQUES
+# ==============================================================================
+# Clé : code du catalogue d'examens. Chaque paramètre : libellé, unité, bornes
+# de référence, décimales, appellations du dossier (libellés MIMIC en anglais
+# compris), comparées après normalisation, et facteurs de conversion des autres
+# unités rencontrées vers l'unité de référence (clés : cf. `_unit_key`).
+
+LAB_PANELS: Dict[str, List[Dict[str, Any]]] = {
+    "NFS": [
+        {"nom": "Hémoglobine", "unite": "g/dL", "min": 12.0, "max": 16.0, "decimales": 1,
+         "synonymes": ["hemoglobin", "hb", "hgb"], "conversions": {"g l": 0.1, "mmol l": 1.611}},
+        {"nom": "Hématocrite", "unite": "%", "min": 36.0, "max": 46.0, "decimales": 1,
+         "synonymes": ["hematocrit", "ht", "hct"]},
+        {"nom": "Globules rouges", "unite": "T/L", "min": 4.0, "max": 5.5, "decimales": 2,
+         "synonymes": ["red blood cells", "rbc", "hematies"], "conversions": {"10 6 ul": 1.0}},
+        {"nom": "VGM", "unite": "fL", "min": 80.0, "max": 100.0, "decimales": 0,
+         "synonymes": ["mcv", "volume globulaire moyen"]},
+        {"nom": "Leucocytes", "unite": "G/L", "min": 4.0, "max": 10.0, "decimales": 1,
+         "synonymes": ["white blood cells", "wbc", "globules blancs"], "conversions": {"10 3 ul": 1.0}},
+        {"nom": "Polynucléaires neutrophiles", "unite": "%", "min": 40.0, "max": 75.0, "decimales": 0,
+         "synonymes": ["neutrophils", "neutrophiles"]},
+        {"nom": "Lymphocytes", "unite": "%", "min": 20.0, "max": 45.0, "decimales": 0,
+         "synonymes": ["lymphocytes"]},
+        {"nom": "Plaquettes", "unite": "G/L", "min": 150.0, "max": 400.0, "decimales": 0,
+         "synonymes": ["platelet count", "platelets"], "conversions": {"10 3 ul": 1.0}},
+    ],
+    "IONO": [
+        {"nom": "Sodium", "unite": "mmol/L", "min": 135.0, "max": 145.0, "decimales": 0,
+         "synonymes": ["natremie", "na"]},
+        {"nom": "Potassium", "unite": "mmol/L", "min": 3.5, "max": 5.0, "decimales": 1,
+         "synonymes": ["kaliemie", "k"]},
+        {"nom": "Chlore", "unite": "mmol/L", "min": 98.0, "max": 107.0, "decimales": 0,
+         "synonymes": ["chloride", "chlorure", "chloremie"]},
+        {"nom": "Bicarbonates", "unite": "mmol/L", "min": 22.0, "max": 29.0, "decimales": 0,
+         "synonymes": ["bicarbonate", "hco3"]},
+    ],
+    "CRP": [
+        {"nom": "CRP", "unite": "mg/L", "min": 0.0, "max": 5.0, "decimales": 1,
+         "synonymes": ["c reactive protein", "proteine c reactive"], "conversions": {"mg dl": 10.0}},
+    ],
+    "GLYCEMIE": [
+        {"nom": "Glycémie", "unite": "g/L", "min": 0.70, "max": 1.10, "decimales": 2,
+         "synonymes": ["glucose", "glycemie a jeun"], "conversions": {"mg dl": 0.01, "mmol l": 0.18}},
+    ],
+    "FONCTION_RENALE": [
+        {"nom": "Urée", "unite": "mmol/L", "min": 2.5, "max": 7.5, "decimales": 1,
+         "synonymes": ["urea nitrogen", "uremie", "bun"], "conversions": {"mg dl": 0.357}},
+        {"nom": "Créatinine", "unite": "µmol/L", "min": 60.0, "max": 110.0, "decimales": 0,
+         "synonymes": ["creatinine", "creatininemie"], "conversions": {"mg dl": 88.4}},
+    ],
+    "BILAN_HEPATIQUE": [
+        {"nom": "ASAT", "unite": "UI/L", "min": 10.0, "max": 40.0, "decimales": 0,
+         "synonymes": ["asparate aminotransferase ast", "aspartate aminotransferase ast", "ast"]},
+        {"nom": "ALAT", "unite": "UI/L", "min": 7.0, "max": 45.0, "decimales": 0,
+         "synonymes": ["alanine aminotransferase alt", "alt"]},
+        {"nom": "GGT", "unite": "UI/L", "min": 10.0, "max": 50.0, "decimales": 0,
+         "synonymes": ["gamma glutamyltransferase", "gamma gt"]},
+        {"nom": "Phosphatases alcalines", "unite": "UI/L", "min": 40.0, "max": 130.0, "decimales": 0,
+         "synonymes": ["alkaline phosphatase", "pal"]},
+        {"nom": "Bilirubine totale", "unite": "µmol/L", "min": 3.0, "max": 17.0, "decimales": 0,
+         "synonymes": ["bilirubin total", "bilirubine"], "conversions": {"mg dl": 17.1}},
+    ],
+    "COAGULATION": [
+        {"nom": "TP", "unite": "%", "min": 70.0, "max": 100.0, "decimales": 0,
+         "synonymes": ["taux de prothrombine"]},
+        {"nom": "INR", "unite": "", "min": 0.9, "max": 1.2, "decimales": 2,
+         "synonymes": ["inr pt"]},
+        {"nom": "TCA (ratio)", "unite": "", "min": 0.8, "max": 1.2, "decimales": 2,
+         "synonymes": ["ptt", "tca"]},
+    ],
+}
+
+# Unités équivalentes (même grandeur, facteur 1)
+_UNIT_ALIASES = {"meq l": "mmol l", "k ul": "g l", "10 9 l": "g l", "m ul": "t l", "10 12 l": "t l",
+                 "iu l": "ui l", "u l": "ui l", "mumol l": "umol l", "sec": "", "ratio": ""}
+
+
+def _unit_key(unit: Any) -> str:
+    key = normalize_exam_text(str(unit or "").replace("µ", "u"))
+    return _UNIT_ALIASES.get(key, key)
+
+
+def _to_reference_unit(value: Any, unit: Any, param: Dict[str, Any]) -> Optional[float]:
+    """
+    Valeur du dossier exprimée dans l'unité de référence du paramètre, ou None
+    si elle n'est pas numérique ou si son unité n'est pas convertible.
+    Une valeur sans unité est supposée dans l'unité de référence.
+    """
+    try:
+        numeric = float(value)
+    except (TypeError, ValueError):
+        return None
+    unit_key = _unit_key(unit)
+    if not unit_key or unit_key == _unit_key(param["unite"]):
+        return numeric
+    factor = param.get("conversions", {}).get(unit_key)
+    return numeric * factor if factor is not None else None
+
+
+def _format_number(value: float, decimals: int) -> str:
+    text = f"{value:.{decimals}f}"
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def _sample_normal(case_key: str, code: str, param: Dict[str, Any]) -> float:
+    """
+    Valeur normale reproductible : même cas -> même valeur, à chaque demande
+    et dans tous les processus (graine dérivée du cas, pas de `hash()`).
+    """
+    seed = hashlib.sha256(f"{case_key}:{code}:{param['nom']}".encode("utf-8")).digest()
+    rng = random.Random(int.from_bytes(seed[:8], "big"))
+    low, high = param["min"], param["max"]
+    # Milieu de l'intervalle (10 %-90 %) : pas de valeur limite trompeuse
+    return round(low + (0.1 + 0.8 * rng.random()) * (high - low), param["decimales"])
+
+
+def _find_param(panel: List[Dict[str, Any]], lab_name: str) -> Optional[Dict[str, Any]]:
+    """Paramètre du panel correspondant à un libellé du dossier ("INR(PT)" -> INR)."""
+    normalized = normalize_exam_text(lab_name)
+    if not normalized:
+        return None
+    names = [
+        (normalize_exam_text(name), param)
+        for param in panel
+        for name in [param["nom"]] + param["synonymes"]
+    ]
+    for name, param in names:
+        if name == normalized:
+            return param
+    # Libellé plus long ("Bilirubin, Total, Direct") : l'appellation la plus longue l'emporte
+    contained = [(len(name), param) for name, param in names if f" {name} " in f" {normalized} "]
+    return max(contained, key=lambda item: item[0])[1] if contained else None
+
+
+class LabReportRenderer:
+    """
+    Rendu déterministe des examens de biologie à partir de `donnees_paracliniques`.
+
+    Pour un examen du catalogue couvert par `LAB_PANELS`, les valeurs du dossier
+    sont restituées telles quelles (fidélité exacte à la vérité terrain) et le
+    reste du panel est tiré dans les valeurs de référence, de façon reproductible
+    par cas. Le résultat a la même forme que `generate_exam_result`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"rendered": 0, "not_covered": 0, "delegated": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def render(self, case: models.ClinicalCase, exam_name: str) -> Optional[Dict[str, Any]]:
+        """
+        :return: Le compte-rendu, ou None si l'examen n'est pas un panel de
+            biologie connu ou si une valeur du dossier n'est pas interprétable
+            (unité inconnue, paramètre hors panel) : l'IA Laboratoire prend
+            alors le relais.
+        """
+        if not settings.LOCAL_LAB_REPORTS_ENABLED:
+            return None
+        entry = exam_catalog.match(exam_name, use_embeddings=False)
+        panel = LAB_PANELS.get(entry["code"]) if entry else None
+        if not panel:
+            self._count("not_covered")
+            return None
+
+        code = entry["code"]
+        case_key = str(case.id or case.code_fultang)
+        panel_rows = self._panel_rows(case, code, panel)
+        if panel_rows is None:
+            self._count("delegated")
+            return None
+        rows, anomalies = panel_rows
+        self._count("rendered")
+        logger.info(f"   🧪 [{code}] Compte-rendu local pour le cas {case_key} ({len(anomalies)} valeur(s) hors normes).")
+
+        lines = [f"COMPTE-RENDU : {entry['nom']}", "", "Paramètre | Résultat | Valeurs de référence"]
+        lines.extend(f"{label} | {result} | {reference}" for label, result, reference in rows)
+        if anomalies:
+            # Pas de "anormal" : le tuteur repère un résultat normal au mot "normal"
+            conclusion = "Valeurs hors normes : " + ", ".join(f"{label} {finding}" for label, finding, _ in anomalies) + "."
+            key_values = {label: value for label, _, value in anomalies[:MAX_KEY_VALUES]}
+        else:
+            conclusion = "Bilan dans les limites de la normale."
+            key_values = {label: result for label, result, _ in rows[:MAX_KEY_VALUES]}
+        return {
+            "type_resultat": "biologie",
+            "valeurs_cles": key_values,
+            "rapport_complet": "\n".join(lines),
+            "conclusion": conclusion,
+        }
+
+    def _panel_rows(
+        self,
+        case: models.ClinicalCase,
+        code: str,
+        panel: List[Dict[str, Any]]
+    ) -> Optional[Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]]]]:
+        """
+        :return: (lignes (paramètre, résultat, référence),
+                  anomalies (paramètre, constat, valeur affichée)),
+                 ou None si une valeur du dossier n'est pas interprétable.
+        """
+        case_key = str(case.id or case.code_fultang)
+        measured: Dict[str, Dict[str, Any]] = {}
+        for lab in (case.donnees_paracliniques or {}).get("lab_results") or []:
+            if not isinstance(lab, dict) or not lab.get("nom"):
+                continue
+            param = _find_param(panel, str(lab["nom"]))
+            if param:
+                measured.setdefault(param["nom"], lab)
+            elif exam_catalog.match_code(str(lab["nom"]), use_embeddings=False) == code:
+                # Résultat de l'examen sans bornes connues : pas d'interprétation locale
+                logger.info(f"   ↪️ [{code}] '{lab['nom']}' hors panel : compte-rendu délégué à l'IA.")
+                return None
+
+        rows: List[Tuple[str, str, str]] = []
+        anomalies: List[Tuple[str, str, str]] = []
+        for param in panel:
+            reference = f"{_format_number(param['min'], param['decimales'])} - {_format_number(param['max'], param['decimales'])} {param['unite']}".strip()
+            lab = measured.get(param["nom"])
+            if lab is None:
+                value = _sample_normal(case_key, code, param)
+                rows.append((param["nom"], f"{_format_number(value, param['decimales'])} {param['unite']}".strip(), reference))
+                continue
+
+            # Valeur du dossier, ramenée à l'unité de référence pour la comparer aux bornes
+            value = _to_reference_unit(lab.get("valeur"), lab.get("unite"), param)
+            if value is None:
+                logger.info(
+                    f"   ↪️ [{code}] '{lab['nom']}' = {lab.get('valeur')} {lab.get('unite') or ''} "
+                    f"non convertible en {param['unite'] or 'ratio'} : compte-rendu délégué à l'IA."
+                )
+                return None
+            shown = f"{_format_number(value, max(param['decimales'], 1))} {param['unite']}".strip()
+            if _unit_key(lab.get("unite")) not in ("", _unit_key(param["unite"])):
+                shown += f" ({lab.get('valeur')} {lab.get('unite')})"
+
+            if value < param["min"]:
+                finding, arrow = "en baisse", " ↓"
+            elif value > param["max"]:
+                finding, arrow = "en hausse", " ↑"
+            else:
+                rows.append((param["nom"], shown, reference))
+                continue
+            rows.append((param["nom"], shown + arrow, reference))
+            anomalies.append((param["nom"], f"{finding} ({shown})", shown + arrow))
+        return rows, anomalies
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+# Instance globale (par processus)
+lab_report_renderer = LabReportRenderer()
@@ -0,0 +1,22 @@
+# ==============================================================================
+# PACKAGE 'llm' : COUCHE DE TRANSPORT DU NOYAU IA
+# ------------------------------------------------------------------------------
+# Ce package regroupe les briques techniques utilisées par `ai_generation_service`
+# pour parler au fournisseur LLM (OpenRouter) : client HTTP mutualisé, boucle
+# asynchrone dédiée, coalescence, gouverneur de débit et de priorités,
+# disjoncteur, relances différées multi-modèles, réparation des JSON, budgets
+# de tokens, etc.
+#
+# Les services métiers ne doivent pas l'utiliser directement : ils passent par
+# `ai_generation_service`, qui reste la seule porte d'entrée vers l'IA.
+# ==============================================================================
+
+from .client import llm_client, LLMClient, LLMUnavailableError
+from .single_flight import completion_single_flight, payload_fingerprint, SingleFlight
+from .governor import llm_governor, LLMGovernor
+from .circuit_breaker import circuit_breakers, CircuitBreaker, CircuitOpenError
+from .hedging import hedged_call, model_latency_tracker, ModelLatencyTracker
+from .json_repair import repair_json
+from .token_budget import (
+    count_tokens, count_message_tokens, truncate_to_tokens, assemble_prompt, fit_messages, PromptSection
+)
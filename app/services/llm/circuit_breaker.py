@@ -0,0 +1,171 @@
+#=== Fichier: ./app/services/llm/circuit_breaker.py ===
+
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from ...config import settings
+from .client import LLMUnavailableError
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-BREAKER"
+# ==============================================================================
+logger = logging.getLogger("llm_circuit_breaker")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LLM-BREAKER] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+STATE_CLOSED = "closed"        # Fonctionnement normal
+STATE_OPEN = "open"            # Fournisseur considéré en panne : échec immédiat
+STATE_HALF_OPEN = "half_open"  # Quelques appels 'sondes' pour tester le rétablissement
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Appel refusé sans contacter le fournisseur : le disjoncteur est ouvert."""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un couple fournisseur/modèle.
+
+    Après `failure_threshold` échecs consécutifs (chacun ayant déjà épuisé ses
+    retries réseau), le circuit s'ouvre : les appels échouent immédiatement
+    (`CircuitOpenError`) au lieu de bloquer des workers pendant des dizaines de
+    secondes. Passé `recovery_timeout`, jusqu'à `half_open_max_calls` appels
+    sondes sont autorisés : un succès referme le circuit, un échec le rouvre.
+
+    Thread-safe : l'état est consulté depuis la boucle du noyau IA comme depuis
+    les threads des routes (`is_available`).
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._stats = {"rejected": 0, "failures": 0, "successes": 0, "opened": 0}
+
+    # ==========================================================================
+    # ÉTAT
+    # ==========================================================================
+
+    def _current_state(self) -> str:
+        """État effectif (bascule OPEN -> HALF_OPEN une fois le délai écoulé). Verrou requis."""
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = STATE_HALF_OPEN
+            self._half_open_in_flight = 0
+            logger.info(f"   🟡 [{self.name}] Circuit semi-ouvert : envoi d'un appel sonde.")
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def is_available(self) -> bool:
+        """True si un appel a une chance d'être accepté (sans réserver de place sonde)."""
+        with self._lock:
+            state = self._current_state()
+            return state == STATE_CLOSED or (
+                state == STATE_HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls
+            )
+
+    # ==========================================================================
+    # CYCLE D'UN APPEL
+    # ==========================================================================
+
+    def before_call(self) -> None:
+        """
+        À appeler avant de contacter le fournisseur.
+
+        :raises CircuitOpenError: si le circuit est ouvert (ou si les places
+            sondes du mode semi-ouvert sont déjà prises).
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_CLOSED:
+                return
+            if state == STATE_HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return
+            self._stats["rejected"] += 1
+        raise CircuitOpenError(f"Circuit '{self.name}' ouvert : fournisseur LLM temporairement indisponible.")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state != STATE_CLOSED:
+                logger.info(f"   🟢 [{self.name}] Fournisseur rétabli : circuit refermé.")
+            self._state = STATE_CLOSED
+            self._half_open_in_flight = 0
+
+    def record_cancelled(self) -> None:
+        """Appel annulé par l'appelant : libère sa place sonde sans conclure."""
+        with self._lock:
+            if self._state == STATE_HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == STATE_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if state != STATE_OPEN:
+                    self._stats["opened"] += 1
+                    logger.critical(
+                        f"   🔴 [{self.name}] Circuit OUVERT après {self._consecutive_failures} échec(s) "
+                        f"consécutif(s). Mode dégradé pendant {self.recovery_timeout:.0f}s."
+                    )
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["state"] = self._current_state()
+            stats["consecutive_failures"] = self._consecutive_failures
+        return stats
+
+
+class CircuitBreakerRegistry:
+    """Un disjoncteur par fournisseur/modèle, créé à la première utilisation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                    recovery_timeout=settings.LLM_BREAKER_RECOVERY_SECONDS,
+                    half_open_max_calls=settings.LLM_BREAKER_HALF_OPEN_CALLS,
+                )
+                self._breakers[name] = breaker
+            return breaker
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: b.stats() for b in breakers}
+
+
+# Registre global (un disjoncteur par modèle appelé)
+circuit_breakers = CircuitBreakerRegistry()
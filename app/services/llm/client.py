@@ -0,0 +1,424 @@
+#=== Fichier: ./app/services/llm/client.py ===
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import httpx
+
+from ...config import settings
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-CLIENT"
+# ==============================================================================
+logger = logging.getLogger("llm_client")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter(
+        '%(asctime)s - [LLM-CLIENT] - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
+    )
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# ==============================================================================
+# CONSTANTES
+# ==============================================================================
+
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+DEFAULT_TIMEOUT_SECONDS = 60   # Timeout strict d'un appel (lecture comprise)
+CONNECT_TIMEOUT_SECONDS = 10   # Timeout d'établissement de connexion
+DEFAULT_MAX_RETRIES = 3        # Tentatives réseau (429 / 5xx / coupure)
+BACKOFF_BASE_SECONDS = 1.0     # Backoff exponentiel : 1s, 2s, 4s... (+ jitter)
+BACKOFF_MAX_SECONDS = 20.0
+
+# HTTP/2 nécessite le paquet optionnel 'h2'. Sans lui, on reste en HTTP/1.1 keep-alive.
+try:
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+T = TypeVar("T")
+
+# Marqueur de fin pour les générateurs consommés à travers deux boucles
+_END_OF_STREAM = object()
+
+
+async def _anext_or_sentinel(agen: AsyncIterator[T]) -> Any:
+    """`anext()` qui renvoie un marqueur au lieu de lever StopAsyncIteration."""
+    try:
+        return await agen.__anext__()
+    except StopAsyncIteration:
+        return _END_OF_STREAM
+
+
+class LLMUnavailableError(Exception):
+    """
+    Levée lorsque le fournisseur LLM reste injoignable après toutes les tentatives
+    réseau (timeouts, 429 persistants, erreurs 5xx).
+    """
+    pass
+
+
+class LLMClient:
+    """
+    Client HTTP asynchrone mutualisé vers OpenRouter.
+
+    ARCHITECTURE :
+    Le client possède sa propre boucle asyncio, exécutée dans un thread démon
+    ("llm-kernel-loop"). Toutes les requêtes LLM de l'application passent par
+    cette boucle et partagent un unique `httpx.AsyncClient` (pool keep-alive,
+    HTTP/2 si disponible).
+
+    Deux ponts permettent d'y soumettre du travail :
+    - `run(coro)`       : depuis du code synchrone (routes `def`, scripts).
+    - `run_async(coro)` : depuis n'importe quelle autre boucle asyncio (routes `async def`).
+
+    Un appel en attente de réponse ne coûte donc qu'une coroutine, et plus un
+    thread bloqué sur `requests.post` + `time.sleep`.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Pattern Singleton : un seul pool de connexions par processus."""
+        if cls._instance is None:
+            cls._instance = super(LLMClient, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    # ==========================================================================
+    # BOUCLE DÉDIÉE
+    # ==========================================================================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Démarre (une seule fois) la boucle asyncio du noyau IA."""
+        if self._loop is not None and self._loop.is_running():
+            return self._loop
+
+        with self._lock:
+            if self._loop is not None and self._loop.is_running():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _runner():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_runner, name="llm-kernel-loop", daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._thread = thread
+            logger.info("✨ Boucle asynchrone du noyau IA démarrée (thread 'llm-kernel-loop').")
+            return loop
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._ensure_loop()
+
+    def in_kernel_loop(self) -> bool:
+        """Indique si l'appelant s'exécute déjà dans la boucle du noyau."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Exécute une coroutine sur la boucle du noyau et attend son résultat
+        (pont pour le code synchrone).
+        """
+        if self.in_kernel_loop():
+            raise RuntimeError("LLMClient.run() appelé depuis la boucle du noyau : utilisez 'await'.")
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return future.result(timeout)
+
+    async def run_async(self, coro: Awaitable[T]) -> T:
+        """
+        Exécute une coroutine sur la boucle du noyau depuis une autre boucle
+        asyncio, sans bloquer cette dernière. L'annulation est propagée.
+        """
+        if self.in_kernel_loop():
+            return await coro
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def iterate(self, agen: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Consomme un générateur asynchrone exécuté sur la boucle du noyau depuis
+        du code synchrone (ex: `StreamingResponse` d'une route `def`).
+        """
+        loop = self._ensure_loop()
+        try:
+            while True:
+                item = asyncio.run_coroutine_threadsafe(_anext_or_sentinel(agen), loop).result()
+                if item is _END_OF_STREAM:
+                    break
+                yield item
+        finally:
+            asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result(timeout=5)
+
+    async def iterate_async(self, agen: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Équivalent asynchrone de `iterate` (depuis une autre boucle asyncio)."""
+        if self.in_kernel_loop():
+            async for item in agen:
+                yield item
+            return
+        loop = self._ensure_loop()
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(_anext_or_sentinel(agen), loop)
+                item = await asyncio.wrap_future(future)
+                if item is _END_OF_STREAM:
+                    break
+                yield item
+        finally:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(agen.aclose(), loop))
+
+    # ==========================================================================
+    # TRANSPORT HTTP
+    # ==========================================================================
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Crée paresseusement le client HTTP partagé (dans la boucle du noyau)."""
+        if self._http is None or self._http.is_closed:
+            use_http2 = settings.LLM_HTTP2_ENABLED and _H2_AVAILABLE
+            if settings.LLM_HTTP2_ENABLED and not _H2_AVAILABLE:
+                logger.warning("   ⚠️ Paquet 'h2' absent : repli sur HTTP/1.1 keep-alive.")
+
+            self._http = httpx.AsyncClient(
+                http2=use_http2,
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(DEFAULT_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+                headers={
+                    "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://expert-cmck.onrender.com",
+                    "X-Title": "STI Medical Expert System"
+                },
+            )
+            logger.info(
+                f"🔌 Pool HTTP initialisé (HTTP/2={use_http2}, "
+                f"max_connections={settings.LLM_POOL_MAX_CONNECTIONS}, "
+                f"keepalive={settings.LLM_POOL_MAX_KEEPALIVE})"
+            )
+        return self._http
+
+    @staticmethod
+    def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Délai avant la tentative suivante (respecte 'Retry-After' si fourni)."""
+        if retry_after:
+            try:
+                return min(BACKOFF_MAX_SECONDS, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        delay = BACKOFF_BASE_SECONDS * (2 ** (attempt - 1))
+        return min(BACKOFF_MAX_SECONDS, delay) + random.uniform(0, 0.5)
+
+    async def post_chat_completion(
+        self,
+        payload: Dict[str, Any],
+        trace_id: str = "N/A",
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        on_rate_limited: Optional[Callable[[float], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Envoie une requête 'chat/completions' et renvoie le JSON de réponse brut.
+
+        Les erreurs transitoires (réseau, 429, 5xx) sont retentées avec un backoff
+        exponentiel non bloquant (`asyncio.sleep`). Les erreurs client (400, 401, 403)
+        lèvent immédiatement `httpx.HTTPStatusError`.
+
+        `on_rate_limited(delai)` est appelé à chaque 429 (ex: `llm_governor.penalize`)
+        pour que le gel s'applique à tous les appels du processus.
+
+        :raises LLMUnavailableError: si toutes les tentatives ont échoué.
+        """
+        http = self._get_http()
+        attempt = 0
+        retry_after: Optional[str] = None
+
+        while attempt < max_retries:
+            attempt += 1
+
+            if attempt > 1:
+                delay = self._backoff_delay(attempt - 1, retry_after)
+                logger.warning(f"   🔄 [{trace_id}] Tentative réseau {attempt}/{max_retries} dans {delay:.1f}s...")
+                await asyncio.sleep(delay)
+            retry_after = None
+
+            start_time = time.time()
+            try:
+                logger.debug(f"   🚀 [{trace_id}] Envoi requête POST vers {OPENROUTER_API_URL}...")
+                response = await http.post(OPENROUTER_API_URL, json=payload, timeout=timeout)
+                latency = time.time() - start_time
+
+                if response.status_code == 200:
+                    logger.debug(f"   📡 [{trace_id}] HTTP 200 ({response.http_version}) en {latency:.2f}s")
+                    return response.json()
+
+                if response.status_code == 429:
+                    retry_after = response.headers.get("Retry-After")
+                    logger.warning(f"   ⚠️ [{trace_id}] Rate Limit atteint (429). Retry-After={retry_after or 'N/A'}")
+                    if on_rate_limited is not None:
+                        on_rate_limited(self._backoff_delay(attempt, retry_after))
+                    continue
+
+                if response.status_code >= 500:
+                    logger.error(f"   🔥 [{trace_id}] Erreur Serveur IA ({response.status_code}).")
+                    logger.debug(f"      Body: {response.text}")
+                    continue
+
+                # Erreur client (400, 401, 403) -> Pas de retry
+                logger.critical(f"   ⛔ [{trace_id}] Erreur Client {response.status_code}.")
+                logger.critical(f"      Réponse: {response.text}")
+                response.raise_for_status()
+
+            except httpx.HTTPStatusError:
+                raise
+            except httpx.HTTPError as e:
+                logger.error(f"   🌐 [{trace_id}] Exception Réseau ({type(e).__name__}) : {str(e)}")
+                continue
+
+        logger.critical(f"   💀 [{trace_id}] ÉCHEC TOTAL après {max_retries} tentatives réseaux.")
+        raise LLMUnavailableError(f"Fournisseur LLM injoignable après {max_retries} tentatives.")
+
+    async def stream_chat_completion(
+        self,
+        payload: Dict[str, Any],
+        trace_id: str = "N/A",
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        on_rate_limited: Optional[Callable[[float], None]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Variante 'stream' de `post_chat_completion` : renvoie les fragments de texte
+        (deltas) au fil de leur génération (protocole SSE d'OpenRouter).
+
+        Les erreurs transitoires ne sont retentées que tant qu'aucun token n'a été
+        transmis : une fois le flux entamé, une coupure termine simplement le flux.
+
+        :raises LLMUnavailableError: si le flux n'a jamais pu démarrer.
+        """
+        http = self._get_http()
+        stream_payload = dict(payload, stream=True)
+        attempt = 0
+        retry_after: Optional[str] = None
+
+        while attempt < max_retries:
+            attempt += 1
+            if attempt > 1:
+                delay = self._backoff_delay(attempt - 1, retry_after)
+                logger.warning(f"   🔄 [{trace_id}] Tentative stream {attempt}/{max_retries} dans {delay:.1f}s...")
+                await asyncio.sleep(delay)
+            retry_after = None
+
+            start_time = time.time()
+            first_token_at: Optional[float] = None
+            try:
+                async with http.stream("POST", OPENROUTER_API_URL, json=stream_payload, timeout=timeout) as response:
+                    if response.status_code == 429:
+                        retry_after = response.headers.get("Retry-After")
+                        logger.warning(f"   ⚠️ [{trace_id}] Rate Limit atteint (429) sur stream.")
+                        if on_rate_limited is not None:
+                            on_rate_limited(self._backoff_delay(attempt, retry_after))
+                        continue
+                    if response.status_code >= 500:
+                        logger.error(f"   🔥 [{trace_id}] Erreur Serveur IA ({response.status_code}) sur stream.")
+                        continue
+                    if response.status_code != 200:
+                        await response.aread()
+                        logger.critical(f"   ⛔ [{trace_id}] Erreur Client {response.status_code} : {response.text}")
+                        response.raise_for_status()
+
+                    async for line in response.aiter_lines():
+                        # Les lignes commençant par ':' sont des commentaires keep-alive
+                        if not line or not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                        except json.JSONDecodeError:
+                            logger.debug(f"   [{trace_id}] Fragment SSE illisible ignoré : {data[:80]}")
+                            continue
+
+                        choices = chunk.get("choices") or []
+                        delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                        if delta:
+                            if first_token_at is None:
+                                first_token_at = time.time()
+                                logger.info(f"   ⚡ [{trace_id}] Premier token en {first_token_at - start_time:.2f}s")
+                            yield delta
+
+                logger.info(f"   ✅ [{trace_id}] Stream terminé en {time.time() - start_time:.2f}s")
+                return
+
+            except httpx.HTTPStatusError:
+                raise
+            except httpx.HTTPError as e:
+                logger.error(f"   🌐 [{trace_id}] Exception Réseau sur stream ({type(e).__name__}) : {str(e)}")
+                if first_token_at is not None:
+                    # Flux déjà entamé : on ne rejoue pas (le client a déjà reçu des tokens)
+                    return
+                continue
+
+        logger.critical(f"   💀 [{trace_id}] ÉCHEC TOTAL du stream après {max_retries} tentatives.")
+        raise LLMUnavailableError(f"Stream LLM impossible après {max_retries} tentatives.")
+
+    # ==========================================================================
+    # CYCLE DE VIE
+    # ==========================================================================
+
+    async def _aclose(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+
+    def shutdown(self):
+        """Ferme le pool HTTP et arrête la boucle du noyau (arrêt de l'application)."""
+        with self._lock:
+            loop = self._loop
+            if loop is None or not loop.is_running():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._aclose(), loop).result(timeout=5)
+            except Exception as e:
+                logger.error(f"   ❌ Erreur fermeture pool HTTP : {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+            logger.info("🛑 Boucle du noyau IA arrêtée.")
+
+
+# Instance globale prête à l'emploi
+llm_client = LLMClient()
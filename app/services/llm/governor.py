@@ -0,0 +1,212 @@
+#=== Fichier: ./app/services/llm/governor.py ===
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ...config import settings
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-GOVERNOR"
+# ==============================================================================
+logger = logging.getLogger("llm_governor")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LLM-GOVERNOR] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+
+class LLMGovernor:
+    """
+    Ordonnanceur central des appels LLM (exécuté sur la boucle du noyau IA).
+
+    Deux limites s'appliquent avant qu'une requête ne parte vers le fournisseur :
+    - un plafond de requêtes simultanées (`max_concurrency`) ;
+    - un seau à jetons (`rate_per_second`, `burst`) qui lisse le débit. Un 429
+      du fournisseur vide le seau et le gèle pendant le Retry-After (`penalize`).
+
+    Les requêtes en attente sont servies par priorité (0 = plus urgente), puis
+    par ordre d'arrivée : une vague de soumissions finales ne peut plus affamer
+    les conversations en direct.
+    """
+
+    def __init__(self, max_concurrency: int, rate_per_second: float, burst: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+
+        self._active = 0
+        self._waiting: List[Tuple[int, int, str, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self._stats_lock = threading.Lock()
+        self._task_stats: Dict[str, Dict[str, float]] = {}
+        self._rate_limited = 0
+
+    # ==========================================================================
+    # ACQUISITION / LIBÉRATION
+    # ==========================================================================
+
+    @asynccontextmanager
+    async def slot(self, task_name: str, priority: int) -> AsyncIterator[None]:
+        """Réserve une place d'appel LLM pour la durée du bloc `async with`."""
+        await self.acquire(task_name, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, task_name: str, priority: int) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        enqueued_at = time.monotonic()
+        heapq.heappush(self._waiting, (priority, next(self._seq), task_name, enqueued_at, future))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Annulé après avoir obtenu la place : on la rend immédiatement
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+        wait = time.monotonic() - enqueued_at
+        self._record_wait(task_name, wait)
+        if wait > 1.0:
+            logger.info(f"   ⏳ [{task_name}] Place obtenue après {wait:.2f}s d'attente (priorité {priority}).")
+
+    def release(self) -> None:
+        self._active = max(0, self._active - 1)
+        self._dispatch()
+
+    def penalize(self, retry_after: float) -> None:
+        """
+        Signale un 429 du fournisseur : plus aucun appel ne part avant `retry_after`
+        secondes (pour tout le processus, pas seulement pour l'appel fautif).
+        """
+        with self._stats_lock:
+            self._rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + max(0.0, retry_after))
+        self._tokens = 0.0
+        logger.warning(f"   🧊 Débit gelé {retry_after:.1f}s suite à un 429 du fournisseur.")
+
+    # ==========================================================================
+    # ORDONNANCEMENT
+    # ==========================================================================
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate_per_second > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def _seconds_until_token(self) -> float:
+        """0 si un appel peut partir maintenant, sinon délai avant le prochain jeton."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.rate_per_second <= 0:
+            return 0.0
+        self._refill()
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate_per_second
+
+    def _dispatch(self) -> None:
+        while self._waiting and self._active < self.max_concurrency:
+            future = self._waiting[0][4]
+            if future.done():
+                # Appelant annulé pendant l'attente
+                heapq.heappop(self._waiting)
+                continue
+
+            delay = self._seconds_until_token()
+            if delay > 0:
+                self._schedule_wakeup(delay)
+                return
+
+            heapq.heappop(self._waiting)
+            if self.rate_per_second > 0:
+                self._tokens -= 1.0
+            self._active += 1
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            return
+        loop = asyncio.get_running_loop()
+
+        def _wake():
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = loop.call_later(delay, _wake)
+
+    # ==========================================================================
+    # MÉTRIQUES
+    # ==========================================================================
+
+    @property
+    def queue_depth(self) -> int:
+        """Nombre d'appels en attente d'une place."""
+        return sum(1 for entry in self._waiting if not entry[4].done())
+
+    def _record_wait(self, task_name: str, wait: float) -> None:
+        with self._stats_lock:
+            stats = self._task_stats.setdefault(task_name, {"acquired": 0, "total_wait": 0.0, "max_wait": 0.0})
+            stats["acquired"] += 1
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Profondeur des files par tâche, places actives et temps d'attente."""
+        depth: Dict[str, int] = {}
+        for _, _, task_name, _, future in list(self._waiting):
+            if not future.done():
+                depth[task_name] = depth.get(task_name, 0) + 1
+
+        with self._stats_lock:
+            per_task = {
+                name: {
+                    "acquired": int(s["acquired"]),
+                    "avg_wait_ms": round(s["total_wait"] / s["acquired"] * 1000, 1) if s["acquired"] else 0.0,
+                    "max_wait_ms": round(s["max_wait"] * 1000, 1),
+                    "queued": depth.get(name, 0),
+                }
+                for name, s in self._task_stats.items()
+            }
+            rate_limited = self._rate_limited
+        for name, queued in depth.items():
+            per_task.setdefault(name, {"acquired": 0, "avg_wait_ms": 0.0, "max_wait_ms": 0.0, "queued": queued})
+
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": sum(depth.values()),
+            "tokens_available": round(self._tokens, 2),
+            "rate_per_second": self.rate_per_second,
+            "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "rate_limited_total": rate_limited,
+            "tasks": per_task,
+        }
+
+
+# Instance globale (une par processus, partagée par toutes les tâches IA)
+llm_governor = LLMGovernor(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    rate_per_second=settings.LLM_RATE_LIMIT_PER_SECOND,
+    burst=settings.LLM_RATE_LIMIT_BURST,
+)
@@ -0,0 +1,198 @@
+#=== Fichier: ./app/services/llm/hedging.py ===
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from .client import LLMUnavailableError
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-HEDGING"
+# ==============================================================================
+logger = logging.getLogger("llm_hedging")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LLM-HEDGING] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+T = TypeVar("T")
+
+LATENCY_WINDOW = 200       # Derniers appels conservés par (modèle, tâche)
+MIN_SAMPLES_FOR_P95 = 20   # En dessous : délai de relance par défaut
+
+
+class ModelLatencyTracker:
+    """
+    Statistiques glissantes de latence et d'erreurs par couple (modèle, tâche).
+
+    Le p95 d'un couple sert de délai de relance ('hedge') : si le modèle principal
+    n'a pas répondu dans ce délai, il est probablement dans sa traîne de latence.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+    def _counter(self, key: Tuple[str, str]) -> Dict[str, int]:
+        return self._counters.setdefault(key, {"success": 0, "errors": 0, "cancelled": 0, "hedged": 0})
+
+    def record_success(self, model: str, task: str, latency: float) -> None:
+        with self._lock:
+            key = (model, task)
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+            self._counter(key)["success"] += 1
+
+    def record_error(self, model: str, task: str) -> None:
+        with self._lock:
+            self._counter((model, task))["errors"] += 1
+
+    def record_cancelled(self, model: str, task: str, elapsed: float) -> None:
+        """
+        Appel abandonné (un autre modèle a répondu avant). Sa durée est une borne
+        basse de sa latence réelle : on la garde pour ne pas sous-estimer le p95.
+        """
+        with self._lock:
+            key = (model, task)
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(elapsed)
+            self._counter(key)["cancelled"] += 1
+
+    def record_hedge(self, model: str, task: str) -> None:
+        with self._lock:
+            self._counter((model, task))["hedged"] += 1
+
+    def percentile(self, model: str, task: str, pct: float = 0.95) -> Optional[float]:
+        """Percentile de latence, ou None si l'échantillon est trop petit."""
+        with self._lock:
+            samples = sorted(self._latencies.get((model, task), ()))
+        if len(samples) < MIN_SAMPLES_FOR_P95:
+            return None
+        index = min(len(samples) - 1, int(round(pct * (len(samples) - 1))))
+        return samples[index]
+
+    def error_rate(self, model: str, task: str) -> float:
+        with self._lock:
+            counter = self._counters.get((model, task))
+            if not counter:
+                return 0.0
+            total = counter["success"] + counter["errors"]
+            return counter["errors"] / total if total else 0.0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            keys = set(self._counters) | set(self._latencies)
+            snapshot = {
+                key: (sorted(self._latencies.get(key, ())), dict(self._counter(key)))
+                for key in keys
+            }
+        result: Dict[str, Dict[str, Any]] = {}
+        for (model, task), (samples, counter) in snapshot.items():
+            def pick(pct: float) -> Optional[float]:
+                if not samples:
+                    return None
+                return round(samples[min(len(samples) - 1, int(round(pct * (len(samples) - 1))))], 3)
+            total = counter["success"] + counter["errors"]
+            result.setdefault(model, {})[task] = dict(
+                counter,
+                samples=len(samples),
+                p50_s=pick(0.50),
+                p95_s=pick(0.95),
+                error_rate=round(counter["errors"] / total, 4) if total else 0.0,
+            )
+        return result
+
+
+async def hedged_call(
+    candidates: List[str],
+    call: Callable[[str], Awaitable[T]],
+    hedge_delay: Callable[[str], float],
+    is_valid: Callable[[T], bool],
+    task: str,
+    tracker: "ModelLatencyTracker",
+    allow_hedge: Callable[[], bool] = lambda: True,
+) -> Tuple[str, T]:
+    """
+    Appelle les modèles `candidates` (ordre de préférence) en relance différée.
+
+    - Le premier modèle est appelé immédiatement.
+    - S'il n'a pas répondu après `hedge_delay(modele)`, le suivant est lancé en
+      parallèle (si `allow_hedge()`), et ainsi de suite.
+    - Un échec (exception ou réponse invalide) déclenche aussitôt le suivant.
+    - La première réponse valide l'emporte : les appels restants sont annulés.
+
+    :return: (modèle gagnant, réponse).
+    :raises LLMUnavailableError: si aucun modèle n'a fourni de réponse valide.
+    """
+    if not candidates:
+        raise LLMUnavailableError("Aucun modèle disponible pour cette tâche.")
+
+    pending: Dict[asyncio.Task, Tuple[str, float]] = {}
+    next_index = 0
+    last_error: Optional[BaseException] = None
+
+    def launch() -> None:
+        nonlocal next_index
+        model = candidates[next_index]
+        next_index += 1
+        pending[asyncio.ensure_future(call(model))] = (model, time.monotonic())
+
+    launch()
+    try:
+        while pending:
+            timeout = None
+            if next_index < len(candidates):
+                # Délai de relance calé sur le dernier modèle lancé
+                last_model, last_started = max(pending.values(), key=lambda v: v[1])
+                timeout = max(0.0, hedge_delay(last_model) - (time.monotonic() - last_started))
+
+            done, _ = await asyncio.wait(pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                if allow_hedge():
+                    hedge_model = candidates[next_index]
+                    logger.info(f"   🪃 [{task}] Pas de réponse à temps : relance en parallèle sur '{hedge_model}'.")
+                    tracker.record_hedge(hedge_model, task)
+                    launch()
+                else:
+                    # Fournisseur saturé : relancer ne ferait qu'aggraver la file
+                    next_index = len(candidates)
+                continue
+
+            for finished in done:
+                model, started = pending.pop(finished)
+                try:
+                    result = finished.result()
+                except Exception as e:
+                    last_error = e
+                    tracker.record_error(model, task)
+                    logger.warning(f"   ⚠️ [{task}] Échec du modèle '{model}' : {type(e).__name__}")
+                    continue
+                if not is_valid(result):
+                    tracker.record_error(model, task)
+                    logger.warning(f"   ⚠️ [{task}] Réponse invalide du modèle '{model}'.")
+                    continue
+                tracker.record_success(model, task, time.monotonic() - started)
+                return model, result
+
+            # Tous les appels terminés ont échoué : on passe au suivant sans attendre
+            if not pending and next_index < len(candidates):
+                launch()
+    finally:
+        for task_future, (model, started) in pending.items():
+            task_future.cancel()
+            tracker.record_cancelled(model, task, time.monotonic() - started)
+
+    if isinstance(last_error, LLMUnavailableError) or last_error is None:
+        raise last_error or LLMUnavailableError("Aucune réponse valide des modèles disponibles.")
+    raise last_error
+
+
+# Statistiques globales (par processus)
+model_latency_tracker = ModelLatencyTracker()
@@ -0,0 +1,162 @@
+#=== Fichier: ./app/services/llm/json_repair.py ===
+
+import json
+import logging
+import re
+from typing import Any, List, Optional, Tuple
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-JSON-REPAIR"
+# ==============================================================================
+logger = logging.getLogger("llm_json_repair")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LLM-JSON-REPAIR] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*", re.IGNORECASE)
+_CLOSERS = {"{": "}", "[": "]"}
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def _scan(text: str, start: int) -> Tuple[List[str], List[str], bool, List[Tuple[int, List[str]]]]:
+    """
+    Parcourt le JSON caractère par caractère à partir de `start` (première
+    accolade/crochet) et produit une version normalisée :
+    - les retours à la ligne bruts dans les chaînes sont échappés ;
+    - les virgules traînantes avant '}' / ']' sont supprimées ;
+    - les littéraux Python (True/False/None) sont convertis ;
+    - tout ce qui suit la fermeture de l'objet racine (prose) est ignoré.
+
+    :return: (fragments de sortie, pile des conteneurs encore ouverts, chaîne
+              ouverte ?, points de reprise [(nb de fragments, pile)] où la
+              sortie est un préfixe cohérent).
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    safe_points: List[Tuple[int, List[str]]] = []
+    in_string = False
+    escaped = False
+    i = start
+
+    while i < len(text):
+        ch = text[i]
+
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(ch)
+            elif ch == "\\":
+                escaped = True
+                out.append(ch)
+            elif ch == '"':
+                in_string = False
+                out.append(ch)
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch in "\r\t":
+                out.append("\\r" if ch == "\r" else "\\t")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in _CLOSERS:
+            stack.append(ch)
+            out.append(ch)
+            safe_points.append((len(out), list(stack)))
+        elif ch in "}]":
+            # Virgule traînante : {"a": 1,}
+            while out and out[-1] in " \n\r\t":
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                # Objet racine complet : la suite n'est que de la prose
+                return out, stack, False, safe_points
+            safe_points.append((len(out), list(stack)))
+        elif ch == ",":
+            safe_points.append((len(out), list(stack)))
+            out.append(ch)
+        elif ch.isalpha():
+            # Littéraux nus (true, false, null, True, None...)
+            j = i
+            while j < len(text) and text[j].isalpha():
+                j += 1
+            word = text[i:j]
+            out.append(_PYTHON_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    return out, stack, in_string, safe_points
+
+
+def _close(prefix: str, stack: List[str]) -> str:
+    prefix = prefix.rstrip()
+    if prefix.endswith(","):
+        prefix = prefix[:-1]
+    return prefix + "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def _try_load(candidate: str) -> Optional[Any]:
+    try:
+        return json.loads(candidate)
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def repair_json(raw: str) -> Optional[Any]:
+    """
+    Récupère un objet JSON depuis une sortie LLM malformée ou tronquée
+    (max_tokens atteint), sans nouvel appel au modèle.
+
+    - Blocs Markdown (même non refermés) et prose avant/après sont ignorés.
+    - Une chaîne coupée est refermée telle quelle (texte partiel conservé).
+    - Une clé ou une valeur incomplète en fin de flux est abandonnée, puis les
+      objets/listes encore ouverts sont refermés.
+
+    :return: L'objet réparé, ou None si rien d'exploitable n'a pu être extrait.
+    """
+    if not raw:
+        return None
+    text = _FENCE_PATTERN.sub("", raw)
+    starts = [pos for pos in (text.find("{"), text.find("[")) if pos != -1]
+    if not starts:
+        return None
+
+    fragments, stack, in_string, safe_points = _scan(text, min(starts))
+    out = "".join(fragments)
+
+    if not stack and not in_string:
+        return _try_load(out)
+
+    # Flux tronqué : 1) on referme au point exact de coupure
+    if in_string:
+        trailing_backslashes = len(out) - len(out.rstrip("\\"))
+        if trailing_backslashes % 2:
+            out = out[:-1]  # Séquence d'échappement coupée en deux
+        out += '"'
+    result = _try_load(_close(out, stack))
+    if result is not None:
+        logger.debug(f"   🩹 JSON tronqué refermé au point de coupure ({len(stack)} niveau(x)).")
+        return result
+
+    # 2) sinon on recule jusqu'au dernier préfixe cohérent
+    for count, snapshot in reversed(safe_points):
+        result = _try_load(_close("".join(fragments[:count]), snapshot))
+        if result is not None:
+            logger.debug(f"   🩹 JSON tronqué : fin incomplète abandonnée ({len(fragments) - count} fragment(s)).")
+            return result
+    return None
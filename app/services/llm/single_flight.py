@@ -0,0 +1,101 @@
+#=== Fichier: ./app/services/llm/single_flight.py ===
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-SINGLE-FLIGHT"
+# ==============================================================================
+logger = logging.getLogger("llm_single_flight")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LLM-SINGLE-FLIGHT] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+T = TypeVar("T")
+
+
+def payload_fingerprint(payload: Dict[str, Any]) -> str:
+    """
+    Clé de coalescence d'une requête 'chat/completions' : hash du modèle, des
+    messages, de la température et du mode de réponse (JSON ou texte), ainsi que
+    de `max_tokens` (deux limites différentes ne donnent pas la même réponse).
+    """
+    key = {
+        "model": payload.get("model"),
+        "messages": payload.get("messages"),
+        "temperature": payload.get("temperature"),
+        "json_mode": "response_format" in payload,
+        "max_tokens": payload.get("max_tokens"),
+    }
+    raw = json.dumps(key, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalescence des appels identiques simultanés ("single-flight").
+
+    Le premier appelant d'une clé (le 'leader') déclenche l'appel amont ; les
+    appelants suivants arrivés pendant que cet appel est en vol ('followers')
+    attendent le même résultat (ou la même exception) au lieu de refaire l'appel.
+
+    Toutes les méthodes s'exécutent sur la boucle du noyau IA (`llm_client`).
+    L'appel amont tourne dans une tâche dédiée : l'annulation d'un appelant
+    (ex: client HTTP déconnecté) n'annule pas le résultat attendu par les autres.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "leaders": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Exécute `factory()` une seule fois pour tous les appels concurrents de même clé.
+
+        :param key: Clé de coalescence (cf. `payload_fingerprint`).
+        :param factory: Fabrique de la coroutine amont (appelée par le leader uniquement).
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self._count("leaders")
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+        else:
+            self._count("coalesced")
+            logger.info(f"   🔗 [{self.name}] Requête identique déjà en vol ({key[:10]}) : résultat partagé.")
+        self._count("calls")
+
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._count("errors")
+
+    def _count(self, metric: str) -> None:
+        with self._stats_lock:
+            self._stats[metric] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques de coalescence (taux de partage = coalesced / calls)."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["in_flight"] = len(self._inflight)
+        stats["hit_rate"] = round(stats["coalesced"] / stats["calls"], 4) if stats["calls"] else 0.0
+        return stats
+
+
+# Instance globale pour les appels 'chat/completions'
+completion_single_flight = SingleFlight("chat-completions")
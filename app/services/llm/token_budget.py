@@ -0,0 +1,179 @@
+#=== Fichier: ./app/services/llm/token_budget.py ===
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-TOKENS"
+# ==============================================================================
+logger = logging.getLogger("llm_token_budget")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LLM-TOKENS] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+ENCODING_NAME = "cl100k_base"   # Approximation raisonnable pour les modèles servis par OpenRouter
+CHARS_PER_TOKEN_FALLBACK = 3.5  # Estimation si l'encodeur tiktoken est indisponible
+MESSAGE_OVERHEAD_TOKENS = 4     # Balises de rôle / séparateurs par message
+TRUNCATION_MARKER = "\n... [TRONQUÉ] ...\n"
+
+_encoder_lock = threading.Lock()
+_encoder: Any = None
+_encoder_failed = False
+
+
+def _get_encoder():
+    """Encodeur tiktoken chargé à la première utilisation (None si indisponible)."""
+    global _encoder, _encoder_failed
+    if _encoder is not None or _encoder_failed:
+        return _encoder
+    with _encoder_lock:
+        if _encoder is None and not _encoder_failed:
+            try:
+                import tiktoken
+                _encoder = tiktoken.get_encoding(ENCODING_NAME)
+            except Exception as e:
+                # Fichier BPE non téléchargeable (hors ligne) : on passe à l'estimation
+                _encoder_failed = True
+                logger.warning(f"   ⚠️ Encodeur tiktoken indisponible ({type(e).__name__}) : estimation par caractères.")
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Nombre de tokens d'un texte (compté avant l'envoi au fournisseur)."""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is None:
+        return int(len(text) / CHARS_PER_TOKEN_FALLBACK) + 1
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Taille d'une liste de messages 'chat' (contenu + surcoût par message)."""
+    return sum(count_tokens(str(m.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """
+    Tronque `text` à `max_tokens` tokens.
+
+    :param keep: 'head' garde le début (ex: parcours depuis l'arrivée du patient),
+        'tail' garde la fin (ex: derniers échanges).
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max(0, max_tokens - count_tokens(TRUNCATION_MARKER))
+    encoder = _get_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        kept = tokens[:budget] if keep == "head" else tokens[len(tokens) - budget:]
+        piece = encoder.decode(kept)
+    else:
+        chars = int(budget * CHARS_PER_TOKEN_FALLBACK)
+        piece = text[:chars] if keep == "head" else text[len(text) - chars:]
+    return piece + TRUNCATION_MARKER if keep == "head" else TRUNCATION_MARKER + piece
+
+
+class PromptSection:
+    """
+    Bloc d'un prompt assemblé par `assemble_prompt`.
+
+    :param priority: Ordre de remplissage du budget (0 = servi en premier).
+    :param required: Toujours inclus en entier (consignes, format de sortie...).
+    :param truncate: 'head' / 'tail' si le bloc peut être raccourci pour tenir
+        dans le budget restant, None s'il est tout ou rien.
+    """
+
+    def __init__(self, name: str, text: str, priority: int = 1, required: bool = False, truncate: Optional[str] = None):
+        self.name = name
+        self.text = text or ""
+        self.priority = priority
+        self.required = required
+        self.truncate = truncate
+
+
+def assemble_prompt(sections: List[PromptSection], budget: int, trace_id: str = "N/A") -> str:
+    """
+    Assemble les sections dans leur ordre d'origine en respectant un budget de
+    tokens d'entrée : les sections obligatoires d'abord, puis les autres par
+    priorité ; une section tronquable est raccourcie pour occuper le reste du
+    budget, une section non tronquable qui ne tient pas est omise.
+    """
+    kept: Dict[int, str] = {}
+    remaining = budget
+
+    for index, section in enumerate(sections):
+        if section.required:
+            kept[index] = section.text
+            remaining -= count_tokens(section.text)
+
+    optional = sorted(
+        (i for i, s in enumerate(sections) if not s.required),
+        key=lambda i: sections[i].priority
+    )
+    for index in optional:
+        section = sections[index]
+        size = count_tokens(section.text)
+        if size <= remaining:
+            kept[index] = section.text
+            remaining -= size
+        elif section.truncate and remaining > 0:
+            kept[index] = truncate_to_tokens(section.text, remaining, keep=section.truncate)
+            logger.info(f"   ✂️ [{trace_id}] Section '{section.name}' réduite à {remaining}/{size} tokens (budget {budget}).")
+            remaining = 0
+        else:
+            logger.info(f"   ✂️ [{trace_id}] Section '{section.name}' omise ({size} tokens, reste {max(0, remaining)}).")
+
+    if remaining < 0:
+        logger.warning(f"   ⚠️ [{trace_id}] Sections obligatoires au-delà du budget ({budget - remaining}/{budget} tokens).")
+    return "".join(kept[i] for i in sorted(kept))
+
+
+def fit_messages(
+    messages: List[Dict[str, Any]],
+    budget: int,
+    pinned_head: int = 1,
+    pinned_tail: int = 1,
+    trace_id: str = "N/A"
+) -> List[Dict[str, Any]]:
+    """
+    Réduit une conversation à `budget` tokens en retirant les messages les plus
+    anciens du milieu. Les `pinned_head` premiers (prompt système), les
+    `pinned_tail` derniers (question courante) et les messages 'system'
+    intermédiaires (contexte dynamique) sont toujours conservés.
+    """
+    total = count_message_tokens(messages)
+    if total <= budget or len(messages) <= pinned_head + pinned_tail:
+        return messages
+
+    head = messages[:pinned_head]
+    tail = messages[len(messages) - pinned_tail:] if pinned_tail else []
+    middle = list(messages[pinned_head:len(messages) - pinned_tail])
+
+    def drop_oldest(roles) -> bool:
+        nonlocal total
+        for index, message in enumerate(middle):
+            if message.get("role") in roles:
+                total -= count_message_tokens([middle.pop(index)])
+                return True
+        return False
+
+    dropped = 0
+    while total > budget and drop_oldest(("user", "assistant")):
+        dropped += 1
+    # L'historique ne doit pas commencer par une réplique du patient orpheline
+    first_turn = next((m for m in middle if m.get("role") != "system"), None)
+    if first_turn is not None and first_turn.get("role") == "assistant":
+        drop_oldest(("assistant",))
+        dropped += 1
+
+    logger.info(f"   ✂️ [{trace_id}] {dropped} message(s) ancien(s) retiré(s) pour tenir dans {budget} tokens.")
+    return head + middle + tail
@@ -0,0 +1,240 @@
+#=== Fichier: ./app/services/llm_work_executor.py ===
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict
+
+from ..config import settings
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LLM-WORK"
+# ==============================================================================
+logger = logging.getLogger("llm_work_executor")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LLM-WORK] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+
+class LlmWorkSaturatedError(Exception):
+    """Capacité dédiée au travail IA saturée : la demande est refusée sans attendre."""
+
+    def __init__(self, pool_name: str, retry_after: int):
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+        super().__init__(f"Capacité '{pool_name}' saturée, réessayer dans {retry_after}s.")
+
+
+class _BoundedWork:
+    """
+    Compteurs communs : travaux actifs (au plus `max_workers`), travaux en
+    attente (au plus `max_queued`), refus et pics d'occupation.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queued: int, retry_after_seconds: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max(0, max_queued)
+        self.retry_after_seconds = max(1, retry_after_seconds)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self._stats = {"admitted": 0, "rejected": 0, "queue_timeouts": 0, "completed": 0,
+                       "peak_active": 0, "peak_queued": 0}
+
+    def _mark_active(self) -> None:
+        """À appeler sous verrou."""
+        self._active += 1
+        self._stats["admitted"] += 1
+        self._stats["peak_active"] = max(self._stats["peak_active"], self._active)
+
+    def _mark_queued(self) -> None:
+        """À appeler sous verrou."""
+        self._queued += 1
+        self._stats["peak_queued"] = max(self._stats["peak_queued"], self._queued)
+
+    def _saturated(self, label: str) -> LlmWorkSaturatedError:
+        """À appeler sous verrou : comptabilise le refus et prépare l'erreur."""
+        self._stats["rejected"] += 1
+        logger.warning(
+            f"   🚫 [{self.name}] '{label}' refusé : {self._active} actif(s), "
+            f"{self._queued} en attente (max {self.max_workers} + {self.max_queued})."
+        )
+        return LlmWorkSaturatedError(self.name, self.retry_after_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats.update({
+                "active": self._active,
+                "queued": self._queued,
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+            })
+        stats["utilization"] = round(stats["active"] / self.max_workers, 3)
+        return stats
+
+
+class LlmWorkExecutor(_BoundedWork):
+    """
+    Pool de threads dédié aux traitements synchrones liés à un LLM (jobs
+    d'arrière-plan). Sa file est bornée : au-delà, `submit` lève
+    `LlmWorkSaturatedError` au lieu d'empiler indéfiniment.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queued: int, retry_after_seconds: int):
+        super().__init__(name, max_workers, max_queued, retry_after_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+
+    def submit(self, label: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._active + self._queued >= self.max_workers + self.max_queued:
+                raise self._saturated(label)
+            self._mark_queued()
+        try:
+            return self._executor.submit(self._run, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    def _run(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._mark_active()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._stats["completed"] += 1
+
+
+class LlmRequestGate(_BoundedWork):
+    """
+    Contrôle d'admission des requêtes HTTP qui attendent un LLM (routes
+    `async def`) : `max_workers` requêtes traitées à la fois, `max_queued` en
+    attente pendant au plus `queue_timeout` secondes. Au-delà, refus immédiat
+    (`LlmWorkSaturatedError`, traduit en 503 + Retry-After par l'API).
+
+    Les lectures CRUD ne passent pas par ici : une vague d'évaluations lentes
+    ne peut plus retarder `GET /symptoms`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queued: int,
+        queue_timeout: float,
+        retry_after_seconds: int
+    ):
+        super().__init__(name, max_workers, max_queued, retry_after_seconds)
+        self.queue_timeout = queue_timeout
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @asynccontextmanager
+    async def slot(self, label: str) -> AsyncIterator[None]:
+        """Réserve une place pour la durée du bloc `async with`."""
+        await self.acquire(label)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, label: str) -> None:
+        with self._lock:
+            if self._active < self.max_workers and not self._waiters:
+                self._mark_active()
+                return
+            if self._queued >= self.max_queued:
+                raise self._saturated(label)
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._mark_queued()
+
+        enqueued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = waiter not in self._waiters and waiter.done() and not waiter.cancelled()
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._queued -= 1
+                # Place transmise mais pas encore remise : `_grant` la rendra.
+                if isinstance(e, asyncio.TimeoutError):
+                    self._stats["queue_timeouts"] += 1
+                    logger.warning(f"   ⌛ [{self.name}] '{label}' : aucune place après {self.queue_timeout:.0f}s d'attente.")
+                    raise LlmWorkSaturatedError(self.name, self.retry_after_seconds) from None
+            if granted:
+                # Annulé après avoir obtenu la place : on la rend immédiatement
+                self._release(completed=False)
+            raise
+
+        wait = time.monotonic() - enqueued_at
+        if wait > 1.0:
+            logger.info(f"   ⏳ [{self.name}] '{label}' admis après {wait:.2f}s d'attente.")
+
+    def release(self) -> None:
+        self._release(completed=True)
+
+    def _release(self, completed: bool) -> None:
+        with self._lock:
+            if completed:
+                self._stats["completed"] += 1
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                self._queued -= 1
+                if waiter.done():
+                    continue
+                # La place passe directement au suivant (`_active` inchangé)
+                self._stats["admitted"] += 1
+                waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+                return
+            self._active -= 1
+
+    def _grant(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # Le demandeur a abandonné entre-temps : place rendue au suivant
+            with self._lock:
+                self._stats["admitted"] -= 1
+            self._release(completed=False)
+            return
+        waiter.set_result(None)
+
+
+# ==============================================================================
+# INSTANCES GLOBALES (par processus)
+# ==============================================================================
+# Requêtes HTTP dont le traitement attend un LLM (actions, indices, soumission, chat)
+llm_request_gate = LlmRequestGate(
+    "llm-requests",
+    max_workers=settings.LLM_WORK_MAX_ACTIVE,
+    max_queued=settings.LLM_WORK_MAX_QUEUED,
+    queue_timeout=settings.LLM_WORK_QUEUE_TIMEOUT_SECONDS,
+    retry_after_seconds=settings.LLM_WORK_RETRY_AFTER_SECONDS
+)
+
+# Analyse du Tuteur en arrière-plan (cf. chat_service)
+tutor_analysis_executor = LlmWorkExecutor(
+    "tutor-analysis",
+    max_workers=settings.TUTOR_ANALYSIS_WORKERS,
+    max_queued=settings.TUTOR_ANALYSIS_MAX_QUEUED,
+    retry_after_seconds=settings.LLM_WORK_RETRY_AFTER_SECONDS
+)
+
+
+def get_llm_work_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        "llm_requests": llm_request_gate.stats(),
+        "tutor_analysis": tutor_analysis_executor.stats(),
+    }
@@ -0,0 +1,599 @@
+#=== Fichier: ./app/services/local_grader_service.py ===
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from .. import models, schemas
+from ..config import settings
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "LOCAL-GRADER"
+# ==============================================================================
+logger = logging.getLogger("local_grader")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [LOCAL-GRADER] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# ==============================================================================
+# CONSTANTES
+# ==============================================================================
+# Méthodes de résolution du diagnostic (de la plus sûre à la moins sûre)
+MATCH_EXACT = "exact"
+MATCH_SYNONYM = "synonyme"
+MATCH_LOCAL_NAME = "nom_local"
+MATCH_EMBEDDING = "embedding"
+
+# Barème diagnostic /10 (mêmes paliers que la consigne du jury LLM)
+DIAG_SCORE_EXACT = 10.0
+DIAG_SCORE_EMBEDDING = 9.0      # Bonne pathologie, reconnue par similarité seulement
+DIAG_SCORE_INCOMPLETE = 8.0     # Ex: "Paludisme" pour "Paludisme grave"
+DIAG_SCORE_SAME_FAMILY = 5.0    # Même catégorie de pathologie
+DIAG_SCORE_WRONG = 1.0
+
+# Démarche /5 : couverture de l'anamnèse attendue, couverture et pertinence des examens
+DEMARCHE_WEIGHT_QUESTIONS = 0.5
+DEMARCHE_WEIGHT_EXAM_COVERAGE = 0.35
+DEMARCHE_WEIGHT_EXAM_RELEVANCE = 0.15
+# Sans modèle d'embedding : recouvrement des mots (coefficient de Dice)
+LEXICAL_MATCH_THRESHOLD = 0.5
+_LEXICAL_STOPWORDS = {"avez", "vous", "votre", "etes", "avoir", "dans", "pour", "avec", "elle", "elles",
+                      "cette", "quel", "quelle", "quels", "quelles", "sont", "fait", "faites"}
+# Toujours pertinents, jamais comptés comme examens superflus
+EXAM_RELEVANCE_IGNORED_CODES = {"CONSTANTES"}
+MAX_MISSED_ITEMS = 10
+
+DISEASE_INDEX_TTL_SECONDS = 300.0
+_SPLIT_NAMES = re.compile(r"[,;/|]|\bou\b")
+
+
+def _normalize(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation (comparaisons lexicales)."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    return text.strip()
+
+
+def _contains_phrase(haystack: str, phrase: str) -> bool:
+    """`phrase` apparaît en mots entiers dans `haystack` (tous deux normalisés)."""
+    return bool(phrase) and f" {phrase} " in f" {haystack} "
+
+
+class LocalGrade:
+    """Notes calculées localement ; None = non décidable sans le jury LLM."""
+
+    def __init__(
+        self,
+        score_diagnostic: Optional[float],
+        score_therapeutique: Optional[float],
+        score_demarche: Optional[float],
+        details: Dict[str, Any]
+    ):
+        self.score_diagnostic = score_diagnostic
+        self.score_therapeutique = score_therapeutique
+        self.score_demarche = score_demarche
+        self.details = details
+
+    @property
+    def is_complete(self) -> bool:
+        return None not in (self.score_diagnostic, self.score_therapeutique, self.score_demarche)
+
+    def to_result(self) -> schemas.simulation.EvaluationResult:
+        s_diag = self.score_diagnostic or 0.0
+        s_ther = self.score_therapeutique or 0.0
+        s_dem = self.score_demarche or 0.0
+        return schemas.simulation.EvaluationResult(
+            score_diagnostic=s_diag,
+            score_therapeutique=s_ther,
+            score_demarche=s_dem,
+            score_total=round(s_diag + s_ther + s_dem, 2)
+        )
+
+    def missed_items(self) -> Dict[str, List[str]]:
+        """Questions d'anamnèse et examens attendus que l'apprenant n'a pas abordés."""
+        demarche = self.details.get("demarche") or {}
+        return {
+            "questions": (demarche.get("anamnese") or {}).get("manquees") or [],
+            "examens": (demarche.get("examens") or {}).get("manques") or [],
+        }
+
+
+# ==============================================================================
+# RÉSOLUTION DU DIAGNOSTIC
+# ==============================================================================
+
+class _DiseaseEntry:
+    def __init__(self, disease: models.Disease):
+        self.id = disease.id
+        self.nom_fr = disease.nom_fr
+        self.categorie = disease.categorie
+        self.exact = {_normalize(disease.nom_fr)} - {""}
+        self.words = set(_normalize(disease.nom_fr).split())
+        self.synonyms = {_normalize(disease.nom_en), _normalize(disease.code_icd10)} - {""}
+        self.local_names = {_normalize(name) for name in _SPLIT_NAMES.split(disease.nom_local or "")} - {""}
+
+
+class DiseaseResolver:
+    """
+    Associe le diagnostic libre d'un apprenant à une pathologie de la base :
+    nom exact, synonyme (nom anglais, code CIM-10), nom local, puis plus proche
+    voisin par embedding (pgvector) au-delà de GRADER_DISEASE_MIN_SIMILARITY.
+
+    Les noms des pathologies sont gardés en mémoire (rechargés toutes les
+    DISEASE_INDEX_TTL_SECONDS).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Optional[List[_DiseaseEntry]] = None
+        self._loaded_at = 0.0
+
+    def _index(self, db: Session) -> List[_DiseaseEntry]:
+        with self._lock:
+            if self._entries is None or time.monotonic() - self._loaded_at > DISEASE_INDEX_TTL_SECONDS:
+                self._entries = [_DiseaseEntry(d) for d in db.query(models.Disease).all()]
+                self._loaded_at = time.monotonic()
+            return self._entries
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries = None
+
+    def entry(self, db: Session, disease_id: int) -> Optional[_DiseaseEntry]:
+        return next((e for e in self._index(db) if e.id == disease_id), None)
+
+    def resolve(self, db: Session, text: str) -> Tuple[Optional[_DiseaseEntry], Optional[str], float]:
+        """:return: (pathologie, méthode, similarité) ou (None, None, 0.0)."""
+        normalized = _normalize(text)
+        if not normalized:
+            return None, None, 0.0
+        entries = self._index(db)
+
+        # 1. Égalité stricte, par ordre de confiance
+        for method, attr in ((MATCH_EXACT, "exact"), (MATCH_SYNONYM, "synonyms"), (MATCH_LOCAL_NAME, "local_names")):
+            for entry in entries:
+                if normalized in getattr(entry, attr):
+                    return entry, method, 1.0
+
+        # 2. Nom cité dans une phrase ("je pense à un paludisme grave") : le plus long l'emporte
+        best: Optional[Tuple[int, _DiseaseEntry, str]] = None
+        for method, attr in ((MATCH_EXACT, "exact"), (MATCH_SYNONYM, "synonyms"), (MATCH_LOCAL_NAME, "local_names")):
+            for entry in entries:
+                for name in getattr(entry, attr):
+                    if len(name) >= 3 and _contains_phrase(normalized, name):
+                        if best is None or len(name) > best[0]:
+                            best = (len(name), entry, method)
+        if best:
+            return best[1], best[2], 1.0
+
+        # 3. Plus proche voisin par embedding
+        return self._nearest(db, entries, text)
+
+    def _nearest(
+        self,
+        db: Session,
+        entries: List[_DiseaseEntry],
+        text: str
+    ) -> Tuple[Optional[_DiseaseEntry], Optional[str], float]:
+        try:
+            # Import tardif : le modèle d'embedding est lourd et optionnel
+            from .embedding_service import embedding_service
+            vector = embedding_service.get_text_embedding(text)
+        except Exception as e:
+            logger.warning(f"   ⚠️ Recherche par embedding indisponible : {e}")
+            return None, None, 0.0
+        if not vector:
+            return None, None, 0.0
+
+        try:
+            # SAVEPOINT : un échec (ex: pgvector absent) n'annule que cette
+            # requête, pas la transaction de l'appelant
+            with db.begin_nested():
+                distance = models.Disease.embedding_vector.cosine_distance(vector)
+                row = db.query(models.Disease.id, distance.label("distance")).filter(
+                    models.Disease.embedding_vector.isnot(None)
+                ).order_by(distance).first()
+        except Exception as e:
+            logger.warning(f"   ⚠️ Recherche par embedding indisponible : {e}")
+            return None, None, 0.0
+
+        if not row:
+            return None, None, 0.0
+        similarity = 1.0 - float(row.distance)
+        if similarity < settings.GRADER_DISEASE_MIN_SIMILARITY:
+            logger.debug(f"   🔎 Plus proche pathologie trop éloignée (similarité {similarity:.2f}).")
+            return None, None, similarity
+        entry = next((e for e in entries if e.id == row.id), None)
+        return entry, MATCH_EMBEDDING if entry else None, similarity
+
+
+# ==============================================================================
+# CORRESPONDANCE DES MÉDICAMENTS
+# ==============================================================================
+
+def _expected_treatments(db: Session, pathology_id: int) -> List[Dict[str, Any]]:
+    rows = db.query(models.TraitementPathologie).options(
+        joinedload(models.TraitementPathologie.medicament)
+    ).filter(
+        models.TraitementPathologie.pathologie_id == pathology_id
+    ).all()
+
+    treatments = []
+    for row in rows:
+        med = row.medicament
+        if not med:
+            continue
+        first_line = row.ligne_traitement == 1 or "premi" in _normalize(row.type_traitement)
+        treatments.append({
+            "nom": med.nom_commercial or med.dci,
+            "appellations": {_normalize(med.dci), _normalize(med.nom_commercial)} - {""},
+            "premiere_ligne": first_line,
+        })
+    # Aucune ligne renseignée : tous les traitements sont considérés essentiels
+    if treatments and not any(t["premiere_ligne"] for t in treatments):
+        for t in treatments:
+            t["premiere_ligne"] = True
+    return treatments
+
+
+def _score_treatment(student_text: str, treatments: List[Dict[str, Any]]) -> Tuple[Optional[float], Dict[str, Any]]:
+    """
+    Molécules citées (DCI ou nom commercial, mots entiers) face aux traitements
+    de référence. Barème /5 : 3 dès qu'une molécule de première ligne est
+    citée, +2 au prorata de la couverture ; sinon au plus 2.
+    """
+    if not treatments:
+        return None, {"raison": "aucun_traitement_de_reference"}
+
+    normalized = _normalize(student_text)
+    found = [t for t in treatments if any(_contains_phrase(normalized, name) for name in t["appellations"])]
+    coverage = len(found) / len(treatments)
+    key_found = any(t["premiere_ligne"] for t in found)
+
+    score = 3.0 + 2.0 * coverage if key_found else 2.0 * coverage
+    details = {
+        "cites": [t["nom"] for t in found],
+        "manquants": [t["nom"] for t in treatments if t not in found],
+        "premiere_ligne_citee": key_found,
+    }
+    return round(min(5.0, score), 2), details
+
+
+# ==============================================================================
+# DÉMARCHE (couverture de l'anamnèse et des examens)
+# ==============================================================================
+
+def _session_activity(db: Session, session_id: uuid.UUID) -> Tuple[List[str], List[str]]:
+    """:return: (messages de l'apprenant, noms des actions réalisées), session complète."""
+    # Import local : chat_service dépend de ai_generation_service, qui dépend de ce module
+    from .chat_service import is_ai_trigger
+
+    messages = db.query(models.ChatMessage.sender, models.ChatMessage.content).filter(
+        models.ChatMessage.session_id == session_id
+    ).order_by(models.ChatMessage.timestamp).all()
+    questions = [content.strip() for sender, content in messages if is_ai_trigger(sender) and content and content.strip()]
+
+    actions = []
+    for (content,) in db.query(models.InteractionLog.action_content).filter(
+        models.InteractionLog.session_id == session_id
+    ).order_by(models.InteractionLog.timestamp).all():
+        name = content.get("name") if isinstance(content, dict) else content
+        if isinstance(name, str) and name.strip():
+            actions.append(name.strip())
+    return questions, actions
+
+
+def _flatten_questions(raw: Any) -> List[str]:
+    """`Symptom.questions_anamnese` : liste, dict (ex: PQRST) ou texte, à plat."""
+    if isinstance(raw, str):
+        return [raw.strip()] if raw.strip() else []
+    if isinstance(raw, dict):
+        if "question" in raw:
+            return _flatten_questions(raw["question"])
+        return [q for value in raw.values() for q in _flatten_questions(value)]
+    if isinstance(raw, list):
+        return [q for item in raw for q in _flatten_questions(item)]
+    return []
+
+
+def _expected_questions(db: Session, case: models.ClinicalCase) -> List[str]:
+    """
+    Questions d'anamnèse des symptômes du cas (à défaut, des symptômes de la
+    pathologie principale), sans doublons.
+    """
+    presentation = case.presentation_clinique or {}
+    symptom_ids = {
+        item.get("symptome_id") for item in (presentation.get("symptomes_patient") or [])
+        if isinstance(item, dict)
+    }
+    symptom_ids.discard(None)
+    if not symptom_ids and case.pathologie_principale_id:
+        symptom_ids = {
+            row.symptome_id for row in db.query(models.PathologieSymptome.symptome_id).filter(
+                models.PathologieSymptome.pathologie_id == case.pathologie_principale_id
+            ).all()
+        }
+    if not symptom_ids:
+        return []
+
+    rows = db.query(models.Symptom.questions_anamnese).filter(
+        models.Symptom.id.in_(symptom_ids)
+    ).order_by(models.Symptom.id).all()
+    questions: Dict[str, str] = {}
+    for (raw,) in rows:
+        for question in _flatten_questions(raw):
+            questions.setdefault(_normalize(question), question)
+    questions.pop("", None)
+    return list(questions.values())
+
+
+def _exam_key(label: str) -> Tuple[Optional[str], str]:
+    """(code du catalogue, libellé affichable) d'un examen du dossier ou demandé."""
+    # Import tardif : exam_catalog_service charge le catalogue depuis la BDD
+    from .exam_catalog_service import exam_catalog
+    entry = exam_catalog.match(label.replace("_", " "), use_embeddings=False)
+    return (entry["code"], entry["nom"]) if entry else (None, label)
+
+
+def _expected_exams(case: models.ClinicalCase) -> Dict[str, str]:
+    """Examens dont le dossier contient un résultat : {clé: libellé}."""
+    paracliniques = case.donnees_paracliniques or {}
+    labels = [str(lab["nom"]) for lab in (paracliniques.get("lab_results") or []) if isinstance(lab, dict) and lab.get("nom")]
+    labels += [
+        str(key) for key, value in paracliniques.items()
+        if key != "lab_results" and value not in (None, "", [], {})
+    ]
+    expected: Dict[str, str] = {}
+    for label in labels:
+        code, name = _exam_key(label)
+        expected.setdefault(code or _normalize(label), name)
+    return expected
+
+
+def _content_words(text: str) -> set:
+    return {w for w in _normalize(text).split() if len(w) > 3 and w not in _LEXICAL_STOPWORDS}
+
+
+def _dice(a: str, b: str) -> float:
+    words_a, words_b = _content_words(a), _content_words(b)
+    if not words_a or not words_b:
+        return 0.0
+    return 2.0 * len(words_a & words_b) / (len(words_a) + len(words_b))
+
+
+def _similarity_matrix(expected: List[str], asked: List[str]):
+    """
+    Similarités (attendues x posées), calculées en une seule passe vectorisée.
+
+    :return: (matrice numpy, seuil d'acceptation, méthode)
+    """
+    import numpy as np
+    try:
+        # Import tardif : le modèle d'embedding est lourd et optionnel
+        from .embedding_service import embedding_service
+        vectors = embedding_service.get_text_embeddings(expected + asked)
+        if vectors:
+            matrix = np.array(vectors, dtype="float32")
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            return matrix[:len(expected)] @ matrix[len(expected):].T, settings.GRADER_QUESTION_MIN_SIMILARITY, MATCH_EMBEDDING
+    except Exception as e:
+        logger.warning(f"   ⚠️ Embeddings indisponibles, comparaison lexicale des questions : {e}")
+    matrix = np.array([[_dice(e, a) for a in asked] for e in expected], dtype="float32")
+    return matrix, LEXICAL_MATCH_THRESHOLD, "lexical"
+
+
+def _question_coverage(expected: List[str], asked: List[str]) -> Dict[str, Any]:
+    if not asked:
+        return {"couverture": 0.0, "attendues": len(expected), "posees": 0,
+                "manquees": expected[:MAX_MISSED_ITEMS], "methode": None}
+    similarities, threshold, method = _similarity_matrix(expected, asked)
+    covered = similarities.max(axis=1) >= threshold
+    return {
+        "couverture": round(float(covered.mean()), 3),
+        "attendues": len(expected),
+        "posees": len(asked),
+        "manquees": [q for q, ok in zip(expected, covered) if not ok][:MAX_MISSED_ITEMS],
+        "methode": method,
+    }
+
+
+def _exam_coverage(expected: Dict[str, str], actions: List[str]) -> Dict[str, Any]:
+    ordered: Dict[str, str] = {}
+    for action in actions:
+        code, name = _exam_key(action)
+        if code:
+            ordered.setdefault(code, name)
+        else:
+            # Hors catalogue : rapproché d'un résultat du dossier par son libellé
+            normalized = _normalize(action)
+            key = next((k for k in expected if k and _contains_phrase(normalized, k)), None)
+            if key:
+                ordered.setdefault(key, expected[key])
+
+    done = [k for k in expected if k in ordered]
+    counted = [k for k in ordered if k not in EXAM_RELEVANCE_IGNORED_CODES]
+    return {
+        "couverture": round(len(done) / len(expected), 3),
+        "pertinence": round(sum(1 for k in counted if k in expected) / len(counted), 3) if counted else 1.0,
+        "attendus": len(expected),
+        "demandes": list(ordered.values()),
+        "manques": [expected[k] for k in expected if k not in ordered][:MAX_MISSED_ITEMS],
+    }
+
+
+def _score_demarche(
+    db: Session,
+    case: models.ClinicalCase,
+    session_id: uuid.UUID
+) -> Tuple[Optional[float], Dict[str, Any]]:
+    """
+    Note /5 de la démarche sur la session complète (aucune troncature) :
+    questions d'anamnèse attendues couvertes par les messages de l'apprenant,
+    examens du dossier demandés, et part d'examens demandés qui étaient utiles.
+    Une composante sans référence est retirée et les poids renormalisés ;
+    None si le cas n'a aucune référence (le jury LLM note alors la démarche).
+    """
+    asked, actions = _session_activity(db, session_id)
+    details: Dict[str, Any] = {}
+    weighted, weights = 0.0, 0.0
+
+    expected_questions = _expected_questions(db, case)
+    if expected_questions:
+        details["anamnese"] = _question_coverage(expected_questions, asked)
+        weighted += DEMARCHE_WEIGHT_QUESTIONS * details["anamnese"]["couverture"]
+        weights += DEMARCHE_WEIGHT_QUESTIONS
+
+    expected_exams = _expected_exams(case)
+    if expected_exams:
+        details["examens"] = _exam_coverage(expected_exams, actions)
+        weighted += DEMARCHE_WEIGHT_EXAM_COVERAGE * details["examens"]["couverture"]
+        weighted += DEMARCHE_WEIGHT_EXAM_RELEVANCE * details["examens"]["pertinence"]
+        weights += DEMARCHE_WEIGHT_EXAM_COVERAGE + DEMARCHE_WEIGHT_EXAM_RELEVANCE
+
+    if not weights:
+        return None, {"raison": "aucune_reference"}
+    return round(5.0 * weighted / weights, 2), details
+
+
+# ==============================================================================
+# CORRECTEUR
+# ==============================================================================
+
+class LocalGrader:
+    """
+    Correcteur déterministe des soumissions finales : notes diagnostique,
+    thérapeutique et de démarche calculées à partir de la base, sans LLM.
+
+    Le jury LLM n'est plus sollicité que pour la rédaction du feedback, ou plus
+    du tout en mode « correction rapide » (FAST_GRADING_ENABLED).
+    """
+
+    def __init__(self):
+        self.diseases = DiseaseResolver()
+        self._stats_lock = threading.Lock()
+        self._stats = {"graded": 0, "complete": 0, "fast_graded": 0, "errors": 0,
+                       MATCH_EXACT: 0, MATCH_SYNONYM: 0, MATCH_LOCAL_NAME: 0, MATCH_EMBEDDING: 0, "non_resolu": 0}
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def grade(
+        self,
+        db: Session,
+        case: models.ClinicalCase,
+        submission: schemas.simulation.SubmissionRequest,
+        session_id: uuid.UUID
+    ) -> Optional[LocalGrade]:
+        """
+        Note la soumission. Lecture BDD courte (noms des pathologies en cache,
+        traitements de référence, messages et actions de la session). None si le
+        correcteur est désactivé ou en échec.
+        """
+        if not settings.LOCAL_GRADER_ENABLED:
+            return None
+        start = time.perf_counter()
+        try:
+            s_diag, diag_details = self._score_diagnosis(db, case, submission.diagnosed_pathology_text)
+            s_ther, ther_details = _score_treatment(
+                submission.prescribed_treatment_text, _expected_treatments(db, case.pathologie_principale_id)
+            )
+            s_dem, dem_details = _score_demarche(db, case, session_id)
+        except Exception as e:
+            db.rollback()
+            self._count("errors")
+            logger.error(f"   ❌ Correction locale en échec (jury LLM utilisé) : {e}")
+            return None
+
+        grade = LocalGrade(s_diag, s_ther, s_dem, {
+            "diagnostic": diag_details,
+            "traitement": ther_details,
+            "demarche": dem_details,
+            "duree_ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+        self._count("graded")
+        if grade.is_complete:
+            self._count("complete")
+        logger.info(f"   🧮 Correction locale : diag={s_diag}, ther={s_ther}, dem={s_dem} ({grade.details['duree_ms']} ms)")
+        return grade
+
+    def _score_diagnosis(
+        self,
+        db: Session,
+        case: models.ClinicalCase,
+        diagnosis_text: str
+    ) -> Tuple[Optional[float], Dict[str, Any]]:
+        expected = self.diseases.entry(db, case.pathologie_principale_id)
+        resolved, method, similarity = self.diseases.resolve(db, diagnosis_text)
+        self._count(method or "non_resolu")
+
+        details: Dict[str, Any] = {
+            "attendu": expected.nom_fr if expected else None,
+            "reconnu": resolved.nom_fr if resolved else None,
+            "methode": method,
+            "similarite": round(similarity, 3),
+        }
+        if not resolved or not expected:
+            return None, details
+
+        if resolved.id == expected.id:
+            score = DIAG_SCORE_EMBEDDING if method == MATCH_EMBEDDING else DIAG_SCORE_EXACT
+        elif resolved.words and resolved.words < expected.words:
+            # Forme générale du bon diagnostic ("Paludisme" pour "Paludisme grave")
+            score = DIAG_SCORE_INCOMPLETE
+        elif resolved.categorie and resolved.categorie == expected.categorie:
+            score = DIAG_SCORE_SAME_FAMILY
+        else:
+            score = DIAG_SCORE_WRONG
+        return score, details
+
+    def feedback(self, grade: LocalGrade) -> Tuple[str, str]:
+        """Feedback et recommandation rédigés sans LLM (mode correction rapide)."""
+        diag = grade.details["diagnostic"]
+        ther = grade.details["traitement"]
+        missed = grade.missed_items()
+        parts = []
+        if grade.score_diagnostic == DIAG_SCORE_EXACT or grade.score_diagnostic == DIAG_SCORE_EMBEDDING:
+            parts.append(f"Diagnostic correct : {diag['attendu']}.")
+        else:
+            parts.append(f"Diagnostic attendu : {diag['attendu']} (vous avez proposé : {diag['reconnu']}).")
+        if ther.get("cites"):
+            parts.append(f"Traitements pertinents cités : {', '.join(ther['cites'])}.")
+        if ther.get("manquants"):
+            parts.append(f"Traitements de référence non cités : {', '.join(ther['manquants'])}.")
+        if missed["questions"]:
+            parts.append(f"Questions d'anamnèse non abordées : {', '.join(f'« {q} »' for q in missed['questions'])}.")
+        if missed["examens"]:
+            parts.append(f"Examens utiles non demandés : {', '.join(missed['examens'])}.")
+
+        if grade.score_diagnostic < DIAG_SCORE_INCOMPLETE:
+            recommendation = f"Revoir la présentation clinique de : {diag['attendu']}."
+        elif not ther.get("premiere_ligne_citee"):
+            recommendation = f"Revoir le traitement de première ligne de : {diag['attendu']}."
+        elif missed["questions"] or missed["examens"]:
+            recommendation = "Structurer l'interrogatoire et le bilan paraclinique avant de conclure."
+        else:
+            recommendation = "Continuer avec un cas de difficulté supérieure."
+        return " ".join(parts), recommendation
+
+    def record_fast_grading(self) -> None:
+        self._count("fast_graded")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+# Instance globale (par processus)
+local_grader = LocalGrader()
@@ -1,21 +1,28 @@
 #=== Fichier: ./app/services/patient_actor_service.py ===
 
+import asyncio
 import logging
 import json
 import time
 import re
 import random
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
 import uuid
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import desc
 
 # Import des modèles et services existants
 from .. import models
+from ..database import release_connection_async
 from . import ai_generation_service, interaction_log_service
+from .conversation_summary_service import get_summary, read_summary, summary_covered_id_column
+from .session_context_cache import session_context_cache, SessionContext
+from . import case_narrative_service
+from .patient_intent_service import patient_intent_router
 
 # ==============================================================================
 # CONFIGURATION DU LOGGER AVANCÉ
@@ -31,6 +38,11 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
+# Nombre maximal de messages relus pour l'historique (messages non encore
+# résumés). Ce n'est qu'un plafond de lecture : le noyau IA ne garde que les
+# échanges récents qui tiennent dans le budget de tokens de la tâche CHAT_PATIENT.
+CHAT_HISTORY_FETCH_LIMIT = 40
+
 class PatientActorService:
     """
     Service responsable de l'incarnation du patient virtuel (Patient Actor).
@@ -86,13 +98,10 @@ HISTOIRE DE LA MALADIE (Ce qui t'est arrivé) :
 ANTÉCÉDENTS (Ton passé médical) :
 {antecedents}
 
-CONTEXTE DYNAMIQUE (Ce qui vient de se passer dans la consultation) :
-{dynamic_context}
-
 --- RÈGLES DE JEU DE RÔLE (STRICTES) ---
 1. LANGAGE : Parle comme un patient camerounais {education}. N'utilise JAMAIS de jargon médical (ex: dis "j'ai mal au ventre" et pas "douleur abdominale").
 2. RÉVÉLATION PROGRESSIVE : Ne déballe pas toutes les informations d'un coup. Réponds uniquement à la question posée. Laisse l'étudiant chercher.
-3. COHÉRENCE : Réfère-toi à l'historique de la conversation ci-dessous. Ne te répète pas inutilement.
+3. COHÉRENCE : Réfère-toi à l'historique de la conversation qui suit. Ne te répète pas inutilement.
 4. ÉTAT D'ESPRIT : Ton niveau de stress ({stress_level}/10) doit transparaître dans ta façon de parler (ex: phrases courtes si stressé, plaintes si douleur).
 5. INTERDIT : Ne donne JAMAIS le diagnostic final. Tu es là pour consulter, tu ne sais pas ce que tu as.
 
@@ -100,149 +109,312 @@ CONTEXTE DYNAMIQUE (Ce qui vient de se passer dans la consultation) :
 L'étudiant en médecine te parle. Réponds-lui directement, en restant dans ton personnage.
 """
 
-    def generate_response(self, db: Session, session_id: UUID, student_message: str) -> str:
+        # Contexte qui évolue au fil de la consultation : envoyé APRÈS l'historique
+        # pour que tout ce qui précède (prompt système + historique) reste un
+        # préfixe identique d'un tour à l'autre (cache de prompt du fournisseur).
+        self.DYNAMIC_CONTEXT_PROMPT = """
+CONTEXTE DYNAMIQUE (Ce qui vient de se passer dans la consultation) :
+{dynamic_context}
+"""
+
+        # Résumé glissant des échanges plus anciens que l'historique envoyé
+        self.CONVERSATION_SUMMARY_PROMPT = """
+CE QUI S'EST DIT PLUS TÔT DANS LA CONSULTATION (résumé) :
+{summary}
+Reste cohérent avec ces échanges (ne contredis pas ce que tu as déjà dit).
+"""
+
+    # ==============================================================================
+    # GÉNÉRATION DE LA RÉPONSE (routes `async def`, moteur asyncpg)
+    # ==============================================================================
+    # Les lectures BDD courtes passent par les helpers synchrones via
+    # `AsyncSession.run_sync`, seule l'attente du LLM est un `await`
+    # (aucune connexion gardée pendant).
+
+    async def _prepare_turn_async(
+        self,
+        db: AsyncSession,
+        session_id: UUID,
+        student_message: str,
+        correlation_id: str
+    ) -> Tuple[Optional[List[Dict[str, str]]], Optional[str]]:
+        """
+        Étapes 1 à 6 : contexte de la session, voie rapide, puis prompt.
+
+        :return: (messages, None) si le LLM doit répondre, sinon (None, réplique
+            définitive : voie rapide ou repli).
+        """
+        session_context, fallback_text = await db.run_sync(
+            lambda sync_db: self._get_session_context(sync_db, session_id, correlation_id)
+        )
+        if session_context is None:
+            return None, fallback_text
+        # Connexion rendue avant la classification : elle ne doit pas rester
+        # tenue pendant le calcul de l'embedding
+        await release_connection_async(db)
+
+        # Classification par embedding (calcul CPU) hors de la boucle d'événements
+        fast_reply = await asyncio.to_thread(
+            patient_intent_router.answer, session_context, student_message, correlation_id
+        )
+        if fast_reply is not None:
+            return None, fast_reply
+
+        messages_payload = await db.run_sync(
+            lambda sync_db: self._build_messages_payload(
+                sync_db, session_id, session_context, student_message, correlation_id
+            )
+        )
+        await release_connection_async(db)
+        return messages_payload, None
+
+    async def generate_response_async(self, db: AsyncSession, session_id: UUID, student_message: str) -> str:
         """
         Point d'entrée principal pour générer une réponse du patient.
-        
-        :param db: Session SQLAlchemy active.
+
+        :param db: Session asynchrone de la requête.
         :param session_id: ID unique de la session de simulation.
         :param student_message: Le texte envoyé par l'apprenant.
         :return: La réponse textuelle du patient simulé.
         """
-        correlation_id = str(uuid.uuid4())[:8] # Pour tracer cette exécution spécifique dans les logs
+        correlation_id = str(uuid.uuid4())[:8]
         start_time = time.time()
-        
-        logger.info(f"🎬 [REQ-{correlation_id}] DÉBUT GÉNÉRATION RÉPONSE PATIENT")
+
+        logger.info(f"🎬 [REQ-{correlation_id}] DÉBUT GÉNÉRATION RÉPONSE PATIENT (async)")
         logger.info(f"   📍 Session ID : {session_id}")
-        logger.info(f"   🗣️ Message Étudiant : '{student_message}'")
 
         try:
-            # --- ÉTAPE 1 : Chargement du contexte (Session & Cas) ---
-            logger.debug(f"   [REQ-{correlation_id}] Étape 1: Chargement du contexte BDD...")
-            session_obj = db.query(models.SimulationSession).filter(
-                models.SimulationSession.id == session_id
-            ).first()
-
-            if not session_obj:
-                msg = f"Session {session_id} introuvable en base de données."
-                logger.critical(f"   ❌ [REQ-{correlation_id}] {msg}")
-                return "..."
-
-            clinical_case = session_obj.cas_clinique
-            if not clinical_case:
-                msg = f"Aucun cas clinique associé à la session {session_id}."
-                logger.critical(f"   ❌ [REQ-{correlation_id}] {msg}")
-                return "(Le patient semble absent... Erreur de configuration du cas)"
-
-            logger.info(f"   ✅ [REQ-{correlation_id}] Contexte chargé: Cas '{clinical_case.code_fultang}' (ID: {clinical_case.id})")
-
-            # --- ÉTAPE 2 : Construction du Persona ---
-            logger.debug(f"   [REQ-{correlation_id}] Étape 2: Génération du Persona...")
-            persona = self._get_or_create_persona(clinical_case)
-            logger.info(f"   👤 [REQ-{correlation_id}] Persona actif: {persona['nom']} ({persona['age']}, {persona['metier']})")
-
-            # --- ÉTAPE 3 : Extraction de la Vérité Clinique ---
-            logger.debug(f"   [REQ-{correlation_id}] Étape 3: Extraction des données cliniques...")
-            clinical_data = self._extract_clinical_data(db, clinical_case)
-            
-            # --- ÉTAPE 4 : Analyse Contextuelle (Actions précédentes) ---
-            logger.debug(f"   [REQ-{correlation_id}] Étape 4: Analyse des événements récents...")
-            dynamic_context = self._analyze_recent_events(db, session_id)
-            if dynamic_context:
-                logger.info(f"   ⚡ [REQ-{correlation_id}] Contexte dynamique détecté: {dynamic_context}")
-
-            # --- ÉTAPE 5 : Construction de l'Historique de Conversation ---
-            logger.debug(f"   [REQ-{correlation_id}] Étape 5: Récupération historique chat...")
-            chat_history_str = self._format_chat_history(db, session_id, limit=10)
-            
-            # --- ÉTAPE 6 : Assemblage du Prompt ---
-            logger.debug(f"   [REQ-{correlation_id}] Étape 6: Assemblage du Prompt Système...")
-            final_prompt = self.BASE_SYSTEM_PROMPT.format(
-                nom=persona['nom'],
-                age=persona['age'],
-                metier=persona['metier'],
-                education=persona['education'],
-                stress_level=persona['stress_level'],
-                trait_caractere=persona['trait'],
-                symptomes_liste=clinical_data['symptomes'],
-                histoire_maladie=clinical_data['histoire'],
-                antecedents=clinical_data['antecedents'],
-                dynamic_context=dynamic_context if dynamic_context else "Rien de particulier ne s'est passé récemment."
-            )
-
-            # Ajout de l'historique conversationnel à la fin pour le LLM
-            messages_payload = [
-                {"role": "system", "content": final_prompt}
-            ]
-            
-            # On parse l'historique formaté pour le remettre en structure message (si nécessaire par l'API)
-            # Ou on l'envoie comme contexte. Ici, on va utiliser une méthode propre.
-            raw_history = self._get_raw_chat_history(db, session_id, limit=10)
-            for msg in raw_history:
-                role = "assistant" if msg.sender == "Patient" else "user"
-                # Nettoyage basique du contenu
-                content = msg.content.strip() if msg.content else "..."
-                messages_payload.append({"role": role, "content": content})
-            
-            # Ajout du message actuel
-            messages_payload.append({"role": "user", "content": student_message})
+            messages_payload, final_text = await self._prepare_turn_async(db, session_id, student_message, correlation_id)
+            if messages_payload is None:
+                logger.info(f"   🏁 [REQ-{correlation_id}] FIN GÉNÉRATION sans LLM ({time.time() - start_time:.2f}s)")
+                return final_text
 
-            logger.debug(f"   📦 [REQ-{correlation_id}] Payload LLM prêt ({len(messages_payload)} messages).")
-            # Log détaillé du system prompt pour debug (tronqué)
-            logger.debug(f"   📄 [REQ-{correlation_id}] System Prompt (Preview): {final_prompt[:300]}...")
-
-            # --- ÉTAPE 7 : Appel au Service IA ---
-            logger.info(f"   🚀 [REQ-{correlation_id}] Appel API IA en cours...")
-            
-            # Note: On convertit tout en texte car l'API actuelle _call_openrouter_api prend un string unique
-            # Dans une version V2, ai_generation_service devrait accepter une liste de messages.
-            full_text_prompt = self._convert_payload_to_text(messages_payload)
-            
-            ai_response_raw = ai_generation_service._call_openrouter_api(full_text_prompt)
-            
-            # --- ÉTAPE 8 : Traitement de la Réponse ---
-            logger.debug(f"   [REQ-{correlation_id}] Étape 8: Parsing réponse IA...")
-            
-            patient_response_text = "..."
-            
-            # L'IA retourne souvent un JSON (car le service est configuré pour le mode JSON)
-            # Il faut extraire le texte "parlé"
-            if isinstance(ai_response_raw, dict):
-                # On cherche les clés probables
-                keys_to_check = ['response', 'content', 'patient_response', 'text', 'message']
-                found = False
-                for key in keys_to_check:
-                    if key in ai_response_raw and ai_response_raw[key]:
-                        patient_response_text = ai_response_raw[key]
-                        found = True
-                        break
-                
-                if not found:
-                    # Si aucune clé standard, on prend la première valeur string trouvée
-                    logger.warning(f"   ⚠️ [REQ-{correlation_id}] Structure JSON IA inconnue: {ai_response_raw.keys()}")
-                    for v in ai_response_raw.values():
-                        if isinstance(v, str):
-                            patient_response_text = v
-                            break
-            elif isinstance(ai_response_raw, str):
-                patient_response_text = ai_response_raw
-            
-            # Nettoyage final (suppression de guillemets parasites, etc.)
+            logger.info(f"   🚀 [REQ-{correlation_id}] Appel API IA en cours (async)...")
+            patient_response_text = await ai_generation_service.generate_patient_reply_chat_async(messages_payload)
             patient_response_text = self._clean_text_response(patient_response_text)
 
-            execution_time = time.time() - start_time
-            logger.info(f"   🏁 [REQ-{correlation_id}] FIN GÉNÉRATION ({execution_time:.2f}s)")
-            logger.info(f"   🗣️ [PATIENT] : {patient_response_text[:100]}...")
-
+            logger.info(f"   🏁 [REQ-{correlation_id}] FIN GÉNÉRATION ({time.time() - start_time:.2f}s)")
             return patient_response_text
 
         except Exception as e:
             logger.error(f"   ❌ [REQ-{correlation_id}] ERREUR CRITIQUE DANS PATIENT_ACTOR: {str(e)}")
             import traceback
             logger.error(traceback.format_exc())
-            # Fallback en cas de crash complet pour ne pas casser l'UI
             return "Je... excusez-moi, j'ai un moment d'absence. Pouvez-vous répéter ?"
 
+    async def stream_response_async(self, db: AsyncSession, session_id: UUID, student_message: str) -> AsyncIterator[str]:
+        """
+        Variante 'stream' de `generate_response_async` : produit la réponse du
+        patient fragment par fragment, au fil de la génération par le LLM.
+
+        Les fragments sont bruts : la réplique définitive (à persister) s'obtient
+        en passant leur concaténation à `finalize_response`.
+        """
+        correlation_id = str(uuid.uuid4())[:8]
+        start_time = time.time()
+
+        logger.info(f"🎬 [REQ-{correlation_id}] DÉBUT STREAM RÉPONSE PATIENT (async)")
+        logger.info(f"   📍 Session ID : {session_id}")
+
+        try:
+            messages_payload, final_text = await self._prepare_turn_async(db, session_id, student_message, correlation_id)
+        except Exception as e:
+            logger.error(f"   ❌ [REQ-{correlation_id}] ERREUR CRITIQUE DANS PATIENT_ACTOR: {str(e)}")
+            yield "Je... excusez-moi, j'ai un moment d'absence. Pouvez-vous répéter ?"
+            return
+
+        if messages_payload is None:
+            yield final_text
+            return
+
+        first_chunk = True
+        async for delta in ai_generation_service.stream_patient_reply_chat_async(messages_payload):
+            if first_chunk:
+                logger.info(f"   ⚡ [REQ-{correlation_id}] Premier fragment après {time.time() - start_time:.2f}s")
+                first_chunk = False
+            yield delta
+
+        logger.info(f"   🏁 [REQ-{correlation_id}] FIN STREAM ({time.time() - start_time:.2f}s)")
+
+    def finalize_response(self, raw_text: str) -> str:
+        """Nettoie la réplique complète reconstituée à partir des fragments streamés."""
+        return self._clean_text_response(raw_text)
+
+    def _build_messages_payload(
+        self,
+        db: Session,
+        session_id: UUID,
+        session_context: SessionContext,
+        student_message: str,
+        correlation_id: str
+    ) -> List[Dict[str, str]]:
+        """
+        Complète le contexte statique de la session (étapes 1 à 3, cf.
+        `_get_session_context`) par le contexte du tour (étapes 4 à 6) et
+        assemble les messages à envoyer au LLM.
+        """
+        # --- ÉTAPE 4 : Analyse Contextuelle (Actions précédentes) ---
+        logger.debug(f"   [REQ-{correlation_id}] Étape 4: Analyse des événements récents...")
+        dynamic_context = self._analyze_recent_events(db, session_id)
+        if dynamic_context:
+            logger.info(f"   ⚡ [REQ-{correlation_id}] Contexte dynamique détecté: {dynamic_context}")
+
+        # --- ÉTAPE 5 : Construction de l'Historique de Conversation ---
+        logger.debug(f"   [REQ-{correlation_id}] Étape 5: Récupération historique chat...")
+        # Résumé des échanges anciens + messages postérieurs au résumé (fenêtre récente)
+        summary = session_context.summary
+        raw_history = self._get_raw_chat_history(
+            db, session_id, limit=CHAT_HISTORY_FETCH_LIMIT,
+            after_message_id=session_context.summary_covered_message_id
+        )
+        
+        # --- ÉTAPE 6 : Assemblage du Prompt ---
+        # Ordre des messages, du plus stable au plus volatil :
+        #   1. prompt système (persona + vérité clinique + règles) : identique pour
+        #      toutes les sessions du cas -> préfixe mis en cache par le fournisseur ;
+        #   2. résumé des échanges anciens (change tous les N tours) ;
+        #   3. historique récent de la conversation ;
+        #   4. contexte dynamique + message courant (changent à chaque tour).
+        logger.debug(f"   [REQ-{correlation_id}] Étape 6: Assemblage du Prompt...")
+        final_prompt = session_context.system_prompt
+
+        messages_payload = [
+            ai_generation_service.cacheable_message("system", final_prompt)
+        ]
+        if summary:
+            messages_payload.append({
+                "role": "system",
+                "content": self.CONVERSATION_SUMMARY_PROMPT.format(summary=summary)
+            })
+
+        # Le message courant est déjà persisté : on ne l'envoie qu'une fois (en dernier)
+        if raw_history and raw_history[-1].sender != "Patient" and (raw_history[-1].content or "").strip() == student_message.strip():
+            raw_history = raw_history[:-1]
+        for msg in raw_history:
+            role = "assistant" if msg.sender == "Patient" else "user"
+            # Nettoyage basique du contenu
+            content = msg.content.strip() if msg.content else "..."
+            messages_payload.append({"role": role, "content": content})
+
+        if dynamic_context:
+            messages_payload.append({
+                "role": "system",
+                "content": self.DYNAMIC_CONTEXT_PROMPT.format(dynamic_context=dynamic_context)
+            })
+
+        # Ajout du message actuel
+        messages_payload.append({"role": "user", "content": student_message})
+
+        logger.debug(f"   📦 [REQ-{correlation_id}] Payload LLM prêt ({len(messages_payload)} messages).")
+        # Log détaillé du system prompt pour debug (tronqué)
+        logger.debug(f"   📄 [REQ-{correlation_id}] System Prompt (Preview): {final_prompt[:300]}...")
+
+        return messages_payload
+
+    # ==============================================================================
+    # CONTEXTE DE SESSION (CACHE MÉMOIRE)
+    # ==============================================================================
+
+    def _get_session_context(
+        self,
+        db: Session,
+        session_id: UUID,
+        correlation_id: str
+    ) -> Tuple[Optional[SessionContext], Optional[str]]:
+        """
+        Contexte statique de la session, depuis le cache ou reconstruit (étapes 1 à 3).
+        En régime établi, seule une requête légère (version du cas et du résumé)
+        est émise, au plus une fois par `SESSION_CONTEXT_VERSION_CHECK_SECONDS`.
+
+        :return: (contexte, None), ou (None, réplique de repli) si la session est inexploitable.
+        """
+        session_context = session_context_cache.get(session_id)
+        if session_context is not None and session_context_cache.needs_version_check(session_context):
+            row = db.query(models.ClinicalCase.updated_at, summary_covered_id_column()).join(
+                models.SimulationSession, models.SimulationSession.cas_clinique_id == models.ClinicalCase.id
+            ).filter(
+                models.SimulationSession.id == session_id,
+                models.ClinicalCase.id == session_context.case_id
+            ).first()
+            current_version, summary_covered_id = row if row else (None, None)
+            if not session_context_cache.revalidate(session_context, current_version):
+                session_context = None
+            elif summary_covered_id != session_context.summary_covered_message_id:
+                # Résumé rafraîchi par un autre worker : seul le résumé est relu
+                summary, covered_id = read_summary(db, session_id)
+                session_context_cache.update_summary(session_id, summary, covered_id)
+                logger.debug(f"   ♻️ [REQ-{correlation_id}] Résumé de conversation relu (jusqu'au message {covered_id}).")
+
+        if session_context is not None:
+            logger.debug(f"   ⚡ [REQ-{correlation_id}] Contexte de session servi depuis le cache.")
+            return session_context, None
+
+        # --- ÉTAPE 1 : Chargement du contexte (Session & Cas) ---
+        logger.debug(f"   [REQ-{correlation_id}] Étape 1: Chargement du contexte BDD...")
+        session_obj = db.query(models.SimulationSession).filter(
+            models.SimulationSession.id == session_id
+        ).first()
+
+        if not session_obj:
+            msg = f"Session {session_id} introuvable en base de données."
+            logger.critical(f"   ❌ [REQ-{correlation_id}] {msg}")
+            return None, "..."
+
+        if not session_obj.cas_clinique:
+            msg = f"Aucun cas clinique associé à la session {session_id}."
+            logger.critical(f"   ❌ [REQ-{correlation_id}] {msg}")
+            return None, "(Le patient semble absent... Erreur de configuration du cas)"
+
+        return self.warm_session_context(db, session_obj, correlation_id), None
+
+    def warm_session_context(
+        self,
+        db: Session,
+        session_obj: models.SimulationSession,
+        correlation_id: str = "WARMUP"
+    ) -> SessionContext:
+        """
+        Construit (étapes 2 et 3) et met en cache le contexte statique d'une session.
+        Appelé au démarrage de la session pour que le premier tour de chat soit déjà 'chaud'.
+        """
+        clinical_case = session_obj.cas_clinique
+        logger.info(f"   ✅ [REQ-{correlation_id}] Contexte chargé: Cas '{clinical_case.code_fultang}' (ID: {clinical_case.id})")
+
+        # --- ÉTAPE 2 : Construction du Persona ---
+        logger.debug(f"   [REQ-{correlation_id}] Étape 2: Génération du Persona...")
+        persona = self._get_or_create_persona(clinical_case)
+        logger.info(f"   👤 [REQ-{correlation_id}] Persona actif: {persona['nom']} ({persona['age']}, {persona['metier']})")
+
+        # --- ÉTAPE 3 : Extraction de la Vérité Clinique ---
+        logger.debug(f"   [REQ-{correlation_id}] Étape 3: Extraction des données cliniques...")
+        clinical_data = self._extract_clinical_data(db, clinical_case)
+
+        system_prompt = self.BASE_SYSTEM_PROMPT.format(
+            nom=persona['nom'],
+            age=persona['age'],
+            metier=persona['metier'],
+            education=persona['education'],
+            stress_level=persona['stress_level'],
+            trait_caractere=persona['trait'],
+            symptomes_liste=clinical_data['symptomes'],
+            histoire_maladie=clinical_data['histoire'],
+            antecedents=clinical_data['antecedents']
+        )
+        summary, covered_message_id = get_summary(session_obj)
+
+        session_context = SessionContext(
+            session_id=str(session_obj.id),
+            case_id=clinical_case.id,
+            case_version=clinical_case.updated_at,
+            persona=persona,
+            clinical_data=clinical_data,
+            system_prompt=system_prompt,
+            summary=summary,
+            summary_covered_message_id=covered_message_id
+        )
+        session_context_cache.put(session_context)
+        return session_context
+
     # ==============================================================================
     # MÉTHODES PRIVÉES (HELPER METHODS)
     # ==============================================================================
@@ -306,63 +478,14 @@ L'étudiant en médecine te parle. Réponds-lui directement, en restant dans ton
 
     def _extract_clinical_data(self, db: Session, case: models.ClinicalCase) -> Dict[str, str]:
         """
-        Transforme les données relationnelles/JSON de la BDD en texte narratif pour le prompt.
+        Texte narratif du cas pour le prompt (histoire, symptômes, antécédents).
+        Simple lecture des fragments matérialisés sur le cas (cf. case_narrative_service).
         """
-        # 1. Histoire
-        presentation = case.presentation_clinique or {}
-        histoire = presentation.get("histoire_maladie", "Pas d'histoire disponible.")
-        
-        # 2. Symptômes
-        # Les symptômes sont souvent stockés sous forme d'IDs dans le JSON presentation_clinique
-        # Structure attendue : [{'symptome_id': 123, 'details': '...'}, ...]
-        symptomes_txt = []
-        raw_symptoms = presentation.get("symptomes_patient", [])
-        
-        if isinstance(raw_symptoms, list):
-            for item in raw_symptoms:
-                if isinstance(item, dict):
-                    s_id = item.get("symptome_id")
-                    details = item.get("details", "")
-                    
-                    # Récupération du nom du symptôme
-                    symptom_name = "Symptôme inconnu"
-                    if s_id:
-                        symptom_obj = db.query(models.Symptom).filter(models.Symptom.id == s_id).first()
-                        if symptom_obj:
-                            symptom_name = symptom_obj.nom
-                            # Ajout du nom local si disponible pour plus de réalisme
-                            if symptom_obj.nom_local:
-                                symptom_name += f" (ou '{symptom_obj.nom_local}')"
-                    
-                    line = f"- {symptom_name}"
-                    if details:
-                        line += f" : {details}"
-                    symptomes_txt.append(line)
-        
-        if not symptomes_txt:
-            symptomes_txt = ["Aucun symptôme spécifique listé (improviser selon l'histoire)."]
-
-        # 3. Antécédents
-        antecedents_raw = presentation.get("antecedents", {})
-        antecedents_txt = "Aucun antécédent notable."
-        if isinstance(antecedents_raw, dict):
-            # Transformation simple du dict en texte
-            parts = []
-            for k, v in antecedents_raw.items():
-                if isinstance(v, list):
-                    v_str = ", ".join(v)
-                    parts.append(f"{k}: {v_str}")
-                else:
-                    parts.append(f"{k}: {v}")
-            if parts:
-                antecedents_txt = "\n".join(parts)
-        elif isinstance(antecedents_raw, str):
-            antecedents_txt = antecedents_raw
-
+        fragments = case_narrative_service.get_case_fragments(case, db)
         return {
-            "histoire": histoire,
-            "symptomes": "\n".join(symptomes_txt),
-            "antecedents": antecedents_txt
+            "histoire": fragments["histoire"],
+            "symptomes": fragments["symptomes"],
+            "antecedents": fragments["antecedents"]
         }
 
     def _analyze_recent_events(self, db: Session, session_id: UUID) -> Optional[str]:
@@ -394,11 +517,18 @@ L'étudiant en médecine te parle. Réponds-lui directement, en restant dans ton
             return "\n".join(context_updates)
         return None
 
-    def _get_raw_chat_history(self, db: Session, session_id: UUID, limit: int = 10) -> List[models.ChatMessage]:
-        """Récupère les objets messages bruts."""
-        return db.query(models.ChatMessage).filter(
-            models.ChatMessage.session_id == session_id
-        ).order_by(models.ChatMessage.timestamp.desc()).limit(limit).all()[::-1] # Ordre chronologique
+    def _get_raw_chat_history(
+        self,
+        db: Session,
+        session_id: UUID,
+        limit: int = 10,
+        after_message_id: Optional[int] = None
+    ) -> List[models.ChatMessage]:
+        """Récupère les objets messages bruts (postérieurs à `after_message_id` si fourni)."""
+        query = db.query(models.ChatMessage).filter(models.ChatMessage.session_id == session_id)
+        if after_message_id is not None:
+            query = query.filter(models.ChatMessage.id > after_message_id)
+        return query.order_by(models.ChatMessage.timestamp.desc()).limit(limit).all()[::-1] # Ordre chronologique
 
     def _format_chat_history(self, db: Session, session_id: UUID, limit: int = 10) -> str:
         """Formate l'historique en bloc de texte pour le log ou le debug."""
@@ -408,20 +538,6 @@ L'étudiant en médecine te parle. Réponds-lui directement, en restant dans ton
             txt += f"[{m.sender}]: {m.content}\n"
         return txt
 
-    def _convert_payload_to_text(self, messages: List[Dict[str, str]]) -> str:
-        """
-        Convertit la liste de messages structurés en un prompt textuel unique
-        pour l'API d'IA actuelle.
-        """
-        prompt = ""
-        for msg in messages:
-            role = msg['role'].upper()
-            content = msg['content']
-            prompt += f"\n--- {role} ---\n{content}\n"
-        
-        prompt += "\n--- ASSISTANT (PATIENT) ---\n"
-        return prompt
-
     def _clean_text_response(self, text: str) -> str:
         """
         Nettoie la réponse générée par l'IA pour enlever les artefacts.
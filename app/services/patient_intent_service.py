@@ -0,0 +1,350 @@
+#=== Fichier: ./app/services/patient_intent_service.py ===
+
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .session_context_cache import SessionContext
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "PATIENT-INTENT"
+# ==============================================================================
+logger = logging.getLogger("patient_intent")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [PATIENT-INTENT] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# ==============================================================================
+# BANQUE D'INTENTIONS
+# ==============================================================================
+# Questions factuelles dont la réponse est entièrement déterminée par le persona
+# ou le cas : elles peuvent être servies sans appel au LLM.
+FACTUAL_INTENTS: Dict[str, List[str]] = {
+    "age": [
+        "quel âge avez-vous ?",
+        "quel age avez vous",
+        "vous avez quel âge ?",
+        "quel est votre âge ?",
+        "vous avez combien d'années ?",
+        "tu as quel âge ?",
+        "quelle est votre date de naissance ?",
+        "en quelle année êtes-vous né ?",
+    ],
+    "nom": [
+        "comment vous appelez-vous ?",
+        "quel est votre nom ?",
+        "vous vous appelez comment ?",
+        "quel est votre nom complet ?",
+        "comment tu t'appelles ?",
+        "votre nom s'il vous plaît",
+        "pouvez-vous me donner votre nom et prénom ?",
+    ],
+    "metier": [
+        "que faites-vous comme métier ?",
+        "quel est votre métier ?",
+        "quelle est votre profession ?",
+        "vous faites quoi dans la vie ?",
+        "vous travaillez dans quoi ?",
+        "quel travail faites-vous ?",
+        "quelle est votre activité professionnelle ?",
+        "tu fais quoi comme travail ?",
+    ],
+    "education": [
+        "quel est votre niveau d'études ?",
+        "jusqu'où êtes-vous allé à l'école ?",
+        "vous avez fait des études ?",
+        "quel est votre niveau scolaire ?",
+        "avez-vous été à l'école ?",
+        "quel diplôme avez-vous ?",
+    ],
+    "antecedents": [
+        "avez-vous des antécédents médicaux ?",
+        "avez-vous déjà été malade avant ?",
+        "avez-vous des maladies connues ?",
+        "avez-vous déjà été hospitalisé ?",
+        "souffrez-vous d'une maladie chronique ?",
+        "avez-vous déjà été opéré ?",
+    ],
+}
+
+# Exemples « ouverts » (étiquette None) : ils servent de contre-exemples. Une
+# question dont le plus proche voisin est ici part au LLM, même si elle
+# ressemble un peu à une question factuelle.
+OPEN_EXAMPLES: List[str] = [
+    "où avez-vous mal ?",
+    "depuis quand avez-vous mal ?",
+    "qu'est-ce qui vous amène aujourd'hui ?",
+    "pouvez-vous décrire la douleur ?",
+    "avez-vous de la fièvre ?",
+    "avez-vous pris des médicaments ?",
+    "y a-t-il des maladies dans votre famille ?",
+    "vos parents ont-ils des problèmes de santé ?",
+    "est-ce que vous fumez ou buvez de l'alcool ?",
+    "est-ce que votre travail vous fatigue ?",
+    "comment vous sentez-vous maintenant ?",
+    "avez-vous des questions ?",
+    "je vais vous examiner",
+    "depuis combien de jours êtes-vous malade ?",
+    "comment s'appelle le médicament que vous prenez ?",
+]
+
+# Libellé des antécédents quand le cas n'en mentionne aucun (cf. case_narrative_service)
+NO_ANTECEDENTS_TEXT = "Aucun antécédent notable."
+
+# Au-delà, le message est considéré comme du dialogue ouvert (ou plusieurs questions)
+FAST_PATH_MAX_WORDS = 14
+
+_FEMININE_JOBS = {
+    "commerçant": "commerçante",
+    "enseignant": "enseignante",
+    "étudiant": "étudiante",
+    "retraité": "retraitée",
+    "agriculteur": "agricultrice",
+    "éleveur": "éleveuse",
+}
+
+# ==============================================================================
+# RÉPLIQUES (par registre de langage, selon le niveau d'éducation du persona)
+# ==============================================================================
+_TEMPLATES: Dict[str, Dict[str, List[str]]] = {
+    "age": {
+        "primaire": ["J'ai {age}.", "{age}, docteur."],
+        "secondaire": ["J'ai {age}, docteur.", "J'ai {age}."],
+        "universitaire": ["J'ai {age}, docteur.", "J'ai actuellement {age}."],
+    },
+    "nom": {
+        "primaire": ["Je m'appelle {nom}.", "C'est {nom}, docteur."],
+        "secondaire": ["Je m'appelle {nom}.", "{nom}, docteur."],
+        "universitaire": ["Je m'appelle {nom}.", "Mon nom est {nom}."],
+    },
+    "metier": {
+        "primaire": ["Je suis {metier}.", "Moi je suis {metier}, docteur."],
+        "secondaire": ["Je suis {metier}.", "Je travaille comme {metier}."],
+        "universitaire": ["Je suis {metier}.", "J'exerce comme {metier}."],
+    },
+    "education": {
+        "primaire": ["J'ai arrêté l'école après le primaire.", "Je n'ai pas beaucoup fréquenté, juste le primaire."],
+        "secondaire": ["J'ai fait le secondaire.", "J'ai étudié jusqu'au lycée."],
+        "universitaire": ["J'ai fait des études universitaires.", "J'ai fait l'université."],
+    },
+    "antecedents": {
+        "primaire": ["Non, je n'ai jamais été vraiment malade avant.", "Non docteur, rien de spécial avant ça."],
+        "secondaire": ["Non, je n'ai pas eu de problème de santé particulier avant.", "Non, rien de particulier."],
+        "universitaire": ["Non, je n'ai pas d'antécédents particuliers.", "Aucun problème de santé notable jusqu'ici."],
+    },
+}
+
+# Ton du trait de caractère dominant : (préfixes, suffixes)
+_TRAIT_STYLES: Dict[str, Tuple[List[str], List[str]]] = {
+    "Timide": (["Euh... ", "Hum... "], [""]),
+    "Anxieux": ([""], [" Pourquoi, c'est important ?", " C'est grave, docteur ?"]),
+    "Impatient": ([""], [" On peut parler de mon problème maintenant ?", " Mais c'est surtout mon mal qui m'inquiète."]),
+    "Confus": (["Attendez... ", "Euh, oui... "], [""]),
+    "Bavard": ([""], [" Demandez-moi, je vous dis tout.", " Vous pouvez tout me demander, docteur."]),
+    "Stoïque": ([""], [""]),
+}
+HIGH_STRESS_LEVEL = 7  # Au-delà, les réponses restent brèves (pas de bavardage)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def _register(persona: Dict[str, Any]) -> str:
+    education = str(persona.get("education", "")).lower()
+    for register in ("primaire", "universitaire", "secondaire"):
+        if education.startswith(register):
+            return register
+    return "secondaire"
+
+
+def _job_label(persona: Dict[str, Any]) -> str:
+    metier = str(persona.get("metier", "")).strip().lower()
+    if persona.get("genre") == "F":
+        return _FEMININE_JOBS.get(metier, metier)
+    return metier
+
+
+class PatientIntentRouter:
+    """
+    Voie rapide du patient virtuel.
+
+    Classe chaque message de l'apprenant par plus proche voisin (embeddings)
+    dans la banque d'intentions. Une question factuelle reconnue avec une
+    confiance suffisante (similarité et marge sur l'intention suivante) reçoit
+    une réplique construite à partir du persona et du cas ; tout le reste
+    (dialogue ouvert, doute) part au LLM.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Pattern Singleton : l'index d'embeddings n'est calculé qu'une fois."""
+        if cls._instance is None:
+            cls._instance = super(PatientIntentRouter, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._index = None        # (étiquettes, matrice normalisée), calculé à la demande
+        self._unavailable_until = 0.0  # erreur du classifieur : voie rapide suspendue jusqu'à cet instant (monotonic)
+        self._stats: Dict[str, Any] = {"answered": {}, "deferred": 0, "skipped": 0, "errors": 0}
+
+    # --------------------------------------------------------------------------
+    # CLASSIFICATION
+    # --------------------------------------------------------------------------
+
+    def _build_index(self):
+        # Import tardif : le modèle d'embedding est lourd et optionnel
+        import numpy as np
+        from .embedding_service import embedding_service
+
+        labels: List[Optional[str]] = []
+        vectors: List[List[float]] = []
+        examples = [(intent, phrase) for intent, phrases in FACTUAL_INTENTS.items() for phrase in phrases]
+        examples += [(None, phrase) for phrase in OPEN_EXAMPLES]
+        for intent, phrase in examples:
+            vector = embedding_service.get_text_embedding(_normalize(phrase))
+            if vector:
+                labels.append(intent)
+                vectors.append(vector)
+
+        matrix = np.array(vectors, dtype="float32")
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        logger.info(f"   🧭 Banque d'intentions indexée ({len(labels)} exemples).")
+        return labels, matrix
+
+    def _suspended(self) -> bool:
+        return time.monotonic() < self._unavailable_until
+
+    def classify(self, message: str) -> Tuple[Optional[str], float]:
+        """
+        Intention factuelle d'un message.
+
+        :return: (intention, similarité), intention à None si le message doit
+            aller au LLM (dialogue ouvert, confiance insuffisante, modèle absent).
+        """
+        normalized = _normalize(message)
+        if not normalized or self._suspended():
+            return None, 0.0
+        # Message long ou questions multiples : dialogue ouvert
+        if len(normalized.split()) > FAST_PATH_MAX_WORDS or normalized.count("?") > 1:
+            return None, 0.0
+
+        try:
+            import numpy as np
+            from .embedding_service import embedding_service
+
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build_index()
+            labels, matrix = self._index
+
+            query = embedding_service.get_text_embedding(normalized)
+            if not query or not labels:
+                return None, 0.0
+            query = np.array(query, dtype="float32")
+            scores = matrix @ (query / (np.linalg.norm(query) + 1e-12))
+        except Exception as e:
+            # Erreur possiblement transitoire (modèle en cours de chargement, mémoire) :
+            # on suspend la voie rapide le temps du délai, puis on réessaie.
+            retry_seconds = settings.PATIENT_FAST_PATH_RETRY_SECONDS
+            self._unavailable_until = time.monotonic() + retry_seconds
+            self._stats["errors"] += 1
+            logger.warning(f"   ⚠️ Classifieur d'intentions indisponible, voie rapide suspendue {retry_seconds:.0f}s : {e}")
+            return None, 0.0
+
+        # Meilleur score par étiquette (None = dialogue ouvert)
+        best_by_label: Dict[Optional[str], float] = {}
+        for label, score in zip(labels, scores.tolist()):
+            if score > best_by_label.get(label, -1.0):
+                best_by_label[label] = score
+        ranked = sorted(best_by_label.items(), key=lambda item: item[1], reverse=True)
+
+        intent, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if intent is None \
+                or score < settings.PATIENT_FAST_PATH_MIN_SIMILARITY \
+                or score - runner_up < settings.PATIENT_FAST_PATH_MIN_MARGIN:
+            logger.debug(f"   ∅ Pas d'intention factuelle sûre pour '{normalized}' ({intent}, {score:.2f}, marge {score - runner_up:.2f})")
+            return None, score
+        return intent, score
+
+    # --------------------------------------------------------------------------
+    # RÉPONSE
+    # --------------------------------------------------------------------------
+
+    def answer(self, context: SessionContext, message: str, correlation_id: str = "SYSTEM") -> Optional[str]:
+        """
+        Réplique du patient servie sans LLM, ou None si le message relève du
+        dialogue ouvert (le LLM prend alors le relais).
+        """
+        if not settings.PATIENT_FAST_PATH_ENABLED:
+            return None
+
+        intent, score = self.classify(message)
+        if intent is None:
+            self._stats["deferred"] += 1
+            return None
+
+        reply = self._render(intent, context, message)
+        if reply is None:
+            # Intention reconnue mais réponse non déterminée par le cas (ex: antécédents présents)
+            self._stats["skipped"] += 1
+            return None
+
+        answered = self._stats["answered"]
+        answered[intent] = answered.get(intent, 0) + 1
+        logger.info(f"   ⚡ [REQ-{correlation_id}] Voie rapide : intention '{intent}' ({score:.2f}), pas d'appel LLM.")
+        return reply
+
+    def _render(self, intent: str, context: SessionContext, message: str) -> Optional[str]:
+        persona = context.persona or {}
+        if intent == "antecedents":
+            # Seule l'absence d'antécédents se formule sans risque de jargon ni de
+            # révélation prématurée : sinon le LLM reformule la vérité clinique.
+            antecedents = (context.clinical_data or {}).get("antecedents", "")
+            if antecedents.strip() != NO_ANTECEDENTS_TEXT:
+                return None
+
+        # Choix déterministe pour une même session et une même question
+        rng = random.Random(f"{context.session_id}:{intent}:{_normalize(message)}")
+        template = rng.choice(_TEMPLATES[intent][_register(persona)])
+        reply = template.format(
+            age=persona.get("age", ""),
+            nom=persona.get("nom", ""),
+            metier=_job_label(persona),
+        )
+
+        prefixes, suffixes = _TRAIT_STYLES.get(persona.get("trait"), ([""], [""]))
+        prefix = rng.choice(prefixes)
+        suffix = "" if int(persona.get("stress_level") or 0) >= HIGH_STRESS_LEVEL else rng.choice(suffixes)
+        return prefix + reply + suffix
+
+    def stats(self) -> Dict[str, Any]:
+        answered = dict(self._stats["answered"])
+        total_answered = sum(answered.values())
+        total = total_answered + self._stats["deferred"] + self._stats["skipped"]
+        return {
+            "enabled": settings.PATIENT_FAST_PATH_ENABLED and not self._suspended(),
+            "answered": answered,
+            "deferred_to_llm": self._stats["deferred"] + self._stats["skipped"],
+            "errors": self._stats["errors"],
+            "fast_path_ratio": round(total_answered / total, 3) if total else 0.0,
+        }
+
+
+# Instance globale prête à l'emploi
+patient_intent_router = PatientIntentRouter()
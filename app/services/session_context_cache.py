@@ -0,0 +1,162 @@
+#=== Fichier: ./app/services/session_context_cache.py ===
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "SESSION-CONTEXT"
+# ==============================================================================
+logger = logging.getLogger("session_context_cache")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [SESSION-CONTEXT] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+
+class SessionContext:
+    """
+    Contexte 'chaud' d'une session de simulation : tout ce qui ne change pas
+    d'un tour de chat à l'autre (persona, vérité clinique mise en texte, prompt
+    système du patient), plus le dernier résumé de conversation connu.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        case_id: int,
+        case_version: Any,
+        persona: Dict[str, Any],
+        clinical_data: Dict[str, str],
+        system_prompt: str,
+        summary: Optional[str] = None,
+        summary_covered_message_id: Optional[int] = None
+    ):
+        self.session_id = session_id
+        self.case_id = case_id
+        self.case_version = case_version  # `updated_at` du cas au moment de la construction
+        self.persona = persona
+        self.clinical_data = clinical_data
+        self.system_prompt = system_prompt
+        self.summary = summary
+        self.summary_covered_message_id = summary_covered_message_id
+        self.created_at = time.monotonic()
+        self.version_checked_at = self.created_at
+
+
+class SessionContextCache:
+    """
+    Cache LRU borné + TTL des contextes de session (par processus).
+
+    Invalidation :
+    - locale et immédiate quand un cas est modifié (`invalidate_case`, appelé
+      par `clinical_case_service`) ;
+    - entre workers, par comparaison du `updated_at` du cas, revérifié au plus
+      toutes les `version_check_seconds` (`needs_version_check`) ;
+    - en dernier recours par le TTL.
+
+    Le résumé de conversation suit le même rythme : `update_summary` le met à
+    jour localement, et la vérification périodique compare son
+    `covered_message_id` à celui en base (résumé écrit par un autre worker).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, version_check_seconds: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def get(self, session_id: Any) -> Optional[SessionContext]:
+        key = str(session_id)
+        with self._lock:
+            context = self._entries.get(key)
+            if context is None:
+                self._stats["misses"] += 1
+                return None
+            if self.ttl_seconds and time.monotonic() - context.created_at > self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return context
+
+    def put(self, context: SessionContext) -> None:
+        with self._lock:
+            self._entries[context.session_id] = context
+            self._entries.move_to_end(context.session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def needs_version_check(self, context: SessionContext) -> bool:
+        return time.monotonic() - context.version_checked_at >= self.version_check_seconds
+
+    def revalidate(self, context: SessionContext, current_version: Any) -> bool:
+        """
+        Compare la version du cas en base à celle du contexte.
+
+        :return: True si le contexte reste valide (il est alors marqué vérifié),
+            False s'il a été retiré du cache.
+        """
+        if current_version == context.case_version:
+            context.version_checked_at = time.monotonic()
+            return True
+        self.invalidate(context.session_id)
+        logger.info(f"   ♻️ Cas {context.case_id} modifié : contexte de la session {context.session_id} reconstruit.")
+        return False
+
+    def update_summary(self, session_id: Any, summary: str, covered_message_id: int) -> None:
+        """Répercute un nouveau résumé de conversation sur le contexte en cache (s'il existe)."""
+        with self._lock:
+            context = self._entries.get(str(session_id))
+            if context is not None:
+                context.summary = summary
+                context.summary_covered_message_id = covered_message_id
+
+    def invalidate(self, session_id: Any) -> None:
+        with self._lock:
+            if self._entries.pop(str(session_id), None) is not None:
+                self._stats["invalidations"] += 1
+
+    def invalidate_case(self, case_id: int) -> int:
+        """Retire les contextes de toutes les sessions d'un cas. Retourne leur nombre."""
+        return self._invalidate_where(lambda c: c.case_id == case_id)
+
+    def clear(self) -> int:
+        return self._invalidate_where(lambda c: True)
+
+    def _invalidate_where(self, predicate: Callable[[SessionContext], bool]) -> int:
+        with self._lock:
+            keys = [key for key, context in self._entries.items() if predicate(context)]
+            for key in keys:
+                del self._entries[key]
+            self._stats["invalidations"] += len(keys)
+        if keys:
+            logger.info(f"   🧹 {len(keys)} contexte(s) de session invalidé(s).")
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        return stats
+
+
+# Instance globale (par processus)
+session_context_cache = SessionContextCache(
+    max_entries=settings.SESSION_CONTEXT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SESSION_CONTEXT_CACHE_TTL_SECONDS,
+    version_check_seconds=settings.SESSION_CONTEXT_VERSION_CHECK_SECONDS,
+)
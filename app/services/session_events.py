@@ -0,0 +1,187 @@
+#=== Fichier: ./app/services/session_events.py ===
+
+import asyncio
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from ..config import settings
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "SESSION-EVENTS"
+# ==============================================================================
+logger = logging.getLogger("session_events")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [SESSION-EVENTS] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Nombre max d'événements en attente par abonné (un client lent ne doit pas faire gonfler la mémoire)
+SUBSCRIBER_QUEUE_SIZE = 100
+RELAY_POLL_SECONDS = 2.0
+RELAY_RECONNECT_SECONDS = 5.0
+
+
+class SessionEventBus:
+    """
+    Bus d'événements en mémoire, par session de simulation (pub/sub).
+
+    Permet aux traitements d'arrière-plan (ex: analyse du Tuteur) de notifier
+    le client d'une session dès qu'un résultat est disponible.
+
+    - `publish` est appelable depuis n'importe quel thread (workers, routes `def`).
+    - `subscribe` / `unsubscribe` s'utilisent depuis une boucle asyncio (route SSE).
+
+    NOTE : Le bus est local au processus. Les événements produits dans un
+    autre processus (worker d'évaluation, autre worker web) passent par
+    Postgres NOTIFY et sont republiés ici par `SessionEventRelay` :
+    `evaluation_done` et `tutor_feedback`.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Pattern Singleton : un seul bus par processus."""
+        if cls._instance is None:
+            cls._instance = super(SessionEventBus, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, session_id: UUID) -> asyncio.Queue:
+        """Abonne l'appelant (boucle asyncio courante) aux événements d'une session."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(str(session_id), []).append((loop, queue))
+        logger.debug(f"🔔 Nouvel abonné sur la session {session_id}")
+        return queue
+
+    def unsubscribe(self, session_id: UUID, queue: asyncio.Queue) -> None:
+        """Retire un abonné (à appeler à la déconnexion du client)."""
+        key = str(session_id)
+        with self._lock:
+            subscribers = [s for s in self._subscribers.get(key, []) if s[1] is not queue]
+            if subscribers:
+                self._subscribers[key] = subscribers
+            else:
+                self._subscribers.pop(key, None)
+        logger.debug(f"🔕 Abonné retiré de la session {session_id}")
+
+    def has_subscribers(self, session_id: UUID) -> bool:
+        with self._lock:
+            return bool(self._subscribers.get(str(session_id)))
+
+    def publish(self, session_id: UUID, event: str, data: Dict[str, Any]) -> int:
+        """
+        Diffuse un événement à tous les abonnés d'une session.
+
+        :return: Le nombre d'abonnés notifiés.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(session_id), []))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, (event, data))
+            except RuntimeError:
+                # Boucle fermée : l'abonné a disparu sans se désinscrire
+                self.unsubscribe(session_id, queue)
+
+        logger.debug(f"📣 Événement '{event}' publié sur la session {session_id} ({len(subscribers)} abonné(s))")
+        return len(subscribers)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, item: Tuple[str, Dict[str, Any]]) -> None:
+        """Dépose un événement sans bloquer (l'événement est perdu si l'abonné est saturé)."""
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning("⚠️ File d'un abonné saturée : événement ignoré.")
+
+
+# Instance globale prête à l'emploi
+session_event_bus = SessionEventBus()
+
+
+# ==============================================================================
+# RELAIS INTER-PROCESSUS (LISTEN / NOTIFY)
+# ==============================================================================
+
+class SessionEventRelay:
+    """
+    Écoute des canaux Postgres (connexion dédiée, hors pool) et passe chaque
+    notification au relais de son canal, qui la republie sur `session_event_bus`
+    s'il a des abonnés locaux. À démarrer dans chaque processus web (cf. main.lifespan).
+
+    :param handlers: canal -> relais(payload) ; le relais renvoie True s'il a publié.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[str], bool]], poll_seconds: float = RELAY_POLL_SECONDS):
+        self.handlers = dict(handlers)
+        self.poll_seconds = poll_seconds
+        self._listen_engine = None
+
+    def run_forever(self, stop_event: threading.Event) -> None:
+        logger.info(f"📡 Relais d'événements à l'écoute des canaux {sorted(self.handlers)}.")
+        while not stop_event.is_set():
+            try:
+                self._listen(stop_event)
+            except Exception as e:
+                logger.error(f"   ❌ Relais d'événements interrompu ({e}), reconnexion dans {RELAY_RECONNECT_SECONDS:.0f}s.")
+                stop_event.wait(RELAY_RECONNECT_SECONDS)
+        logger.info("🛑 Relais d'événements arrêté.")
+
+    def _listen(self, stop_event: threading.Event) -> None:
+        if self._listen_engine is None:
+            self._listen_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+        connection = self._listen_engine.raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                for channel in self.handlers:
+                    cursor.execute(f"LISTEN {channel}")
+            while not stop_event.is_set():
+                readable, _, _ = select.select([dbapi_connection], [], [], self.poll_seconds)
+                if not readable:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    self.dispatch(notify.channel, notify.payload)
+        finally:
+            connection.close()
+
+    def dispatch(self, channel: str, payload: str) -> bool:
+        """Transmet une notification au relais de son canal (une erreur n'arrête pas l'écoute)."""
+        handler = self.handlers.get(channel)
+        if handler is None:
+            return False
+        try:
+            return handler(payload)
+        except Exception as e:
+            logger.error(f"   ❌ Relais du canal '{channel}' en échec : {e}")
+            return False
+
+
+def start_event_relay(handlers: Dict[str, Callable[[str], bool]], stop_event: threading.Event) -> threading.Thread:
+    """Démarre le relais des événements inter-processus (thread démon)."""
+    relay = SessionEventRelay(handlers)
+    thread = threading.Thread(target=relay.run_forever, args=(stop_event,), name="session-event-relay", daemon=True)
+    thread.start()
+    return thread
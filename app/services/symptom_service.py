@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from .. import models, schemas
 from ..utils.exceptions import NotFoundException # Nous créerons ce fichier plus tard
+from . import case_narrative_service
 
 
 def get_symptom_by_id(db: Session, symptom_id: int) -> Optional[models.Symptom]:
@@ -67,6 +68,10 @@ def update_symptom(db: Session, symptom_id: int, symptom_update: schemas.Symptom
         
     db.commit()
     db.refresh(db_symptom)
+
+    # Les cas qui citent ce symptôme affichent son nom (et son nom local)
+    if {"nom", "nom_local"} & update_data.keys():
+        case_narrative_service.on_symptom_changed(db, symptom_id)
     
     return db_symptom
 
@@ -82,6 +87,7 @@ def delete_symptom(db: Session, symptom_id: int) -> Optional[models.Symptom]:
 
     db.delete(db_symptom)
     db.commit()
+    case_narrative_service.on_symptom_changed(db, symptom_id)
     
     return db_symptom
 
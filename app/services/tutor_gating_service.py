@@ -0,0 +1,265 @@
+#=== Fichier: ./app/services/tutor_gating_service.py ===
+
+import json
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from .patient_intent_service import patient_intent_router
+
+# ==============================================================================
+# CONFIGURATION DU LOGGER "TUTOR-GATE"
+# ==============================================================================
+logger = logging.getLogger("tutor_gating")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - [TUTOR-GATE] - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# ==============================================================================
+# CONSTANTES
+# ==============================================================================
+# Actions enregistrées dans `TutorDecision.action_choisie`
+ACTION_ANALYZE = "analyse"
+ACTION_BATCH = "analyse_groupee"
+ACTION_DEFER = "differee"
+ACTION_SKIP = "ignoree"
+GATING_STRATEGY = "declenchement_heuristique"  # `TutorDecision.strategy_used`
+
+# Les premiers échanges sont toujours analysés : le tuteur juge l'entrée en matière.
+OPENING_MESSAGES = 2
+# Message apprenant trop court pour porter une démarche clinique
+MIN_SUBSTANTIVE_WORDS = 3
+# Intentions factuelles sans enjeu clinique (cf. patient_intent_service)
+LOW_VALUE_INTENTS = {"age", "nom", "metier", "education"}
+
+_SMALL_TALK_PATTERN = re.compile(
+    r"^(bonjour|bonsoir|salut|merci|ok|okay|d'accord|dac|tres bien|bien|parfait|"
+    r"au revoir|a bientot|enchante|oui|non|hum+|ah|je vois|entendu|allez-y)\b[\s!.,?]*",
+)
+
+# Vocabulaire clinique générique (en plus des termes propres au cas)
+_GENERIC_CLINICAL_TERMS = {
+    "douleur", "fievre", "sang", "vomi", "vomissements", "toux", "diarrhee", "fatigue",
+    "vertiges", "brulure", "gonfle", "essouffle", "saigne", "urines", "selles", "maigri",
+    "frissons", "sueurs", "palpitations", "demangeaisons", "boutons", "convulsions",
+}
+_STOPWORDS = {
+    "avec", "dans", "pour", "sans", "mais", "depuis", "cette", "comme", "aussi", "plus",
+    "tres", "fois", "jours", "semaines", "patient", "patiente", "symptome", "inconnu",
+    "aucun", "notable", "antecedent", "antecedents", "details", "niveau",
+}
+_WORD_PATTERN = re.compile(r"[a-z]{5,}")
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents (comparaisons lexicales)."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _terms(text: str) -> Set[str]:
+    return {word for word in _WORD_PATTERN.findall(_fold(text)) if word not in _STOPWORDS}
+
+
+class TutorGateDecision:
+    """Décision du déclencheur pour un échange : analyser maintenant ou non, et pourquoi."""
+
+    def __init__(
+        self,
+        action: str,
+        reason: str,
+        signals: Dict[str, Any],
+        exchanges: Optional[List[Tuple[str, str]]] = None
+    ):
+        self.action = action
+        self.reason = reason
+        self.signals = signals
+        self.exchanges = exchanges or []  # échanges (étudiant, patient) à analyser
+
+    @property
+    def should_analyze(self) -> bool:
+        return self.action in (ACTION_ANALYZE, ACTION_BATCH)
+
+
+class _SessionGateState:
+    def __init__(self):
+        self.seen_terms: Set[str] = set()
+        self.pending: List[Tuple[str, str]] = []  # échanges substantiels non encore analysés
+
+
+class TutorGate:
+    """
+    Déclencheur local de l'analyse du Tuteur.
+
+    À partir de signaux peu coûteux (longueur et intention du message de
+    l'apprenant, position dans la consultation, apparition d'informations
+    cliniques nouvelles dans la réponse du patient), il décide si l'échange
+    mérite un appel LLM :
+
+    - `analyse`          : ouverture de la consultation ou information clinique
+                           nouvelle, analysé immédiatement ;
+    - `differee`         : question sans élément nouveau, mise en attente ;
+    - `analyse_groupee`  : N échanges en attente, analysés ensemble ;
+    - `ignoree`          : salutations, politesse, questions d'état civil.
+
+    L'état (termes déjà vus, échanges en attente) est tenu en mémoire par
+    session ; s'il est perdu (redémarrage, éviction), le déclencheur repart
+    simplement d'un état vide.
+    """
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max(1, max_sessions)
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[str, _SessionGateState]" = OrderedDict()
+        self._stats = {ACTION_ANALYZE: 0, ACTION_BATCH: 0, ACTION_DEFER: 0, ACTION_SKIP: 0}
+
+    def _state(self, session_id: Any) -> _SessionGateState:
+        key = str(session_id)
+        state = self._states.get(key)
+        if state is None:
+            state = _SessionGateState()
+            self._states[key] = state
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+        self._states.move_to_end(key)
+        return state
+
+    def _case_terms(self, clinical_fragments: Dict[str, Any]) -> Set[str]:
+        return _terms(clinical_fragments.get("symptomes", "")) | _terms(clinical_fragments.get("antecedents", ""))
+
+    def evaluate(
+        self,
+        session_id: Any,
+        student_msg: str,
+        patient_msg: str,
+        chat_history_count: int,
+        clinical_fragments: Dict[str, Any]
+    ) -> TutorGateDecision:
+        """
+        Décide du sort de l'échange (étudiant, patient) qui vient d'avoir lieu.
+
+        :param chat_history_count: Nombre de messages de la session (échange inclus).
+        :param clinical_fragments: Fragments narratifs du cas (cf. case_narrative_service).
+        """
+        exchange = (student_msg, patient_msg)
+        if not settings.TUTOR_GATING_ENABLED:
+            return self._decide(ACTION_ANALYZE, "declencheur_desactive", {}, [exchange])
+
+        words = len(student_msg.split())
+        small_talk = bool(_SMALL_TALK_PATTERN.match(_fold(student_msg).strip())) and words <= 4
+        intent, _ = patient_intent_router.classify(student_msg) if not small_talk else (None, 0.0)
+
+        reply_terms = _terms(patient_msg)
+        clinical_terms = reply_terms & (self._case_terms(clinical_fragments) | _GENERIC_CLINICAL_TERMS)
+
+        with self._lock:
+            state = self._state(session_id)
+            new_terms = clinical_terms - state.seen_terms
+            state.seen_terms |= clinical_terms
+
+            signals = {
+                "mots_etudiant": words,
+                "politesse": small_talk,
+                "intention": intent,
+                "messages_session": chat_history_count,
+                "nouvelles_infos_cliniques": sorted(new_terms)[:10],
+                "echanges_en_attente": len(state.pending),
+            }
+
+            if chat_history_count <= OPENING_MESSAGES:
+                exchanges, state.pending = state.pending + [exchange], []
+                return self._decide(ACTION_ANALYZE, "ouverture_consultation", signals, exchanges)
+
+            # Le patient vient de livrer un élément clinique : analyse immédiate
+            # (avec les échanges en attente), quelle que soit la question.
+            if new_terms:
+                exchanges, state.pending = state.pending + [exchange], []
+                action = ACTION_BATCH if len(exchanges) > 1 else ACTION_ANALYZE
+                return self._decide(action, "nouvelle_information_clinique", signals, exchanges)
+
+            if small_talk or words < MIN_SUBSTANTIVE_WORDS or intent in LOW_VALUE_INTENTS:
+                return self._decide(ACTION_SKIP, "echange_sans_enjeu_clinique", signals)
+
+            state.pending.append(exchange)
+            if len(state.pending) >= settings.TUTOR_ANALYSIS_BATCH_EVERY:
+                exchanges, state.pending = state.pending, []
+                return self._decide(ACTION_BATCH, "lot_complet", signals, exchanges)
+            return self._decide(ACTION_DEFER, "aucun_element_nouveau", signals)
+
+    def _decide(
+        self,
+        action: str,
+        reason: str,
+        signals: Dict[str, Any],
+        exchanges: Optional[List[Tuple[str, str]]] = None
+    ) -> TutorGateDecision:
+        self._stats[action] += 1
+        logger.debug(f"   🚦 Tuteur : {action} ({reason}) - {signals}")
+        return TutorGateDecision(action, reason, signals, exchanges)
+
+    def forget(self, session_id: Any) -> None:
+        with self._lock:
+            self._states.pop(str(session_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["sessions"] = len(self._states)
+        total = sum(stats[action] for action in self._stats)
+        analyzed = stats[ACTION_ANALYZE] + stats[ACTION_BATCH]
+        stats["llm_calls_avoided_ratio"] = round(1 - analyzed / total, 3) if total else 0.0
+        return stats
+
+
+def merge_exchanges(exchanges: List[Tuple[str, str]]) -> Tuple[str, str]:
+    """
+    Regroupe plusieurs échanges pour une analyse unique du Tuteur : les
+    questions (et réponses) sont numérotées dans l'ordre de la consultation.
+    """
+    if len(exchanges) == 1:
+        return exchanges[0]
+    student = "\n".join(f"[{i}] {q}" for i, (q, _) in enumerate(exchanges, 1))
+    patient = "\n".join(f"[{i}] {r}" for i, (_, r) in enumerate(exchanges, 1))
+    return student, patient
+
+
+def record_tutor_decision(
+    db: Session,
+    session_id: Any,
+    decision: TutorGateDecision,
+    patient_msg_id: int,
+    feedback: Optional[Dict[str, Any]] = None
+) -> models.TutorDecision:
+    """
+    Trace la décision du déclencheur (audit) dans `tutor_decisions`.
+    L'appelant valide la transaction.
+    """
+    tutor_decision = models.TutorDecision(
+        session_id=session_id,
+        strategy_used=GATING_STRATEGY,
+        action_choisie=decision.action,
+        intervention_content=json.dumps(feedback, ensure_ascii=False) if feedback else None,
+        rationale={
+            "raison": decision.reason,
+            "signaux": decision.signals,
+            "message_id": patient_msg_id,
+            "echanges_analyses": len(decision.exchanges) if decision.should_analyze else 0,
+        },
+    )
+    db.add(tutor_decision)
+    return tutor_decision
+
+
+# Instance globale (par processus)
+tutor_gate = TutorGate(max_sessions=settings.SESSION_CONTEXT_CACHE_MAX_ENTRIES)
@@ -1,9 +1,11 @@
 #=== Fichier: ./app/services/tutor_service.py ===
 
 from collections import defaultdict
+import asyncio
 import logging
 import json
 import time
+import re
 import uuid
 import random
 from datetime import datetime, timedelta
@@ -11,16 +13,22 @@ from typing import List, Tuple, Dict, Any, Optional, Union
 from enum import Enum
 
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import desc, func
 
 from .. import models, schemas
+from ..database import release_connection_async
 from . import (
     simulation_service, 
     interaction_log_service, 
     ai_generation_service, 
     clinical_case_service,
-    disease_service
+    disease_service,
+    exam_cache_service,
+    case_narrative_service
 )
+from .patient_actor_service import patient_actor_service
+from .exam_catalog_service import exam_catalog
 
 # ==============================================================================
 # CONFIGURATION DU LOGGER "TUTOR-ORCHESTRATOR"
@@ -49,6 +57,30 @@ if not logger.handlers:
 # CLASSES UTILITAIRES INTERNES (Logique Métier)
 # ==============================================================================
 
+# Types d'action pour lesquels le libellé désigne un examen : la correspondance
+# sémantique (embedding) du catalogue n'est tentée que pour ceux-là.
+EXAM_ACTION_TYPES = {"examen_complementaire", "biologie", "imagerie", "consulter_image", "parametres_vitaux"}
+
+def _catalog_entry(action_name: str, exam_code: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Entrée du catalogue pour une action : celle du code déjà résolu, sinon une
+    correspondance lexicale seule (jamais d'embedding : appelable sous `run_sync`).
+    """
+    if exam_code:
+        return exam_catalog.get(exam_code)
+    return exam_catalog.match(action_name, use_embeddings=False)
+
+
+async def resolve_exam_code_async(action_type: str, action_name: str) -> Optional[str]:
+    """
+    Code catalogue d'une action, résolu une fois par requête. Le repli par
+    embedding (calcul bloquant) n'est tenté que pour les examens, dans un thread.
+    """
+    if action_type.lower() not in EXAM_ACTION_TYPES:
+        return exam_catalog.match_code(action_name, use_embeddings=False)
+    return await asyncio.to_thread(exam_catalog.match_code, action_name)
+
+
 class VirtualTimeManager:
     """Gère l'avancement du temps dans la simulation en fonction des actions."""
     
@@ -68,17 +100,13 @@ class VirtualTimeManager:
     }
 
     @staticmethod
-    def calculate_duration(action_type: str, action_name: str) -> int:
-        name_lower = action_name.lower()
-        type_lower = action_type.lower()
+    def calculate_duration(action_type: str, action_name: str, exam_code: Optional[str] = None) -> int:
+        # Examen reconnu : durée du catalogue canonique
+        exam = _catalog_entry(action_name, exam_code)
+        if exam and exam.get("duree_minutes") is not None:
+            return exam["duree_minutes"]
         
-        if "scanner" in name_lower or "tdm" in name_lower: return VirtualTimeManager.COSTS_MINUTES["scanner"]
-        if "irm" in name_lower: return VirtualTimeManager.COSTS_MINUTES["irm"]
-        if "radio" in name_lower or "rx" in name_lower: return VirtualTimeManager.COSTS_MINUTES["radio"]
-        if "nfs" in name_lower or "crp" in name_lower: return VirtualTimeManager.COSTS_MINUTES["biologie_standard"]
-        if "constante" in name_lower or "vitaux" in name_lower: return VirtualTimeManager.COSTS_MINUTES["constantes"]
-        
-        return VirtualTimeManager.COSTS_MINUTES.get(type_lower, VirtualTimeManager.COSTS_MINUTES["default"])
+        return VirtualTimeManager.COSTS_MINUTES.get(action_type.lower(), VirtualTimeManager.COSTS_MINUTES["default"])
 
 class VirtualBudgetManager:
     """Gère le coût financier fictif des examens pour l'évaluation économique."""
@@ -96,13 +124,11 @@ class VirtualBudgetManager:
     }
 
     @staticmethod
-    def estimate_cost(action_name: str) -> int:
-        name_lower = action_name.lower()
-        if "scanner" in name_lower: return VirtualBudgetManager.COSTS_CURRENCY["scanner"]
-        if "irm" in name_lower: return VirtualBudgetManager.COSTS_CURRENCY["irm"]
-        if "radio" in name_lower: return VirtualBudgetManager.COSTS_CURRENCY["radio"]
-        if "echo" in name_lower: return VirtualBudgetManager.COSTS_CURRENCY["echo"]
-        if "nfs" in name_lower or "crp" in name_lower: return VirtualBudgetManager.COSTS_CURRENCY["biologie_simple"]
+    def estimate_cost(action_name: str, action_type: Optional[str] = None, exam_code: Optional[str] = None) -> int:
+        # Examen reconnu : coût du catalogue canonique
+        exam = _catalog_entry(action_name, exam_code)
+        if exam and exam.get("cout_virtuel") is not None:
+            return exam["cout_virtuel"]
         return VirtualBudgetManager.COSTS_CURRENCY["default"]
 
 # ==============================================================================
@@ -215,6 +241,12 @@ def start_new_session(
             formative_cases_pool=[]
         )
         logger.info(f"   💾 Session persistée avec succès : {new_session.id}", extra={'trace_id': trace_id})
+
+        # Contexte du patient (persona, vérité clinique, prompt) préparé dès maintenant
+        try:
+            patient_actor_service.warm_session_context(db, new_session, trace_id)
+        except Exception as e:
+            logger.warning(f"   ⚠️ Préchauffage du contexte patient impossible (Non-bloquant) : {str(e)}", extra={'trace_id': trace_id})
         
         return new_session, selected_case, session_type
 
@@ -223,23 +255,35 @@ def start_new_session(
         raise e
 
 
-def process_learner_action(
-    db: Session, 
-    session_id: uuid.UUID, 
-    action_data: schemas.simulation.LearnerActionRequest
-) -> Tuple[Dict[str, Any], str]:
-    """
-    Cœur réactif du système de simulation.
+# Catégories d'action dont le résultat est produit par l'IA Laboratoire
+EXAM_RESULT_CATEGORIES = ["examen_complementaire", "biologie", "imagerie", "consulter_image"]
+VITALS_CATEGORIES = ["parametres_vitaux"]
+# Conclusion d'examen normale : mot entier ("anormal" ne compte pas)
+NORMAL_CONCLUSION = re.compile(r"\bnormal(e|es|s|aux)?\b", re.IGNORECASE)
+HINT_TIME_PENALTY = 5
+
+
+def _load_action_context(
+    db: Session,
+    session_id: uuid.UUID,
+    action_data: schemas.simulation.LearnerActionRequest,
+    exam_code: Optional[str],
+    trace_id: str
+) -> Tuple[models.ClinicalCase, int, int]:
     """
-    trace_id = f"ACT-{str(uuid.uuid4())[:6]}"
-    start_process = time.time()
-    
-    logger.info(f"🎬 Début traitement action : {action_data.action_type} - {action_data.action_name}", extra={'trace_id': trace_id})
+    Étapes 1 à 3 d'une action (lecture courte) : session, doublons, coût et durée.
+    `exam_code` est résolu en amont, hors de la connexion (cf. `resolve_exam_code_async`).
 
+    :return: (cas clinique, durée virtuelle, coût virtuel)
+    :raises ValueError: si la session est introuvable.
+    """
     # 1. Chargement et Validation
     session = db.query(models.SimulationSession).filter(models.SimulationSession.id == session_id).first()
     if not session: raise ValueError("Session introuvable")
     clinical_case = session.cas_clinique
+    # Fragments narratifs lus dès maintenant : le prompt d'examen n'interroge
+    # plus la BDD une fois la connexion rendue.
+    case_narrative_service.get_case_fragments(clinical_case, db)
 
     # 2. Vérification Doublons
     previous_logs = db.query(models.InteractionLog).filter(
@@ -252,64 +296,72 @@ def process_learner_action(
             logger.info("   🔄 Action déjà réalisée précédemment.", extra={'trace_id': trace_id})
 
     # 3. Coût et Temps
-    virtual_duration = VirtualTimeManager.calculate_duration(action_data.action_type, action_data.action_name)
-    virtual_cost = VirtualBudgetManager.estimate_cost(action_data.action_name)
-    
-    # 4. Exécution Action
-    result_data = {}
-    feedback_tutor = ""
+    virtual_duration = VirtualTimeManager.calculate_duration(action_data.action_type, action_data.action_name, exam_code)
+    virtual_cost = VirtualBudgetManager.estimate_cost(action_data.action_name, action_data.action_type, exam_code)
+    return clinical_case, virtual_duration, virtual_cost
+
+
+def _exam_request(
+    action_category: str,
+    action_data: schemas.simulation.LearnerActionRequest,
+    trace_id: str
+) -> Optional[Tuple[str, str]]:
+    """(examen, justification) à demander à l'IA Laboratoire, ou None si l'action n'en a pas besoin."""
+    if action_category in EXAM_RESULT_CATEGORIES:
+        logger.info("   🔬 Délégation à l'IA Laboratoire...", extra={'trace_id': trace_id})
+        return action_data.action_name, action_data.justification
+    if action_category in VITALS_CATEGORIES:
+        logger.info("   💓 Délégation à l'IA Monitor...", extra={'trace_id': trace_id})
+        return "Paramètres vitaux complets", "Surveillance"
+    return None
+
+
+def _action_outcome(
+    action_category: str,
+    ai_result: Optional[Dict[str, Any]],
+    trace_id: str
+) -> Tuple[Dict[str, Any], str]:
+    """Étape 4 : résultat affiché et commentaire du tuteur selon le type d'action."""
+    # EXAMENS (BIO/RADIO)
+    if action_category in EXAM_RESULT_CATEGORIES:
+        if NORMAL_CONCLUSION.search(str(ai_result.get("conclusion", ""))):
+            return ai_result, "Résultat revenu normal."
+        return ai_result, "Résultat pathologique reçu."
+
+    # CONSTANTES
+    if action_category in VITALS_CATEGORIES:
+        return ai_result, "Constantes prises."
+
+    # PRESCRIPTIONS
+    if action_category in ["prescription", "traitement"]:
+        logger.info("   💊 Traitement administré.", extra={'trace_id': trace_id})
+        return {"statut": "Administré", "observation": "Le patient a reçu le traitement."}, "Traitement noté."
+
+    # AUTRES
+    return {"info": "Action enregistrée."}, "Action notée."
+
+
+def _persist_action_outcome(
+    db: Session,
+    session_id: uuid.UUID,
+    action_data: schemas.simulation.LearnerActionRequest,
+    result_data: Dict[str, Any],
+    virtual_duration: int,
+    virtual_cost: int,
+    start_process: float,
+    trace_id: str
+) -> None:
+    """Étapes 5 & 6 (transaction courte, après l'appel IA) : compteurs de session et log d'interaction."""
     action_category = action_data.action_type.lower()
-
-    try:
-        # EXAMENS (BIO/RADIO)
-        if action_category in ["examen_complementaire", "biologie", "imagerie", "consulter_image"]:
-            logger.info("   🔬 Délégation à l'IA Laboratoire...", extra={'trace_id': trace_id})
-            ai_result = ai_generation_service.generate_exam_result(
-                case=clinical_case,
-                session_history=[],
-                exam_name=action_data.action_name,
-                exam_justification=action_data.justification
-            )
-            result_data = ai_result
-            if "normal" in str(ai_result.get("conclusion", "")).lower():
-                feedback_tutor = "Résultat revenu normal."
-            else:
-                feedback_tutor = "Résultat pathologique reçu."
-
-        # CONSTANTES
-        elif action_category in ["parametres_vitaux"]:
-            logger.info("   💓 Délégation à l'IA Monitor...", extra={'trace_id': trace_id})
-            ai_result = ai_generation_service.generate_exam_result(
-                case=clinical_case,
-                session_history=[],
-                exam_name="Paramètres vitaux complets",
-                exam_justification="Surveillance"
-            )
-            result_data = ai_result
-            feedback_tutor = "Constantes prises."
-
-        # PRESCRIPTIONS
-        elif action_category in ["prescription", "traitement"]:
-            logger.info("   💊 Traitement administré.", extra={'trace_id': trace_id})
-            result_data = {"statut": "Administré", "observation": "Le patient a reçu le traitement."}
-            feedback_tutor = "Traitement noté."
-
-        # AUTRES
-        else:
-            result_data = {"info": "Action enregistrée."}
-            feedback_tutor = "Action notée."
-
-    except Exception as e:
-        logger.error(f"   ❌ Erreur IA Action : {str(e)}", extra={'trace_id': trace_id})
-        result_data = {"erreur": "Problème technique."}
-        feedback_tutor = "Erreur système."
-
-    # 5. Mise à jour Session
-    session.temps_total = (session.temps_total or 0) + virtual_duration
-    session.cout_virtuel_genere = (session.cout_virtuel_genere or 0) + virtual_cost
-
-    # 6. Persistence Log
     try:
+        # Incrément atomique en SQL : la session lue avant l'appel IA peut être périmée
+        db.query(models.SimulationSession).filter(models.SimulationSession.id == session_id).update(
+            {
+                models.SimulationSession.temps_total: func.coalesce(models.SimulationSession.temps_total, 0) + virtual_duration,
+                models.SimulationSession.cout_virtuel_genere: func.coalesce(models.SimulationSession.cout_virtuel_genere, 0) + virtual_cost,
+            },
+            synchronize_session=False
+        )
         log_content = {
             "name": action_data.action_name,
             "justification": action_data.justification,
@@ -333,49 +385,111 @@ def process_learner_action(
         db.rollback()
         logger.critical(f"   🔥 Échec sauvegarde log : {e}", extra={'trace_id': trace_id})
 
-    return result_data, feedback_tutor
+
+async def process_learner_action_async(
+    db: AsyncSession,
+    session_id: uuid.UUID,
+    action_data: schemas.simulation.LearnerActionRequest
+) -> Tuple[Dict[str, Any], str, schemas.simulation.ActionMetadata]:
+    """
+    Cœur réactif du système de simulation : lectures et écritures courtes via
+    `run_sync`, génération de l'examen attendue sans connexion BDD.
+
+    :return: (résultat affiché, commentaire du tuteur, coût et durée virtuels)
+    """
+    trace_id = f"ACT-{str(uuid.uuid4())[:6]}"
+    start_process = time.time()
+
+    logger.info(f"🎬 Début traitement action (async) : {action_data.action_type} - {action_data.action_name}", extra={'trace_id': trace_id})
+
+    exam_code = await resolve_exam_code_async(action_data.action_type, action_data.action_name)
+    clinical_case, virtual_duration, virtual_cost = await db.run_sync(
+        lambda sync_db: _load_action_context(sync_db, session_id, action_data, exam_code, trace_id)
+    )
+
+    action_category = action_data.action_type.lower()
+    try:
+        exam_request = _exam_request(action_category, action_data, trace_id)
+        ai_result = None
+        if exam_request:
+            exam_name, justification = exam_request
+            ai_result = await exam_cache_service.get_or_generate_exam_result_async(
+                db=db,
+                case=clinical_case,
+                exam_name=exam_name,
+                exam_justification=justification,
+                exam_code=exam_code if exam_name == action_data.action_name else None
+            )
+        result_data, feedback_tutor = _action_outcome(action_category, ai_result, trace_id)
+
+    except Exception as e:
+        logger.error(f"   ❌ Erreur IA Action : {str(e)}", extra={'trace_id': trace_id})
+        result_data = {"erreur": "Problème technique."}
+        feedback_tutor = "Erreur système."
+
+    await db.run_sync(
+        lambda sync_db: _persist_action_outcome(
+            sync_db, session_id, action_data, result_data, virtual_duration, virtual_cost, start_process, trace_id
+        )
+    )
+    meta = schemas.simulation.ActionMetadata(virtual_cost=virtual_cost, virtual_duration=virtual_duration)
+    return result_data, feedback_tutor, meta
+
+
+def _load_hint_context(db: Session, session_id: uuid.UUID) -> Tuple[models.ClinicalCase, List[str]]:
+    """Cas clinique (pathologie incluse) et derniers messages de la session, pour l'indice."""
+    session = db.query(models.SimulationSession).options(
+        joinedload(models.SimulationSession.cas_clinique).joinedload(models.ClinicalCase.pathologie_principale)
+    ).filter(models.SimulationSession.id == session_id).first()
+    # Historique récent pour contexte
+    history = [m.content for m in session.messages[-5:]]
+    return session.cas_clinique, history
+
+
+def _apply_hint_penalty(db: Session, session_id: uuid.UUID) -> None:
+    """Pénalité de temps de l'indice (incrément atomique, transaction courte)."""
+    db.query(models.SimulationSession).filter(models.SimulationSession.id == session_id).update(
+        {models.SimulationSession.temps_total: func.coalesce(models.SimulationSession.temps_total, 0) + HINT_TIME_PENALTY},
+        synchronize_session=False
+    )
+    db.commit()
 
 
-def provide_hint(db: Session, session_id: uuid.UUID) -> Tuple[str, str]:
-    """Fournit un indice."""
+async def provide_hint_async(db: AsyncSession, session_id: uuid.UUID) -> Tuple[str, str]:
+    """Fournit un indice (pénalité de temps appliquée après génération)."""
     trace_id = f"HINT-{str(uuid.uuid4())[:6]}"
-    logger.info(f"💡 Demande indice Session {session_id}", extra={'trace_id': trace_id})
-    session = db.query(models.SimulationSession).filter(models.SimulationSession.id == session_id).first()
-    
+    logger.info(f"💡 Demande indice Session {session_id} (async)", extra={'trace_id': trace_id})
+
     try:
-        # Historique récent pour contexte
-        history = [m.content for m in session.messages[-5:]]
-        hint_type, hint_content = ai_generation_service.generate_hint(
-            case=session.cas_clinique,
+        case, history = await db.run_sync(lambda sync_db: _load_hint_context(sync_db, session_id))
+        await release_connection_async(db)
+        hint_type, hint_content = await ai_generation_service.generate_hint_async(
+            case=case,
             session_history=history,
             hint_level=1
         )
-        # Pénalité
-        session.temps_total = (session.temps_total or 0) + 5
-        db.commit()
+        await db.run_sync(lambda sync_db: _apply_hint_penalty(sync_db, session_id))
         return hint_type, hint_content
     except Exception as e:
         logger.error(f"   ❌ Erreur indice: {e}", extra={'trace_id': trace_id})
         return "error", "Indisponible."
 
 
-def evaluate_submission(
-    db: Session, 
-    session_id: uuid.UUID, 
-    submission_data: schemas.simulation.SubmissionRequest
-) -> Tuple[schemas.simulation.EvaluationResult, str, str]:
-    """
-    Termine la session, évalue la performance (Sémantique) et met à jour la progression.
+def _load_evaluation_context(
+    db: Session,
+    session_id: uuid.UUID,
+    trace_id: str
+) -> Tuple[models.SimulationSession, List[str]]:
     """
-    trace_id = f"EVAL-{str(uuid.uuid4())[:6]}"
-    start_eval = time.time()
-    
-    logger.info(f"🏁 [EVALUATION] Soumission reçue pour Session {session_id}", extra={'trace_id': trace_id})
-    logger.debug(f"   📝 Diagnostic soumis : {submission_data.diagnosed_pathology_text}", extra={'trace_id': trace_id})
-    logger.debug(f"   📝 Traitement soumis : {submission_data.prescribed_treatment_text[:50]}...", extra={'trace_id': trace_id})
+    Étapes 1 et 2 de l'évaluation : session et timeline fusionnée (chat + actions)
+    destinée à l'IA Juge.
 
+    :raises ValueError: si la session est introuvable.
+    """
     # 1. Chargement Session
-    session = db.query(models.SimulationSession).filter(models.SimulationSession.id == session_id).first()
+    session = db.query(models.SimulationSession).options(
+        joinedload(models.SimulationSession.cas_clinique).joinedload(models.ClinicalCase.pathologie_principale)
+    ).filter(models.SimulationSession.id == session_id).first()
     if not session: raise ValueError("Session introuvable")
 
     # 2. Reconstitution Timeline (Fusion Chat + Actions) pour l'IA Juge
@@ -394,6 +508,99 @@ def evaluate_submission(
     
     timeline.sort(key=lambda x: x['time'])
     history_for_ai = [f"[{t['time'].strftime('%H:%M')}] {t['type']} ({t['actor']}): {t['detail']}" for t in timeline]
+    return session, history_for_ai
+
+
+class SessionAlreadyEvaluatedError(ValueError):
+    """La session a déjà été clôturée par une évaluation : on ne la note pas deux fois."""
+
+
+def _apply_evaluation(
+    db: Session,
+    session_id: uuid.UUID,
+    eval_result: schemas.simulation.EvaluationResult,
+    trace_id: str
+) -> None:
+    """
+    Étape 4 (transaction courte, après le jury) : clôture de la session et
+    progression de l'apprenant.
+
+    :raises SessionAlreadyEvaluatedError: si la session est déjà clôturée
+        (la progression n'est jamais comptée deux fois).
+    """
+    logger.info("   📈 Mise à jour de la progression de l'apprenant...", extra={'trace_id': trace_id})
+
+    # Relecture verrouillée : la connexion a été rendue pendant l'attente du jury,
+    # `context_state` a pu changer (ex: résumé de conversation) et une autre
+    # évaluation de la même session a pu aboutir entre-temps.
+    session = db.query(models.SimulationSession).filter(
+        models.SimulationSession.id == session_id
+    ).populate_existing().with_for_update().first()
+    if not session: raise ValueError("Session introuvable")
+    if session.statut == "completed":
+        db.rollback()
+        raise SessionAlreadyEvaluatedError(f"Session {session_id} déjà évaluée")
+    
+    # A. Clôture Session
+    session.score_final = eval_result.score_total
+    session.statut = "completed"
+    session.end_time = datetime.now()
+    session.raison_fin = "submission"
+    
+    # Stockage détails dans le JSON contextuel pour audit futur
+    # Réassignation d'un nouveau dict : SQLAlchemy ne détecte pas les mutations en place du JSON
+    context = dict(session.context_state or {})
+    context["evaluation_details"] = eval_result.model_dump()
+    session.context_state = context
+    
+    # B. Mise à jour LearningPath (Table séparée)
+    # On vérifie si une entrée existe pour cet apprenant
+    learning_path = db.query(models.LearningPath).filter(
+        models.LearningPath.learner_id == session.learner_id
+    ).first()
+    
+    if not learning_path:
+        logger.info("      Création d'un nouveau LearningPath...", extra={'trace_id': trace_id})
+        learning_path = models.LearningPath(
+            learner_id=session.learner_id,
+            progression=0.0,
+            status="active"
+        )
+        db.add(learning_path)
+    
+    # Logique de mise à jour de la progression (Simplifiée)
+    # On incrémente la progression globale si la note est bonne
+    if eval_result.score_total >= 12:
+        # Gain de progression (ex: +5% par cas réussi)
+        learning_path.progression = min(100.0, (learning_path.progression or 0.0) + 5.0)
+        logger.info(f"      ✅ Succès ! Progression totale : {learning_path.progression}%", extra={'trace_id': trace_id})
+        
+        # Ici, on pourrait aussi mettre à jour les compétences spécifiques
+        # (LearnerCompetencyMastery) mais cela demande un mapping complexe.
+        # Pour l'instant, on se contente du LearningPath global.
+    else:
+        logger.info("      ❌ Échec. Pas de progression.", extra={'trace_id': trace_id})
+
+    db.commit()
+
+
+def evaluate_submission(
+    db: Session, 
+    session_id: uuid.UUID, 
+    submission_data: schemas.simulation.SubmissionRequest
+) -> Tuple[schemas.simulation.EvaluationResult, str, str]:
+    """
+    Termine la session, évalue la performance (Sémantique) et met à jour la progression.
+    """
+    trace_id = f"EVAL-{str(uuid.uuid4())[:6]}"
+    start_eval = time.time()
+    
+    logger.info(f"🏁 [EVALUATION] Soumission reçue pour Session {session_id}", extra={'trace_id': trace_id})
+    logger.debug(f"   📝 Diagnostic soumis : {submission_data.diagnosed_pathology_text}", extra={'trace_id': trace_id})
+    logger.debug(f"   📝 Traitement soumis : {submission_data.prescribed_treatment_text[:50]}...", extra={'trace_id': trace_id})
+
+    # 1 & 2. Session et timeline
+    session, history_for_ai = _load_evaluation_context(db, session_id, trace_id)
 
     # 3. Appel IA Juge (Comparaison Sémantique)
     # -------------------------------------------------------------------------
@@ -404,66 +611,27 @@ def evaluate_submission(
             db=db,
             case=session.cas_clinique,
             submission=submission_data,
-            session_history=history_for_ai
+            session_history=history_for_ai,
+            session_id=session_id
         )
         
         logger.info(f"   🏆 Note attribuée : {eval_result.score_total}/20", extra={'trace_id': trace_id})
 
         # 4. Mise à jour des Données Apprenant (Progression)
-        # ---------------------------------------------------------------------
-        logger.info("   📈 Mise à jour de la progression de l'apprenant...", extra={'trace_id': trace_id})
-        
-        # A. Clôture Session
-        session.score_final = eval_result.score_total
-        session.statut = "completed"
-        session.end_time = datetime.now()
-        session.raison_fin = "submission"
-        
-        # Stockage détails dans le JSON contextuel pour audit futur
-        context = session.context_state or {}
-        context["evaluation_details"] = eval_result.model_dump()
-        session.context_state = context
-        
-        # B. Mise à jour LearningPath (Table séparée)
-        # On vérifie si une entrée existe pour cet apprenant
-        learning_path = db.query(models.LearningPath).filter(
-            models.LearningPath.learner_id == session.learner_id
-        ).first()
-        
-        if not learning_path:
-            logger.info("      Création d'un nouveau LearningPath...", extra={'trace_id': trace_id})
-            learning_path = models.LearningPath(
-                learner_id=session.learner_id,
-                progression=0.0,
-                status="active"
-            )
-            db.add(learning_path)
-        
-        # Logique de mise à jour de la progression (Simplifiée)
-        # On incrémente la progression globale si la note est bonne
-        if eval_result.score_total >= 12:
-            # Gain de progression (ex: +5% par cas réussi)
-            learning_path.progression = min(100.0, (learning_path.progression or 0.0) + 5.0)
-            logger.info(f"      ✅ Succès ! Progression totale : {learning_path.progression}%", extra={'trace_id': trace_id})
-            
-            # Ici, on pourrait aussi mettre à jour les compétences spécifiques
-            # (LearnerCompetencyMastery) mais cela demande un mapping complexe.
-            # Pour l'instant, on se contente du LearningPath global.
-        else:
-            logger.info("      ❌ Échec. Pas de progression.", extra={'trace_id': trace_id})
-
-        db.commit()
+        _apply_evaluation(db, session_id, eval_result, trace_id)
         
         logger.info(f"🏁 [EVALUATION] Terminée en {time.time() - start_eval:.2f}s", extra={'trace_id': trace_id})
         return eval_result, feedback, recommendation
 
+    except SessionAlreadyEvaluatedError:
+        logger.warning(f"   ⚠️ Session {session_id} déjà évaluée : progression inchangée.", extra={'trace_id': trace_id})
+        raise
     except Exception as e:
         db.rollback()
         logger.critical(f"   🔥 Erreur critique évaluation : {e}", extra={'trace_id': trace_id})
         import traceback
         logger.error(traceback.format_exc())
         raise e
-    
 
 
 def get_learner_history_by_category(db: Session, learner_id: int) -> schemas.simulation.LearnerDetailedHistoryResponse:
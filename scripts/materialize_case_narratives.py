@@ -0,0 +1,63 @@
+import sys
+import os
+import argparse
+
+# Ajoute la racine du projet au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.orm import joinedload
+
+from app.database import SessionLocal
+from app import models
+from app.services import case_narrative_service
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Calcule et enregistre les fragments narratifs (textes des prompts) de chaque cas clinique."
+    )
+    parser.add_argument("--case-ids", type=str, default=None,
+                        help="Limiter à certains cas (IDs séparés par des virgules).")
+    parser.add_argument("--force", action="store_true",
+                        help="Régénérer même les fragments déjà à jour.")
+    return parser.parse_args()
+
+
+def materialize_case_narratives():
+    args = parse_args()
+    db = SessionLocal()
+    print("--- Matérialisation des fragments narratifs des cas ---")
+
+    try:
+        query = db.query(models.ClinicalCase).options(joinedload(models.ClinicalCase.pathologie_principale))
+        if args.case_ids:
+            ids = [int(x) for x in args.case_ids.split(",") if x.strip()]
+            query = query.filter(models.ClinicalCase.id.in_(ids))
+        cases = query.order_by(models.ClinicalCase.id).all()
+
+        done = skipped = failed = 0
+        for case in cases:
+            fragments = case.fragments_narratifs
+            if not args.force and isinstance(fragments, dict) \
+                    and fragments.get("version") == case_narrative_service.FRAGMENTS_VERSION:
+                skipped += 1
+                continue
+            try:
+                case_narrative_service.refresh_case_fragments(db, case)
+                done += 1
+            except Exception as e:
+                db.rollback()
+                failed += 1
+                print(f"   ❌ Cas {case.id} : {e}")
+
+        print(f"✅ {done} cas matérialisé(s), {skipped} déjà à jour, {failed} échec(s).")
+
+    except Exception as e:
+        print(f"❌ Une erreur est survenue : {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    materialize_case_narratives()
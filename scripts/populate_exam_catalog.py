@@ -0,0 +1,46 @@
+import sys
+import os
+
+# Ajoute la racine du projet au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import SessionLocal
+from app import models
+from app.services.exam_catalog_service import DEFAULT_EXAM_CATALOG
+
+
+def populate():
+    db = SessionLocal()
+    print("--- Peuplement du Catalogue des Examens ---")
+
+    created = 0
+    updated = 0
+    try:
+        for entry in DEFAULT_EXAM_CATALOG:
+            existing = db.query(models.ExamCatalogEntry).filter(
+                models.ExamCatalogEntry.code == entry["code"]
+            ).first()
+
+            if existing:
+                # On complète les synonymes sans écraser ceux ajoutés par les experts
+                synonymes = list(existing.synonymes or [])
+                for s in entry["synonymes"]:
+                    if s not in synonymes:
+                        synonymes.append(s)
+                existing.synonymes = synonymes
+                updated += 1
+            else:
+                db.add(models.ExamCatalogEntry(**entry))
+                created += 1
+
+        db.commit()
+        print(f"✨ Terminé. {created} examen(s) créé(s), {updated} mis à jour.")
+    except Exception as e:
+        print(f"❌ Une erreur est survenue : {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    populate()
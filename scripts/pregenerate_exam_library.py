@@ -0,0 +1,146 @@
+import sys
+import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Ajoute la racine du projet au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.orm import joinedload
+
+from app.database import SessionLocal
+from app import models
+from app.services import ai_generation_service, exam_cache_service
+from app.services.llm import llm_client
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Pré-génère la bibliothèque d'examens courants pour chaque cas clinique."
+    )
+    parser.add_argument("--exams", type=str, default=None,
+                        help="Liste d'examens séparés par des virgules (défaut : DEFAULT_EXAM_LIBRARY).")
+    parser.add_argument("--case-ids", type=str, default=None,
+                        help="Limiter à certains cas (IDs séparés par des virgules).")
+    parser.add_argument("--include-unvalidated", action="store_true",
+                        help="Inclure les cas non validés par un expert.")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Nombre maximal de générations simultanées (défaut : 4).")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Nombre maximal de générations pour ce lancement.")
+    parser.add_argument("--force", action="store_true",
+                        help="Régénérer même les entrées déjà présentes et à jour.")
+    return parser.parse_args()
+
+
+def load_cases(db, args):
+    """Charge les cas cibles avec leur pathologie (aucun accès BDD pendant la génération)."""
+    query = db.query(models.ClinicalCase).options(joinedload(models.ClinicalCase.pathologie_principale))
+    if not args.include_unvalidated:
+        query = query.filter(models.ClinicalCase.valide_expert.is_(True))
+    if args.case_ids:
+        ids = [int(x) for x in args.case_ids.split(",") if x.strip()]
+        query = query.filter(models.ClinicalCase.id.in_(ids))
+    return query.order_by(models.ClinicalCase.id).all()
+
+
+def total_tokens(usage):
+    stats = usage.get(ai_generation_service.AiTaskType.EXAM_GENERATION.value, {})
+    return stats.get("calls", 0), stats.get("prompt_tokens", 0), stats.get("completion_tokens", 0)
+
+
+def pregenerate_exam_library():
+    args = parse_args()
+    exams = [e.strip() for e in args.exams.split(",")] if args.exams else exam_cache_service.DEFAULT_EXAM_LIBRARY
+
+    db = SessionLocal()
+    print("--- Pré-génération de la bibliothèque d'examens ---")
+
+    try:
+        cases = load_cases(db, args)
+        print(f"Cas cliniques ciblés : {len(cases)} | Examens : {len(exams)} | Concurrence : {args.concurrency}")
+
+        # --- Étape 1 : Planification (reprise : on saute ce qui est déjà à jour) ---
+        jobs = []
+        skipped = 0
+        for case in cases:
+            for exam_name in exams:
+                if not args.force and exam_cache_service.has_fresh_entry(
+                    db, case, exam_name, source=exam_cache_service.LIBRARY_SOURCE
+                ):
+                    skipped += 1
+                    continue
+                jobs.append((case, exam_name))
+
+        if args.limit is not None:
+            jobs = jobs[:args.limit]
+
+        print(f"  -> {skipped} entrée(s) déjà à jour (ignorées), {len(jobs)} à générer.")
+        if not jobs:
+            print("✅ Rien à faire.")
+            return
+
+        # --- Étape 2 : Génération (concurrence bornée) ---
+        # Les appels LLM partent en parallèle ; les écritures BDD restent dans ce thread.
+        calls_0, prompt_0, completion_0 = total_tokens(ai_generation_service.get_token_usage())
+        start = time.time()
+        stored = failed = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            futures = {
+                executor.submit(
+                    ai_generation_service.generate_exam_result,
+                    case=case,
+                    session_history=[],
+                    exam_name=exam_name,
+                    exam_justification="Pré-génération (bibliothèque d'examens)"
+                ): (case, exam_name)
+                for case, exam_name in jobs
+            }
+
+            for index, future in enumerate(as_completed(futures), start=1):
+                case, exam_name = futures[future]
+                try:
+                    result = future.result()
+                    ok = exam_cache_service.store_result(
+                        db, case, exam_name, result,
+                        source=exam_cache_service.LIBRARY_SOURCE, ttl_hours=0
+                    )
+                except Exception as e:
+                    print(f"   ❌ Cas {case.id} / {exam_name} : {e}")
+                    ok = False
+
+                if ok:
+                    stored += 1
+                else:
+                    failed += 1
+
+                calls, prompt_tok, completion_tok = total_tokens(ai_generation_service.get_token_usage())
+                elapsed = time.time() - start
+                eta = elapsed / index * (len(jobs) - index)
+                print(
+                    f"  [{index}/{len(jobs)}] {'✅' if ok else '⚠️'} Cas {case.id} / {exam_name} "
+                    f"| Tokens : {prompt_tok - prompt_0} in / {completion_tok - completion_0} out "
+                    f"| ETA : {eta:.0f}s"
+                )
+
+        # --- Étape 3 : Bilan ---
+        calls, prompt_tok, completion_tok = total_tokens(ai_generation_service.get_token_usage())
+        print("\n" + "=" * 50)
+        print(f"✅ {stored} résultat(s) enregistré(s), {failed} échec(s), {skipped} déjà à jour.")
+        print(f"   Appels LLM : {calls - calls_0} | Tokens : {prompt_tok - prompt_0} in / {completion_tok - completion_0} out")
+        print(f"   Durée : {time.time() - start:.1f}s")
+        if failed:
+            print("   Relancez le script pour reprendre les examens en échec.")
+
+    except Exception as e:
+        print(f"❌ Une erreur est survenue : {e}")
+        db.rollback()
+    finally:
+        db.close()
+        llm_client.shutdown()
+
+
+if __name__ == "__main__":
+    pregenerate_exam_library()
@@ -0,0 +1,49 @@
+import sys
+import os
+import argparse
+import signal
+import threading
+
+# Ajoute la racine du projet au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.evaluation_job_service import EvaluationWorker, default_worker_id, start_worker_threads
+from app.config import settings
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Traite la file des évaluations finales (POST /simulation/sessions/{id}/submit)."
+    )
+    parser.add_argument("--threads", type=int, default=1,
+                        help="Nombre de workers (threads) dans ce processus.")
+    parser.add_argument("--once", action="store_true",
+                        help="Traiter les jobs prêts puis s'arrêter (ex: tâche planifiée).")
+    return parser.parse_args()
+
+
+def run_evaluation_worker():
+    args = parse_args()
+
+    if args.once:
+        worker = EvaluationWorker(default_worker_id(), settings.EVALUATION_WORKER_POLL_SECONDS)
+        done = 0
+        while worker.run_once():
+            done += 1
+        print(f"✅ {done} job(s) traité(s).")
+        return
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
+    print(f"--- Workers d'évaluation : {args.threads} thread(s) ---")
+    threads = start_worker_threads(max(1, args.threads), stop_event)
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(timeout=1.0)
+    print("✅ Workers arrêtés.")
+
+
+if __name__ == "__main__":
+    run_evaluation_worker()
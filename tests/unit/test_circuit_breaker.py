@@ -0,0 +1,94 @@
+#=== Fichier: ./tests/unit/test_circuit_breaker.py ===
+
+import pytest
+
+from app.services.llm import circuit_breaker as cb
+from app.services.llm.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cb.time, "monotonic", fake)
+    return fake
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker("m", failure_threshold=3, recovery_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == cb.STATE_CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == cb.STATE_OPEN
+    assert not breaker.is_available()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("m", failure_threshold=3, recovery_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == cb.STATE_CLOSED
+
+
+def test_half_open_after_recovery_timeout_allows_limited_probes(clock):
+    breaker = CircuitBreaker("m", failure_threshold=1, recovery_timeout=30, half_open_max_calls=1)
+    _open(breaker)
+
+    clock.now += 29
+    assert breaker.state == cb.STATE_OPEN
+
+    clock.now += 1
+    assert breaker.state == cb.STATE_HALF_OPEN
+    breaker.before_call()  # place sonde
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_probe_success_closes_the_circuit(clock):
+    breaker = CircuitBreaker("m", failure_threshold=1, recovery_timeout=30)
+    _open(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == cb.STATE_CLOSED
+    breaker.before_call()
+
+
+def test_probe_failure_reopens_the_circuit(clock):
+    breaker = CircuitBreaker("m", failure_threshold=3, recovery_timeout=30)
+    _open(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == cb.STATE_OPEN
+    assert breaker.stats()["opened"] == 2
+
+
+def test_cancelled_probe_frees_its_slot(clock):
+    breaker = CircuitBreaker("m", failure_threshold=1, recovery_timeout=30, half_open_max_calls=1)
+    _open(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_cancelled()
+    assert breaker.is_available()
+    breaker.before_call()
@@ -0,0 +1,174 @@
+#=== Fichier: ./tests/unit/test_evaluation_jobs.py ===
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.services import evaluation_job_service as jobs
+from app.services import tutor_service
+
+
+def _job(**fields):
+    values = dict(
+        id=uuid.uuid4(), session_id=uuid.uuid4(), status=jobs.JOB_RUNNING, attempts=1,
+        locked_by="w", locked_at=datetime.now(), run_after=None, finished_at=None,
+        last_error=None, result=None,
+        submission={"diagnosed_pathology_text": "Paludisme grave", "prescribed_treatment_text": "Artésunate IV"},
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+def _claim_query(db, job):
+    query = db.query.return_value
+    query.filter.return_value.order_by.return_value.with_for_update.return_value.first.return_value = job
+    return query
+
+
+# ==============================================================================
+# RÉSERVATION
+# ==============================================================================
+
+def test_claim_locks_with_skip_locked_and_takes_the_job():
+    db = mock.MagicMock()
+    job = _job(status=jobs.JOB_QUEUED, attempts=0, locked_by=None, locked_at=None)
+    query = _claim_query(db, job)
+
+    claimed = jobs.claim_next_job(db, "worker-1")
+
+    assert claimed is job
+    assert (job.status, job.attempts, job.locked_by) == (jobs.JOB_RUNNING, 1, "worker-1")
+    assert job.locked_at is not None
+    query.filter.return_value.order_by.return_value.with_for_update.assert_called_once_with(skip_locked=True)
+    db.commit.assert_called_once()
+
+
+def test_claim_filters_ready_jobs_and_expired_leases():
+    db = mock.MagicMock()
+    query = _claim_query(db, None)
+
+    assert jobs.claim_next_job(db, "worker-1") is None
+    db.rollback.assert_called_once()
+
+    (condition,), _ = query.filter.call_args
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+    assert "evaluation_jobs.status = %(status_1)s AND evaluation_jobs.run_after <= %(run_after_1)s" in sql
+    assert "evaluation_jobs.status = %(status_2)s AND evaluation_jobs.locked_at < %(locked_at_1)s" in sql
+    params = condition.compile(dialect=postgresql.dialect()).params
+    assert (params["status_1"], params["status_2"]) == (jobs.JOB_QUEUED, jobs.JOB_RUNNING)
+    lease = params["run_after_1"] - params["locked_at_1"]
+    assert abs(lease.total_seconds() - settings.EVALUATION_JOB_LEASE_SECONDS) < 1
+
+
+def test_claim_of_an_expired_lease_counts_a_new_attempt():
+    db = mock.MagicMock()
+    job = _job(status=jobs.JOB_RUNNING, attempts=1, locked_by="mort", locked_at=datetime.now() - timedelta(hours=1))
+    _claim_query(db, job)
+
+    jobs.claim_next_job(db, "worker-2")
+
+    assert (job.attempts, job.locked_by) == (2, "worker-2")
+
+
+# ==============================================================================
+# ÉCHECS ET NOUVELLES TENTATIVES
+# ==============================================================================
+
+@pytest.mark.parametrize("attempts, factor", [(1, 1), (2, 2), (3, 4)])
+def test_retry_delay_is_exponential(attempts, factor):
+    assert jobs._retry_delay(attempts) == settings.EVALUATION_JOB_RETRY_BACKOFF_SECONDS * factor
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Job renvoyé par `get_job` et notifications de fin émises."""
+    job = _job()
+    notified = []
+    monkeypatch.setattr(jobs, "get_job", lambda db, job_id: job)
+    monkeypatch.setattr(jobs, "_notify_finished", lambda db, j: notified.append(j))
+    return job, notified
+
+
+def test_retryable_failure_requeues_with_backoff(recorded):
+    job, notified = recorded
+    db = mock.MagicMock()
+
+    jobs._record_failure(db, job.id, attempts=1, error="x" * 5000, retryable=True)
+
+    assert job.status == jobs.JOB_QUEUED
+    assert (job.locked_by, job.locked_at) == (None, None)
+    assert len(job.last_error) == jobs.MAX_ERROR_CHARS
+    expected = datetime.now() + timedelta(seconds=jobs._retry_delay(1))
+    assert abs((job.run_after - expected).total_seconds()) < 5
+    assert notified == []
+    db.commit.assert_called_once()
+
+
+@pytest.mark.parametrize("attempts, retryable", [
+    (settings.EVALUATION_JOB_MAX_ATTEMPTS, True),  # tentatives épuisées
+    (1, False),                                    # erreur définitive
+])
+def test_final_failure_marks_failed_and_notifies(recorded, attempts, retryable):
+    job, notified = recorded
+    db = mock.MagicMock()
+
+    jobs._record_failure(db, job.id, attempts=attempts, error="boom", retryable=retryable)
+
+    assert job.status == jobs.JOB_FAILED
+    assert job.finished_at is not None
+    assert notified == [job]
+
+
+# ==============================================================================
+# EXÉCUTION
+# ==============================================================================
+
+@contextmanager
+def _no_heartbeat(job_id, worker_id):
+    yield
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    """`run_job` sans base : session ouverte, sans battement de bail."""
+    calls = {"failures": [], "resolved": []}
+    monkeypatch.setattr(jobs, "_session_completed", lambda db, session_id: False)
+    monkeypatch.setattr(jobs, "_lease_heartbeat", _no_heartbeat)
+    monkeypatch.setattr(jobs, "_record_failure", lambda db, job_id, attempts, error, retryable: calls["failures"].append(retryable))
+    monkeypatch.setattr(jobs, "_resolve_already_evaluated", lambda db, job_id, session_id, worker_id: calls["resolved"].append(job_id))
+    return calls
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (RuntimeError("fournisseur indisponible"), True),
+    (ValueError("session introuvable"), False),
+])
+def test_run_job_failure_is_recorded(monkeypatch, runner, error, retryable):
+    monkeypatch.setattr(tutor_service, "evaluate_submission", mock.Mock(side_effect=error))
+    db = mock.MagicMock()
+
+    assert jobs.run_job(db, _job(), "w") is False
+    db.rollback.assert_called_once()
+    assert runner["failures"] == [retryable]
+
+
+def test_run_job_never_reevaluates_a_completed_session(monkeypatch, runner):
+    evaluate = mock.Mock(side_effect=tutor_service.SessionAlreadyEvaluatedError("déjà évaluée"))
+    monkeypatch.setattr(tutor_service, "evaluate_submission", evaluate)
+    job = _job()
+
+    assert jobs.run_job(mock.MagicMock(), job, "w") is False
+    assert runner["resolved"] == [job.id]
+    assert runner["failures"] == []
+
+    # Session déjà clôturée avant même l'évaluation : aucun appel au jury
+    evaluate.reset_mock()
+    monkeypatch.setattr(jobs, "_session_completed", lambda db, session_id: True)
+    assert jobs.run_job(mock.MagicMock(), job, "w") is False
+    evaluate.assert_not_called()
@@ -0,0 +1,163 @@
+#=== Fichier: ./tests/unit/test_exam_cache.py ===
+
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy import select
+
+from app import models
+from app.services import exam_cache_service as cache
+from app.services.case_narrative_service import FRAGMENTS_VERSION
+
+
+@pytest.fixture(autouse=True)
+def no_embeddings(monkeypatch):
+    """Pas de modèle d'embedding en test : correspondance lexicale seule."""
+    monkeypatch.setitem(sys.modules, "app.services.embedding_service", None)
+
+
+def _case(**overrides):
+    fields = dict(
+        id=7,
+        donnees_paracliniques={"NFS": {"Hb": "9 g/dL"}},
+        pathologie_principale_id=3,
+        fragments_narratifs={
+            "version": FRAGMENTS_VERSION,
+            "verite_terrain": {"pathologie_nom": "Paludisme grave", "description": "d", "physiopathologie": "p"},
+        },
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def _with_truth(**truth):
+    case = _case()
+    case.fragments_narratifs = dict(case.fragments_narratifs, verite_terrain=dict(case.fragments_narratifs["verite_terrain"], **truth))
+    return case
+
+
+# ==============================================================================
+# CLÉS
+# ==============================================================================
+
+@pytest.mark.parametrize("label, key", [
+    ("N.F.S", "NFS"),
+    ("Hémogramme", "NFS"),
+    ("Dosage TPHA", "dosage tpha"),
+])
+def test_exam_key_is_catalog_code_or_normalized_label(label, key):
+    assert cache.canonicalize_exam_name(label) == key
+
+
+def test_resolved_code_is_used_as_is():
+    assert cache.canonicalize_exam_name("libellé libre", exam_code="CRP") == "CRP"
+
+
+def test_fingerprint_is_stable_and_tracks_what_the_prompt_uses():
+    reference = cache.compute_case_fingerprint(_case())
+    assert cache.compute_case_fingerprint(_case()) == reference
+
+    changed = [
+        _case(donnees_paracliniques={"NFS": {"Hb": "12 g/dL"}}),
+        _case(pathologie_principale_id=4),
+        _with_truth(pathologie_nom="Méningite"),
+        _with_truth(physiopathologie="autre mécanisme"),
+    ]
+    assert all(cache.compute_case_fingerprint(case) != reference for case in changed)
+
+
+# ==============================================================================
+# LECTURE
+# ==============================================================================
+
+def _db_with_entry(entry):
+    db = mock.MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = entry
+    return db
+
+
+def _entry(case, **overrides):
+    fields = dict(
+        id=1,
+        expires_at=datetime.now() + timedelta(hours=1),
+        case_fingerprint=cache.compute_case_fingerprint(case),
+        result={"conclusion": "Anémie."},
+        source="llm",
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_fresh_entry_is_a_hit():
+    case = _case()
+    db = _db_with_entry(_entry(case))
+    assert cache.get_cached_result(db, case, "NFS", exam_key="NFS") == {"conclusion": "Anémie."}
+    db.commit.assert_called_once()
+
+
+@pytest.mark.parametrize("overrides", [
+    {"expires_at": datetime.now() - timedelta(minutes=1)},
+    {"case_fingerprint": "périmée"},
+])
+def test_expired_or_stale_entry_is_a_miss(overrides):
+    case = _case()
+    db = _db_with_entry(_entry(case, **overrides))
+    assert cache.get_cached_result(db, case, "NFS") is None
+    db.commit.assert_not_called()
+
+
+@pytest.mark.parametrize("result", [
+    {"type_resultat": "erreur", "conclusion": "Examen non réalisé."},
+    {"type_resultat": "biologie", "mode_degrade": True},
+    "pas un dict",
+])
+def test_fallback_results_are_never_stored(result):
+    db = mock.MagicMock()
+    assert cache.store_result(db, _case(), "NFS", result) is False
+    db.execute.assert_not_called()
+
+
+def test_prompt_template_version_is_part_of_the_key():
+    db = _db_with_entry(None)
+    cache.get_cached_result(db, _case(), "NFS", exam_key="NFS")
+    criteria = [str(c) for c in db.query.return_value.filter.call_args.args]
+    assert any("template_version" in c for c in criteria)
+
+
+# ==============================================================================
+# ÉVICTION
+# ==============================================================================
+
+def _evict_db(expired: int, total: int, lru_deleted: int):
+    db = mock.MagicMock()
+    query = db.query.return_value
+    query.filter.return_value.delete.side_effect = [expired, lru_deleted]
+    query.scalar.return_value = total
+    query.filter.return_value.order_by.return_value.limit.return_value.subquery.return_value = (
+        select(models.ExamResultCache.id).subquery()
+    )
+    return db
+
+
+def test_evict_removes_expired_then_lru_overflow():
+    db = _evict_db(expired=2, total=13, lru_deleted=3)
+    assert cache.evict(db, max_entries=10) == 5
+    query = db.query.return_value.filter.return_value
+    query.order_by.return_value.limit.assert_called_once_with(3)
+    db.commit.assert_called_once()
+
+
+def test_evict_without_overflow_only_drops_expired():
+    db = _evict_db(expired=1, total=5, lru_deleted=0)
+    assert cache.evict(db, max_entries=10) == 1
+    db.query.return_value.filter.return_value.order_by.assert_not_called()
+
+
+def test_evict_failure_rolls_back():
+    db = mock.MagicMock()
+    db.query.side_effect = RuntimeError("base indisponible")
+    assert cache.evict(db, max_entries=10) == 0
+    db.rollback.assert_called_once()
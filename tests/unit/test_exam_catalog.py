@@ -0,0 +1,110 @@
+#=== Fichier: ./tests/unit/test_exam_catalog.py ===
+
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.exam_catalog_service import DEFAULT_EXAM_CATALOG, exam_catalog, normalize_exam_text
+
+
+class FakeEmbeddings:
+    """Vecteurs déterministes : 'image des poumons' est proche de la radiographie du thorax."""
+
+    def __init__(self, fail=False, delay=0.0):
+        self.fail = fail
+        self.delay = delay
+        self.batches = 0
+        self.single = 0
+
+    @staticmethod
+    def _vector(text):
+        text = normalize_exam_text(text)
+        return [1.0, 0.0] if ("thorax" in text or "poumon" in text) else [0.0, 1.0]
+
+    def get_text_embeddings(self, texts):
+        self.batches += 1
+        time.sleep(self.delay)
+        return None if self.fail else [self._vector(t) for t in texts]
+
+    def get_text_embedding(self, text):
+        self.single += 1
+        return None if self.fail else self._vector(text)
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    def install(**kwargs):
+        fake = FakeEmbeddings(**kwargs)
+        monkeypatch.setitem(sys.modules, "app.services.embedding_service", SimpleNamespace(embedding_service=fake))
+        return fake
+    return install
+
+
+@pytest.fixture(autouse=True)
+def catalog():
+    exam_catalog.load(DEFAULT_EXAM_CATALOG)
+    yield exam_catalog
+    exam_catalog.load(DEFAULT_EXAM_CATALOG)
+
+
+@pytest.mark.parametrize("raw, normalized", [
+    ("N.F.S", "nfs"),
+    ("Échographie  abdominale !", "echographie abdominale"),
+    ("NFS + plaquettes", "nfs + plaquettes"),
+    ("", ""),
+])
+def test_normalize_exam_text(raw, normalized):
+    assert normalize_exam_text(raw) == normalized
+
+
+@pytest.mark.parametrize("label, code", [
+    ("NFS", "NFS"),
+    ("n.f.s + plaquettes", "NFS"),
+    ("Goutte épaisse", "GOUTTE_EPAISSE"),
+    ("TDR paludisme svp", "GOUTTE_EPAISSE"),
+    ("Scanner cérébral sans injection", "TDM_CEREBRAL"),   # le synonyme le plus long l'emporte
+    ("Échographie abdominale", "ECHO_ABDO"),
+    ("Échographie", "ECHO"),
+])
+def test_synonym_match_without_embeddings(label, code):
+    assert exam_catalog.match_code(label, use_embeddings=False) == code
+
+
+def test_unknown_label_without_embeddings():
+    assert exam_catalog.match_code("examen imaginaire", use_embeddings=False) is None
+    assert exam_catalog.match_code("   ", use_embeddings=False) is None
+
+
+def test_embedding_fallback_uses_one_batch_for_the_index(embeddings):
+    fake = embeddings()
+    assert exam_catalog.match_code("image des poumons") == "RX_THORAX"
+    assert exam_catalog.match_code("cliché des poumons de face") == "RX_THORAX"
+    assert fake.batches == 1
+    assert fake.single == 2
+
+
+def test_concurrent_first_lookups_build_the_index_once(embeddings):
+    fake = embeddings(delay=0.05)
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(exam_catalog.match_code(f"image poumons {i}")))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["RX_THORAX"] * 4
+    assert fake.batches == 1
+
+
+def test_failed_embedding_lookup_is_not_cached(embeddings):
+    embeddings(fail=True)
+    assert exam_catalog.match_code("image des poumons") is None
+
+    fake = embeddings()
+    assert exam_catalog.match_code("image des poumons") == "RX_THORAX"
+    assert fake.batches == 1
@@ -0,0 +1,93 @@
+#=== Fichier: ./tests/unit/test_governor.py ===
+
+import asyncio
+
+from app.services.llm.governor import LLMGovernor
+
+
+def test_waiting_calls_are_served_by_priority_then_arrival():
+    async def scenario():
+        governor = LLMGovernor(max_concurrency=1, rate_per_second=0, burst=1)
+        order = []
+
+        async def call(name: str, priority: int):
+            async with governor.slot(name, priority):
+                order.append(name)
+
+        await governor.acquire("occupant", 0)
+        tasks = [
+            asyncio.ensure_future(call("soumission", 5)),
+            asyncio.ensure_future(call("chat-1", 0)),
+            asyncio.ensure_future(call("chat-2", 0)),
+        ]
+        await asyncio.sleep(0)
+        assert governor.queue_depth == 3
+
+        governor.release()
+        await asyncio.gather(*tasks)
+        return order, governor.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["chat-1", "chat-2", "soumission"]
+    assert stats["active"] == 0
+    assert stats["tasks"]["soumission"]["acquired"] == 1
+
+
+def test_concurrency_cap_is_respected():
+    async def scenario():
+        governor = LLMGovernor(max_concurrency=2, rate_per_second=0, burst=1)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with governor.slot("t", 1):
+                peak = max(peak, governor.stats()["active"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_token_bucket_spaces_calls_beyond_the_burst():
+    async def scenario():
+        governor = LLMGovernor(max_concurrency=10, rate_per_second=20, burst=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await governor.acquire("t", 0)
+        first = loop.time() - start
+        await governor.acquire("t", 0)
+        second = loop.time() - start
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first < 0.02
+    assert second >= 0.04  # un jeton toutes les 50 ms
+
+
+def test_penalize_freezes_the_bucket():
+    governor = LLMGovernor(max_concurrency=10, rate_per_second=5, burst=10)
+    assert governor._seconds_until_token() == 0.0
+
+    governor.penalize(2.0)
+    assert 1.9 < governor._seconds_until_token() <= 2.0
+    assert governor.stats()["rate_limited_total"] == 1
+
+
+def test_cancelled_waiter_does_not_keep_a_slot():
+    async def scenario():
+        governor = LLMGovernor(max_concurrency=1, rate_per_second=0, burst=1)
+        await governor.acquire("occupant", 0)
+        waiter = asyncio.ensure_future(governor.acquire("annulé", 0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+        governor.release()
+        await asyncio.wait_for(governor.acquire("suivant", 0), timeout=1)
+        return governor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 1
+    assert stats["queue_depth"] == 0
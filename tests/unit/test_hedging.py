@@ -0,0 +1,95 @@
+#=== Fichier: ./tests/unit/test_hedging.py ===
+
+import asyncio
+
+import pytest
+
+from app.services.llm.client import LLMUnavailableError
+from app.services.llm.hedging import MIN_SAMPLES_FOR_P95, ModelLatencyTracker, hedged_call
+
+
+def _fake_models(behaviours):
+    """
+    `behaviours` : modèle -> (délai en s, résultat ou exception).
+    Retourne la fonction d'appel et la liste des modèles lancés.
+    """
+    launched = []
+
+    async def call(model):
+        launched.append(model)
+        delay, outcome = behaviours[model]
+        await asyncio.sleep(delay)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return call, launched
+
+
+def _run(candidates, behaviours, hedge_delay=0.05, allow_hedge=lambda: True, tracker=None):
+    call, launched = _fake_models(behaviours)
+    tracker = tracker or ModelLatencyTracker()
+    result = asyncio.run(hedged_call(
+        candidates, call,
+        hedge_delay=lambda model: hedge_delay,
+        is_valid=lambda r: r != "invalide",
+        task="test",
+        tracker=tracker,
+        allow_hedge=allow_hedge,
+    ))
+    return result, launched, tracker
+
+
+def test_fast_primary_wins_without_hedge():
+    result, launched, _ = _run(["a", "b"], {"a": (0, "A"), "b": (0, "B")})
+    assert result == ("a", "A")
+    assert launched == ["a"]
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    result, launched, tracker = _run(["a", "b"], {"a": (1.0, "A"), "b": (0, "B")})
+    assert result == ("b", "B")
+    assert launched == ["a", "b"]
+    stats = tracker.stats()
+    assert stats["b"]["test"]["hedged"] == 1
+    assert stats["a"]["test"]["cancelled"] == 1
+
+
+def test_failure_or_invalid_reply_moves_on_immediately():
+    result, launched, tracker = _run(
+        ["a", "b", "c"],
+        {"a": (0, RuntimeError("boom")), "b": (0, "invalide"), "c": (0, "C")},
+        hedge_delay=10,
+    )
+    assert result == ("c", "C")
+    assert launched == ["a", "b", "c"]
+    assert tracker.error_rate("a", "test") == 1.0
+
+
+def test_no_hedge_when_not_allowed():
+    result, launched, _ = _run(["a", "b"], {"a": (0.1, "A"), "b": (0, "B")}, hedge_delay=0.01, allow_hedge=lambda: False)
+    assert result == ("a", "A")
+    assert launched == ["a"]
+
+
+def test_all_models_unavailable_raises():
+    with pytest.raises(LLMUnavailableError):
+        _run(["a", "b"], {"a": (0, LLMUnavailableError("a")), "b": (0, "invalide")})
+    with pytest.raises(LLMUnavailableError):
+        _run([], {})
+
+
+def test_last_non_provider_error_is_propagated():
+    with pytest.raises(ValueError):
+        _run(["a"], {"a": (0, ValueError("réponse illisible"))})
+
+
+def test_p95_needs_enough_samples():
+    tracker = ModelLatencyTracker()
+    for i in range(MIN_SAMPLES_FOR_P95 - 1):
+        tracker.record_success("m", "t", float(i))
+    assert tracker.percentile("m", "t") is None
+
+    for i in range(MIN_SAMPLES_FOR_P95 - 1, 100):
+        tracker.record_success("m", "t", float(i))
+    assert tracker.percentile("m", "t") == 94.0
@@ -0,0 +1,45 @@
+#=== Fichier: ./tests/unit/test_json_repair.py ===
+
+import pytest
+
+from app.services.llm.json_repair import repair_json
+
+
+@pytest.mark.parametrize("raw, expected", [
+    # Chaîne coupée : refermée telle quelle, texte partiel conservé
+    ('{"a": "hello wor', {"a": "hello wor"}),
+    # Littéral incomplet en fin de flux : la paire est abandonnée
+    ('{"x": tru', {}),
+    # Clé coupée : abandonnée, le reste de l'objet est conservé
+    ('{"a": 1, "b', {"a": 1}),
+    # Conteneurs encore ouverts : refermés dans l'ordre
+    ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1, 2]}),
+    ('{"a": {"b": 2, "c": 3', {"a": {"b": 2, "c": 3}}),
+    ('[{"a": 1}, {"b":', [{"a": 1}, {}]),
+    # Nombre en fin de flux : conservé
+    ('{"a": 12', {"a": 12}),
+    # Séquence d'échappement coupée en deux : le '\' orphelin est retiré
+    ('{"a": "x\\', {"a": "x"}),
+])
+def test_truncated_json_is_closed(raw, expected):
+    assert repair_json(raw) == expected
+
+
+@pytest.mark.parametrize("raw, expected", [
+    # Virgules traînantes
+    ('{"a": 1,}', {"a": 1}),
+    ('{"a": [1, 2,]}', {"a": [1, 2]}),
+    # Bloc Markdown et littéraux Python
+    ('```json\n{"a": True, "b": None}\n```', {"a": True, "b": None}),
+    # Prose avant / après l'objet racine
+    ('Voici le résultat : {"a": 1} Bonne journée !', {"a": 1}),
+    # Retour à la ligne brut dans une chaîne
+    ('{"a": "x\ny"}', {"a": "x\ny"}),
+])
+def test_malformed_json_is_normalized(raw, expected):
+    assert repair_json(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [None, "", "pas de json ici"])
+def test_nothing_to_recover(raw):
+    assert repair_json(raw) is None
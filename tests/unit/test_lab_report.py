@@ -0,0 +1,113 @@
+#=== Fichier: ./tests/unit/test_lab_report.py ===
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services import lab_report_service as lr
+from app.services.exam_catalog_service import DEFAULT_EXAM_CATALOG, exam_catalog
+from app.services.lab_report_service import LabReportRenderer
+
+LAB_RESULTS = [
+    {"nom": "Hemoglobin", "valeur": 8.2, "unite": "g/dL"},
+    {"nom": "Platelet Count", "valeur": 90, "unite": "K/uL"},
+    {"nom": "Creatinine", "valeur": 2.0, "unite": "mg/dL"},
+]
+
+
+@pytest.fixture(autouse=True)
+def catalog(monkeypatch):
+    exam_catalog.load(DEFAULT_EXAM_CATALOG)
+    monkeypatch.setattr(settings, "LOCAL_LAB_REPORTS_ENABLED", True)
+
+
+@pytest.fixture
+def renderer():
+    return LabReportRenderer()
+
+
+def _case(lab_results=LAB_RESULTS, id=7):
+    return SimpleNamespace(id=id, code_fultang=f"C{id}", donnees_paracliniques={"lab_results": lab_results})
+
+
+# ==============================================================================
+# UNITÉS ET PARAMÈTRES
+# ==============================================================================
+
+@pytest.mark.parametrize("value, unit, expected", [
+    (8.2, "g/dL", 8.2),
+    (82, "g/L", 8.2),
+    (8.2, None, 8.2),
+    ("8,2", "g/dL", None),
+    (8.2, "mg/L", None),
+])
+def test_values_are_converted_to_the_reference_unit(value, unit, expected):
+    hemoglobin = lr.LAB_PANELS["NFS"][0]
+    assert lr._to_reference_unit(value, unit, hemoglobin) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("Hémoglobine", "Hémoglobine"),
+    ("INR(PT)", "INR"),
+    ("Bilirubin, Total, Direct", "Bilirubine totale"),
+    ("Ferritine", None),
+])
+def test_record_labels_are_matched_to_panel_parameters(label, expected):
+    panel = [p for code in ("NFS", "COAGULATION", "BILAN_HEPATIQUE") for p in lr.LAB_PANELS[code]]
+    param = lr._find_param(panel, label)
+    assert (param["nom"] if param else None) == expected
+
+
+def test_number_formatting_drops_trailing_zeros():
+    assert lr._format_number(12.0, 1) == "12"
+    assert lr._format_number(0.7, 2) == "0.7"
+    assert lr._format_number(150.0, 0) == "150"
+
+
+# ==============================================================================
+# COMPTES-RENDUS
+# ==============================================================================
+
+def test_record_values_are_reported_as_is_with_anomalies(renderer):
+    report = renderer.render(_case(), "NFS")
+
+    assert report["type_resultat"] == "biologie"
+    assert "Hémoglobine | 8.2 g/dL ↓ | 12 - 16 g/dL" in report["rapport_complet"]
+    assert report["valeurs_cles"] == {"Hémoglobine": "8.2 g/dL ↓", "Plaquettes": "90 G/L ↓"}
+    assert report["conclusion"].startswith("Valeurs hors normes : Hémoglobine en baisse")
+    assert "anormal" not in report["conclusion"]
+
+
+def test_converted_value_keeps_the_original_reading(renderer):
+    report = renderer.render(_case(), "Créatinine")
+    assert report["valeurs_cles"] == {"Créatinine": "176.8 µmol/L (2.0 mg/dL) ↑"}
+
+
+def test_missing_parameters_are_normal_and_reproducible(renderer):
+    first = renderer.render(_case([]), "Ionogramme sanguin")
+    assert first == renderer.render(_case([]), "Ionogramme")
+    assert first["conclusion"] == "Bilan dans les limites de la normale."
+
+    for param in lr.LAB_PANELS["IONO"]:
+        value = float(first["valeurs_cles"][param["nom"]].split()[0])
+        assert param["min"] <= value <= param["max"]
+    assert renderer.render(_case([], id=8), "Ionogramme sanguin") != first
+
+
+def test_uninterpretable_value_is_delegated_to_the_llm(renderer):
+    case = _case([{"nom": "Hemoglobin", "valeur": 8.2, "unite": "mg/L"}])
+    assert renderer.render(case, "NFS") is None
+    assert renderer.stats()["delegated"] == 1
+
+
+@pytest.mark.parametrize("exam", ["Radiographie thoracique", "Examen inconnu"])
+def test_exams_without_panel_are_not_covered(renderer, exam):
+    assert renderer.render(_case(), exam) is None
+    assert renderer.stats() == {"rendered": 0, "not_covered": 1, "delegated": 0}
+
+
+def test_disabled_renderer_does_nothing(renderer, monkeypatch):
+    monkeypatch.setattr(settings, "LOCAL_LAB_REPORTS_ENABLED", False)
+    assert renderer.render(_case(), "NFS") is None
+    assert renderer.stats()["not_covered"] == 0
@@ -0,0 +1,124 @@
+#=== Fichier: ./tests/unit/test_llm_client.py ===
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.llm import client as client_module
+from app.services.llm.client import (
+    BACKOFF_MAX_SECONDS,
+    LLMUnavailableError,
+    llm_client,
+)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """
+    Remplace le pool HTTP partagé par un transport simulé. `install(réponses)`
+    rejoue les réponses dans l'ordre (une exception est levée telle quelle) ;
+    les attentes de backoff sont enregistrées au lieu d'être dormies.
+    """
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(client_module.asyncio, "sleep", fake_sleep)
+
+    def install(responses):
+        requests = []
+        queue = list(responses)
+
+        def handler(request):
+            requests.append(request)
+            outcome = queue.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(llm_client, "_http", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return requests
+
+    install.sleeps = sleeps
+    return install
+
+
+def _post(**kwargs):
+    return asyncio.run(llm_client.post_chat_completion({"model": "m", "messages": []}, **kwargs))
+
+
+# ==============================================================================
+# BACKOFF
+# ==============================================================================
+
+def test_backoff_honours_retry_after_within_bounds():
+    assert llm_client._backoff_delay(1, "3") == 3.0
+    assert llm_client._backoff_delay(1, "120") == BACKOFF_MAX_SECONDS
+    assert llm_client._backoff_delay(1, "-5") == 0.0
+
+
+@pytest.mark.parametrize("attempt, base", [(1, 1.0), (2, 2.0), (3, 4.0), (10, BACKOFF_MAX_SECONDS)])
+def test_backoff_is_exponential_with_jitter(attempt, base):
+    delay = llm_client._backoff_delay(attempt, "pas un nombre")
+    assert base <= delay <= base + 0.5
+
+
+# ==============================================================================
+# TENTATIVES RÉSEAU
+# ==============================================================================
+
+def test_rate_limit_waits_retry_after_then_succeeds(transport):
+    requests = transport([
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json={"choices": []}),
+    ])
+    penalties = []
+
+    assert _post(on_rate_limited=penalties.append) == {"choices": []}
+    assert len(requests) == 2
+    assert penalties == [2.0]
+    assert transport.sleeps == [2.0]
+
+
+def test_server_errors_exhaust_retries(transport):
+    requests = transport([httpx.Response(503)] * 3)
+    with pytest.raises(LLMUnavailableError):
+        _post(max_retries=3)
+    assert len(requests) == 3
+    assert len(transport.sleeps) == 2
+
+
+def test_network_error_is_retried(transport):
+    requests = transport([
+        httpx.ConnectError("coupure"),
+        httpx.Response(200, json={"ok": True}),
+    ])
+    assert _post() == {"ok": True}
+    assert len(requests) == 2
+
+
+def test_client_error_is_not_retried(transport):
+    requests = transport([httpx.Response(401), httpx.Response(200, json={})])
+    with pytest.raises(httpx.HTTPStatusError):
+        _post()
+    assert len(requests) == 1
+    assert transport.sleeps == []
+
+
+# ==============================================================================
+# PONTS VERS LA BOUCLE DU NOYAU
+# ==============================================================================
+
+def test_run_and_run_async_execute_on_the_kernel_loop():
+    async def where():
+        return llm_client.in_kernel_loop()
+
+    assert llm_client.run(where()) is True
+
+    async def from_other_loop():
+        return await llm_client.run_async(where())
+
+    assert asyncio.run(from_other_loop()) is True
+    assert llm_client.in_kernel_loop() is False
@@ -0,0 +1,282 @@
+#=== Fichier: ./tests/unit/test_local_grader.py ===
+
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.services import local_grader_service as lg
+from app.services.exam_catalog_service import DEFAULT_EXAM_CATALOG, exam_catalog
+
+
+def _disease(id, nom_fr, nom_en, code_icd10, nom_local, categorie):
+    return SimpleNamespace(id=id, nom_fr=nom_fr, nom_en=nom_en, code_icd10=code_icd10,
+                           nom_local=nom_local, categorie=categorie)
+
+
+DISEASES = [
+    _disease(1, "Paludisme grave", "Severe Malaria", "B50.0", "djoudjou", "Infectieuse"),
+    _disease(2, "Paludisme", "Malaria", "B54", "palu", "Infectieuse"),
+    _disease(3, "Fièvre typhoïde", "Typhoid fever", "A01.0", None, "Infectieuse"),
+    _disease(4, "Diabète de type 2", "Type 2 diabetes", "E11", "sucre", "Métabolique"),
+]
+
+# Paludisme grave : molécule de première ligne + traitement d'appoint
+TREATMENTS = [
+    {"nom": "Artésunate", "appellations": {"artesunate"}, "premiere_ligne": True},
+    {"nom": "Doliprane", "appellations": {"paracetamol", "doliprane"}, "premiere_ligne": False},
+]
+
+
+@pytest.fixture
+def grader(monkeypatch):
+    """Correcteur dont l'index des pathologies est pré-chargé (aucune requête BDD)."""
+    monkeypatch.setitem(sys.modules, "app.services.embedding_service", None)
+    grader = lg.LocalGrader()
+    grader.diseases._entries = [lg._DiseaseEntry(d) for d in DISEASES]
+    grader.diseases._loaded_at = time.monotonic()
+    return grader
+
+
+@pytest.fixture
+def catalog():
+    exam_catalog.load(DEFAULT_EXAM_CATALOG)
+    return exam_catalog
+
+
+# ==============================================================================
+# DIAGNOSTIC
+# ==============================================================================
+
+@pytest.mark.parametrize("text, expected_id, method", [
+    ("Paludisme grave", 1, lg.MATCH_EXACT),
+    ("  PALUDISME   GRAVE. ", 1, lg.MATCH_EXACT),
+    ("Severe Malaria", 1, lg.MATCH_SYNONYM),
+    ("b50.0", 1, lg.MATCH_SYNONYM),
+    ("djoudjou", 1, lg.MATCH_LOCAL_NAME),
+    ("Je pense à un paludisme grave", 1, lg.MATCH_EXACT),   # le nom le plus long l'emporte
+    ("plutôt un palu", 2, lg.MATCH_LOCAL_NAME),
+    ("fievre typhoide", 3, lg.MATCH_EXACT),
+])
+def test_diagnosis_resolution(grader, text, expected_id, method):
+    entry, found_method, similarity = grader.diseases.resolve(mock.MagicMock(), text)
+    assert (entry.id, found_method, similarity) == (expected_id, method, 1.0)
+
+
+@pytest.mark.parametrize("text", ["", "   ", "pneumopathie communautaire"])
+def test_unresolved_diagnosis(grader, text):
+    # Sans modèle d'embedding, aucun rapprochement approximatif
+    assert grader.diseases.resolve(mock.MagicMock(), text) == (None, None, 0.0)
+
+
+def _embedding_fallback(monkeypatch, grader, query_outcome):
+    """Modèle d'embedding factice ; `query_outcome` : ligne renvoyée ou exception levée par la requête."""
+    fake = SimpleNamespace(get_text_embedding=lambda text: [0.1, 0.2])
+    monkeypatch.setitem(sys.modules, "app.services.embedding_service", SimpleNamespace(embedding_service=fake))
+    db = mock.MagicMock()
+    first = db.query.return_value.filter.return_value.order_by.return_value.first
+    if isinstance(query_outcome, Exception):
+        first.side_effect = query_outcome
+    else:
+        first.return_value = query_outcome
+    return grader.diseases.resolve(db, "infection à salmonelle"), db
+
+
+def test_nearest_disease_by_embedding(monkeypatch, grader):
+    (entry, method, similarity), _ = _embedding_fallback(monkeypatch, grader, SimpleNamespace(id=3, distance=0.1))
+    assert (entry.id, method) == (3, lg.MATCH_EMBEDDING)
+    assert similarity == pytest.approx(0.9)
+
+
+def test_failed_nearest_query_keeps_the_caller_transaction(monkeypatch, grader):
+    result, db = _embedding_fallback(monkeypatch, grader, RuntimeError("extension vector absente"))
+    assert result == (None, None, 0.0)
+    db.begin_nested.assert_called_once()
+    db.rollback.assert_not_called()
+
+
+@pytest.mark.parametrize("text, score", [
+    ("paludisme grave", lg.DIAG_SCORE_EXACT),
+    ("Severe Malaria", lg.DIAG_SCORE_EXACT),
+    ("Paludisme", lg.DIAG_SCORE_INCOMPLETE),       # forme générale du bon diagnostic
+    ("typhoïde", None),                            # mot isolé : non résolu
+    ("Fièvre typhoïde", lg.DIAG_SCORE_SAME_FAMILY),
+    ("Diabète de type 2", lg.DIAG_SCORE_WRONG),
+    ("pneumopathie", None),                        # non résolu : jury LLM
+])
+def test_diagnosis_score(grader, text, score):
+    case = SimpleNamespace(pathologie_principale_id=1)
+    result, details = grader._score_diagnosis(mock.MagicMock(), case, text)
+    assert result == score
+    assert details["attendu"] == "Paludisme grave"
+
+
+# ==============================================================================
+# TRAITEMENT
+# ==============================================================================
+
+@pytest.mark.parametrize("text, score, cited", [
+    ("Artésunate IV + doliprane", 5.0, ["Artésunate", "Doliprane"]),
+    ("Artésunate IV", 4.0, ["Artésunate"]),
+    ("doliprane", 1.0, ["Doliprane"]),
+    ("paracétamol 1g", 1.0, ["Doliprane"]),
+    ("artesunatex", 0.0, []),                      # mots entiers uniquement
+    ("repos et hydratation", 0.0, []),
+])
+def test_treatment_scale(text, score, cited):
+    result, details = lg._score_treatment(text, TREATMENTS)
+    assert result == score
+    assert details["cites"] == cited
+    assert details["premiere_ligne_citee"] == ("Artésunate" in cited)
+
+
+def test_treatment_without_reference_is_left_to_the_jury():
+    assert lg._score_treatment("Artésunate", []) == (None, {"raison": "aucun_traitement_de_reference"})
+
+
+# ==============================================================================
+# FEEDBACK (mode correction rapide)
+# ==============================================================================
+
+def _grade(score_diagnostic, cites, manquants, premiere_ligne, questions=(), examens=()):
+    return lg.LocalGrade(score_diagnostic, 4.0, 3.0, {
+        "diagnostic": {"attendu": "Paludisme grave", "reconnu": "Paludisme"},
+        "traitement": {"cites": cites, "manquants": manquants, "premiere_ligne_citee": premiere_ligne},
+        "demarche": {
+            "anamnese": {"manquees": list(questions)},
+            "examens": {"manques": list(examens)},
+        },
+    })
+
+
+@pytest.mark.parametrize("grade, fragments, recommendation", [
+    (
+        _grade(lg.DIAG_SCORE_EXACT, ["Artésunate"], [], True),
+        ["Diagnostic correct : Paludisme grave.", "Traitements pertinents cités : Artésunate."],
+        "Continuer avec un cas de difficulté supérieure.",
+    ),
+    (
+        _grade(lg.DIAG_SCORE_SAME_FAMILY, [], ["Artésunate"], False),
+        ["Diagnostic attendu : Paludisme grave (vous avez proposé : Paludisme).",
+         "Traitements de référence non cités : Artésunate."],
+        "Revoir la présentation clinique de : Paludisme grave.",
+    ),
+    (
+        _grade(lg.DIAG_SCORE_INCOMPLETE, ["Doliprane"], ["Artésunate"], False),
+        ["Diagnostic attendu : Paludisme grave"],
+        "Revoir le traitement de première ligne de : Paludisme grave.",
+    ),
+    (
+        _grade(lg.DIAG_SCORE_EMBEDDING, ["Artésunate"], [], True,
+               questions=["Avez-vous des frissons ?"], examens=["Goutte épaisse"]),
+        ["Diagnostic correct : Paludisme grave.",
+         "Questions d'anamnèse non abordées : « Avez-vous des frissons ? ».",
+         "Examens utiles non demandés : Goutte épaisse."],
+        "Structurer l'interrogatoire et le bilan paraclinique avant de conclure.",
+    ),
+])
+def test_feedback(grade, fragments, recommendation):
+    feedback, next_step = lg.LocalGrader().feedback(grade)
+    for fragment in fragments:
+        assert fragment in feedback
+    assert next_step == recommendation
+
+
+# ==============================================================================
+# DÉMARCHE (couverture)
+# ==============================================================================
+
+MESSAGES = [
+    ("student", "Depuis quand avez-vous de la fièvre ?"),
+    ("patient", "Depuis trois jours."),
+    ("tutor", "Pensez aux signes de gravité."),
+    ("Apprenant ", "   "),
+]
+ACTIONS = [
+    ({"name": "NFS"},),
+    ({"name": "Goutte épaisse"},),
+    ({"name": "Scanner cérébral", "justification": "céphalées"},),
+    ("Prise des constantes",),
+    ({"type": "sans nom"},),
+]
+
+
+def _session_db(messages=MESSAGES, actions=ACTIONS):
+    """Requêtes successives : messages (émetteur, contenu) puis contenus des actions."""
+    db = mock.MagicMock()
+    db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [list(messages), list(actions)]
+    return db
+
+
+def test_session_activity_reads_learner_messages_and_action_names():
+    questions, actions = lg._session_activity(_session_db(), "session")
+    assert questions == ["Depuis quand avez-vous de la fièvre ?"]
+    assert actions == ["NFS", "Goutte épaisse", "Scanner cérébral", "Prise des constantes"]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Où avez-vous mal ?", ["Où avez-vous mal ?"]),
+    ("  ", []),
+    (["A ?", ["B ?", ""]], ["A ?", "B ?"]),
+    ({"P": ["A ?"], "Q": {"question": "B ?"}, "R": "", "S": 3}, ["A ?", "B ?"]),
+    (None, []),
+])
+def test_flatten_questions(raw, expected):
+    assert lg._flatten_questions(raw) == expected
+
+
+def test_question_coverage_lexical_fallback(monkeypatch):
+    monkeypatch.setitem(sys.modules, "app.services.embedding_service", None)
+    coverage = lg._question_coverage(
+        ["Depuis quand la fièvre dure-t-elle ?", "Avez-vous des frissons ?"],
+        ["Depuis quand avez-vous de la fièvre ?"],
+    )
+    assert coverage["methode"] == "lexical"
+    assert coverage["couverture"] == 0.5
+    assert coverage["manquees"] == ["Avez-vous des frissons ?"]
+
+
+def test_question_coverage_without_questions():
+    coverage = lg._question_coverage(["Avez-vous des frissons ?"], [])
+    assert (coverage["couverture"], coverage["methode"]) == (0.0, None)
+
+
+def test_expected_exams_from_case(catalog):
+    case = SimpleNamespace(donnees_paracliniques={
+        "lab_results": [{"nom": "NFS"}, {"nom": "Goutte épaisse"}, {"nom": "Créatinine"}],
+        "fonction_renale": {"creatinine": 9},   # même examen que "Créatinine"
+        "imagerie": "",                         # vide : pas de résultat
+        "ecg": None,
+    })
+    assert list(lg._expected_exams(case)) == ["NFS", "GOUTTE_EPAISSE", "FONCTION_RENALE"]
+
+
+def test_exam_coverage_and_relevance(catalog):
+    expected = {
+        "NFS": "Numération Formule Sanguine",
+        "GOUTTE_EPAISSE": "Goutte épaisse / Frottis sanguin",
+        "FONCTION_RENALE": "Urée et créatininémie",
+    }
+    _, actions = lg._session_activity(_session_db(), "session")
+    coverage = lg._exam_coverage(expected, actions)
+    # 2 examens attendus sur 3 ; 2 demandes utiles sur 3 (constantes non comptées)
+    assert coverage["couverture"] == 0.667
+    assert coverage["pertinence"] == 0.667
+    assert coverage["manques"] == ["Urée et créatininémie"]
+
+
+def test_demarche_weights_are_renormalized_without_question_reference(monkeypatch, catalog):
+    monkeypatch.setattr(lg, "_expected_questions", lambda db, case: [])
+    case = SimpleNamespace(donnees_paracliniques={"lab_results": [{"nom": "NFS"}, {"nom": "Goutte épaisse"}]})
+    score, details = lg._score_demarche(_session_db(), case, "session")
+    # Examens : couverture 1.0 (poids 0.35), pertinence 2/3 (poids 0.15)
+    assert score == round(5.0 * (0.35 * 1.0 + 0.15 * 0.667) / 0.5, 2)
+    assert "anamnese" not in details
+
+
+def test_demarche_without_any_reference_is_left_to_the_jury(monkeypatch):
+    monkeypatch.setattr(lg, "_expected_questions", lambda db, case: [])
+    case = SimpleNamespace(donnees_paracliniques={})
+    assert lg._score_demarche(_session_db(), case, "session") == (None, {"raison": "aucune_reference"})
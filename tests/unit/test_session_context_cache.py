@@ -0,0 +1,137 @@
+#=== Fichier: ./tests/unit/test_session_context_cache.py ===
+
+import uuid
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from app.services import session_context_cache as scc
+from app.services.patient_actor_service import patient_actor_service
+from app.services.session_context_cache import SessionContext, SessionContextCache
+
+VERSION = datetime(2026, 1, 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scc.time, "monotonic", fake)
+    return fake
+
+
+def _context(session_id="s1", case_id=1, covered=None):
+    return SessionContext(
+        session_id=session_id, case_id=case_id, case_version=VERSION,
+        persona={}, clinical_data={}, system_prompt="prompt",
+        summary="résumé" if covered else None, summary_covered_message_id=covered
+    )
+
+
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+def test_lru_evicts_the_least_recently_used(clock):
+    cache = SessionContextCache(max_entries=2, ttl_seconds=0, version_check_seconds=60)
+    for key in ("a", "b"):
+        cache.put(_context(key))
+    cache.get("a")
+    cache.put(_context("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_context_is_dropped(clock):
+    cache = SessionContextCache(max_entries=10, ttl_seconds=100, version_check_seconds=60)
+    cache.put(_context())
+    clock.now += 101
+    assert cache.get("s1") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_version_check_is_periodic_and_invalidates_on_change(clock):
+    cache = SessionContextCache(max_entries=10, ttl_seconds=0, version_check_seconds=60)
+    context = _context()
+    cache.put(context)
+
+    assert not cache.needs_version_check(context)
+    clock.now += 60
+    assert cache.needs_version_check(context)
+    assert cache.revalidate(context, VERSION)
+    assert not cache.needs_version_check(context)
+
+    assert not cache.revalidate(context, datetime(2026, 2, 1))
+    assert cache.get("s1") is None
+
+
+def test_invalidate_case_only_drops_its_sessions(clock):
+    cache = SessionContextCache(max_entries=10, ttl_seconds=0, version_check_seconds=60)
+    cache.put(_context("a", case_id=1))
+    cache.put(_context("b", case_id=2))
+    assert cache.invalidate_case(1) == 1
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_update_summary_only_touches_cached_sessions(clock):
+    cache = SessionContextCache(max_entries=10, ttl_seconds=0, version_check_seconds=60)
+    cache.put(_context())
+    cache.update_summary("s1", "nouveau résumé", 12)
+    cache.update_summary("absente", "ignoré", 3)
+
+    context = cache.get("s1")
+    assert (context.summary, context.summary_covered_message_id) == ("nouveau résumé", 12)
+    assert cache.get("absente") is None
+
+
+# ==============================================================================
+# FRAÎCHEUR DU RÉSUMÉ ENTRE WORKERS
+# ==============================================================================
+
+@pytest.fixture
+def cached_session(monkeypatch, clock):
+    cache = SessionContextCache(max_entries=10, ttl_seconds=0, version_check_seconds=60)
+    monkeypatch.setattr("app.services.patient_actor_service.session_context_cache", cache)
+    session_id = uuid.uuid4()
+    context = _context(str(session_id), covered=5)
+    cache.put(context)
+    clock.now += 60
+    return session_id, context
+
+
+def _db(case_version, covered_id, context_state=None):
+    db = mock.MagicMock()
+    db.query.return_value.join.return_value.filter.return_value.first.return_value = (case_version, covered_id)
+    db.query.return_value.filter.return_value.scalar.return_value = context_state
+    return db
+
+
+def test_summary_written_by_another_worker_is_read_back(cached_session):
+    session_id, context = cached_session
+    db = _db(VERSION, 11, {"conversation_summary": {"text": "résumé d'un autre worker", "covered_message_id": 11}})
+
+    served, fallback = patient_actor_service._get_session_context(db, session_id, "T")
+
+    assert served is context and fallback is None
+    assert (context.summary, context.summary_covered_message_id) == ("résumé d'un autre worker", 11)
+
+
+def test_unchanged_summary_is_not_read_again(cached_session):
+    session_id, context = cached_session
+    db = _db(VERSION, 5)
+
+    patient_actor_service._get_session_context(db, session_id, "T")
+
+    db.query.return_value.filter.return_value.scalar.assert_not_called()
+    assert context.summary == "résumé"
@@ -0,0 +1,100 @@
+#=== Fichier: ./tests/unit/test_session_events.py ===
+
+import json
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.services import chat_service
+from app.services.session_events import SessionEventRelay, session_event_bus
+
+SESSION_ID = uuid.uuid4()
+
+
+# ==============================================================================
+# AIGUILLAGE PAR CANAL
+# ==============================================================================
+
+def test_notifications_go_to_the_handler_of_their_channel():
+    received = []
+    relay = SessionEventRelay({"a": lambda p: received.append(("a", p)) or True, "b": lambda p: False})
+    assert relay.dispatch("a", "x") is True
+    assert relay.dispatch("b", "y") is False
+    assert relay.dispatch("inconnu", "z") is False
+    assert received == [("a", "x")]
+
+
+def test_failing_handler_does_not_stop_the_relay():
+    def boom(payload):
+        raise RuntimeError("base indisponible")
+
+    assert SessionEventRelay({"a": boom}).dispatch("a", "x") is False
+
+
+# ==============================================================================
+# RELAIS DU FEEDBACK TUTEUR
+# ==============================================================================
+
+@pytest.fixture
+def bus(monkeypatch):
+    published = []
+    monkeypatch.setattr(session_event_bus, "has_subscribers", lambda session_id: True)
+    monkeypatch.setattr(session_event_bus, "publish", lambda *args: published.append(args))
+    return published
+
+
+def _payload(**overrides):
+    data = {"session_id": str(SESSION_ID), "message_id": 42, "abandoned": False}
+    data.update(overrides)
+    return json.dumps(data)
+
+
+def _db_returning(row):
+    db = mock.MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = row
+    return db
+
+
+def test_feedback_is_read_back_from_the_message(monkeypatch, bus):
+    feedback = {"chronology_check": "ok"}
+    db = _db_returning(SimpleNamespace(message_metadata={"tutor_feedback": feedback}))
+    monkeypatch.setattr(chat_service, "SessionLocal", lambda: db)
+
+    assert chat_service.relay_tutor_feedback(_payload()) is True
+    assert bus == [(SESSION_ID, chat_service.EVENT_TUTOR_FEEDBACK, {"message_id": 42, "tutor_feedback": feedback})]
+    db.close.assert_called_once()
+
+
+def test_missing_message_publishes_an_empty_feedback(monkeypatch, bus):
+    monkeypatch.setattr(chat_service, "SessionLocal", lambda: _db_returning(None))
+    chat_service.relay_tutor_feedback(_payload())
+    assert bus[0][2] == {"message_id": 42, "tutor_feedback": {}}
+
+
+def test_abandoned_analysis_publishes_none_without_reading(monkeypatch, bus):
+    monkeypatch.setattr(chat_service, "SessionLocal", mock.Mock(side_effect=AssertionError("pas de lecture")))
+    assert chat_service.relay_tutor_feedback(_payload(abandoned=True)) is True
+    assert bus[0][2] == {"message_id": 42, "tutor_feedback": None}
+
+
+def test_no_local_subscriber_means_nothing_to_do(monkeypatch):
+    monkeypatch.setattr(session_event_bus, "has_subscribers", lambda session_id: False)
+    monkeypatch.setattr(chat_service, "SessionLocal", mock.Mock(side_effect=AssertionError("pas de lecture")))
+    assert chat_service.relay_tutor_feedback(_payload()) is False
+
+
+@pytest.mark.parametrize("payload", ["pas du json", json.dumps({"session_id": "x", "message_id": 1}), json.dumps({})])
+def test_unreadable_notification_is_ignored(payload, bus):
+    assert chat_service.relay_tutor_feedback(payload) is False
+    assert bus == []
+
+
+def test_notification_is_sent_on_the_tutor_channel():
+    db = mock.MagicMock()
+    chat_service._notify_tutor_feedback(db, SESSION_ID, 42, {}, abandoned=True)
+    params = db.execute.call_args.args[1]
+    assert params["channel"] == chat_service.TUTOR_NOTIFY_CHANNEL
+    assert json.loads(params["payload"]) == {"session_id": str(SESSION_ID), "message_id": 42, "abandoned": True}
+    db.commit.assert_called_once()
@@ -0,0 +1,97 @@
+#=== Fichier: ./tests/unit/test_single_flight.py ===
+
+import asyncio
+
+import pytest
+
+from app.services.llm.single_flight import SingleFlight, payload_fingerprint
+
+
+def _counting_factory(result="R", delay=0.01, error=None):
+    calls = []
+
+    def factory():
+        async def upstream():
+            calls.append(1)
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            return result
+        return upstream()
+
+    return factory, calls
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    flight = SingleFlight("test")
+    factory, calls = _counting_factory()
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", factory) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["R"] * 5
+    assert len(calls) == 1
+    stats = flight.stats()
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["hit_rate"] == 0.8
+    assert stats["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight("test")
+    factory, calls = _counting_factory()
+
+    async def scenario():
+        await flight.do("k", factory)
+        await flight.do("k", factory)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_errors_are_shared_and_counted_once():
+    flight = SingleFlight("test")
+    factory, calls = _counting_factory(error=RuntimeError("amont"))
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", factory) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(calls) == 1
+    assert flight.stats()["errors"] == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight("test")
+    factory, calls = _counting_factory(delay=0.05)
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("k", factory))
+        follower = asyncio.ensure_future(flight.do("k", factory))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "R"
+    assert len(calls) == 1
+
+
+def test_fingerprint_covers_the_fields_that_change_the_answer():
+    base = {"model": "m", "messages": [{"role": "user", "content": "bonjour"}], "temperature": 0.2, "max_tokens": 100}
+    same = dict(base, stream=True, extra_headers={"x": "y"})
+    assert payload_fingerprint(base) == payload_fingerprint(same)
+
+    variants = [
+        dict(base, model="autre"),
+        dict(base, messages=[{"role": "user", "content": "bonsoir"}]),
+        dict(base, temperature=0.7),
+        dict(base, max_tokens=200),
+        dict(base, response_format={"type": "json_object"}),
+    ]
+    fingerprints = {payload_fingerprint(v) for v in variants}
+    assert len(fingerprints) == len(variants)
+    assert payload_fingerprint(base) not in fingerprints
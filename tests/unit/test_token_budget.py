@@ -0,0 +1,121 @@
+#=== Fichier: ./tests/unit/test_token_budget.py ===
+
+import pytest
+
+from app.services.llm import token_budget as tb
+from app.services.llm.token_budget import (
+    TRUNCATION_MARKER,
+    PromptSection,
+    assemble_prompt,
+    count_message_tokens,
+    count_tokens,
+    fit_messages,
+    truncate_to_tokens,
+)
+
+
+@pytest.fixture(autouse=True)
+def char_estimate(monkeypatch):
+    """Estimation par caractères : comptes identiques avec ou sans tiktoken en local."""
+    monkeypatch.setattr(tb, "_get_encoder", lambda: None)
+
+
+def _text(tokens: int, char: str = "a") -> str:
+    """Texte estimé à `tokens` tokens (cf. CHARS_PER_TOKEN_FALLBACK)."""
+    return char * int((tokens - 1) * tb.CHARS_PER_TOKEN_FALLBACK)
+
+
+# ==============================================================================
+# TRONCATURE
+# ==============================================================================
+
+def test_short_text_is_untouched():
+    assert truncate_to_tokens("bonjour", 50) == "bonjour"
+    assert truncate_to_tokens("bonjour", 0) == ""
+
+
+@pytest.mark.parametrize("keep", ["head", "tail"])
+def test_truncation_respects_budget_and_side(keep):
+    text = _text(100, "d") + _text(100, "f")
+    piece = truncate_to_tokens(text, 40, keep=keep)
+    assert count_tokens(piece) <= 40
+    if keep == "head":
+        assert piece.startswith("d") and piece.endswith(TRUNCATION_MARKER)
+    else:
+        assert piece.endswith("f") and piece.startswith(TRUNCATION_MARKER)
+
+
+# ==============================================================================
+# ASSEMBLAGE DE PROMPT
+# ==============================================================================
+
+def test_sections_that_fit_are_kept_in_original_order():
+    sections = [
+        PromptSection("consignes", "A", required=True),
+        PromptSection("contexte", "B", priority=2),
+        PromptSection("historique", "C", priority=1),
+    ]
+    assert assemble_prompt(sections, budget=100) == "ABC"
+
+
+def test_truncatable_section_fills_the_remaining_budget():
+    sections = [
+        PromptSection("consignes", _text(20), required=True),
+        PromptSection("historique", _text(200, "h"), truncate="tail"),
+    ]
+    prompt = assemble_prompt(sections, budget=60)
+    assert prompt.startswith(_text(20))
+    assert TRUNCATION_MARKER in prompt
+    assert count_tokens(prompt) <= 62
+
+
+def test_lower_priority_section_is_dropped_when_it_does_not_fit():
+    sections = [
+        PromptSection("consignes", _text(20), required=True),
+        PromptSection("essentiel", _text(30, "e"), priority=0),
+        PromptSection("annexe", _text(30, "x"), priority=1),
+    ]
+    prompt = assemble_prompt(sections, budget=60)
+    assert "e" in prompt
+    assert "x" not in prompt
+
+
+def test_required_sections_are_never_cut():
+    sections = [PromptSection("format", _text(80), required=True)]
+    assert assemble_prompt(sections, budget=10) == _text(80)
+
+
+# ==============================================================================
+# CONVERSATIONS
+# ==============================================================================
+
+def _conversation(turns: int):
+    messages = [{"role": "system", "content": "persona"}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i} " + _text(20)})
+        messages.append({"role": "assistant", "content": f"réponse {i} " + _text(20)})
+    messages.append({"role": "user", "content": "question courante"})
+    return messages
+
+
+def test_conversation_within_budget_is_unchanged():
+    messages = _conversation(2)
+    assert fit_messages(messages, budget=10_000) is messages
+
+
+def test_oldest_turns_are_dropped_and_ends_are_pinned():
+    messages = _conversation(6)
+    fitted = fit_messages(messages, budget=120)
+
+    assert count_message_tokens(fitted) <= 120
+    assert fitted[0] == messages[0]
+    assert fitted[-1] == messages[-1]
+    assert fitted[1]["role"] == "user"
+    assert fitted[-2] == messages[-2]
+
+
+def test_intermediate_system_messages_are_kept():
+    messages = _conversation(4)
+    messages.insert(3, {"role": "system", "content": "contexte dynamique"})
+    fitted = fit_messages(messages, budget=80)
+    assert {"role": "system", "content": "contexte dynamique"} in fitted
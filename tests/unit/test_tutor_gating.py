@@ -0,0 +1,127 @@
+#=== Fichier: ./tests/unit/test_tutor_gating.py ===
+
+from unittest import mock
+
+import pytest
+
+from app.config import settings
+from app.services import tutor_gating_service as gating
+from app.services.tutor_gating_service import (
+    ACTION_ANALYZE,
+    ACTION_BATCH,
+    ACTION_DEFER,
+    ACTION_SKIP,
+    TutorGate,
+    merge_exchanges,
+    record_tutor_decision,
+)
+
+FRAGMENTS = {"symptomes": "Céphalées intenses, raideur de la nuque", "antecedents": "Diabète"}
+
+
+@pytest.fixture(autouse=True)
+def intents(monkeypatch):
+    """Classifieur d'intentions sans embedding : seule la question d'âge est reconnue."""
+    def classify(message):
+        return ("age", 0.9) if "âge" in message else (None, 0.0)
+
+    monkeypatch.setattr(gating.patient_intent_router, "classify", classify)
+    monkeypatch.setattr(settings, "TUTOR_GATING_ENABLED", True)
+    monkeypatch.setattr(settings, "TUTOR_ANALYSIS_BATCH_EVERY", 3)
+
+
+@pytest.fixture
+def gate():
+    return TutorGate(max_sessions=10)
+
+
+def _eval(gate, student, patient, count=10, session="s"):
+    return gate.evaluate(session, student, patient, count, FRAGMENTS)
+
+
+# ==============================================================================
+# DÉCISIONS
+# ==============================================================================
+
+def test_opening_exchange_is_always_analyzed(gate):
+    decision = _eval(gate, "Bonjour", "Bonjour docteur.", count=2)
+    assert decision.action == ACTION_ANALYZE
+    assert decision.reason == "ouverture_consultation"
+
+
+@pytest.mark.parametrize("student", ["Merci !", "ok", "Quel âge avez-vous exactement ?", "Et alors"])
+def test_exchanges_without_clinical_stake_are_skipped(gate, student):
+    decision = _eval(gate, student, "Je vois.")
+    assert decision.action == ACTION_SKIP
+    assert not decision.should_analyze
+
+
+def test_new_clinical_information_is_analyzed_once(gate):
+    first = _eval(gate, "Avez-vous mal quelque part ?", "J'ai une raideur de la nuque.")
+    assert first.action == ACTION_ANALYZE
+    assert "raideur" in first.signals["nouvelles_infos_cliniques"]
+
+    again = _eval(gate, "Et la nuque, comment est-elle ?", "Toujours cette raideur.")
+    assert again.action == ACTION_DEFER
+
+
+def test_deferred_exchanges_are_batched(gate):
+    questions = ["Depuis quand êtes-vous là ?", "Vous habitez où donc ?", "Vous vivez avec qui ?"]
+    decisions = [_eval(gate, q, "Je ne sais pas trop.") for q in questions]
+
+    assert [d.action for d in decisions] == [ACTION_DEFER, ACTION_DEFER, ACTION_BATCH]
+    assert decisions[-1].reason == "lot_complet"
+    assert [q for q, _ in decisions[-1].exchanges] == questions
+
+
+def test_pending_exchanges_join_the_next_clinical_analysis(gate):
+    _eval(gate, "Depuis quand êtes-vous là ?", "Ce matin.")
+    decision = _eval(gate, "Avez-vous de la fièvre ?", "Oui, une grosse fièvre.")
+    assert decision.action == ACTION_BATCH
+    assert len(decision.exchanges) == 2
+
+
+def test_sessions_have_independent_state(gate):
+    assert _eval(gate, "Avez-vous de la fièvre ?", "Oui, de la fièvre.", session="a").action == ACTION_ANALYZE
+    assert _eval(gate, "Avez-vous de la fièvre ?", "Oui, de la fièvre.", session="b").action == ACTION_ANALYZE
+
+
+def test_disabled_gate_analyzes_everything(gate, monkeypatch):
+    monkeypatch.setattr(settings, "TUTOR_GATING_ENABLED", False)
+    assert _eval(gate, "Merci", "De rien.").action == ACTION_ANALYZE
+
+
+def test_stats_report_avoided_calls(gate):
+    _eval(gate, "Bonjour", "Bonjour.", count=1)
+    _eval(gate, "Merci", "De rien.")
+    stats = gate.stats()
+    assert stats[ACTION_ANALYZE] == 1 and stats[ACTION_SKIP] == 1
+    assert stats["llm_calls_avoided_ratio"] == 0.5
+
+
+def test_least_recent_sessions_are_forgotten():
+    gate = TutorGate(max_sessions=2)
+    for session in ("a", "b", "c"):
+        _eval(gate, "Merci", "De rien.", session=session)
+    assert gate.stats()["sessions"] == 2
+
+
+# ==============================================================================
+# REGROUPEMENT ET AUDIT
+# ==============================================================================
+
+def test_merge_exchanges_numbers_questions_and_answers():
+    assert merge_exchanges([("q", "r")]) == ("q", "r")
+    assert merge_exchanges([("q1", "r1"), ("q2", "r2")]) == ("[1] q1\n[2] q2", "[1] r1\n[2] r2")
+
+
+def test_decision_is_recorded_without_commit(gate):
+    db = mock.MagicMock()
+    decision = _eval(gate, "Merci", "De rien.")
+    row = record_tutor_decision(db, "s", decision, patient_msg_id=9)
+
+    db.add.assert_called_once_with(row)
+    db.commit.assert_not_called()
+    assert row.action_choisie == ACTION_SKIP
+    assert row.rationale["message_id"] == 9
+    assert row.rationale["echanges_analyses"] == 0